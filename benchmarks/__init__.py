@@ -0,0 +1 @@
+"""Suite de benchmarks de rendimiento (corpus sintético, ejecución y comparación)."""
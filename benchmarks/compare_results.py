@@ -0,0 +1,75 @@
+"""
+Compara dos archivos de resultados de benchmarks y señala regresiones.
+
+Uso:
+    python -m benchmarks.compare_results base.json nuevo.json --threshold 10
+
+Devuelve código de salida 1 si alguna métrica empeora más que el umbral (%).
+"""
+
+import argparse
+import json
+import sys
+
+
+def flatten_report(report):
+    """Convierte el reporte en {(tamaño, métrica): segundos} para comparar."""
+    metrics = {("-", "cold_start_s"): report.get("cold_start_s")}
+    for name, seconds in report.get("cold_start", {}).items():
+        if name.endswith("_s"):
+            metrics[("-", f"cold_start.{name}")] = seconds
+    for run in report.get("runs", []):
+        size = run["size"]
+        metrics[(size, "per_row_s")] = run["end_to_end"]["per_row_s"]
+        metrics[(size, "batch_s")] = run["end_to_end"]["batch_s"]
+        metrics[(size, "appropriateness_column_s")] = run["end_to_end"].get("appropriateness_column_s")
+        for name, seconds in run.get("export_s", {}).items():
+            metrics[(size, name)] = seconds
+        metrics[(size, "cascade.cascada_s")] = run.get("cascade", {}).get("cascada_s")
+        for name, stage in run.get("stages", {}).items():
+            metrics[(size, f"{name}.p50")] = stage["p50_ms"] / 1000
+            metrics[(size, f"{name}.p95")] = stage["p95_ms"] / 1000
+    return {key: value for key, value in metrics.items() if value is not None}
+
+
+def compare(base, new, threshold_pct=10.0, min_delta_s=0.001):
+    """
+    Lista de filas (tamaño, métrica, base, nuevo, cambio_%, regresión) para las
+    métricas presentes en ambos reportes. Las diferencias absolutas menores que
+    `min_delta_s` no cuentan como regresión (ruido en métricas submilisegundo).
+    """
+    base_metrics, new_metrics = flatten_report(base), flatten_report(new)
+    rows = []
+    for key in base_metrics.keys() & new_metrics.keys():
+        before, after = base_metrics[key], new_metrics[key]
+        change = (after - before) / before * 100 if before else 0.0
+        rows.append((key[0], key[1], before, after, round(change, 1), change > threshold_pct and after - before > min_delta_s))
+    return sorted(rows, key=lambda row: (str(row[0]), row[1]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara dos resultados de benchmarks.")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Empeoramiento (%%) considerado regresión.")
+    parser.add_argument("--min-delta", type=float, default=0.001, help="Diferencia mínima (s) para contar como regresión.")
+    args = parser.parse_args(argv)
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+
+    rows = compare(base, new, args.threshold, args.min_delta)
+    print(f"Base: {base['environment'].get('commit')}  Nuevo: {new['environment'].get('commit')}")
+    print(f"{'Tamaño':>8} {'Métrica':<40} {'Base (s)':>10} {'Nuevo (s)':>10} {'Cambio':>8}")
+    for size, name, before, after, change, regression in rows:
+        flag = "  ⚠️ REGRESIÓN" if regression else ""
+        print(f"{size!s:>8} {name:<40} {before:>10.4f} {after:>10.4f} {change:>7.1f}%{flag}")
+    regressions = sum(1 for row in rows if row[5])
+    print(f"\n{regressions} regresiones (umbral {args.threshold}%)")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Generador de corpus sintético de RdAs para benchmarks.
+
+Construye Resultados de Aprendizaje realistas en español combinando verbos de
+data/bloom_taxonomy.json, términos de PROFESSIONAL_KEYWORDS y frases de
+condición/criterio. Es determinista para una semilla dada y genera los RdAs de
+forma perezosa, de modo que se pueden producir corpus de 100 a 1.000.000 filas
+sin cargarlos en memoria.
+
+Uso:
+    python -m benchmarks.corpus_generator 10000 --seed 42 --output corpus.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from src.authenticity_analyzer import PROFESSIONAL_KEYWORDS
+
+ACADEMIC_LEVELS = ('2', '4', '6', '8')
+
+PREFIXES = (
+    "",
+    "El estudiante será capaz de ",
+    "Al finalizar el curso, el estudiante podrá ",
+    "Al término de la asignatura, el estudiante deberá ",
+)
+
+OBJECTS = (
+    "los {term} de una organización",
+    "el proceso de {term} en empresas del sector",
+    "un informe técnico sobre {term}",
+    "las normas que regulan la {term}",
+    "un plan de {term} para una pyme",
+    "los indicadores de {term} de un proyecto",
+    "estrategias de {term} y {term2}",
+)
+
+CONDITIONS = (
+    "",
+    " utilizando herramientas de software especializadas",
+    " de acuerdo con la normativa vigente",
+    " mediante el análisis de casos reales",
+    " con un margen de error inferior al 5%",
+    " en un contexto profesional simulado",
+    " aplicando criterios de calidad y ética profesional",
+    " a partir de datos financieros del último ejercicio",
+)
+
+SUFFIXES = (
+    "",
+    " para apoyar la toma de decisiones",
+    " con el fin de mejorar la gestión de la organización",
+    " que permita evaluar el desempeño del equipo",
+)
+
+
+def load_verbs(taxonomy_path=None):
+    """Lista ordenada de verbos de la taxonomía de Bloom (sin duplicados)."""
+    taxonomy_path = taxonomy_path or os.path.join(PROJECT_ROOT, "data", "bloom_taxonomy.json")
+    with open(taxonomy_path, encoding="utf-8") as f:
+        taxonomy = json.load(f)
+    return sorted({verb for verbs in taxonomy.values() for verb in verbs})
+
+
+def load_terms(professional_keywords=None):
+    """Lista ordenada de términos profesionales en texto ('control_interno' -> 'control interno')."""
+    keywords = professional_keywords or PROFESSIONAL_KEYWORDS
+    return sorted({term.replace("_", " ") for terms in keywords.values() for term in terms})
+
+
+def generate_rdas(n, seed=42, verbs=None, terms=None):
+    """
+    Genera `n` tuplas (texto_ra, nivel_academico) de forma determinista.
+
+    Args:
+        n: Número de RdAs a generar.
+        seed: Semilla del generador aleatorio (mismo seed -> mismo corpus).
+        verbs, terms: Vocabularios opcionales (por defecto, taxonomía y keywords del repo).
+    """
+    rng = random.Random(seed)
+    verbs = verbs or load_verbs()
+    terms = terms or load_terms()
+    for _ in range(n):
+        verb = rng.choice(verbs)
+        obj = rng.choice(OBJECTS).format(term=rng.choice(terms), term2=rng.choice(terms))
+        prefix = rng.choice(PREFIXES)
+        if not prefix:
+            verb = verb.capitalize()
+        text = f"{prefix}{verb} {obj}{rng.choice(CONDITIONS)}{rng.choice(SUFFIXES)}."
+        yield text, rng.choice(ACADEMIC_LEVELS)
+
+
+def write_corpus(path, n, seed=42):
+    """Escribe el corpus en CSV (columnas RA, Nivel) o TXT (un RdA por línea)."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            writer = csv.writer(f)
+            writer.writerow(["RA", "Nivel"])
+            writer.writerows(generate_rdas(n, seed))
+        else:
+            for text, _ in generate_rdas(n, seed):
+                f.write(text + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera un corpus sintético de RdAs.")
+    parser.add_argument("size", type=int, help="Número de RdAs (ej: 100 .. 1000000).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", required=True, help="Archivo de salida (.csv o .txt).")
+    args = parser.parse_args(argv)
+    write_corpus(args.output, args.size, args.seed)
+    print(f"Generados {args.size} RdAs en {args.output}")
+
+
+if __name__ == '__main__':
+    main()
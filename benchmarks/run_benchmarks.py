@@ -0,0 +1,306 @@
+"""
+Benchmarks reproducibles del análisis de RdAs.
+
+Para cada tamaño de corpus sintético mide:
+  - análisis extremo a extremo (RdA por RdA, como la app, y en lote con nlp.pipe),
+  - cada analizador y el parseo spaCy (vía src.instrumentation: p50/p95/p99),
+  - exportación Excel (detallado y resumen),
+  - cada reporte PDF (ejecutivo, completo, gráficos y por nivel),
+  - la vía rápida de Bloom (tasa de acierto y coincidencia con el parser),
+  - la cascada de modelos (src/model_cascade.py): filas escaladas, tiempo frente
+    al modelo pequeño y al grande, y coincidencia de cada modo con el modelo grande,
+además del tiempo de carga del modelo en este proceso y del arranque en frío en
+un intérprete nuevo, desde el paquete y desde el snapshot (src/model_snapshot.py).
+
+Los resultados se escriben en JSON (benchmarks/results/ por defecto) junto con
+el commit, las versiones y la semilla, para compararlos entre commits con
+benchmarks/compare_results.py.
+
+Uso:
+    python -m benchmarks.run_benchmarks --sizes 100,1000,10000 --seed 42
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+import pandas as pd
+
+from src import instrumentation
+from src.rda_logging import configure_logging
+from src.nlp_utils import load_spacy_model_internal
+from src.model_snapshot import (preflight_model, measure_cold_start, is_model_installed, snapshot_path,
+                                read_snapshot_meta, is_snapshot_compatible)
+from src.rda_pipeline import analyze_rda, analyze_rda_batch
+from src.appropriateness import get_appropriateness_table
+from src.bloom_analyzer import compare_bloom_fast_path
+from src.model_cascade import analyze_rda_cascade, get_escalation_model, is_uncertain_result
+from src.rule_packs import get_rule_pack
+from src.excel_export import build_detailed_excel, build_summary_excel
+from src.pdf_generator_simple import (
+    generate_executive_pdf, generate_level_pdf, generate_complete_pdf, generate_charts_pdf
+)
+from benchmarks.corpus_generator import generate_rdas
+
+DEFAULT_SIZES = "100,1000"
+DEFAULT_PDF_MAX_ROWS = 1000 # Los PDF con tablas completas crecen mucho; se limita el número de filas
+DEFAULT_CHUNK_ROWS = 1000   # RdAs generados y analizados por bloque
+RESULTS_DIR = os.path.join(PROJECT_ROOT, "benchmarks", "results")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _environment(model_name):
+    import spacy
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "spacy": spacy.__version__,
+        "pandas": pd.__version__,
+        "model": model_name,
+        "rule_pack": f"{get_rule_pack().name}@{get_rule_pack().version}",
+    }
+
+
+def measure_cold_starts(model_name):
+    """Arranque en frío (intérprete nuevo) desde el paquete y desde el snapshot, si existe."""
+    result = {
+        "source": preflight_model(model_name, check_network=False)["source"],
+        "package_s": measure_cold_start(model_name) if is_model_installed(model_name) else None,
+        "snapshot_s": None,
+    }
+    snapshot = snapshot_path(model_name)
+    if is_snapshot_compatible(read_snapshot_meta(snapshot)):
+        result["snapshot_s"] = measure_cold_start(snapshot)
+    return result
+
+
+def _timed_call(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def _corpus_chunks(size, seed, chunk_rows):
+    """Recorre el corpus sintético en bloques de `chunk_rows` RdAs sin cargarlo entero en memoria."""
+    rdas = generate_rdas(size, seed)
+    while True:
+        chunk = list(itertools.islice(rdas, chunk_rows))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _count_agreement(counts, results, reference):
+    """Acumula en `counts` [coincidentes, comparadas] las filas con el mismo nivel de Bloom y la misma Corrección."""
+    for a, b in zip(results, reference):
+        if a and b:
+            counts[0] += a["Nivel Bloom Original"] == b["Nivel Bloom Original"] \
+                and a["Puntaje Corrección"] == b["Puntaje Corrección"]
+            counts[1] += 1
+
+
+def _ratio(counts):
+    same, total = counts
+    return round(same / total, 4) if total else None
+
+
+def benchmark_cascade(size, seed, chunk_rows, nlp, escalation_model, uncertain, batch_seconds, batch_size):
+    """
+    Compromiso tiempo/calidad de la cascada: el modelo grande sobre todas las filas
+    es la referencia de calidad (no hay etiquetas de referencia en el corpus sintético).
+    """
+    report = {"modelo_escalado": None, "inciertas": uncertain,
+              "tasa_escalado": round(uncertain / size, 4) if size else None,
+              "pequeno_s": round(batch_seconds, 4)}
+    if escalation_model is None:
+        return report
+    cascade_seconds = large_seconds = 0.0
+    resolved, model = 0, None
+    small_agreement, cascade_agreement = [0, 0], [0, 0]
+    for chunk in _corpus_chunks(size, seed, chunk_rows):
+        small_results = analyze_rda_batch(chunk, nlp, None, batch_size)
+        (cascade_results, stats), seconds = _timed_call(analyze_rda_cascade, chunk, nlp, escalation_model,
+                                                        None, batch_size)
+        cascade_seconds += seconds
+        large_results, seconds = _timed_call(analyze_rda_batch, chunk, escalation_model, None, batch_size)
+        large_seconds += seconds
+        resolved += stats["resueltas"]
+        model = stats["modelo_escalado"]
+        _count_agreement(small_agreement, small_results, large_results)
+        _count_agreement(cascade_agreement, cascade_results, large_results)
+    report.update({
+        "modelo_escalado": model,
+        "resueltas": resolved,
+        "cascada_s": round(cascade_seconds, 4),
+        "grande_s": round(large_seconds, 4),
+        "coincidencia_pequeno": _ratio(small_agreement),
+        "coincidencia_cascada": _ratio(cascade_agreement),
+    })
+    return report
+
+
+def benchmark_size(nlp, size, seed, pdf_max_rows, batch_size, escalation_model=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Ejecuta todas las mediciones para un corpus de `size` RdAs. El corpus se genera
+    de nuevo (con la misma semilla) para cada pasada y se recorre en bloques de
+    `chunk_rows`: solo se conservan la tabla de resultados para la exportación
+    Excel y las primeras `pdf_max_rows` filas para los PDF.
+    """
+    instrumentation.reset()
+
+    # Extremo a extremo: RdA por RdA (ruta de la aplicación)
+    per_row_seconds, analyzed = 0.0, 0
+    frames, pdf_rows = [], []
+    for chunk in _corpus_chunks(size, seed, chunk_rows):
+        results, seconds = _timed_call(lambda: [analyze_rda(text, level, nlp) for text, level in chunk])
+        per_row_seconds += seconds
+        results = [r for r in results if r]
+        analyzed += len(results)
+        pdf_rows.extend(results[:pdf_max_rows - len(pdf_rows)])
+        frames.append(pd.DataFrame(results))
+    # Las métricas por analizador se toman de esta pasada (cada analizador parsea su texto)
+    stages = instrumentation.snapshot()
+
+    # Extremo a extremo: en lote con nlp.pipe (ruta del servicio HTTP); solo se cuentan las filas inciertas
+    instrumentation.reset()
+    batch_seconds, uncertain = 0.0, 0
+    for chunk in _corpus_chunks(size, seed, chunk_rows):
+        batch_results, seconds = _timed_call(analyze_rda_batch, chunk, nlp, None, batch_size)
+        batch_seconds += seconds
+        uncertain += sum(is_uncertain_result(result) for result in batch_results)
+    batch_stages = instrumentation.snapshot()
+    batch_counters = instrumentation.counters()
+    cascade = benchmark_cascade(size, seed, chunk_rows, nlp, escalation_model, uncertain, batch_seconds, batch_size)
+
+    results_df = pd.concat(frames, ignore_index=True)
+    del frames
+    # Clasificación de adecuación vectorizada sobre la columna completa
+    _, column_seconds = _timed_call(get_appropriateness_table().classify_column,
+                                    results_df["Nivel Bloom Original"], results_df["Nivel Académico Origen"])
+    export = {}
+    instrumentation.reset()
+    export["excel_detallado"] = _timed_call(build_detailed_excel, results_df)[1]
+    export["excel_resumen"] = _timed_call(build_summary_excel, results_df)[1]
+
+    export["pdf_ejecutivo"] = _timed_call(generate_executive_pdf, pdf_rows)[1]
+    export["pdf_completo"] = _timed_call(generate_complete_pdf, pdf_rows)[1]
+    export["pdf_graficos"] = _timed_call(generate_charts_pdf, pdf_rows)[1]
+    export["pdf_nivel"] = sum(_timed_call(generate_level_pdf, pdf_rows, level)[1] for level in ('2', '4', '6', '8'))
+
+    # Vía rápida de Bloom frente al análisis completo sobre los mismos textos
+    fast_path = compare_bloom_fast_path((text for text, _ in generate_rdas(size, seed)), nlp, batch_size,
+                                        chunk_size=chunk_rows)
+
+    return {
+        "size": size,
+        "analyzed": analyzed,
+        "pdf_rows": len(pdf_rows),
+        "end_to_end": {
+            "per_row_s": round(per_row_seconds, 4),
+            "per_row_rdas_per_s": round(size / per_row_seconds, 2) if per_row_seconds else None,
+            "batch_s": round(batch_seconds, 4),
+            "batch_rdas_per_s": round(size / batch_seconds, 2) if batch_seconds else None,
+            "appropriateness_column_s": round(column_seconds, 4),
+        },
+        "export_s": {name: round(seconds, 4) for name, seconds in export.items()},
+        "bloom_fast_path": fast_path,
+        "cascade": cascade,
+        "stages": stages,
+        "batch_stages": batch_stages,
+        "batch_counters": batch_counters,
+    }
+
+
+def run(sizes, seed=42, model_name="es_core_news_sm", pdf_max_rows=DEFAULT_PDF_MAX_ROWS, batch_size=64,
+        chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Ejecuta la suite completa y devuelve el diccionario de resultados."""
+    instrumentation.enable()
+    nlp, cold_start = _timed_call(load_spacy_model_internal, model_name)
+    if not nlp:
+        raise RuntimeError(f"No se pudo cargar el modelo spaCy '{model_name}'.")
+
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seed": seed,
+        "environment": _environment(model_name),
+        "cold_start_s": round(cold_start, 4),
+        "cold_start": measure_cold_starts(model_name),
+        "runs": [],
+    }
+    escalation_model = get_escalation_model()
+    for size in sizes:
+        logging.getLogger(__name__).warning("Benchmark con %s RdAs...", size)
+        report["runs"].append(benchmark_size(nlp, size, seed, pdf_max_rows, batch_size, escalation_model,
+                                             chunk_rows))
+    instrumentation.reset()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks reproducibles del análisis de RdAs.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Tamaños de corpus separados por coma (ej: 100,1000,1000000).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--model", default="es_core_news_sm")
+    parser.add_argument("--pdf-max-rows", type=int, default=DEFAULT_PDF_MAX_ROWS, help="Filas máximas incluidas en los PDF.")
+    parser.add_argument("--batch-size", type=int, default=64, help="Tamaño de lote de nlp.pipe.")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS,
+                        help="RdAs del corpus generados y analizados por bloque.")
+    parser.add_argument("--output", help="Archivo JSON de salida (por defecto benchmarks/results/<commit>-<fecha>.json).")
+    args = parser.parse_args(argv)
+
+    configure_logging("WARNING")
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    report = run(sizes, args.seed, args.model, args.pdf_max_rows, args.batch_size, args.chunk_rows)
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{report['environment']['commit'] or 'local'}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    for run_result in report["runs"]:
+        e2e = run_result["end_to_end"]
+        print(f"{run_result['size']:>8} RdAs | por fila {e2e['per_row_s']:.2f}s ({e2e['per_row_rdas_per_s']} RdA/s)"
+              f" | lote {e2e['batch_s']:.2f}s ({e2e['batch_rdas_per_s']} RdA/s)")
+        fast_path = run_result["bloom_fast_path"]
+        print(f"{'':>8}      | Bloom vía rápida: acierto {fast_path['tasa_acierto']}, coincidencia de nivel"
+              f" {fast_path['coincidencia_nivel']} ({fast_path['rapida_s']:.3f}s frente a {fast_path['completa_s']:.2f}s)")
+        lemma_memo = run_result["batch_counters"].get("lemma_memo")
+        if lemma_memo:
+            print(f"{'':>8}      | Memo de lemas (lote): {lemma_memo['aciertos']} aciertos, {lemma_memo['fallos']} fallos"
+                  f" (tasa {lemma_memo['tasa_acierto']}, {lemma_memo['lemas']} lemas)")
+        cascade = run_result["cascade"]
+        if cascade["modelo_escalado"]:
+            print(f"{'':>8}      | Cascada ({cascade['modelo_escalado']}): {cascade['inciertas']} filas escaladas,"
+                  f" {cascade['cascada_s']:.2f}s (pequeño {cascade['pequeno_s']:.2f}s, grande {cascade['grande_s']:.2f}s),"
+                  f" coincidencia con el grande {cascade['coincidencia_cascada']} (pequeño {cascade['coincidencia_pequeno']})")
+        else:
+            print(f"{'':>8}      | Cascada: {cascade['inciertas']} filas inciertas (sin modelo md/lg instalado)")
+    fresh = {name: f"{seconds:.2f}s" if seconds is not None else "n/d" for name, seconds in report["cold_start"].items()
+             if name.endswith("_s")}
+    print(f"Carga del modelo en frío: {report['cold_start_s']:.2f}s ({report['cold_start']['source']})"
+          f" | intérprete nuevo: paquete {fresh['package_s']}, snapshot {fresh['snapshot_s']}")
+    print(f"Resultados: {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,15 +3,12 @@ import pandas as pd
 import os
 import sys
 import logging
-import io
+import uuid
 from io import StringIO
 
 # <<< MOVIDO AQUÍ >>> Debe ser el primer comando de Streamlit
 st.set_page_config(layout="wide")
 
-# Configuración básica de logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-
 # --- Añadir el directorio raíz del proyecto al sys.path ---
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if PROJECT_ROOT not in sys.path:
@@ -20,13 +17,35 @@ if PROJECT_ROOT not in sys.path:
 
 # Importar desde nuestros módulos en src
 try:
-    from bloom_analyzer import analyze_bloom_level, check_appropriateness
     from src.nlp_utils import load_spacy_model
-    from verificability_analyzer import check_verificability
-    from correction_analyzer import check_correction
-    from authenticity_analyzer import check_authenticity, PROFESSIONAL_KEYWORDS
-    # <<< AÑADIDO >>> Importar la nueva función de dimensión del conocimiento
-    from src.knowledge_analyzer import check_knowledge_dimension
+    from src.authenticity_analyzer import PROFESSIONAL_KEYWORDS
+    # Pipeline por RdA (Bloom, Adecuación, Verificabilidad, Corrección, Autenticidad, Conocimiento)
+    # (las filas con el mismo texto se analizan una vez; solo la adecuación se evalúa por fila)
+    from src.rda_pipeline import make_row_analyzer, analyze_cached_rows, LEVEL_TO_NUMBER
+    # Caché de resultados compartida entre sesiones (RDA_RESULT_CACHE_*)
+    from src.result_cache import get_result_cache
+    # Almacén acotado de PDF/Excel generados, compartido entre sesiones (RDA_ARTIFACT_*)
+    from src.artifact_store import get_artifact_store, content_key
+    # Reglas de adecuación compiladas (niveles académicos configurables en data/appropriateness_rules.json)
+    from src.appropriateness import get_appropriateness_table
+    # Paquete de reglas (léxicos) de los analizadores (RDA_RULE_PACK)
+    from src.rule_packs import get_rule_pack
+    # Re-análisis incremental (solo filas nuevas o modificadas)
+    from src.incremental import (
+        diff_input_data, rows_to_analyze, merge_results, summarize_diff, STATUS_UNCHANGED
+    )
+    # Ejecución del análisis en segundo plano (progreso, cancelación y reanudación)
+    from src.job_runner import AnalysisJob, JOB_CANCELLED, JOB_FAILED
+    # Pool de instancias del modelo spaCy para los trabajos simultáneos (RDA_MODEL_POOL_SIZE)
+    from src.model_pool import get_model_pool
+    # Exportación Excel (tabla detallada y resumen general)
+    from src.excel_export import DISPLAY_COLUMNS, DISPLAY_ORDER, build_detailed_excel, build_summary_excel
+    # Instrumentación opcional de tiempos (panel oculto "Performance")
+    from src import instrumentation
+    # Notas codificadas de los analizadores (el texto se genera solo al mostrarlas)
+    from src.notes import render_note_columns
+    # Configuración del logging y traza muestreada por RdA (RDA_LOG_LEVEL, RDA_TRACE, RDA_TRACE_SAMPLE)
+    from src.rda_logging import configure_logging
     # <<< AÑADIDO >>> Importar módulo de generación PDF
     from src.pdf_generator_simple import (
         generate_executive_pdf, generate_level_pdf,
@@ -37,17 +56,22 @@ except ImportError as e:
     st.error(f"Asegúrate de que los archivos .py necesarios estén en la carpeta 'src' y que ejecutas Streamlit desde la carpeta raíz del proyecto: {PROJECT_ROOT}")
     st.stop()
 
-# Mapeo de Nivel de Bloom a Número
-LEVEL_TO_NUMBER = {
-    'recordar': 1, 'comprender': 2, 'aplicar': 3,
-    'analizar': 4, 'evaluar': 5, 'crear': 6
-}
+configure_logging()
+
 # <<< AÑADIDO >>> Mapeo para Dimensión Conocimiento (para tooltips)
 KNOWLEDGE_SCORE_DESC = {
     1: "Bajo", 2: "Medio", 3: "Alto"
 }
 
 
+# Instrumentación de tiempos: ?perf=1 en la URL (o RDA_PROFILING=1) muestra el panel "Performance" solo en
+# esa sesión. La medición es del proceso (los trabajos se ejecutan en hilos compartidos y las métricas suman
+# todas las sesiones): la sesión con ?perf=1 la activa al abrirse y puede detenerla desde el panel.
+show_perf_panel = st.query_params.get("perf") == "1" or instrumentation.is_enabled_by_env()
+if show_perf_panel and not st.session_state.get("perf_session_started"):
+    st.session_state.perf_session_started = True
+    instrumentation.enable()
+
 # --- Carga de Recursos con Caché de Streamlit ---
 @st.cache_resource
 def cached_load_spacy_model():
@@ -74,22 +98,21 @@ st.markdown("Análisis basado en Taxonomía de Bloom Revisada y Criterios de Cal
 # --- Opciones en la Barra Lateral ---
 st.sidebar.header("Opciones de Análisis")
 
+# Niveles académicos definidos en las reglas de adecuación
+appropriateness_table = get_appropriateness_table()
+academic_level_options = appropriateness_table.academic_levels
+
 # Selector global, principalmente para "Pegar Texto"
 global_academic_level = st.sidebar.selectbox(
-    "Nivel Académico (para 'Pegar Texto'):", ('2', '4', '6', '8'), index=0
+    "Nivel Académico (para 'Pegar Texto'):", tuple(academic_level_options), index=0
 )
 st.sidebar.info(f"Nivel Académico Global seleccionado: **{global_academic_level}** (Usado si pega texto o archivo .txt)")
 
 # Texto informativo sobre niveles Bloom esperados (basado en selector global)
 expected_bloom_levels_text = ""
-if global_academic_level == '2':
-    expected_bloom_levels_text = "Nivel 2: Se esperan niveles Bloom **1 (Recordar) a 2 (Comprender)** como apropiados."
-elif global_academic_level == '4':
-    expected_bloom_levels_text = "Nivel 4: Se esperan niveles Bloom **2 (Comprender) a 4 (Analizar)** como apropiados."
-elif global_academic_level == '6':
-    expected_bloom_levels_text = "Nivel 6: Se esperan niveles Bloom **1 (Recordar) a 3 (Aplicar)** como apropiados."
-elif global_academic_level == '8':
-    expected_bloom_levels_text = "Nivel 8: Se esperan niveles Bloom **3 (Aplicar) a 6 (Crear)** como apropiados."
+expected_bloom_range = appropriateness_table.describe_levels(global_academic_level)
+if expected_bloom_range:
+    expected_bloom_levels_text = f"Nivel {global_academic_level}: Se esperan niveles Bloom **{expected_bloom_range}** como apropiados."
 if expected_bloom_levels_text:
     st.sidebar.markdown(f"ℹ️ *{expected_bloom_levels_text}*")
 
@@ -123,6 +146,8 @@ st.sidebar.expander("Configuración Avanzada (Autenticidad)").markdown(
     """
 )
 current_professional_keywords = PROFESSIONAL_KEYWORDS
+active_rule_pack = get_rule_pack()
+st.sidebar.caption(f"Paquete de reglas: **{active_rule_pack.name}** (versión `{active_rule_pack.version}`)")
 
 st.sidebar.divider() # Separador visual
 
@@ -207,6 +232,12 @@ else: # Método "Subir Archivo"
             st.sidebar.error(f"Error al procesar el archivo: {e}")
             input_data = []
 
+# Re-análisis incremental: solo se re-analizan las filas nuevas o modificadas
+incremental_mode = st.sidebar.checkbox(
+    "Análisis incremental (solo filas nuevas o modificadas)", value=True,
+    help="Compara la entrada con el análisis anterior (por fila y contenido) y reutiliza los resultados de las filas sin cambios."
+)
+
 # Botón para iniciar análisis en la barra lateral
 analyze_button = st.sidebar.button("Analizar RAs", type="primary")
 
@@ -228,148 +259,158 @@ if 'analysis_completed' not in st.session_state:
     st.session_state.analysis_completed = False
 if 'current_input_data' not in st.session_state:
     st.session_state.current_input_data = []
+if 'results_by_hash' not in st.session_state:
+    st.session_state.results_by_hash = {} # hash de contenido -> resultado del RdA
+if 'last_input_diff' not in st.session_state:
+    st.session_state.last_input_diff = None
+
+if 'analysis_job' not in st.session_state:
+    st.session_state.analysis_job = None # Trabajo de análisis en segundo plano
+if 'analysis_job_context' not in st.session_state:
+    st.session_state.analysis_job_context = None
+
+
+def start_analysis_job(input_data, incremental):
+    """Calcula las filas a analizar y lanza el trabajo de análisis en segundo plano."""
+    # Comparar con la entrada del análisis anterior (por fila y hash de contenido)
+    previous_input = st.session_state.current_input_data if incremental else []
+    base_results = st.session_state.results_by_hash if incremental else {}
+    input_diff = diff_input_data(previous_input, input_data)
+    pending_rows = rows_to_analyze(input_diff, base_results)
+    pending = [(input_diff['hashes'][i], *input_data[i]) for i in pending_rows]
+
+    # Textos ya analizados en otra sesión (caché compartida del proceso): resultado inmediato
+    result_cache = get_result_cache()
+    shared_results = analyze_cached_rows(pending, nlp_model, current_professional_keywords, result_cache)
+    if shared_results:
+        base_results = {**base_results, **shared_results}
+        pending = [row for row in pending if row[0] not in shared_results]
+
+    job = AnalysisJob(pending, make_row_analyzer(nlp_model, current_professional_keywords, result_cache,
+                                                 model_pool=get_model_pool(nlp_model)))
+    st.session_state.analysis_job = job
+    st.session_state.analysis_job_context = {
+        'input_data': input_data,
+        'input_diff': input_diff,
+        'base_results': base_results,
+        'incremental': bool(incremental and previous_input),
+        'finalized': False,
+    }
+    job.start()
+    if not job.rows:
+        job.wait() # Todo estaba en caché: se publica en esta misma ejecución
 
-# Si se presiona el botón de análisis, ejecutar análisis
+    shared_note = f" ({len(shared_results)} reutilizados de análisis anteriores)" if shared_results else ""
+    if incremental and previous_input:
+        st.info(f"Análisis incremental: {summarize_diff(input_diff)}. Analizando {len(pending_rows)} de {len(input_data)} RdAs{shared_note}...")
+    else:
+        st.info(f"Analizando {len(input_data)} RdAs{shared_note}...")
+
+
+def job_results_by_hash(job, context):
+    """Resultados reutilizados + resultados (parciales) del trabajo, solo de filas actuales."""
+    current_hashes = set(context['input_diff']['hashes'])
+    results_by_hash = {h: r for h, r in context['base_results'].items() if h in current_hashes}
+    results_by_hash.update(job.snapshot_results())
+    return results_by_hash
+
+
+def finalize_analysis_job(job, context):
+    """Fusiona los resultados del trabajo terminado y los publica en session_state."""
+    results_by_hash = job_results_by_hash(job, context)
+    results_list = merge_results(context['input_diff'], results_by_hash)
+
+    st.session_state.results_by_hash = results_by_hash
+    st.session_state.last_input_diff = context['input_diff'] if context['incremental'] else None
+    st.session_state.current_input_data = context['input_data']
+    context['finalized'] = True
+    if results_list:
+        st.session_state.analysis_results = pd.DataFrame(results_list)
+        st.session_state.analysis_completed = True
+        st.success(f"✅ Análisis completado exitosamente para {len(results_list)} RdAs.")
+    else:
+        st.session_state.analysis_results = pd.DataFrame()
+        st.session_state.analysis_completed = False
+        if 'artifact_session_id' in st.session_state: # Sin resultados: soltar sus archivos
+            get_artifact_store().release_session(st.session_state.artifact_session_id)
+        st.warning("⚠️ No se pudieron procesar los RdAs. Verifique el formato de entrada.")
+
+
+@st.fragment(run_every=1.0)
+def show_analysis_job_progress():
+    """Consulta periódica del trabajo en curso: progreso, resultados parciales y controles."""
+    job = st.session_state.analysis_job
+    context = st.session_state.analysis_job_context
+    if job is None or context is None or context['finalized']:
+        return
+    if job.is_finished:
+        st.rerun() # Recargar la página completa para publicar los resultados
+
+    queue_position = job.queue_position
+    if queue_position is not None and job.done == 0:
+        st.info(f"⏳ En cola: posición {queue_position}. El análisis empezará cuando terminen los turnos anteriores.")
+    waiting_note = f" (esperando turno, posición {queue_position})" if queue_position is not None and job.done else ""
+    st.progress(job.progress, text=f"Procesando... {job.done}/{job.total} RdAs{waiting_note}")
+    if job.status == JOB_CANCELLED:
+        st.warning(f"⏸️ Análisis cancelado tras {job.done} de {job.total} RdAs.")
+    elif job.status == JOB_FAILED:
+        st.error(f"Error durante el análisis: {job.error}")
+
+    col_cancel, col_resume = st.columns(2)
+    with col_cancel:
+        if job.is_running and st.button("⏹️ Cancelar análisis", key="btn_cancel_job"):
+            job.cancel()
+    with col_resume:
+        if job.status in (JOB_CANCELLED, JOB_FAILED) and st.button("▶️ Reanudar análisis", key="btn_resume_job"):
+            job.resume()
+
+    partial_results = merge_results(context['input_diff'], job_results_by_hash(job, context))
+    if partial_results:
+        with st.expander(f"Resultados parciales ({len(partial_results)} RdAs)"):
+            st.dataframe(pd.DataFrame(partial_results)[["RA", "Nivel Académico Origen", "Nivel Bloom Detectado", "Clasificación vs Nivel Origen"]],
+                         use_container_width=True, hide_index=True)
+
+
+# Si se presiona el botón de análisis, lanzar el análisis en segundo plano
 if analyze_button:
     if not input_data:
         st.warning("Por favor, ingrese o suba RdAs válidos y seleccione las columnas necesarias (si aplica) para analizar.")
     else:
-        st.info(f"Analizando {len(input_data)} RdAs...")
-        results_list = []
-        progress_bar = st.progress(0)
-        total_items = len(input_data)
-
-        with st.spinner('Procesando...'):
-            for i, data_item in enumerate(input_data):
-                objective_text, ra_academic_level = data_item
-
-                if not objective_text or not isinstance(objective_text, str):
-                    logging.warning(f"Saltando entrada inválida en índice {i}: {objective_text}")
-                    continue
-
-                # 1. Analizar Nivel de Bloom (Proceso Cognitivo)
-                bloom_result = analyze_bloom_level(objective_text)
-                original_level = bloom_result.get('level', 'Error')
-                verb = bloom_result.get('verb', 'N/A')
-                error_bloom = bloom_result.get('error')
-                level_number = LEVEL_TO_NUMBER.get(original_level.lower(), '')
-                formatted_level = f"{original_level} ({level_number})" if level_number else original_level
-
-                # 2. Evaluar Adecuación vs Nivel Académico
-                appropriateness = check_appropriateness(original_level, str(ra_academic_level))
-
-                # 3. Evaluar Verificabilidad
-                verificability_result = check_verificability(objective_text, nlp_model)
-                obs_score = verificability_result.get('observable_score', 0)
-                mea_score = verificability_result.get('measurable_score', 0)
-                eva_score = verificability_result.get('evaluability_score', 0)
-                # verif_justification = verificability_result.get('justification', '')
-
-                # 4. Evaluar Corrección
-                correction_result = check_correction(objective_text, nlp_model)
-                corr_score = correction_result.get('correction_score', 0)
-                corr_notes = correction_result.get('correction_notes', '')
-
-                # 5. Evaluar Autenticidad
-                authenticity_result = check_authenticity(objective_text, nlp_model, current_professional_keywords)
-                auth_action_score = authenticity_result.get('action_score', 1)
-                auth_context_score = authenticity_result.get('context_score', 1)
-                auth_meaning_score = authenticity_result.get('meaning_score', 1)
-                auth_notes = authenticity_result.get('authenticity_notes', '')
-
-                # 6. Evaluar Dimensión del Conocimiento <<< AÑADIDO >>>
-                knowledge_result = check_knowledge_dimension(objective_text, nlp_model)
-                k_fact_score = knowledge_result.get('factual_score', 1)
-                k_conc_score = knowledge_result.get('conceptual_score', 1)
-                k_proc_score = knowledge_result.get('procedural_score', 1)
-                k_meta_score = knowledge_result.get('metacognitive_score', 1)
-                k_notes = knowledge_result.get('knowledge_notes', '')
-
-
-                # Construir diccionario de resultados <<< MODIFICADO >>>
-                results_list.append({
-                    "RA": objective_text,
-                    "Nivel Académico Origen": ra_academic_level,
-                    "Verbo Principal": verb,
-                    "Nivel Bloom Original": original_level,
-                    "Nivel Bloom Detectado": formatted_level,
-                    "Clasificación vs Nivel Origen": appropriateness,
-                    "Puntaje Observable": obs_score,
-                    "Puntaje Medible": mea_score,
-                    "Puntaje Evaluable": eva_score,
-                    "Puntaje Corrección": corr_score,
-                    "Autenticidad Acción": auth_action_score,
-                    "Autenticidad Contexto": auth_context_score,
-                    "Autenticidad Sentido": auth_meaning_score,
-                    "Conocimiento Factual": k_fact_score,      # <<< AÑADIDO >>>
-                    "Conocimiento Conceptual": k_conc_score,   # <<< AÑADIDO >>>
-                    "Conocimiento Procedimental": k_proc_score,# <<< AÑADIDO >>>
-                    "Conocimiento Metacognitivo": k_meta_score,# <<< AÑADIDO >>>
-                    "Notas Corrección": corr_notes,
-                    "Notas Autenticidad": auth_notes,
-                    "Notas Conocimiento": k_notes,             # <<< AÑADIDO >>>
-                    "Error Bloom": error_bloom
-                })
-
-                # Actualizar barra de progreso
-                progress_bar.progress((i + 1) / total_items)
-
-        if results_list:
-            st.session_state.analysis_results = pd.DataFrame(results_list)
-            st.session_state.analysis_completed = True
-            st.session_state.current_input_data = input_data
-            st.success(f"✅ Análisis completado exitosamente para {len(results_list)} RdAs.")
-        else:
-            st.session_state.analysis_results = pd.DataFrame()
-            st.session_state.analysis_completed = False
-            st.session_state.current_input_data = input_data
-            st.warning("⚠️ No se pudieron procesar los RdAs. Verifique el formato de entrada.")
+        # Un nuevo análisis reemplaza al que estuviera en curso
+        if st.session_state.analysis_job is not None:
+            st.session_state.analysis_job.cancel()
+        start_analysis_job(input_data, incremental_mode)
+
+# Publicar los resultados del trabajo terminado, o mostrar su progreso
+if st.session_state.analysis_job is not None and not st.session_state.analysis_job_context['finalized']:
+    if st.session_state.analysis_job.is_finished:
+        finalize_analysis_job(st.session_state.analysis_job, st.session_state.analysis_job_context)
+    else:
+        show_analysis_job_progress()
 
 # Usar results almacenados en session_state para mostrar resultado
 results_df = st.session_state.analysis_results
 
 if st.session_state.analysis_completed and not results_df.empty:
 
+    # --- Filas que cambiaron respecto al análisis anterior (modo incremental) ---
+    last_diff = st.session_state.last_input_diff
+    if last_diff is not None:
+        changed_rows = [
+            {"Fila": i + 1, "Estado": status, "RA": st.session_state.current_input_data[i][0]}
+            for i, status in enumerate(last_diff['status']) if status != STATUS_UNCHANGED
+        ]
+        with st.expander(f"🔁 Cambios respecto al análisis anterior ({summarize_diff(last_diff)})", expanded=bool(changed_rows)):
+            if changed_rows:
+                st.dataframe(pd.DataFrame(changed_rows), use_container_width=True, hide_index=True)
+            else:
+                st.info("No se detectaron filas nuevas o modificadas; se reutilizaron todos los resultados.")
+
     # --- Mostrar Tabla de Resultados Detallados ---
     st.subheader("Análisis Detallado por RdA")
-    # <<< MODIFICADO >>> Añadir nuevas columnas de Conocimiento
-    display_columns = {
-        "RdA": "Resultado de Aprendizaje",
-        "Nivel Académico Origen": "Nivel Origen",
-        "Verbo Principal": "Verbo",
-        "Nivel Bloom Detectado": "Nivel Bloom (Proceso)", # Aclarar que es Proceso
-        "Clasificación vs Nivel Origen": "Adecuación T.",
-        "Puntaje Observable": "Obs.",
-        "Puntaje Medible": "Med.",
-        "Puntaje Evaluable": "Eval.",
-        "Puntaje Corrección": "Corr.",
-        "Autenticidad Acción": "Aut. Acción",
-        "Autenticidad Contexto": "Aut. Contexto",
-        "Autenticidad Sentido": "Aut. Sentido",
-        "Conocimiento Factual": "K.Fact",        # <<< AÑADIDO >>>
-        "Conocimiento Conceptual": "K.Conc",     # <<< AÑADIDO >>>
-        "Conocimiento Procedimental": "K.Proc",  # <<< AÑADIDO >>>
-        "Conocimiento Metacognitivo": "K.Meta",  # <<< AÑADIDO >>>
-    }
-    # Reordenar columnas <<< MODIFICADO >>>
-    display_order = [
-        "RA",
-        "Nivel Académico Origen",
-        "Verbo Principal",
-        "Nivel Bloom Detectado", # Proceso Cognitivo
-        "Conocimiento Factual",        # <<< AÑADIDO >>>
-        "Conocimiento Conceptual",     # <<< AÑADIDO >>>
-        "Conocimiento Procedimental",  # <<< AÑADIDO >>>
-        "Conocimiento Metacognitivo",  # <<< AÑADIDO >>>
-        "Clasificación vs Nivel Origen",
-        "Puntaje Observable",
-        "Puntaje Medible",
-        "Puntaje Evaluable",
-        "Puntaje Corrección",
-        "Autenticidad Acción",
-        "Autenticidad Contexto",
-        "Autenticidad Sentido",
-    ]
+    # Columnas mostradas (y exportadas) con nombres amigables
+    display_columns = DISPLAY_COLUMNS
+    display_order = DISPLAY_ORDER
     existing_display_order = [col for col in display_order if col in results_df.columns]
     st.dataframe(
         results_df[existing_display_order].rename(columns=display_columns),
@@ -386,22 +427,24 @@ if st.session_state.analysis_completed and not results_df.empty:
          }
     )
 
+    # Archivos generados (Excel y PDF): almacén acotado compartido entre sesiones,
+    # con grupos por clave de contenido (ver src/artifact_store.py)
+    artifact_store = get_artifact_store()
+    artifact_session = st.session_state.setdefault("artifact_session_id", uuid.uuid4().hex)
+    results_digest = content_key("resultados", len(results_df), results_df.to_dict())
+    detailed_key = f"excel_detallado_{results_digest}"
+    summary_key = f"excel_resumen_{results_digest}"
+    # Clave de los PDFs: resultados, nivel global y niveles por los que se filtra
+    pdf_key = content_key("pdfs", results_digest, global_academic_level, academic_level_options)
+    # Soltar los archivos de resultados anteriores de esta sesión
+    artifact_store.retain_groups(artifact_session, {detailed_key, summary_key, pdf_key})
+    pdf_artifacts = {}
+
     # --- Botón de Descarga para Tabla Detallada ---
     if not results_df.empty:
-        @st.cache_data
-        def convert_df_to_excel_detailed(df):
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                # Descargar las columnas mostradas con nombres amigables
-                # <<< MODIFICADO >>> Asegurarse que existing_display_order y display_columns están actualizados
-                df_to_download = df[existing_display_order].rename(columns=display_columns)
-                # O descargar todas las columnas originales si se prefiere:
-                # df_to_download = df # Incluiría notas y errores
-                df_to_download.to_excel(writer, index=False, sheet_name='Analisis_Detallado')
-            processed_data = output.getvalue()
-            return processed_data
-
-        excel_bytes_detailed = convert_df_to_excel_detailed(results_df)
+        excel_bytes_detailed = artifact_store.get_or_build(
+            artifact_session, detailed_key,
+            lambda: {"detallado": build_detailed_excel(results_df)})["detallado"]
 
         st.download_button(
             label="📥 Descargar Análisis Detallado (.xlsx)",
@@ -415,15 +458,9 @@ if st.session_state.analysis_completed and not results_df.empty:
         st.markdown("---")
         st.subheader("📥 Descarga de Reportes PDF")
 
-        # Usar session_state para mantener el estado de los PDFs generados
-        if 'pdf_cache' not in st.session_state:
-            st.session_state.pdf_cache = {}
-
-        # Generar cache key único basado en los datos
-        cache_key = f"pdfs_{len(results_df)}_{hash(str(results_df.to_dict()))}"
-
-        # Solo regenerar PDFs si los datos han cambiado
-        if cache_key not in st.session_state.pdf_cache:
+        # Solo regenerar PDFs si los datos han cambiado (o el almacén los expulsó)
+        pdf_artifacts = artifact_store.get_group(artifact_session, pdf_key)
+        if pdf_artifacts is None:
             with st.spinner("🔄 Preparando reportes PDF..."):
                 try:
                     # Preparar datos comunes
@@ -438,23 +475,24 @@ if st.session_state.analysis_completed and not results_df.empty:
                     }
 
                     # Generar PDFs optimizados (sin PDF detallado)
-                    st.session_state.pdf_cache[cache_key] = {
+                    pdf_artifacts = {
                         'executive': generate_executive_pdf(results_df.to_dict('records'), global_academic_level, common_stats),
                         'complete': generate_complete_pdf(results_df.to_dict('records'), global_academic_level, common_stats),
                         'charts': generate_charts_pdf(results_df.to_dict('records'), global_academic_level, common_stats)
                     }
 
                     # Generar PDFs por nivel
-                    for level in ['2', '4', '6', '8']:
-                        st.session_state.pdf_cache[cache_key][f'level_{level}'] = generate_level_pdf(
+                    for level in academic_level_options:
+                        pdf_artifacts[f'level_{level}'] = generate_level_pdf(
                             results_df.to_dict('records'), level, common_stats
                         )
+                    artifact_store.put_group(artifact_session, pdf_key, pdf_artifacts)
                 except Exception as e:
                     st.error(f"Error al preparar PDFs: {str(e)}")
-                    st.session_state.pdf_cache[cache_key] = {}
+                    pdf_artifacts = {}
 
         # Mostrar botones de descarga principales (sin regenerar PDFs)
-        if cache_key in st.session_state.pdf_cache and st.session_state.pdf_cache[cache_key]:
+        if pdf_artifacts:
 
             # === REPORTES PRINCIPALES ===
             st.markdown("**📊 Reportes Principales:**")
@@ -463,7 +501,7 @@ if st.session_state.analysis_completed and not results_df.empty:
             with col_pdf1:
                 st.download_button(
                     label="📊 PDF Ejecutivo",
-                    data=st.session_state.pdf_cache[cache_key].get('executive', b''),
+                    data=pdf_artifacts.get('executive', b''),
                     file_name=f"Andru_Ejecutivo_{pd.Timestamp.now().strftime('%Y%m%d_%H%M')}.pdf",
                     mime="application/pdf",
                     help="📋 Resumen gerencial con 6 columnas esenciales (vertical)",
@@ -473,7 +511,7 @@ if st.session_state.analysis_completed and not results_df.empty:
             with col_pdf2:
                 st.download_button(
                     label="📋 PDF Completo",
-                    data=st.session_state.pdf_cache[cache_key].get('complete', b''),
+                    data=pdf_artifacts.get('complete', b''),
                     file_name=f"Andru_Completo_{pd.Timestamp.now().strftime('%Y%m%d_%H%M')}.pdf",
                     mime="application/pdf",
                     help="📊 Análisis integral con 15 columnas completas (horizontal)",
@@ -483,7 +521,7 @@ if st.session_state.analysis_completed and not results_df.empty:
             with col_pdf3:
                 st.download_button(
                     label="📈 PDF Solo Gráficos",
-                    data=st.session_state.pdf_cache[cache_key].get('charts', b''),
+                    data=pdf_artifacts.get('charts', b''),
                     file_name=f"Andru_Graficos_{pd.Timestamp.now().strftime('%Y%m%d_%H%M')}.pdf",
                     mime="application/pdf",
                     help="📈 5 páginas con SOLO gráficos y análisis visual (sin tablas)",
@@ -498,8 +536,8 @@ if st.session_state.analysis_completed and not results_df.empty:
     # Selector de nivel
     selected_levels = st.multiselect(
         "Seleccionar Niveles Académicos:",
-        options=['2', '4', '6', '8'],
-        default=['2', '4', '6', '8'],
+        options=academic_level_options,
+        default=academic_level_options,
         help="Selecciona uno o varios niveles para generar PDFs específicos"
     )
 
@@ -511,7 +549,7 @@ if st.session_state.analysis_completed and not results_df.empty:
             with cols_levels[i]:
                 st.download_button(
                     label=f"🎯 Nivel {level}",
-                    data=st.session_state.pdf_cache[cache_key].get(f'level_{level}', b''),
+                    data=pdf_artifacts.get(f'level_{level}', b''),
                     file_name=f"Andru_Nivel{level}_{pd.Timestamp.now().strftime('%Y%m%d_%H%M')}.pdf",
                     mime="application/pdf",
                     help=f"Análisis completo filtrado para nivel académico {level}",
@@ -549,57 +587,9 @@ if st.session_state.analysis_completed and not results_df.empty:
 
         # --- Botón de Descarga para Resumen General Consolidado ---
         if not results_df.empty:
-            @st.cache_data
-            def convert_summaries_to_excel(df_results):
-                output = io.BytesIO()
-                with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                    # Hoja 1: Frecuencia Nivel Bloom (Proceso)
-                    level_counts = df_results['Nivel Bloom Original'].value_counts().sort_index()
-                    formatted_labels = [f"{lvl} ({LEVEL_TO_NUMBER.get(lvl.lower(), '')})" if LEVEL_TO_NUMBER.get(lvl.lower()) else lvl for lvl in level_counts.index]
-                    freq_df_bloom = pd.DataFrame({'Nivel_Proceso': formatted_labels, 'Frecuencia': level_counts.values})
-                    if not freq_df_bloom.empty: freq_df_bloom.to_excel(writer, index=False, sheet_name='Frecuencia_Bloom_Proceso')
-
-                    # <<< AÑADIDO >>> Hoja 2: Promedios Dimensión Conocimiento
-                    avg_scores_know = df_results[[
-                        "Conocimiento Factual", "Conocimiento Conceptual",
-                        "Conocimiento Procedimental", "Conocimiento Metacognitivo"
-                    ]].mean().round(2).reset_index()
-                    avg_scores_know.columns = ['Dimensión Conocimiento', 'Promedio (1-3)']
-                    avg_scores_know['Dimensión Conocimiento'] = avg_scores_know['Dimensión Conocimiento'].replace({
-                        "Conocimiento Factual": "Factual", "Conocimiento Conceptual": "Conceptual",
-                        "Conocimiento Procedimental": "Procedimental", "Conocimiento Metacognitivo": "Metacognitivo"
-                    })
-                    if not avg_scores_know.empty: avg_scores_know.to_excel(writer, index=False, sheet_name='Promedios_Conocimiento')
-
-                    # Hoja 3: Frecuencia Adecuación
-                    adequacy_counts = df_results['Clasificación vs Nivel Origen'].value_counts().reset_index()
-                    adequacy_counts.columns = ['Clasificación', 'Frecuencia']
-                    if not adequacy_counts.empty: adequacy_counts.to_excel(writer, index=False, sheet_name='Frecuencia_Adecuacion')
-
-                    # Hoja 4: Promedios Verificabilidad
-                    avg_scores_verif = df_results[["Puntaje Observable", "Puntaje Medible", "Puntaje Evaluable"]].mean().round(2).reset_index()
-                    avg_scores_verif.columns = ['Métrica', 'Promedio']
-                    avg_scores_verif['Métrica'] = avg_scores_verif['Métrica'].replace({"Puntaje Observable": "Observable", "Puntaje Medible": "Medible", "Puntaje Evaluable": "Evaluable"})
-                    if not avg_scores_verif.empty: avg_scores_verif.to_excel(writer, index=False, sheet_name='Promedios_Verificabilidad')
-
-                    # Hoja 5 y 6: Corrección
-                    avg_corr_val = df_results["Puntaje Corrección"].mean().round(2)
-                    corr_freq = df_results["Puntaje Corrección"].value_counts().sort_index().reset_index()
-                    corr_freq.columns = ['Puntaje', 'Frecuencia']
-                    avg_corr_df = pd.DataFrame({'Métrica': ['Promedio Corrección (0-3)'], 'Valor': [f"{avg_corr_val:.2f}"]})
-                    if not avg_corr_df.empty: avg_corr_df.to_excel(writer, index=False, sheet_name='Promedio_Correccion')
-                    if not corr_freq.empty: corr_freq.to_excel(writer, index=False, sheet_name='Frecuencia_Correccion')
-
-                    # Hoja 7: Promedios Autenticidad
-                    avg_scores_auth = df_results[["Autenticidad Acción", "Autenticidad Contexto", "Autenticidad Sentido"]].mean().round(2).reset_index()
-                    avg_scores_auth.columns = ['Métrica', 'Promedio']
-                    avg_scores_auth['Métrica'] = avg_scores_auth['Métrica'].replace({"Autenticidad Acción": "Acción", "Autenticidad Contexto": "Contexto", "Autenticidad Sentido": "Sentido"})
-                    if not avg_scores_auth.empty: avg_scores_auth.to_excel(writer, index=False, sheet_name='Promedios_Autenticidad')
-
-                processed_data = output.getvalue()
-                return processed_data
-
-            excel_bytes_summary = convert_summaries_to_excel(results_df)
+            excel_bytes_summary = artifact_store.get_or_build(
+                artifact_session, summary_key,
+                lambda: {"resumen": build_summary_excel(results_df)})["resumen"]
             st.download_button(
                 label="📥 Descargar Resumen General (.xlsx)",
                 data=excel_bytes_summary,
@@ -705,9 +695,9 @@ if st.session_state.analysis_completed and not results_df.empty:
             with tab3: # Baja Corrección
                 if not results_df.empty:
                     low_corr_threshold = 1
-                    low_corr_df = results_df[
+                    low_corr_df = render_note_columns(results_df[
                         results_df['Puntaje Corrección'] <= low_corr_threshold
-                    ][['RA', 'Puntaje Corrección', 'Notas Corrección']].rename(columns={
+                    ][['RA', 'Puntaje Corrección', 'Notas Corrección']]).rename(columns={
                          "Puntaje Corrección": "Corr.", "Notas Corrección": "Justificación"
                     })
                     if not low_corr_df.empty:
@@ -718,10 +708,10 @@ if st.session_state.analysis_completed and not results_df.empty:
             with tab4: # Baja Autenticidad
                 if not results_df.empty:
                     low_auth_threshold = 2
-                    low_auth_df = results_df[
+                    low_auth_df = render_note_columns(results_df[
                         (results_df['Autenticidad Acción'] <= low_auth_threshold) |
                         (results_df['Autenticidad Contexto'] <= low_auth_threshold)
-                    ][['RA', 'Autenticidad Acción', 'Autenticidad Contexto', 'Autenticidad Sentido', 'Notas Autenticidad']].rename(columns={
+                    ][['RA', 'Autenticidad Acción', 'Autenticidad Contexto', 'Autenticidad Sentido', 'Notas Autenticidad']]).rename(columns={
                          "Autenticidad Acción": "Acción", "Autenticidad Contexto": "Contexto",
                          "Autenticidad Sentido": "Sentido", "Notas Autenticidad": "Justificación (Estimada)"
                     })
@@ -736,10 +726,10 @@ if st.session_state.analysis_completed and not results_df.empty:
                 if not results_df.empty:
                     low_know_threshold = 1 # Mostrar RAs con puntaje 1 (Bajo)
                     # Definir qué dimensiones son 'clave' para marcar un RA
-                    low_know_df = results_df[
+                    low_know_df = render_note_columns(results_df[
                         (results_df['Conocimiento Conceptual'] <= low_know_threshold) | # Ejemplo: Marcar si Conceptual o Procedimental es bajo
                         (results_df['Conocimiento Procedimental'] <= low_know_threshold)
-                    ][['RA', 'Conocimiento Factual', 'Conocimiento Conceptual', 'Conocimiento Procedimental', 'Conocimiento Metacognitivo', 'Notas Conocimiento']].rename(columns={
+                    ][['RA', 'Conocimiento Factual', 'Conocimiento Conceptual', 'Conocimiento Procedimental', 'Conocimiento Metacognitivo', 'Notas Conocimiento']]).rename(columns={
                          'Conocimiento Factual': 'K.Fact', 'Conocimiento Conceptual': 'K.Conc',
                          'Conocimiento Procedimental': 'K.Proc', 'Conocimiento Metacognitivo': 'K.Meta',
                          'Notas Conocimiento': 'Justificación (Estimada)'
@@ -762,6 +752,39 @@ if st.session_state.analysis_completed and not results_df.empty:
 
 # Para ejecutar: streamlit run src/app.py
 
+# --- Panel oculto de rendimiento (activar con ?perf=1 en la URL o RDA_PROFILING=1) ---
+if show_perf_panel:
+    with st.expander("⏱️ Performance"):
+        perf_metrics = instrumentation.snapshot()
+        if perf_metrics:
+            perf_df = pd.DataFrame.from_dict(perf_metrics, orient='index')
+            perf_df.index.name = 'Etapa'
+            st.dataframe(perf_df, use_container_width=True)
+        else:
+            st.info("Sin mediciones todavía. Ejecute un análisis o genere reportes.")
+        perf_counters = instrumentation.counters()
+        if perf_counters:
+            st.caption("Cachés en memoria (aciertos/fallos)")
+            counters_df = pd.DataFrame.from_dict(perf_counters, orient='index')
+            counters_df.index.name = 'Caché'
+            st.dataframe(counters_df, use_container_width=True)
+        col_perf1, col_perf2, col_perf3 = st.columns(3)
+        with col_perf1:
+            st.download_button("📥 Descargar métricas (.json)", data=instrumentation.dump_json(),
+                               file_name="rendimiento_rdas.json", mime="application/json", key="dl_perf_json")
+        with col_perf2:
+            if st.button("🔄 Reiniciar métricas", key="btn_perf_reset"):
+                instrumentation.reset()
+        with col_perf3:
+            if instrumentation.is_enabled():
+                if st.button("⏹️ Detener medición", key="btn_perf_stop",
+                             help="La medición afecta a todas las sesiones del servidor"):
+                    instrumentation.disable()
+                    st.rerun()
+            elif st.button("▶️ Reanudar medición", key="btn_perf_start"):
+                instrumentation.enable()
+                st.rerun()
+
 # --- Sección de Información Adicional ---
 st.markdown("##### Desarrollado por Ruben Tocain G.")
 st.caption("## Como parte del Proyecto de Investigación RdA's- v2.0")
@@ -0,0 +1,190 @@
+"""
+Tabla precompilada de adecuación (nivel Bloom × nivel académico).
+
+Las reglas (qué niveles de Bloom son bajos, apropiados o altos para cada nivel
+académico) se cargan de data/appropriateness_rules.json (o del archivo indicado
+en RDA_APPROPRIATENESS_RULES) y se compilan una vez en una matriz densa de
+códigos de clasificación. Clasificar un RdA es entonces una búsqueda en dos
+diccionarios y un acceso a la matriz; classify_column() clasifica una columna
+completa de resultados con NumPy.
+
+Cada facultad puede definir su propio esquema de niveles (no solo 2/4/6/8)
+editando el archivo de reglas.
+"""
+
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+RULES_PATH = os.path.join(os.path.dirname(CURRENT_DIR), 'data', 'appropriateness_rules.json')
+
+# Reglas por defecto (si no existe el archivo de configuración)
+DEFAULT_BLOOM_LEVELS = ["recordar", "comprender", "aplicar", "analizar", "evaluar", "crear"]
+DEFAULT_APPROPRIATENESS_RULES = {
+    '2': {'bajo': [], 'apropiado': ['recordar', 'comprender'], 'alto': ['aplicar', 'analizar', 'evaluar', 'crear']},
+    '4': {'bajo': ['recordar'], 'apropiado': ['comprender', 'aplicar', 'analizar'], 'alto': ['evaluar', 'crear']},
+    '6': {'bajo': ['recordar', 'comprender'], 'apropiado': ['aplicar', 'analizar'], 'alto': ['evaluar', 'crear']},
+    '8': {'bajo': ['recordar', 'comprender'], 'apropiado': ['aplicar', 'analizar', 'evaluar', 'crear'], 'alto': []},
+}
+
+# Clasificaciones (el código es el índice en LABELS)
+NOT_CATEGORIZED, LOW, APPROPRIATE, HIGH, NOT_APPLICABLE, UNKNOWN_ACADEMIC_LEVEL = range(6)
+LABELS = (
+    "No Categorizado en Reglas",
+    "Potencialmente Bajo",
+    "Apropiado",
+    "Potencialmente Alto",
+    "N/A",
+    "Nivel Académico Desconocido",
+)
+_CATEGORY_CODES = {'bajo': LOW, 'apropiado': APPROPRIATE, 'alto': HIGH}
+
+# Niveles de Bloom que indican que no hubo clasificación (-> "N/A")
+NON_CLASSIFIED_BLOOM = ("", "N/A", "Error", "No identificado", "No clasificado")
+
+
+class AppropriatenessTable:
+    """
+    Matriz (nivel académico × nivel Bloom) de códigos de clasificación.
+
+    Tiene una fila extra para niveles académicos desconocidos y dos columnas
+    extra: Bloom fuera de las reglas y Bloom no clasificado (N/A), de modo que
+    cualquier combinación se resuelve con un solo acceso a la matriz.
+    """
+
+    def __init__(self, rules, bloom_levels=None):
+        self.rules = rules
+        self.bloom_levels = [level.lower() for level in (bloom_levels or DEFAULT_BLOOM_LEVELS)]
+        self.academic_levels = list(rules.keys())
+
+        n_bloom = len(self.bloom_levels)
+        self._other_col = n_bloom      # Bloom no presente en las reglas
+        self._na_col = n_bloom + 1     # Bloom no clasificado -> N/A
+        self._unknown_row = len(self.academic_levels)
+
+        matrix = np.full((len(self.academic_levels) + 1, n_bloom + 2), NOT_CATEGORIZED, dtype=np.uint8)
+        matrix[self._unknown_row, :] = UNKNOWN_ACADEMIC_LEVEL
+        matrix[:, self._na_col] = NOT_APPLICABLE # "N/A" tiene prioridad sobre el nivel desconocido
+
+        # Índices de búsqueda: se registran las variantes habituales para evitar lower() por fila
+        self._bloom_index = {}
+        for col, level in enumerate(self.bloom_levels):
+            for variant in (level, level.lower(), level.capitalize()):
+                self._bloom_index[variant] = col
+        for value in NON_CLASSIFIED_BLOOM:
+            self._bloom_index[value] = self._na_col
+        self._academic_index = {str(level): row for row, level in enumerate(self.academic_levels)}
+
+        for row, level in enumerate(self.academic_levels):
+            for category, bloom_list in rules[level].items():
+                code = _CATEGORY_CODES.get(category)
+                if code is None:
+                    raise ValueError(f"Categoría '{category}' desconocida en las reglas del nivel '{level}'.")
+                for bloom in bloom_list:
+                    col = self._bloom_index.get(bloom.lower())
+                    if col is None:
+                        raise ValueError(f"Nivel Bloom '{bloom}' del nivel académico '{level}' no está en niveles_bloom.")
+                    matrix[row, col] = code
+        self.matrix = matrix
+
+    def _bloom_col(self, bloom_level):
+        col = self._bloom_index.get(bloom_level)
+        if col is None:
+            if not bloom_level:
+                return self._na_col
+            col = self._bloom_index.get(str(bloom_level).lower(), self._other_col)
+        return col
+
+    def _academic_row(self, academic_level):
+        row = self._academic_index.get(academic_level)
+        if row is None:
+            row = self._academic_index.get(str(academic_level).strip(), self._unknown_row)
+        return row
+
+    def classify(self, bloom_level, academic_level):
+        """Clasificación de un RdA (misma etiqueta que check_appropriateness)."""
+        return LABELS[self.matrix[self._academic_row(academic_level), self._bloom_col(bloom_level)]]
+
+    def classify_column(self, bloom_levels, academic_levels):
+        """
+        Clasifica columnas completas (listas, arrays o Series de pandas) de una vez.
+
+        Las conversiones a índice se hacen una vez por valor distinto; la
+        clasificación es una indexación vectorizada de la matriz.
+
+        Returns:
+            Array NumPy de etiquetas (o Series con el mismo índice si la entrada es una Series).
+        """
+        bloom_values = np.asarray(bloom_levels, dtype=object)
+        academic_values = np.asarray(academic_levels, dtype=object)
+        if academic_values.ndim == 0: # Un único nivel académico para toda la columna
+            academic_values = np.full(len(bloom_values), academic_values.item(), dtype=object)
+
+        bloom_unique, bloom_inverse = np.unique(bloom_values.astype(str), return_inverse=True)
+        academic_unique, academic_inverse = np.unique(academic_values.astype(str), return_inverse=True)
+        cols = np.array([self._bloom_col(value) for value in bloom_unique], dtype=np.intp)[bloom_inverse]
+        rows = np.array([self._academic_row(value) for value in academic_unique], dtype=np.intp)[academic_inverse]
+        # Valores nulos (None/NaN) de Bloom se tratan como no clasificados
+        null_mask = np.array([value is None or value != value for value in bloom_values], dtype=bool)
+        cols[null_mask] = self._na_col
+
+        labels = np.asarray(LABELS, dtype=object)[self.matrix[rows, cols]]
+        if hasattr(bloom_levels, "index") and hasattr(bloom_levels, "to_numpy"): # pandas.Series
+            import pandas as pd
+            return pd.Series(labels, index=bloom_levels.index, name="Clasificación vs Nivel Origen")
+        return labels
+
+    def bloom_levels_for(self, academic_level, category='apropiado'):
+        """Niveles de Bloom de una categoría ('bajo', 'apropiado', 'alto') para un nivel académico."""
+        return list(self.rules.get(str(academic_level), {}).get(category, []))
+
+    def describe_levels(self, academic_level, category='apropiado'):
+        """
+        Texto con los niveles de Bloom de una categoría, numerados según niveles_bloom:
+        '3 (Aplicar) a 4 (Analizar)' si son consecutivos, o una lista separada por comas.
+        """
+        cols = sorted(self.bloom_levels.index(b) for b in self.bloom_levels_for(academic_level, category))
+        names = [f"{col + 1} ({self.bloom_levels[col].capitalize()})" for col in cols]
+        if len(cols) > 1 and cols == list(range(cols[0], cols[-1] + 1)):
+            return f"{names[0]} a {names[-1]}"
+        return ", ".join(names)
+
+
+def load_appropriateness_table(rules_file=None) -> AppropriatenessTable:
+    """
+    Carga y compila las reglas de adecuación.
+
+    Args:
+        rules_file: Ruta del JSON de reglas. Por defecto RDA_APPROPRIATENESS_RULES o
+                    data/appropriateness_rules.json; si no existe se usan las reglas por defecto.
+    """
+    rules_file = rules_file or os.environ.get("RDA_APPROPRIATENESS_RULES") or RULES_PATH
+    if not os.path.exists(rules_file):
+        logger.warning("Archivo de reglas de adecuación '%s' no encontrado; se usan las reglas por defecto.", rules_file)
+        return AppropriatenessTable(DEFAULT_APPROPRIATENESS_RULES, DEFAULT_BLOOM_LEVELS)
+    with open(rules_file, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    rules = {str(level): {category: [b.lower() for b in blooms] for category, blooms in categories.items()}
+             for level, categories in config["niveles_academicos"].items()}
+    return AppropriatenessTable(rules, config.get("niveles_bloom") or DEFAULT_BLOOM_LEVELS)
+
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def get_appropriateness_table() -> AppropriatenessTable:
+    """Tabla compilada compartida (se carga una sola vez por proceso)."""
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                _table = load_appropriateness_table()
+    return _table
@@ -0,0 +1,288 @@
+"""
+Almacén acotado de archivos generados (PDF y Excel) compartido por las sesiones.
+
+Sustituye a los diccionarios de bytes que cada sesión guardaba sin límite en
+st.session_state. Los archivos se agrupan por una clave de contenido (p. ej.
+"pdfs" + hash de los resultados y del nivel global): dos sesiones con los mismos
+resultados reutilizan el mismo grupo sin volver a generarlo.
+
+- Deduplicación: cada archivo se guarda una sola vez por hash de contenido
+  (SHA-256), aunque lo referencien varios grupos o sesiones.
+- Presupuesto por sesión (RDA_ARTIFACT_SESSION_MB, por defecto 64 MB): si los
+  grupos de una sesión lo superan, la sesión suelta sus grupos menos usados.
+- Presupuesto global en memoria (RDA_ARTIFACT_MEMORY_MB, por defecto 256 MB):
+  los archivos menos usados se vuelcan a disco (RDA_ARTIFACT_SPILL_DIR, por
+  defecto un directorio temporal del proceso) y se vuelven a leer al pedirlos.
+- Presupuesto en disco (RDA_ARTIFACT_DISK_MB, por defecto 1024 MB): al
+  superarlo se eliminan los grupos menos usados (se regeneran si se piden).
+
+Un grupo que ya no referencia ninguna sesión se elimina con sus archivos: la
+aplicación suelta los grupos de resultados anteriores con retain_groups() al
+cambiar los resultados, y todos los de la sesión con release_session() cuando
+se quedan sin resultados.
+Los contadores se consultan con instrumentation.counters() (fuente "artifact_store").
+"""
+
+import atexit
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+try:
+    from src import instrumentation
+except ImportError: # Ejecución directa del módulo (python src/...)
+    import instrumentation
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+DEFAULT_MEMORY_MB = 256
+DEFAULT_SESSION_MB = 64
+DEFAULT_DISK_MB = 1024
+
+
+def content_key(prefix: str, *parts) -> str:
+    """Clave de grupo estable a partir del contenido del que se generan los archivos."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return f"{prefix}_{digest.hexdigest()[:24]}"
+
+
+class _Blob:
+    """Archivo guardado una vez por hash de contenido (en memoria o volcado a disco)."""
+
+    __slots__ = ("size", "data", "refs")
+
+    def __init__(self, data: bytes):
+        self.size = len(data)
+        self.data: Optional[bytes] = data # None: volcado a disco
+        self.refs = 0
+
+
+class ArtifactStore:
+    """Grupos de archivos por clave de contenido, con presupuestos por sesión, en memoria y en disco."""
+
+    def __init__(self, max_memory_bytes: int = DEFAULT_MEMORY_MB * MB, session_max_bytes: int = DEFAULT_SESSION_MB * MB,
+                 spill_dir: Optional[str] = None, max_disk_bytes: int = DEFAULT_DISK_MB * MB):
+        self.max_memory_bytes = max_memory_bytes
+        self.session_max_bytes = session_max_bytes
+        self.spill_dir = spill_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._blobs: "OrderedDict[str, _Blob]" = OrderedDict()       # hash -> archivo (orden LRU)
+        self._groups: "OrderedDict[str, Dict[str, str]]" = OrderedDict() # clave -> nombre -> hash (orden LRU)
+        self._group_sessions: Dict[str, set] = {}
+        self._sessions: Dict[str, "OrderedDict[str, None]"] = {}      # sesión -> claves (orden LRU)
+        self._lock = threading.RLock()
+        self.memory_bytes = self.disk_bytes = 0
+        self.hits = self.misses = self.deduplicated = self.spilled = self.evicted = 0
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    # --- Archivos ---
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.spill_dir, f"{digest}.bin")
+
+    def _add_blob(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        blob = self._blobs.get(digest)
+        if blob is None:
+            blob = self._blobs[digest] = _Blob(data)
+            self.memory_bytes += blob.size
+        else:
+            self.deduplicated += 1
+            self._blobs.move_to_end(digest)
+        blob.refs += 1
+        return digest
+
+    def _read_blob(self, digest: str) -> bytes:
+        blob = self._blobs[digest]
+        self._blobs.move_to_end(digest)
+        if blob.data is None: # Volcado: se vuelve a cargar en memoria
+            path = self._blob_path(digest)
+            with open(path, "rb") as f:
+                blob.data = f.read()
+            os.remove(path)
+            self.disk_bytes -= blob.size
+            self.memory_bytes += blob.size
+        return blob.data
+
+    def _release_blob(self, digest: str):
+        blob = self._blobs[digest]
+        blob.refs -= 1
+        if blob.refs > 0:
+            return
+        del self._blobs[digest]
+        if blob.data is None:
+            self.disk_bytes -= blob.size
+            try:
+                os.remove(self._blob_path(digest))
+            except OSError:
+                pass
+        else:
+            self.memory_bytes -= blob.size
+
+    # --- Grupos y sesiones ---
+
+    def _drop_group(self, group_key: str):
+        for digest in self._groups.pop(group_key).values():
+            self._release_blob(digest)
+        for session_id in self._group_sessions.pop(group_key, ()):
+            self._sessions.get(session_id, {}).pop(group_key, None)
+
+    def _attach(self, session_id: str, group_key: str):
+        session = self._sessions.setdefault(session_id, OrderedDict())
+        session[group_key] = None
+        session.move_to_end(group_key)
+        self._group_sessions.setdefault(group_key, set()).add(session_id)
+        self._groups.move_to_end(group_key)
+
+    def session_bytes(self, session_id: str) -> int:
+        """Bytes de los archivos (distintos) que referencia la sesión."""
+        with self._lock:
+            digests = {digest for group_key in self._sessions.get(session_id, ())
+                       for digest in self._groups[group_key].values()}
+            return sum(self._blobs[digest].size for digest in digests)
+
+    def _enforce_budgets(self, session_id: str):
+        # Por sesión: soltar los grupos menos usados (nunca el último)
+        session = self._sessions.get(session_id, OrderedDict())
+        while len(session) > 1 and self.session_bytes(session_id) > self.session_max_bytes:
+            group_key, _ = session.popitem(last=False)
+            sessions = self._group_sessions.get(group_key, set())
+            sessions.discard(session_id)
+            if not sessions:
+                self._drop_group(group_key)
+                self.evicted += 1
+        # Global en memoria: volcar a disco los archivos menos usados (o eliminar grupos sin disco)
+        while self.memory_bytes > self.max_memory_bytes:
+            if self.spill_dir:
+                digest, blob = next(((d, b) for d, b in self._blobs.items() if b.data is not None), (None, None))
+                if digest is None:
+                    break
+                with open(self._blob_path(digest), "wb") as f:
+                    f.write(blob.data)
+                blob.data = None
+                self.memory_bytes -= blob.size
+                self.disk_bytes += blob.size
+                self.spilled += 1
+            elif len(self._groups) > 1:
+                self._drop_group(next(iter(self._groups)))
+                self.evicted += 1
+            else:
+                break
+        # Global en disco: eliminar los grupos menos usados
+        while self.disk_bytes > self.max_disk_bytes and len(self._groups) > 1:
+            self._drop_group(next(iter(self._groups)))
+            self.evicted += 1
+
+    def get_group(self, session_id: str, group_key: str) -> Optional[Dict[str, bytes]]:
+        """Archivos del grupo (nombre -> bytes), o None si no está (o se eliminó)."""
+        with self._lock:
+            digests = self._groups.get(group_key)
+            if digests is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._attach(session_id, group_key)
+            artifacts = {name: self._read_blob(digest) for name, digest in digests.items()}
+            self._enforce_budgets(session_id)
+            return artifacts
+
+    def put_group(self, session_id: str, group_key: str, artifacts: Dict[str, bytes]):
+        """Guarda (o reemplaza) los archivos del grupo y lo asocia a la sesión."""
+        with self._lock:
+            if group_key in self._groups:
+                for digest in self._groups[group_key].values():
+                    self._release_blob(digest)
+            self._groups[group_key] = {name: self._add_blob(data) for name, data in artifacts.items()}
+            self._attach(session_id, group_key)
+            self._enforce_budgets(session_id)
+
+    def get_or_build(self, session_id: str, group_key: str,
+                     build: Callable[[], Dict[str, bytes]]) -> Dict[str, bytes]:
+        """
+        Archivos del grupo; si no están, los genera con build() y los guarda.
+        Si build() falla la excepción se propaga y no se guarda nada.
+        """
+        artifacts = self.get_group(session_id, group_key)
+        if artifacts is None:
+            artifacts = build()
+            self.put_group(session_id, group_key, artifacts)
+        return artifacts
+
+    def _detach(self, session_id: str, group_key: str):
+        sessions = self._group_sessions.get(group_key, set())
+        sessions.discard(session_id)
+        if not sessions:
+            self._drop_group(group_key)
+
+    def retain_groups(self, session_id: str, group_keys):
+        """
+        Suelta los grupos de la sesión que no estén en `group_keys` (p. ej. los de
+        resultados anteriores); los que no use otra sesión se eliminan.
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return
+            for group_key in [key for key in session if key not in group_keys]:
+                session.pop(group_key)
+                self._detach(session_id, group_key)
+            if not session:
+                del self._sessions[session_id]
+
+    def release_session(self, session_id: str):
+        """Suelta todos los grupos de una sesión (los que no use otra se eliminan)."""
+        with self._lock:
+            for group_key in list(self._sessions.pop(session_id, ())):
+                self._detach(session_id, group_key)
+
+    def counters(self) -> dict:
+        with self._lock:
+            return {"aciertos": self.hits, "fallos": self.misses, "deduplicados": self.deduplicated,
+                    "volcados": self.spilled, "expulsados": self.evicted, "grupos": len(self._groups),
+                    "archivos": len(self._blobs), "sesiones": len(self._sessions),
+                    "bytes_memoria": self.memory_bytes, "bytes_disco": self.disk_bytes}
+
+    def reset_counters(self):
+        with self._lock:
+            self.hits = self.misses = self.deduplicated = self.spilled = self.evicted = 0
+
+
+_store: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+
+
+def _env_mb(name: str, default: float) -> int:
+    try:
+        return int(float(os.environ.get(name, default)) * MB)
+    except ValueError:
+        return int(default * MB)
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Almacén de archivos del proceso (configurado con las variables RDA_ARTIFACT_*)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                spill_dir = os.environ.get("RDA_ARTIFACT_SPILL_DIR")
+                if not spill_dir:
+                    spill_dir = tempfile.mkdtemp(prefix="rda_artifacts_")
+                    atexit.register(shutil.rmtree, spill_dir, True)
+                _store = ArtifactStore(_env_mb("RDA_ARTIFACT_MEMORY_MB", DEFAULT_MEMORY_MB),
+                                       _env_mb("RDA_ARTIFACT_SESSION_MB", DEFAULT_SESSION_MB),
+                                       spill_dir, _env_mb("RDA_ARTIFACT_DISK_MB", DEFAULT_DISK_MB))
+                instrumentation.register_counters("artifact_store", _store)
+                logger.info("Almacén de archivos generados: %d MB en memoria, %d MB por sesión, volcado en %s",
+                            _store.max_memory_bytes // MB, _store.session_max_bytes // MB, spill_dir)
+    return _store
@@ -1,6 +1,25 @@
 import spacy
 import logging
-from typing import List, Dict, Optional
+import threading
+from collections import OrderedDict
+from typing import Collection, List, Dict, Optional
+
+import numpy as np
+
+try:
+    from src.instrumentation import timed, timed_block
+    from src.rda_logging import trace
+    from src.rule_packs import get_rule_pack
+    from src.features import extract_features, ACTION_TIER_HIGH, ACTION_TIER_MEDIUM, ACTION_TIER_LOW
+    from src.notes import make_notes, note
+    from src.lexicon_artifact import KEYWORDS_LABEL, keywords_digest
+except ImportError: # Ejecución directa del módulo (python src/...)
+    from instrumentation import timed, timed_block
+    from rda_logging import trace
+    from rule_packs import get_rule_pack
+    from features import extract_features, ACTION_TIER_HIGH, ACTION_TIER_MEDIUM, ACTION_TIER_LOW
+    from notes import make_notes, note
+    from lexicon_artifact import KEYWORDS_LABEL, keywords_digest
 
 # Configurar logger
 logger = logging.getLogger(__name__)
@@ -160,9 +179,114 @@ PROFESSIONAL_KEYWORDS: Dict[str, List[str]] = {
 }
    
 
+# Índices planos de keywords ya construidos, por contenido del diccionario de categorías
+# (keywords_digest) y artefacto de léxicos; se conservan los últimos usados
+_KEYWORD_INDEX_CACHE_SIZE = 8
+_KEYWORD_INDEX_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_KEYWORD_INDEX_LOCK = threading.Lock()
+# Último diccionario consultado y su hash: evita recalcular el hash en cada fila
+_LAST_KEYWORDS_DIGEST: tuple = (None, None)
+
+def get_keyword_index(professional_keywords: Dict[str, List[str]]) -> Collection[str]:
+    """
+    Devuelve el conjunto plano de todas las keywords del diccionario de categorías.
+    Se construye una sola vez por contenido del diccionario (los diccionarios de
+    keywords se tratan como inmutables una vez cargados).
+
+    Si el paquete de reglas activo usa un artefacto de léxicos construido con estas
+    mismas keywords, se devuelve su vista prelematizada (ver src/lexicon_artifact.py).
+    """
+    global _LAST_KEYWORDS_DIGEST
+    last_keywords, digest = _LAST_KEYWORDS_DIGEST
+    if last_keywords is not professional_keywords:
+        digest = keywords_digest(professional_keywords)
+        _LAST_KEYWORDS_DIGEST = (professional_keywords, digest)
+
+    artifact = get_rule_pack().lexicon_artifact
+    key = (digest, id(artifact))
+    with _KEYWORD_INDEX_LOCK:
+        cached = _KEYWORD_INDEX_CACHE.get(key)
+        if cached is not None and cached[0] is artifact:
+            _KEYWORD_INDEX_CACHE.move_to_end(key)
+            return cached[1]
+    if artifact is not None and KEYWORDS_LABEL in artifact.labels and artifact.keywords_digest == digest:
+        index = artifact.lexicon(KEYWORDS_LABEL)
+    else:
+        index = frozenset(kw for sublist in professional_keywords.values() for kw in sublist)
+    with _KEYWORD_INDEX_LOCK:
+        _KEYWORD_INDEX_CACHE[key] = (artifact, index)
+        _KEYWORD_INDEX_CACHE.move_to_end(key)
+        while len(_KEYWORD_INDEX_CACHE) > _KEYWORD_INDEX_CACHE_SIZE:
+            _KEYWORD_INDEX_CACHE.popitem(last=False)
+    return index
+
+# Puntuación de acción por clase del verbo (índice ACTION_TIER_*): otro=3, baja=2, media=3, alta=4
+_ACTION_TIER_SCORES = np.array([3, 2, 3, 4])
+
+# --- Puntuación sobre la tabla de características ---
+
+def score_authenticity_features(features) -> dict:
+    """
+    Puntuaciones de Autenticidad a partir de las características de
+    src/features.py (una fila o las columnas de la tabla de un lote).
+    """
+    has_verb = np.asarray(features["has_main_verb"], dtype=bool)
+    action_tier = np.asarray(features["action_tier"])
+    has_adverb = np.asarray(features["has_application_adverb"], dtype=bool)
+    n_keywords = np.asarray(features["n_keywords"])
+
+    # Acción: según la clase del verbo, +1 por adverbio de aplicación (máx. 5); 1 sin verbo
+    action = np.where(has_verb, np.minimum(5, _ACTION_TIER_SCORES[action_tier] + has_adverb), 1)
+    # Contexto: alto (4) si aparece alguna keyword profesional, bajo (2) si no
+    context = np.where(n_keywords > 0, 4, 2)
+    # Sentido formativo: placeholder (requiere evaluación manual)
+    meaning = np.full_like(context, 3)
+    return {'action_score': action, 'context_score': context, 'meaning_score': meaning}
+
+
+def build_authenticity_result(features: dict, scores: dict) -> dict:
+    """Diccionario de resultado (puntuaciones de una fila y notas codificadas, ver src/notes.py)."""
+    notes = []
+    verb_lemma = features["main_verb"]
+    if features["has_main_verb"]:
+        action_tier = features["action_tier"]
+        if action_tier == ACTION_TIER_HIGH:
+            notes.append(("aut.verbo_alto", verb_lemma))
+        elif action_tier == ACTION_TIER_MEDIUM:
+            notes.append(("aut.verbo_medio", verb_lemma))
+        elif action_tier == ACTION_TIER_LOW:
+            notes.append(("aut.verbo_bajo", verb_lemma))
+        else:
+            notes.append(("aut.verbo_otro", verb_lemma))
+        if features["has_application_adverb"]:
+            notes.append(("aut.adverbio",))
+    else:
+        notes.append(("aut.sin_verbo",))
+
+    matched_kws = features["keyword_matches"]
+    if matched_kws:
+        found_keywords = set()
+        found_keywords.update(matched_kws)
+        notes.append(("aut.keywords", ", ".join(found_keywords)))
+    else:
+        notes.append(("aut.sin_keywords",))
+    notes.append(("aut.sentido_manual",))
+
+    final_result = {
+        'action_score': scores['action_score'],
+        'context_score': scores['context_score'],
+        'meaning_score': scores['meaning_score'],
+        'authenticity_notes': make_notes(notes)
+    }
+    trace(logger, "autenticidad.resultado", accion=final_result['action_score'],
+          contexto=final_result['context_score'], sentido=final_result['meaning_score'])
+    return final_result
+
 # --- Función Principal ---
 
-def check_authenticity(text: str, nlp_model: spacy.language.Language, professional_keywords: Optional[Dict[str, List[str]]] = None) -> dict:
+@timed("check_authenticity")
+def check_authenticity(text: str, nlp_model: spacy.language.Language, professional_keywords: Optional[Dict[str, List[str]]] = None,
+                       doc: Optional[spacy.tokens.Doc] = None, features: Optional[dict] = None) -> dict:
     """
     Estima la autenticidad de un RA basado en heurísticas.
 
@@ -171,22 +295,24 @@ def check_authenticity(text: str, nlp_model: spacy.language.Language, profession
         nlp_model: El modelo de lenguaje spaCy cargado.
         professional_keywords: Diccionario de palabras clave por categoría profesional.
                                Si es None, usa el default (PROFESSIONAL_KEYWORDS).
+        doc: Doc spaCy ya procesado de text.lower() (opcional, evita volver a procesar).
+        features: Características ya extraídas del Doc con el índice de professional_keywords
+                  (ver src/features.py; opcional).
 
     Returns:
         Un diccionario con puntajes estimados (1-5) y notas.
     """
-    logger.info(f"--- Iniciando check_authenticity para: '{text}' ---")
     if not text or not isinstance(text, str):
-        logger.warning("Texto de entrada inválido o vacío.")
+        trace(logger, "autenticidad.texto_invalido", texto=text)
         return {
             'action_score': 1, 'context_score': 1, 'meaning_score': 1,
-            'authenticity_notes': 'Texto de entrada inválido o vacío.'
+            'authenticity_notes': note('texto_invalido')
         }
-    if not nlp_model:
+    if not nlp_model and doc is None and features is None:
          logger.error("Modelo NLP no disponible para check_authenticity.")
          return {
             'action_score': 1, 'context_score': 1, 'meaning_score': 1,
-            'authenticity_notes': 'Modelo NLP no disponible.'
+            'authenticity_notes': note('modelo_no_disponible')
         }
 
     # Usar keywords por defecto si no se proporcionan
@@ -194,83 +320,19 @@ def check_authenticity(text: str, nlp_model: spacy.language.Language, profession
         professional_keywords = PROFESSIONAL_KEYWORDS
 
     try:
-        doc = nlp_model(text.lower())
-        notes = []
-        lemmas = {token.lemma_ for token in doc}
-
-        # --- 1. Estimación de Orientación a la Acción (1-5) ---
-        action_score = 1 # Default: Muy bajo
-        main_verb_token = None
-        for token in doc:
-            if token.dep_ == "ROOT" and token.pos_ == "VERB":
-                main_verb_token = token
-                break
-        if not main_verb_token:
-             for token in doc:
-                 if token.pos_ == "VERB":
-                     main_verb_token = token
-                     break
-
-        if main_verb_token:
-            verb_lemma = main_verb_token.lemma_
-            # Lógica simple: verbos comunes de niveles altos de Bloom = más acción
-            if verb_lemma in ["analizar", "evaluar", "crear", "diseñar", "aplicar", "implementar", "desarrollar", "generar", "resolver"]:
-                action_score = 4 # Alto
-                notes.append(f"Verbo '{verb_lemma}' sugiere acción clara/aplicable.")
-            elif verb_lemma in ["identificar", "describir", "explicar", "comparar", "utilizar"]:
-                action_score = 3 # Medio
-                notes.append(f"Verbo '{verb_lemma}' sugiere acción, podría ser más concreto.")
-            elif verb_lemma in ["comprender", "conocer", "recordar", "definir"]:
-                 action_score = 2 # Bajo
-                 notes.append(f"Verbo '{verb_lemma}' sugiere acción menos directa/observable.")
-            else:
-                 action_score = 3 # Default para otros verbos
-                 notes.append(f"Verbo '{verb_lemma}' encontrado.")
-
-            # Bonus simple por adverbios (ejemplo muy básico)
-            if any(child.lemma_ in ["eficazmente", "correctamente", "eficientemente"] for child in main_verb_token.children if child.pos_ == "ADV"):
-                 action_score = min(5, action_score + 1)
-                 notes.append("Adverbio sugiere mayor nivel de aplicación.")
-
-        else:
-            notes.append("No se encontró verbo principal claro, baja orientación a la acción.")
-            action_score = 1
-
-        # --- 2. Estimación de Vinculación con Contexto Profesional (1-5) ---
-        context_score = 2 # Default: Bajo (asumiendo que algo de contexto académico siempre hay)
-        found_keywords = set()
-        all_keywords = set(kw for sublist in professional_keywords.values() for kw in sublist)
-
-        matched_kws = lemmas.intersection(all_keywords)
-        if matched_kws:
-            found_keywords.update(matched_kws)
-            context_score = 4 # Alto si encuentra alguna keyword relevante
-            notes.append(f"Vinculación con contexto sugerida por keywords: {', '.join(found_keywords)}.")
-        else:
-            notes.append("No se encontraron keywords específicas de contexto profesional (según lista actual).")
-            # Podríamos intentar una lógica más compleja aquí (buscar sustantivos clave, etc.)
-            # pero por ahora lo dejamos simple.
-
-        # --- 3. Estimación de Sentido Formativo (Placeholder) ---
-        meaning_score = 3 # Default: Medio
-        notes.append("Sentido formativo requiere evaluación manual (default=3).")
-
-        # --- Resultado Final ---
-        final_notes = " ".join(notes)
-        final_result = {
-            'action_score': action_score,
-            'context_score': context_score,
-            'meaning_score': meaning_score,
-            'authenticity_notes': final_notes
-        }
-        logger.info(f"--- Resultado final check_authenticity: {final_result} ---")
-        return final_result
+        if features is None:
+            if doc is None:
+                with timed_block("spacy_parse"):
+                    doc = nlp_model(text.lower())
+            features = extract_features(doc, get_rule_pack(), get_keyword_index(professional_keywords))
+        scores = score_authenticity_features(features)
+        return build_authenticity_result(features, {key: int(value) for key, value in scores.items()})
 
     except Exception as e:
-        logger.error(f"Error en check_authenticity para texto '{text[:50]}...': {e}", exc_info=True)
+        logger.error("Error en check_authenticity para texto '%s...': %s", text[:50], e, exc_info=True)
         return {
             'action_score': 1, 'context_score': 1, 'meaning_score': 1,
-            'authenticity_notes': f'Error durante el análisis: {e}'
+            'authenticity_notes': note('error', str(e))
         }
 
 # --- Ejemplo de uso (opcional, para pruebas) ---
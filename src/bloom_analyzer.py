@@ -1,5 +1,8 @@
+import itertools
 import json
 import os
+import re
+import time
 import logging
 import unicodedata # Importación necesaria para normalización Unicode
 import streamlit as st # Necesario para el decorador @st.cache_resource (aunque esté comentado)
@@ -15,38 +18,30 @@ except ImportError:
     def load_spacy_model(): return None
     def clean_text(text): return text
     def find_main_verb(doc): return None
+try:
+    from src.instrumentation import timed, timed_block
+    from src.rda_logging import trace
+    from src.appropriateness import get_appropriateness_table
+    from src.fuzzy_verbs import get_fuzzy_verb_index
+    from src.lemma_decisions import get_lemma_memo
+except ImportError: # Ejecución directa del módulo (python src/...)
+    from instrumentation import timed, timed_block
+    from rda_logging import trace
+    from appropriateness import get_appropriateness_table
+    from fuzzy_verbs import get_fuzzy_verb_index
+    from lemma_decisions import get_lemma_memo
 # --------------------------------------------------------------------
 
-# Configuración básica de logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# Configurar logger (la configuración del logging la hace el punto de entrada)
+logger = logging.getLogger(__name__)
 
 # --- Constantes y Configuración ---
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 TAXONOMY_PATH = os.path.join(os.path.dirname(CURRENT_DIR), 'data', 'bloom_taxonomy.json')
 
 # --- REGLAS DE ADECUACIÓN (EJEMPLO - ¡AJUSTAR!) ---
-APPROPRIATENESS_RULES = {
-    '2': {
-        'bajo': [],
-        'apropiado': ['recordar', 'comprender'],
-        'alto': ['aplicar', 'analizar', 'evaluar', 'crear']
-    },
-    '4': {
-        'bajo': ['recordar'],
-        'apropiado': ['comprender', 'aplicar', 'analizar'],
-        'alto': ['evaluar', 'crear']
-    },
-    '6': {
-        'bajo': ['recordar','comprender'],
-        'apropiado': ['aplicar', 'analizar'],
-        'alto': ['evaluar', 'crear']
-    },
-    '8': {
-        'bajo': ['recordar', 'comprender'],
-        'apropiado': ['aplicar', 'analizar', 'evaluar', 'crear'],
-        'alto': []
-    }
-}
+# Reglas cargadas de data/appropriateness_rules.json y compiladas en una tabla (ver src/appropriateness.py)
+APPROPRIATENESS_RULES = get_appropriateness_table().rules
 # ----------------------------------------------------
 
 # --- Funciones de Carga de Taxonomía (Simplificadas) ---
@@ -57,13 +52,13 @@ def load_bloom_taxonomy(taxonomy_file=TAXONOMY_PATH):
     Realiza normalización robusta de claves y valores.
     """
     verb_to_level_map = {}
-    logging.info(f"load_bloom_taxonomy: Iniciando carga y construcción de verb_map desde: {taxonomy_file}")
+    logger.info("load_bloom_taxonomy: Iniciando carga y construcción de verb_map desde: %s", taxonomy_file)
 
     try:
         with open(taxonomy_file, 'r', encoding='utf-8') as f:
             # Cargar asegurando que se manejen correctamente caracteres unicode
             taxonomy_data = json.load(f)
-        logging.info(f"load_bloom_taxonomy: JSON cargado, {len(taxonomy_data)} niveles encontrados.")
+        logger.info("load_bloom_taxonomy: JSON cargado, %d niveles encontrados.", len(taxonomy_data))
 
         total_verbs_added = 0
         # Construir el mapa verbo -> nivel
@@ -90,7 +85,7 @@ def load_bloom_taxonomy(taxonomy_file=TAXONOMY_PATH):
             #logging.debug(f"      Nivel '{level_norm}' procesado. {count_added_for_level} nuevos añadidos.")
                     total_verbs_added += count_added_for_level
 
-        logging.info(f"load_bloom_taxonomy: Construcción completa. Tamaño final verb_map: {len(verb_to_level_map)}. Total añadidos: {total_verbs_added}")
+        logger.info("load_bloom_taxonomy: Construcción completa. Tamaño final verb_map: %d. Total añadidos: %d", len(verb_to_level_map), total_verbs_added)
 
     except FileNotFoundError:
         #logging.error(f"Error Crítico: No se encontró el archivo de taxonomía en '{taxonomy_file}'")
@@ -114,19 +109,62 @@ def cached_load_bloom_taxonomy():
     """Wrapper para cargar la taxonomía. CACHE DESACTIVADA TEMPORALMENTE."""
     # Llama directamente a la función que ahora solo devuelve el mapa
     the_map = load_bloom_taxonomy()
-    logging.info(f"cached_load_bloom_taxonomy: Mapa recibido de load_bloom_taxonomy. Tamaño: {len(the_map) if isinstance(the_map, dict) else 'Invalido'}")
+    logger.info("cached_load_bloom_taxonomy: Mapa recibido de load_bloom_taxonomy. Tamaño: %s", len(the_map) if isinstance(the_map, dict) else 'Invalido')
     return the_map # Devuelve solo el mapa
 # ---------------------------------------------
 
+# --- Vía Rápida sin Parser ---
+# La mayoría de los RdAs empiezan por el verbo en infinitivo ("Analizar...") o por
+# "será capaz de / podrá + infinitivo": basta con tokenizar y buscar en la taxonomía.
+_FAST_PATH_PREFIX = re.compile(
+    r"^(?:(?:el|la|los|las)\s+(?:estudiantes?|alumn[oa]s?|participantes?|egresad[oa]s?)\s+)?"
+    r"(?:(?:ser[áa]n?|es|son|ser)\s+capa(?:z|ces)\s+de|podr[áa]n?)\s+"
+)
+_FAST_PATH_WORD = re.compile(r"\w+")
+
+
+def fast_bloom_verb(cleaned_text, verb_map):
+    """
+    Verbo de la taxonomía que abre el texto (ya pasado por clean_text), sin
+    etiquetador ni parser: infinitivo inicial o tras "será capaz de" / "podrá".
+
+    Returns:
+        El verbo (clave de verb_map) o None si el caso es ambiguo y requiere el
+        análisis completo (otro inicio, verbo conjugado o fuera de la taxonomía).
+    """
+    prefix = _FAST_PATH_PREFIX.match(cleaned_text)
+    first_word = _FAST_PATH_WORD.match(cleaned_text, prefix.end() if prefix else 0)
+    if not first_word:
+        return None
+    verb = unicodedata.normalize('NFKC', first_word.group(0))
+    return verb if verb in verb_map else None
+
+
 # --- Función Principal de Análisis de Bloom ---
 
-def analyze_bloom_level(text):
+@timed("analyze_bloom_level")
+def analyze_bloom_level(text, doc=None, fast_path=True):
     """
     Analiza un texto (objetivo de aprendizaje) para determinar su nivel de Bloom
     basándose en el verbo principal identificado.
+    Si se proporciona `doc` (Doc spaCy de clean_text(text)), se reutiliza en lugar de volver a procesar el texto.
+    Sin `doc`, primero se intenta la vía rápida (fast_bloom_verb) y solo si es
+    ambigua se procesa el texto con spaCy (fast_path=False fuerza el análisis completo).
+    Con RDA_FUZZY_VERBS, un verbo fuera de la taxonomía se aproxima al más cercano
+    (ver src/fuzzy_verbs.py): el resultado incluye 'approximate_verb' y 'approximate_distance'.
     """
+    # 0. Vía rápida: infinitivo inicial de la taxonomía, sin cargar ni ejecutar el modelo
+    if doc is None and fast_path:
+        verb_map = cached_load_bloom_taxonomy()
+        if isinstance(verb_map, dict) and verb_map:
+            with timed_block("bloom_fast_path"):
+                fast_verb = fast_bloom_verb(clean_text(text), verb_map)
+            if fast_verb:
+                trace(logger, "bloom.via_rapida", verbo=fast_verb, nivel=verb_map[fast_verb])
+                return {"verb": fast_verb, "level": verb_map[fast_verb].capitalize(), "error": None}
+
     # 1. Cargar recursos necesarios
-    nlp = load_spacy_model() # Asume que esta función está cacheada o es eficiente
+    nlp = load_spacy_model() if doc is None else None # Asume que esta función está cacheada o es eficiente
     verb_map = cached_load_bloom_taxonomy() # Obtiene el mapa (sin caché por ahora)
 
     # --- Verificación del mapa y NLP ---
@@ -135,7 +173,7 @@ def analyze_bloom_level(text):
         # No mostrar error de Streamlit aquí, devolver estado de error
         return {"verb": None, "level": "Error", "error": "Fallo carga taxonomía"}
 
-    if not nlp:
+    if doc is None and not nlp:
         #logging.error("analyze_bloom_level: Fallo en carga de modelo NLP.")
         return {"verb": None, "level": "Error", "error": "Fallo carga NLP"}
     # ------------------------------------
@@ -147,68 +185,103 @@ def analyze_bloom_level(text):
         #logging.warning(f"Texto vacío o inválido recibido: '{text}'")
         return {"verb": None, "level": "N/A", "error": "Texto vacío o inválido"}
 
-    # 3. Procesar con spaCy
-    doc = nlp(cleaned_objective)
+    # 3. Procesar con spaCy (salvo que ya se haya procesado en lote)
+    if doc is None:
+        with timed_block("spacy_parse"):
+            doc = nlp(cleaned_objective)
 
     # 4. Encontrar verbo principal (lema)
     main_verb = find_main_verb(doc) # Asume que devuelve el lema normalizado o None
-    logging.info(f"Texto procesado: '{cleaned_objective}'. Verbo encontrado: {repr(main_verb)}")
+    trace(logger, "bloom.verbo", texto=cleaned_objective, verbo=main_verb)
 
     if not main_verb:
          #logging.warning(f"No se encontró verbo principal en: '{cleaned_objective}'")
          return {"verb": None, "level": "No identificado", "error": "No se encontró verbo principal"}
 
-    # Normalización robusta del verbo a buscar (ya debería venir normalizado de find_main_verb si se implementó bien, pero aseguramos)
-    verb_to_search = unicodedata.normalize('NFKC', main_verb).lower().strip()
-    logging.info(f"analyze_bloom_level: Intentando buscar verbo normalizado: {repr(verb_to_search)}")
-    
-    
-    # --- BLOQUE DE DEPURACIÓN INTENSIVA ---
-# -----------------------------------------
-
-    # 5. Buscar verbo en la taxonomía
-    bloom_level = verb_map.get(verb_to_search) # Busca el lema normalizado
+    # 5. Buscar verbo en la taxonomía: normalización NFKC y nivel memorizados por lema (ver src/lemma_decisions.py)
+    decision = get_lemma_memo(verb_map=verb_map).get(main_verb)
+    verb_to_search = decision.bloom_key
+    bloom_level = decision.bloom_level
 
     if bloom_level:
         # Nivel encontrado, devolver capitalizado para presentación
-        logging.info(f"analyze_bloom_level: Verbo {repr(verb_to_search)} ENCONTRADO. Nivel: {repr(bloom_level)}")
+        trace(logger, "bloom.nivel", verbo=verb_to_search, nivel=bloom_level)
         return {"verb": main_verb, "level": bloom_level.capitalize(), "error": None}
     else:
+        # Búsqueda aproximada opcional (RDA_FUZZY_VERBS): verbo de la taxonomía más cercano
+        fuzzy_index = get_fuzzy_verb_index(verb_map)
+        if fuzzy_index is not None:
+            with timed_block("bloom_fuzzy_verb"):
+                fuzzy_match = fuzzy_index.lookup(verb_to_search)
+            if fuzzy_match:
+                trace(logger, "bloom.verbo_aproximado", verbo=verb_to_search, taxonomia=fuzzy_match.verb,
+                      distancia=fuzzy_match.distance)
+                return {"verb": main_verb, "level": fuzzy_match.level.capitalize(), "error": None,
+                        "approximate_verb": fuzzy_match.verb, "approximate_distance": fuzzy_match.distance}
         # Nivel no encontrado para este verbo
         #logging.warning(f"analyze_bloom_level: Verbo {repr(verb_to_search)} NO encontrado en verb_map (Tamaño actual: {len(verb_map)}).")
         # Descomentar para depuración si es necesario:
         # logging.debug(f"   Primeras 15 claves del mapa usado: {list(verb_map.keys())[:15]}")
         return {"verb": main_verb, "level": "No clasificado", "error": f"Verbo '{main_verb}' no encontrado en la taxonomía"}
 
+def compare_bloom_fast_path(texts, nlp_model, batch_size=64, max_examples=20, chunk_size=1000):
+    """
+    Informe de la vía rápida sobre un conjunto de textos: proporción de textos que
+    resuelve (tasa de acierto) y, entre ellos, coincidencia de verbo y nivel con
+    el análisis completo (parser), más ejemplos de discrepancias y tiempos.
+    `texts` puede ser cualquier iterable: se recorre en bloques de `chunk_size`
+    textos sin cargarlo entero en memoria.
+    """
+    verb_map = cached_load_bloom_taxonomy()
+    texts = iter(texts)
+    total = hits = agree_verb = agree_level = 0
+    fast_seconds = full_seconds = 0.0
+    disagreements = []
+    while True:
+        cleaned_texts = [clean_text(text) for text in itertools.islice(texts, chunk_size)]
+        if not cleaned_texts:
+            break
+        total += len(cleaned_texts)
+
+        start = time.perf_counter()
+        fast_verbs = [fast_bloom_verb(text, verb_map) for text in cleaned_texts]
+        fast_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        full_results = [analyze_bloom_level(text, doc=doc)
+                        for text, doc in zip(cleaned_texts, nlp_model.pipe(cleaned_texts, batch_size=batch_size))]
+        full_seconds += time.perf_counter() - start
+
+        for text, fast_verb, full in zip(cleaned_texts, fast_verbs, full_results):
+            if not fast_verb:
+                continue
+            hits += 1
+            agree_verb += fast_verb == full.get("verb")
+            same_level = verb_map[fast_verb].capitalize() == full.get("level")
+            agree_level += same_level
+            if not same_level and len(disagreements) < max_examples:
+                disagreements.append({"texto": text, "rapida": fast_verb, "completa": full.get("verb"),
+                                      "nivel_completa": full.get("level")})
+    return {
+        "textos": total,
+        "aciertos": hits,
+        "tasa_acierto": round(hits / total, 4) if total else None,
+        "coincidencia_verbo": round(agree_verb / hits, 4) if hits else None,
+        "coincidencia_nivel": round(agree_level / hits, 4) if hits else None,
+        "rapida_s": round(fast_seconds, 4),
+        "completa_s": round(full_seconds, 4),
+        "discrepancias": disagreements,
+    }
+
 # --- Función de Evaluación de Adecuación ---
 
+@timed("check_appropriateness")
 def check_appropriateness(bloom_level, academic_level_str):
     """
     Evalúa si un nivel de Bloom es apropiado, bajo o alto para un
     nivel académico dado, según las reglas definidas.
     """
-    if not bloom_level or bloom_level in ["N/A", "Error", "No identificado", "No clasificado"]:
-        return "N/A"
-
-    # Normalizar nivel de Bloom para búsqueda en reglas (minúsculas)
-    # Asegurarse de que bloom_level sea string antes de lower()
-    bloom_level_norm = str(bloom_level).lower()
-
-    if academic_level_str not in APPROPRIATENESS_RULES:
-        #logging.warning(f"Nivel académico '{academic_level_str}' no encontrado en APPROPRIATENESS_RULES.")
-        return "Nivel Académico Desconocido"
-
-    rules_for_level = APPROPRIATENESS_RULES[academic_level_str]
-
-    if bloom_level_norm in rules_for_level.get('bajo', []):
-        return "Potencialmente Bajo"
-    elif bloom_level_norm in rules_for_level.get('apropiado', []):
-        return "Apropiado"
-    elif bloom_level_norm in rules_for_level.get('alto', []):
-        return "Potencialmente Alto"
-    else:
-        #logging.warning(f"Nivel Bloom '{bloom_level_norm}' (original: '{bloom_level}') no categorizado en reglas para nivel '{academic_level_str}'.")
-        return "No Categorizado en Reglas"
+    return get_appropriateness_table().classify(bloom_level, academic_level_str)
 
 # --- Bloque para Pruebas (Opcional) ---
 if __name__ == '__main__':
@@ -1,124 +1,62 @@
 import spacy
 import logging
-from typing import List, Dict, Set, Optional
+from typing import List, Dict, Optional, Iterable
+
+try:
+    from src.instrumentation import timed, timed_block
+    from src.rda_logging import trace
+    from src.rule_packs import get_rule_pack
+    from src.verb_frame import get_verb_frame
+    from src.notes import make_notes, note
+    from src.level_phrases import get_level_phrase_matcher
+except ImportError: # Ejecución directa del módulo (python src/...)
+    from instrumentation import timed, timed_block
+    from rda_logging import trace
+    from rule_packs import get_rule_pack
+    from verb_frame import get_verb_frame
+    from notes import make_notes, note
+    from level_phrases import get_level_phrase_matcher
 
 # Configurar logger
 logger = logging.getLogger(__name__)
 
-# Palabras o frases que indican vaguedad (pueden expandirse)
-VAGUE_WORDS: Set[str] = {
-    "cosa", "aspecto", "elemento", "tema", "área", "campo",
-    "general", "diverso", "varios", "algunos", "ciertos",
-    "relevante", "importante", "adecuado", "apropiado"
-}
-
-# Preposiciones o inicios de cláusulas que SUELEN indicar nivel/condición/método
-LEVEL_INDICATOR_STARTERS: Set[str] = {
-    "según", "con", "bajo", "mediante", "utilizando", "considerando",
-    "aplicando", "de acuerdo a", "en base a", "a través de", "por medio de",
-    "de forma", "de manera", # Seguidos por adjetivo/sustantivo
-    "para", "con el fin de", "con el objetivo de" # Indican propósito, a veces implican nivel
-}
-
-# Mínima longitud esperada para un RA potencialmente bien formulado (ajustable)
-MIN_REASONABLE_LENGTH = 5 # Número de tokens
+# Las palabras vagas, los iniciadores y patrones de frases de nivel/condición y la
+# longitud mínima razonable se definen en el paquete de reglas activo (ver src/rule_packs.py).
 
 def find_main_verb_and_object(doc: spacy.tokens.Doc) -> Dict[str, Optional[spacy.tokens.Token]]:
     """
-    Intenta encontrar el verbo principal (ROOT) y su objeto directo o complemento principal.
-    (Sin cambios respecto a la versión anterior)
+    Verbo principal y su objeto directo o complemento principal, según el
+    marco de verbo compartido (ver src/verb_frame.py).
     """
-    results = {"verb": None, "object": None}
-    verb = None
-    obj = None
-    for token in doc:
-        if token.dep_ == "ROOT" and token.pos_ == "VERB":
-            verb = token
-            break
-    if not verb:
-        for token in doc:
-            if token.pos_ == "VERB":
-                verb = token
-                break
-    if verb:
-        results["verb"] = verb
-        for child in verb.children:
-            if child.dep_ in ["dobj", "obj"]:
-                obj = child
-                break
-            elif child.dep_ in ["ccomp", "xcomp"]:
-                obj_token_in_comp = next((t for t in child.subtree if t.dep_ in ["dobj", "obj"]), None)
-                obj = obj_token_in_comp if obj_token_in_comp else child
-                break
-        if not obj:
-             for child in verb.children:
-                 if child.dep_ == "obl":
-                     obj_token = next((t for t in child.subtree if t.pos_ == "NOUN"), None)
-                     obj = obj_token if obj_token else child
-                     break
-                 elif child.dep_ == "prep":
-                     pobj_token = next((t for t in child.children if t.dep_ == "pobj"), None)
-                     if pobj_token:
-                         obj = pobj_token
-                         break
-        results["object"] = obj
-    logger.debug(f"Verbo principal encontrado: {verb.text if verb else 'Ninguno'}")
-    logger.debug(f"Objeto/Complemento encontrado: {obj.text if obj else 'Ninguno'}")
-    return results
+    frame = get_verb_frame(doc)
+    verb, obj = frame.verb, frame.object
+    trace(logger, "correccion.verbo_objeto", verbo=verb.text if verb else None, objeto=obj.text if obj else None)
+    return {"verb": verb, "object": obj}
 
-def check_level_phrase_clause(verb: Optional[spacy.tokens.Token]) -> Dict[str, bool | str]:
+def check_level_phrase_clause(verb: Optional[spacy.tokens.Token],
+                              modifiers: Optional[Iterable[spacy.tokens.Token]] = None) -> Dict[str, bool | str]:
     """
     Busca frases preposicionales (obl) o cláusulas adverbiales (advcl)
     asociadas al verbo que indiquen nivel, condición o método.
     IGNORA adverbios simples (advmod) directamente modificando al verbo.
+    `modifiers` son los hijos obl/advcl ya resueltos (VerbFrame.modifiers); si es
+    None se obtienen con el DependencyMatcher.
+    Las frases reconocidas (iniciadores y patrones como "de forma/manera ADJ") son
+    reglas del paquete compiladas en un Matcher de spaCy (ver src/level_phrases.py).
     """
-    found = False
-    phrase_text = ""
     if not verb:
         return {"found": False, "text": ""}
 
-    relevant_deps = ["obl", "advcl"] # Dependencias que buscamos
-    # Podríamos añadir 'acl' (cláusula adjetiva) si modifica al objeto y da nivel
-
-    for child in verb.children:
-        # Ignorar adverbios simples directamente modificando el verbo
-        if child.dep_ == "advmod" and child.pos_ == "ADV":
-            logger.debug(f"Ignorando adverbio simple: {child.text}")
-            continue
-
-        # Buscar frases preposicionales o cláusulas adverbiales
-        if child.dep_ in relevant_deps:
-            # Verificar si la frase/cláusula empieza con un indicador común
-            start_token = child if child.dep_ == "advcl" else next(child.subtree, None) # Primer token de la frase/cláusula
-            if start_token and start_token.lemma_.lower() in LEVEL_INDICATOR_STARTERS:
-                found = True
-                phrase_text = " ".join(t.text for t in child.subtree)
-                logger.debug(f"Encontrada frase/cláusula de nivel/condición ({child.dep_}): '{phrase_text}'")
-                break # Encontrar una es suficiente por ahora
-
-            # Caso especial: "de forma [adjetivo]" o "de manera [adjetivo]"
-            elif start_token and start_token.lemma_.lower() in ["de"]:
-                 next_token = start_token.nbor(1) if start_token.i + 1 < len(start_token.doc) else None
-                 if next_token and next_token.lemma_.lower() in ["forma", "manera"]:
-                     adj_token = next_token.nbor(1) if next_token.i + 1 < len(next_token.doc) else None
-                     if adj_token and adj_token.pos_ == "ADJ":
-                         found = True
-                         phrase_text = f"{start_token.text} {next_token.text} {adj_token.text}"
-                         logger.debug(f"Encontrada frase/cláusula de nivel/condición (de forma/manera ADJ): '{phrase_text}'")
-                         break
-
-
-    # Podríamos buscar también modificadores del objeto si fuera relevante
-    # obj = find_object...
-    # if obj:
-    #    for child in obj.children:
-    #        if child.dep_ == 'acl': # Cláusula adjetiva modificando el objeto
-    #             # Analizar si esta cláusula indica un nivel/condición
-
-    return {"found": found, "text": phrase_text}
+    matcher = get_level_phrase_matcher(verb.doc.vocab, get_rule_pack())
+    match = matcher.find(verb, None if modifiers is None else tuple(modifiers))
+    if match is None:
+        return {"found": False, "text": ""}
+    trace(logger, "correccion.frase_nivel", dep=match.complement.dep_, patron=match.pattern, frase=match.text)
+    return {"found": True, "text": match.text}
 
 
-def check_correction(text: str, nlp_model: spacy.language.Language) -> dict:
+@timed("check_correction")
+def check_correction(text: str, nlp_model: spacy.language.Language, doc: Optional[spacy.tokens.Doc] = None) -> dict:
     """
     Evalúa la corrección de la formulación de un RA según la rúbrica 0-2.
     Se enfoca en: Verbo claro, Contenido específico, Frase/Cláusula de Nivel/Condición, Claridad general.
@@ -127,29 +65,30 @@ def check_correction(text: str, nlp_model: spacy.language.Language) -> dict:
     Args:
         text: El texto del Resultado de Aprendizaje.
         nlp_model: El modelo de lenguaje spaCy cargado.
+        doc: Doc spaCy ya procesado del texto original (opcional, evita volver a procesar).
 
     Returns:
         Un diccionario con 'correction_score' (0, 1, o 2) y 'correction_notes'.
     """
-    logger.info(f"--- Iniciando check_correction para: '{text}' ---")
     score = 0 # Por defecto, no definido correctamente
     notes = []
 
     if not text or not isinstance(text, str) or len(text.split()) < 3:
-        logger.warning("Texto inválido o demasiado corto.")
-        notes.append("Texto inválido o demasiado corto para análisis.")
-        return {'correction_score': 0, 'correction_notes': " ".join(notes)}
-    if not nlp_model:
+        trace(logger, "correccion.texto_invalido", texto=text)
+        return {'correction_score': 0, 'correction_notes': note("cor.texto_invalido")}
+    if not nlp_model and doc is None:
          logger.error("Modelo NLP no disponible para check_correction.")
-         notes.append('Modelo NLP no disponible.')
-         return {'correction_score': 0, 'correction_notes': " ".join(notes)}
+         return {'correction_score': 0, 'correction_notes': note("modelo_no_disponible")}
 
     try:
-        doc = nlp_model(text)
+        if doc is None:
+            with timed_block("spacy_parse"):
+                doc = nlp_model(text)
         tokens = [token for token in doc if not token.is_punct and not token.is_space]
 
-        if len(tokens) < MIN_REASONABLE_LENGTH:
-             notes.append(f"Formulación muy breve (menos de {MIN_REASONABLE_LENGTH} palabras significativas).")
+        rules = get_rule_pack()
+        if len(tokens) < rules.min_reasonable_length:
+             notes.append(("cor.muy_breve", rules.min_reasonable_length))
 
         analysis_verb_obj = find_main_verb_and_object(doc)
         verb = analysis_verb_obj["verb"]
@@ -163,83 +102,57 @@ def check_correction(text: str, nlp_model: spacy.language.Language) -> dict:
         is_clear = True # Asumir claridad inicial
 
         if not has_verb:
-            notes.append("No se identificó un verbo de desempeño claro.")
+            notes.append(("cor.sin_verbo",))
             score = 0
-            logger.debug("Resultado: Score 0 (Sin verbo)")
-            return {'correction_score': score, 'correction_notes': " ".join(notes)}
+            return {'correction_score': score, 'correction_notes': make_notes(notes)}
 
         # Si hay verbo, evaluar contenido y frase/cláusula de nivel
+        object_text = ""
         if has_object:
-            object_subtree_lemmas = {t.lemma_.lower() for t in obj.subtree}
-            if not VAGUE_WORDS.intersection(object_subtree_lemmas) and obj.lemma_.lower() not in VAGUE_WORDS:
+            object_subtree = list(obj.subtree)
+            object_text = " ".join(t.text for t in object_subtree)
+            object_subtree_lemmas = {t.lemma_.lower() for t in object_subtree}
+            if not any(lemma in rules.vague_words for lemma in object_subtree_lemmas) and obj.lemma_.lower() not in rules.vague_words:
                  is_content_specific = True
-                 notes.append(f"Verbo '{verb.text}' con contenido específico: '{' '.join(t.text for t in obj.subtree)}'.")
-            else:
-                notes.append(f"Verbo '{verb.text}' presente, pero el contenido '{' '.join(t.text for t in obj.subtree)}' parece vago o general.")
-        else:
-            notes.append(f"Verbo '{verb.text}' presente, pero no se identificó un contenido (objeto/complemento) claro.")
 
         # Buscar frase/cláusula de nivel/condición
-        level_check = check_level_phrase_clause(verb)
+        level_check = check_level_phrase_clause(verb, get_verb_frame(doc).modifiers)
         has_level_phrase_clause = level_check["found"]
         level_phrase_text = level_check["text"]
-        if has_level_phrase_clause:
-            notes.append(f"Se identificó frase/cláusula indicando nivel/condición: '{level_phrase_text}'.")
-        else:
-            notes.append("No se identificó frase/cláusula clara indicando nivel/condición/método.")
-
 
         # --- Asignación de Puntuación (0, 1, 2) ---
         if has_verb and has_object and is_content_specific and has_level_phrase_clause and is_clear:
             score = 2 # Todo presente y claro/específico
-            notes.append("Formulación clara con verbo, contenido específico y nivel/condición.")
-            logger.debug("Resultado: Score 2")
         elif has_verb and (not has_object or not is_content_specific or not has_level_phrase_clause):
              # Si falta CUALQUIERA de los componentes (objeto específico O frase de nivel), es 1
+             # (si hay verbo pero falta todo lo demás, también es 1)
              score = 1
-             missing_parts = []
-             if not has_object: missing_parts.append("contenido claro")
-             elif not is_content_specific: missing_parts.append("contenido específico")
-             if not has_level_phrase_clause: missing_parts.append("frase/cláusula de nivel/condición")
-             notes.append(f"Presenta limitaciones: falta { ' y '.join(missing_parts) }.")
-             logger.debug(f"Resultado: Score 1 (Falta {' y '.join(missing_parts)})")
-        # El caso de score 0 ya se manejó si no hay verbo. Si hay verbo pero falta todo lo demás, cae en score 1.
-        # Podríamos hacer el score 0 más estricto si falta verbo Y objeto Y nivel?
-        elif not has_verb: # Redundante, pero para claridad
-             score = 0
-             notes.append("Carece de verbo de desempeño claro.")
-             logger.debug("Resultado: Score 0 (Sin verbo - verificado de nuevo)")
-
 
-        # Limpiar notas duplicadas o redundantes
+        # Notas: mensaje principal según la puntuación y detalles identificados
         final_notes = []
-        seen_notes = set()
-        # Priorizar mensajes clave
-        if score == 2: final_notes.append("Formulación clara con verbo, contenido específico y nivel/condición.")
+        if score == 2: final_notes.append(("cor.completa",))
         elif score == 1:
             missing_parts = []
             if not has_object: missing_parts.append("contenido claro")
             elif not is_content_specific: missing_parts.append("contenido específico")
             if not has_level_phrase_clause: missing_parts.append("frase/cláusula de nivel/condición")
-            if missing_parts: final_notes.append(f"Presenta limitaciones: falta { ' y '.join(missing_parts) }.")
-            else: final_notes.append("Presenta limitaciones en la formulación.") # Nota genérica si no se identificó qué falta
+            if missing_parts: final_notes.append(("cor.limitaciones", " y ".join(missing_parts)))
+            else: final_notes.append(("cor.limitaciones_generica",)) # Nota genérica si no se identificó qué falta
         elif score == 0:
-             if not has_verb: final_notes.append("No se identificó un verbo de desempeño claro.")
-             else: final_notes.append("Carece de elementos básicos o formulación incorrecta.")
-
-        # Añadir detalles específicos si existen y no son redundantes
-        if has_verb: final_notes.append(f"Verbo: '{verb.text}'.")
-        if has_object and is_content_specific: final_notes.append(f"Contenido: '{' '.join(t.text for t in obj.subtree)}'.")
-        elif has_object: final_notes.append(f"Contenido (vago/general?): '{' '.join(t.text for t in obj.subtree)}'.")
-        if has_level_phrase_clause: final_notes.append(f"Nivel/Condición: '{level_phrase_text}'.")
+             final_notes.append(("cor.incorrecta",))
 
+        # Añadir detalles específicos
+        final_notes.append(("cor.verbo", verb.text))
+        if has_object and is_content_specific: final_notes.append(("cor.contenido", object_text))
+        elif has_object: final_notes.append(("cor.contenido_vago", object_text))
+        if has_level_phrase_clause: final_notes.append(("cor.nivel", level_phrase_text))
 
-        logger.info(f"--- Resultado final check_correction: Score={score} ---")
-        return {'correction_score': score, 'correction_notes': " ".join(list(dict.fromkeys(final_notes)))} # Eliminar duplicados exactos
+        trace(logger, "correccion.resultado", puntaje=score)
+        return {'correction_score': score, 'correction_notes': make_notes(final_notes)} # make_notes elimina duplicados exactos
 
     except Exception as e:
-        logger.error(f"Error en check_correction para texto '{text[:50]}...': {e}", exc_info=True)
-        return {'correction_score': 0, 'correction_notes': f'Error durante el análisis de corrección: {e}'}
+        logger.error("Error en check_correction para texto '%s...': %s", text[:50], e, exc_info=True)
+        return {'correction_score': 0, 'correction_notes': note("cor.error", str(e))}
 
 # --- Ejemplo de uso (opcional, para pruebas) ---
 if __name__ == '__main__':
@@ -0,0 +1,119 @@
+"""
+Exportación de resultados a Excel (.xlsx).
+
+Construye los dos libros que descarga la aplicación: la tabla detallada por RdA
+y el resumen general (frecuencias y promedios por criterio).
+"""
+
+import io
+
+import pandas as pd
+
+from src.rda_pipeline import LEVEL_TO_NUMBER
+from src.instrumentation import timed
+
+# Columnas de la tabla detallada con nombres amigables
+DISPLAY_COLUMNS = {
+    "RdA": "Resultado de Aprendizaje",
+    "Nivel Académico Origen": "Nivel Origen",
+    "Verbo Principal": "Verbo",
+    "Verbo Aproximado": "Verbo aprox.",
+    "Nivel Bloom Detectado": "Nivel Bloom (Proceso)", # Aclarar que es Proceso
+    "Clasificación vs Nivel Origen": "Adecuación T.",
+    "Puntaje Observable": "Obs.",
+    "Puntaje Medible": "Med.",
+    "Puntaje Evaluable": "Eval.",
+    "Puntaje Corrección": "Corr.",
+    "Autenticidad Acción": "Aut. Acción",
+    "Autenticidad Contexto": "Aut. Contexto",
+    "Autenticidad Sentido": "Aut. Sentido",
+    "Conocimiento Factual": "K.Fact",
+    "Conocimiento Conceptual": "K.Conc",
+    "Conocimiento Procedimental": "K.Proc",
+    "Conocimiento Metacognitivo": "K.Meta",
+}
+
+# Orden de columnas de la tabla detallada
+DISPLAY_ORDER = [
+    "RA",
+    "Nivel Académico Origen",
+    "Verbo Principal",
+    "Verbo Aproximado", # Solo si hubo búsqueda aproximada (RDA_FUZZY_VERBS)
+    "Nivel Bloom Detectado", # Proceso Cognitivo
+    "Conocimiento Factual",
+    "Conocimiento Conceptual",
+    "Conocimiento Procedimental",
+    "Conocimiento Metacognitivo",
+    "Clasificación vs Nivel Origen",
+    "Puntaje Observable",
+    "Puntaje Medible",
+    "Puntaje Evaluable",
+    "Puntaje Corrección",
+    "Autenticidad Acción",
+    "Autenticidad Contexto",
+    "Autenticidad Sentido",
+]
+
+
+@timed("excel_detallado")
+def build_detailed_excel(df):
+    """Libro con la tabla detallada (columnas mostradas, con nombres amigables)."""
+    output = io.BytesIO()
+    existing_display_order = [col for col in DISPLAY_ORDER if col in df.columns]
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        df_to_download = df[existing_display_order].rename(columns=DISPLAY_COLUMNS)
+        # O descargar todas las columnas originales si se prefiere:
+        # df_to_download = df # Incluiría notas y errores
+        df_to_download.to_excel(writer, index=False, sheet_name='Analisis_Detallado')
+    return output.getvalue()
+
+
+@timed("excel_resumen")
+def build_summary_excel(df_results):
+    """Libro con el resumen general: una hoja por frecuencia/promedio de cada criterio."""
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        # Hoja 1: Frecuencia Nivel Bloom (Proceso)
+        level_counts = df_results['Nivel Bloom Original'].value_counts().sort_index()
+        formatted_labels = [f"{lvl} ({LEVEL_TO_NUMBER.get(lvl.lower(), '')})" if LEVEL_TO_NUMBER.get(lvl.lower()) else lvl for lvl in level_counts.index]
+        freq_df_bloom = pd.DataFrame({'Nivel_Proceso': formatted_labels, 'Frecuencia': level_counts.values})
+        if not freq_df_bloom.empty: freq_df_bloom.to_excel(writer, index=False, sheet_name='Frecuencia_Bloom_Proceso')
+
+        # Hoja 2: Promedios Dimensión Conocimiento
+        avg_scores_know = df_results[[
+            "Conocimiento Factual", "Conocimiento Conceptual",
+            "Conocimiento Procedimental", "Conocimiento Metacognitivo"
+        ]].mean().round(2).reset_index()
+        avg_scores_know.columns = ['Dimensión Conocimiento', 'Promedio (1-3)']
+        avg_scores_know['Dimensión Conocimiento'] = avg_scores_know['Dimensión Conocimiento'].replace({
+            "Conocimiento Factual": "Factual", "Conocimiento Conceptual": "Conceptual",
+            "Conocimiento Procedimental": "Procedimental", "Conocimiento Metacognitivo": "Metacognitivo"
+        })
+        if not avg_scores_know.empty: avg_scores_know.to_excel(writer, index=False, sheet_name='Promedios_Conocimiento')
+
+        # Hoja 3: Frecuencia Adecuación
+        adequacy_counts = df_results['Clasificación vs Nivel Origen'].value_counts().reset_index()
+        adequacy_counts.columns = ['Clasificación', 'Frecuencia']
+        if not adequacy_counts.empty: adequacy_counts.to_excel(writer, index=False, sheet_name='Frecuencia_Adecuacion')
+
+        # Hoja 4: Promedios Verificabilidad
+        avg_scores_verif = df_results[["Puntaje Observable", "Puntaje Medible", "Puntaje Evaluable"]].mean().round(2).reset_index()
+        avg_scores_verif.columns = ['Métrica', 'Promedio']
+        avg_scores_verif['Métrica'] = avg_scores_verif['Métrica'].replace({"Puntaje Observable": "Observable", "Puntaje Medible": "Medible", "Puntaje Evaluable": "Evaluable"})
+        if not avg_scores_verif.empty: avg_scores_verif.to_excel(writer, index=False, sheet_name='Promedios_Verificabilidad')
+
+        # Hoja 5 y 6: Corrección
+        avg_corr_val = df_results["Puntaje Corrección"].mean().round(2)
+        corr_freq = df_results["Puntaje Corrección"].value_counts().sort_index().reset_index()
+        corr_freq.columns = ['Puntaje', 'Frecuencia']
+        avg_corr_df = pd.DataFrame({'Métrica': ['Promedio Corrección (0-3)'], 'Valor': [f"{avg_corr_val:.2f}"]})
+        if not avg_corr_df.empty: avg_corr_df.to_excel(writer, index=False, sheet_name='Promedio_Correccion')
+        if not corr_freq.empty: corr_freq.to_excel(writer, index=False, sheet_name='Frecuencia_Correccion')
+
+        # Hoja 7: Promedios Autenticidad
+        avg_scores_auth = df_results[["Autenticidad Acción", "Autenticidad Contexto", "Autenticidad Sentido"]].mean().round(2).reset_index()
+        avg_scores_auth.columns = ['Métrica', 'Promedio']
+        avg_scores_auth['Métrica'] = avg_scores_auth['Métrica'].replace({"Autenticidad Acción": "Acción", "Autenticidad Contexto": "Contexto", "Autenticidad Sentido": "Sentido"})
+        if not avg_scores_auth.empty: avg_scores_auth.to_excel(writer, index=False, sheet_name='Promedios_Autenticidad')
+
+    return output.getvalue()
@@ -0,0 +1,190 @@
+"""
+Extracción de características por RdA para los analizadores de Verificabilidad,
+Autenticidad y Dimensión del Conocimiento.
+
+Los tres analizadores trabajan sobre el mismo Doc (texto en minúsculas) y
+necesitan datos que se solapan: conjunto de lemas, verbo principal, objeto
+directo, presencia de números, entidades y coincidencias con los léxicos del
+paquete de reglas. extract_features() los obtiene en una sola pasada por los
+tokens; build_feature_table() reúne las características de un lote en una
+tabla columnar (DataFrame) sobre la que cada analizador calcula sus
+puntuaciones con operaciones de NumPy (score_*_features en cada módulo).
+
+Las columnas numéricas/booleanas (FEATURE_COLUMNS) alimentan el cálculo de
+puntuaciones; las columnas de objetos (lemas, coincidencias) solo se usan para
+redactar las notas y justificaciones.
+"""
+
+from typing import Collection, Iterable, List, Optional
+
+import pandas as pd
+
+try:
+    from src.rule_packs import RulePack, get_rule_pack
+    from src.verb_frame import get_verb_frame
+    from src.lexicon_artifact import MappedLexicon
+    from src.lemma_decisions import (ACTION_TIER_OTHER, ACTION_TIER_LOW, ACTION_TIER_MEDIUM, ACTION_TIER_HIGH,
+                                     get_lemma_memo)
+except ImportError: # Ejecución directa del módulo (python src/...)
+    from rule_packs import RulePack, get_rule_pack
+    from verb_frame import get_verb_frame
+    from lexicon_artifact import MappedLexicon
+    from lemma_decisions import (ACTION_TIER_OTHER, ACTION_TIER_LOW, ACTION_TIER_MEDIUM, ACTION_TIER_HIGH,
+                                 get_lemma_memo)
+
+# Entidades que cuentan como nombres propios (especificidad factual)
+PROPER_NOUN_LABELS = ("PER", "ORG", "LOC", "MISC")
+# Dependencias que indican que el verbo principal tiene un objeto/complemento claro
+CLEAR_OBJECT_DEPS = ("dobj", "obj", "obl", "xcomp")
+
+# Columnas numéricas de la tabla (entrada de las funciones de puntuación)
+FEATURE_COLUMNS = (
+    # Verificabilidad
+    "verif_has_verb", "verif_verb_class", "verif_object_effect",
+    "n_measurement", "has_number", "n_subjective",
+    # Autenticidad
+    "has_main_verb", "action_tier", "has_application_adverb", "n_keywords",
+    # Dimensión del Conocimiento
+    "n_factual", "n_conceptual", "n_procedural", "n_metacognitive",
+    "has_proper_nouns", "has_abstract_nouns", "has_action_verbs",
+    "has_self_reference", "has_clear_object",
+)
+
+
+def extract_features(doc, rules: Optional[RulePack] = None, keyword_index: Optional[Collection[str]] = None) -> dict:
+    """
+    Características de un Doc (procesado en minúsculas) en una sola pasada.
+
+    Args:
+        doc: Doc spaCy de text.lower().
+        rules: Paquete de reglas (por defecto el activo).
+        keyword_index: Conjunto plano de keywords de contexto profesional, o su vista
+                       en el artefacto de léxicos (ver authenticity_analyzer.get_keyword_index).
+
+    Returns:
+        Diccionario con las columnas de FEATURE_COLUMNS y los datos para las notas.
+    """
+    rules = rules or get_rule_pack()
+    # Decisiones por lema (léxicos por token, clases del verbo) memorizadas para todo el proceso
+    decide = get_lemma_memo(rules).get
+    lemmas = {token.lemma_ for token in doc}
+
+    has_number = has_abstract_nouns = has_action_verbs = has_self_reference = False
+    for token in doc:
+        pos = token.pos_
+        decision = decide(token.lemma_)
+        if pos == "VERB":
+            if decision.is_procedural:
+                has_action_verbs = True
+        elif pos == "NOUN" and not token.is_stop and decision.is_conceptual:
+            has_abstract_nouns = True
+        if token.like_num:
+            has_number = True
+        if decision.is_self_reference:
+            has_self_reference = True
+
+    # Verbo principal compartido por todos los analizadores (ver src/verb_frame.py)
+    main_verb = get_verb_frame(doc).verb
+
+    # --- Verificabilidad: clase del verbo y objeto directo ---
+    verif_lemma = main_verb.lemma_ if main_verb is not None else ""
+    verif_verb_class = 0
+    verif_object = None
+    verif_object_effect = 0
+    if verif_lemma:
+        verif_verb_class = decide(verif_lemma).verif_verb_class
+        for child in main_verb.children:
+            if child.dep_ == "dobj" and child.pos_ == "NOUN":
+                verif_object = child.lemma_
+                # Una pasada por los lemas del subárbol (admite entradas de varias palabras)
+                object_matches = rules.object_noun_index.match([t.lemma_ for t in child.subtree])
+                if "concrete_nouns" in object_matches:
+                    verif_object_effect = 1
+                    break
+                elif "abstract_nouns" in object_matches:
+                    verif_object_effect = -1
+                    break
+    # Una sola pasada por los lemas para los léxicos de Verificabilidad y Conocimiento
+    lexicon_matches = rules.match_lemmas(lemmas)
+    measurement_matches = lexicon_matches.get("measurement_keywords", set())
+    subjective_matches = lexicon_matches.get("subjective_keywords", set())
+
+    # --- Autenticidad y Conocimiento: clase del verbo, adverbios y objeto/complemento ---
+    action_tier = ACTION_TIER_OTHER
+    has_application_adverb = False
+    has_clear_object = False
+    if main_verb is not None:
+        action_tier = decide(main_verb.lemma_).action_tier
+        for child in main_verb.children:
+            if child.pos_ == "ADV" and decide(child.lemma_).is_application_adverb:
+                has_application_adverb = True
+            if child.dep_ in CLEAR_OBJECT_DEPS:
+                has_clear_object = True
+    if isinstance(keyword_index, MappedLexicon):
+        # Keywords prelematizadas (también de varias palabras, p. ej. "clima laboral")
+        keyword_matches = keyword_index.match([token.lemma_ for token in doc])
+    else:
+        keyword_matches = lemmas.intersection(keyword_index) if keyword_index else set()
+
+    factual_found = lexicon_matches.get("factual_keywords", set())
+    conceptual_found = lexicon_matches.get("conceptual_keywords", set())
+    procedural_found = lexicon_matches.get("procedural_keywords", set())
+    metacognitive_found = lexicon_matches.get("metacognitive_keywords", set())
+
+    return {
+        "verif_has_verb": bool(verif_lemma),
+        "verif_verb_class": verif_verb_class,
+        "verif_object_effect": verif_object_effect,
+        "n_measurement": len(measurement_matches),
+        "has_number": has_number,
+        "n_subjective": len(subjective_matches),
+        "has_main_verb": main_verb is not None,
+        "action_tier": action_tier,
+        "has_application_adverb": has_application_adverb,
+        "n_keywords": len(keyword_matches),
+        "n_factual": len(factual_found),
+        "n_conceptual": len(conceptual_found),
+        "n_procedural": len(procedural_found),
+        "n_metacognitive": len(metacognitive_found),
+        "has_proper_nouns": any(ent.label_ in PROPER_NOUN_LABELS for ent in doc.ents),
+        "has_abstract_nouns": has_abstract_nouns,
+        "has_action_verbs": has_action_verbs,
+        "has_self_reference": has_self_reference,
+        "has_clear_object": has_clear_object,
+        # Datos para notas y justificaciones
+        "verif_verb": verif_lemma,
+        "verif_object": verif_object,
+        "main_verb": main_verb.lemma_ if main_verb is not None else None,
+        "measurement_matches": measurement_matches,
+        "subjective_matches": subjective_matches,
+        "keyword_matches": keyword_matches,
+        "factual_found": factual_found,
+        "conceptual_found": conceptual_found,
+        "procedural_found": procedural_found,
+        "metacognitive_found": metacognitive_found,
+    }
+
+
+def extract_feature_rows(docs: Iterable, rules: Optional[RulePack] = None,
+                         keyword_index: Optional[Collection[str]] = None) -> List[dict]:
+    """Características de cada Doc de un lote (mismo orden)."""
+    rules = rules or get_rule_pack()
+    return [extract_features(doc, rules, keyword_index) for doc in docs]
+
+
+def build_feature_table(feature_rows: List[dict]) -> pd.DataFrame:
+    """
+    Tabla columnar de características de un lote (una fila por RdA).
+
+    Las columnas de FEATURE_COLUMNS tienen tipos enteros/booleanos; el resto
+    (lemas, coincidencias) se conservan como columnas de objetos.
+    """
+    table = pd.DataFrame.from_records(feature_rows, columns=list(FEATURE_COLUMNS) + [
+        key for key in (feature_rows[0] if feature_rows else {}) if key not in FEATURE_COLUMNS
+    ])
+    if table.empty:
+        return table
+    for column in FEATURE_COLUMNS:
+        dtype = bool if column.startswith("has_") or column == "verif_has_verb" else "int64"
+        table[column] = table[column].astype(dtype)
+    return table
@@ -0,0 +1,138 @@
+"""
+Búsqueda aproximada de verbos en la taxonomía de Bloom (errores de tipeo y variantes).
+
+Índice de borrados al estilo SymSpell, construido una vez a partir de la
+taxonomía: para cada verbo normalizado (minúsculas, sin tildes) se guardan
+todas las cadenas que resultan de borrar hasta `max_distance` caracteres. Una
+consulta genera los borrados de la palabra buscada, reúne los candidatos que
+comparten alguno y calcula la distancia de edición (con transposiciones) solo
+sobre ellos: coste independiente del tamaño de la taxonomía, por debajo del
+milisegundo.
+
+Desactivada por defecto: RDA_FUZZY_VERBS=<distancia máxima> (1 o 2) la activa.
+La distancia efectiva también se limita por la longitud de la palabra
+(máximo una edición cada 4 caracteres, mínimo 1), de modo que los verbos cortos
+no se confunden entre sí. Un empate entre verbos de distinto nivel se considera
+ambiguo y no devuelve coincidencia.
+"""
+
+import os
+import threading
+import unicodedata
+from typing import Dict, NamedTuple, Optional, Set
+
+MIN_WORD_LENGTH = 4 # Palabras más cortas no se aproximan
+
+
+class FuzzyMatch(NamedTuple):
+    verb: str      # Verbo de la taxonomía
+    distance: int  # Distancia de edición con la palabra buscada (0: solo difieren las tildes)
+    level: str     # Nivel de Bloom del verbo
+
+
+def normalize_verb(word: str) -> str:
+    """Minúsculas y sin tildes ni diacríticos (la ñ se compara como n)."""
+    decomposed = unicodedata.normalize('NFKD', word.lower().strip())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """Cadenas obtenidas borrando de 1 a max_distance caracteres de word."""
+    result, frontier = set(), {word}
+    for _ in range(max_distance):
+        frontier = {candidate[:i] + candidate[i + 1:] for candidate in frontier for i in range(len(candidate))}
+        result |= frontier
+    return result
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Distancia de edición con transposiciones de caracteres adyacentes (OSA)."""
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[len(b)]
+
+
+class FuzzyVerbIndex:
+    """Índice de borrados de los verbos de la taxonomía (verbo -> nivel)."""
+
+    def __init__(self, verb_map: Dict[str, str], max_distance: int = 1):
+        self.max_distance = max_distance
+        self._verbs: Dict[str, str] = {} # Forma normalizada -> verbo de la taxonomía
+        self._levels = verb_map
+        self._deletes: Dict[str, Set[str]] = {}
+        for verb in sorted(verb_map):
+            key = normalize_verb(verb)
+            self._verbs.setdefault(key, verb)
+            for deleted in _deletes(key, max_distance) | {key}:
+                self._deletes.setdefault(deleted, set()).add(key)
+
+    def __len__(self):
+        return len(self._verbs)
+
+    def lookup(self, word: str) -> Optional[FuzzyMatch]:
+        """
+        Verbo de la taxonomía más cercano a `word` dentro de la distancia
+        permitida, o None si no hay ninguno o el más cercano es ambiguo.
+        """
+        key = normalize_verb(word)
+        if key in self._verbs:
+            verb = self._verbs[key]
+            return FuzzyMatch(verb, 0, self._levels[verb])
+        if len(key) < MIN_WORD_LENGTH:
+            return None
+        max_distance = min(self.max_distance, max(1, len(key) // 4))
+        candidates = set()
+        for deleted in _deletes(key, max_distance) | {key}:
+            candidates |= self._deletes.get(deleted, set())
+
+        best, best_distance = [], max_distance + 1
+        for candidate in sorted(candidates):
+            distance = edit_distance(key, candidate)
+            if distance > max_distance:
+                continue
+            if distance < best_distance:
+                best, best_distance = [candidate], distance
+            elif distance == best_distance:
+                best.append(candidate)
+        if not best:
+            return None
+        verbs = [self._verbs[candidate] for candidate in best]
+        if len({self._levels[verb] for verb in verbs}) > 1:
+            return None # Empate entre niveles distintos
+        return FuzzyMatch(verbs[0], best_distance, self._levels[verbs[0]])
+
+
+def fuzzy_max_distance() -> int:
+    """Distancia máxima configurada en RDA_FUZZY_VERBS (0: búsqueda aproximada desactivada)."""
+    try:
+        return max(0, int(os.environ.get("RDA_FUZZY_VERBS", "0") or 0))
+    except ValueError:
+        return 0
+
+
+_index_cache = {"key": None, "index": None}
+_index_lock = threading.Lock()
+
+
+def get_fuzzy_verb_index(verb_map: Dict[str, str], max_distance: Optional[int] = None) -> Optional[FuzzyVerbIndex]:
+    """
+    Índice aproximado de la taxonomía (construido una vez por mapa y distancia),
+    o None si la búsqueda aproximada está desactivada.
+    """
+    max_distance = fuzzy_max_distance() if max_distance is None else max_distance
+    if max_distance <= 0 or not verb_map:
+        return None
+    cache_key = (id(verb_map), len(verb_map), max_distance)
+    if _index_cache["key"] != cache_key:
+        with _index_lock:
+            if _index_cache["key"] != cache_key:
+                _index_cache["index"] = FuzzyVerbIndex(verb_map, max_distance)
+                _index_cache["key"] = cache_key
+    return _index_cache["index"]
@@ -0,0 +1,102 @@
+"""
+Re-análisis incremental de RdAs.
+
+Compara la entrada actual (lista de tuplas (texto_ra, nivel_academico)) con la del
+análisis anterior, fila por fila y por hash de contenido, para re-analizar
+únicamente las filas nuevas o modificadas y reutilizar el resto de resultados.
+"""
+
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+# Estados posibles de una fila respecto al análisis anterior
+STATUS_NEW = "Nueva"
+STATUS_CHANGED = "Modificada"
+STATUS_UNCHANGED = "Sin cambios"
+STATUS_REMOVED = "Eliminada"
+
+
+def rda_content_hash(text, academic_level) -> str:
+    """
+    Hash de contenido de una fila de entrada (texto del RdA + nivel académico).
+    El nivel forma parte del hash porque cambia la adecuación del RdA.
+    """
+    payload = f"{text}\x1f{academic_level}".encode("utf-8")
+    return hashlib.sha1(payload).hexdigest()
+
+
+def hash_input_data(input_data: List[Tuple[str, str]]) -> List[str]:
+    """Devuelve la lista de hashes de contenido, en el mismo orden que input_data."""
+    return [rda_content_hash(text, level) for text, level in input_data]
+
+
+def diff_input_data(previous_input: List[Tuple[str, str]],
+                    current_input: List[Tuple[str, str]]) -> Dict[str, list]:
+    """
+    Compara dos entradas por clave de fila (posición) y hash de contenido.
+
+    Una fila cuyo contenido ya existía en la entrada anterior (aunque se haya
+    desplazado de posición) se considera sin cambios y su resultado puede reutilizarse.
+
+    Returns:
+        Diccionario con:
+          - 'status': estado de cada fila actual (STATUS_*), en orden.
+          - 'hashes': hash de contenido de cada fila actual.
+          - 'new', 'changed', 'unchanged': índices de filas actuales en cada estado.
+          - 'removed': índices de filas anteriores que ya no están presentes.
+    """
+    previous_hashes = hash_input_data(previous_input or [])
+    current_hashes = hash_input_data(current_input or [])
+    previous_set = set(previous_hashes)
+    current_set = set(current_hashes)
+
+    diff = {'status': [], 'hashes': current_hashes, 'new': [], 'changed': [], 'unchanged': [], 'removed': []}
+    for i, row_hash in enumerate(current_hashes):
+        if row_hash in previous_set:
+            status = STATUS_UNCHANGED
+            diff['unchanged'].append(i)
+        elif i < len(previous_hashes):
+            status = STATUS_CHANGED
+            diff['changed'].append(i)
+        else:
+            status = STATUS_NEW
+            diff['new'].append(i)
+        diff['status'].append(status)
+
+    # Una fila anterior reemplazada en la misma posición cuenta como modificada, no eliminada
+    replaced = set(diff['changed'])
+    diff['removed'] = [i for i, row_hash in enumerate(previous_hashes)
+                       if row_hash not in current_set and i not in replaced]
+    return diff
+
+
+def rows_to_analyze(diff: Dict[str, list], results_by_hash: Dict[str, Optional[dict]]) -> List[int]:
+    """
+    Índices de filas que requieren análisis: nuevas, modificadas, o sin cambios
+    cuyo resultado no está disponible (ej. caché vacía tras reiniciar la sesión).
+    """
+    pending = []
+    for i, (status, row_hash) in enumerate(zip(diff['status'], diff['hashes'])):
+        if status != STATUS_UNCHANGED or row_hash not in results_by_hash:
+            pending.append(i)
+    return pending
+
+
+def merge_results(diff: Dict[str, list], results_by_hash: Dict[str, Optional[dict]]) -> List[dict]:
+    """
+    Construye la lista de resultados en el orden de la entrada actual a partir de
+    la caché hash -> resultado. Las filas inválidas (resultado None) se omiten,
+    igual que en el análisis completo.
+    """
+    merged = []
+    for row_hash in diff['hashes']:
+        result = results_by_hash.get(row_hash)
+        if result is not None:
+            merged.append(result)
+    return merged
+
+
+def summarize_diff(diff: Dict[str, list]) -> str:
+    """Resumen legible de los cambios detectados."""
+    return (f"{len(diff['new'])} nuevas, {len(diff['changed'])} modificadas, "
+            f"{len(diff['unchanged'])} sin cambios, {len(diff['removed'])} eliminadas")
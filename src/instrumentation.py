@@ -0,0 +1,255 @@
+"""
+Instrumentación opcional de tiempos por analizador.
+
+Registra, por nombre de etapa (parseo spaCy, cada analizador, cada generador
+PDF/Excel), el número de llamadas, el tiempo total y la latencia p50/p95/p99
+mediante histogramas en memoria con cubetas logarítmicas (coste O(1) por
+medición, memoria fija).
+
+Los contadores de las cachés (aciertos/fallos) se leen de las fuentes
+registradas con register_counters() solo al consultarlos (counters()), sin
+coste por operación.
+
+Desactivada por defecto: se activa con la variable de entorno RDA_PROFILING=1
+o llamando a enable(). Desactivada, cada llamada instrumentada solo paga la
+comprobación de un booleano.
+
+Uso como CLI (analiza un archivo .txt de RdAs y vuelca las métricas en JSON):
+    python -m src.instrumentation rdas.txt --level 6 --output perfil.json
+"""
+
+import functools
+import json
+import math
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Cubetas logarítmicas: 1 µs .. ~100 s con resolución ~5% por cubeta
+_MIN_SECONDS = 1e-6
+_GROWTH = 1.05
+_LOG_GROWTH = math.log(_GROWTH)
+_NUM_BUCKETS = int(math.log(1e8) / _LOG_GROWTH) + 2
+
+_ENABLED_BY_ENV = os.environ.get("RDA_PROFILING", "").lower() in ("1", "true", "si", "sí")
+_enabled = _ENABLED_BY_ENV
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def is_enabled_by_env() -> bool:
+    """True si RDA_PROFILING activa la instrumentación desde el arranque."""
+    return _ENABLED_BY_ENV
+
+
+def enable():
+    """Activa la instrumentación en este proceso."""
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """Desactiva la instrumentación (las métricas acumuladas se conservan)."""
+    global _enabled
+    _enabled = False
+
+
+class Histogram:
+    """Histograma de latencias con cubetas logarítmicas de tamaño fijo."""
+
+    __slots__ = ("count", "total", "min", "max", "_buckets", "_lock")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self._buckets = [0] * _NUM_BUCKETS
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        if seconds <= _MIN_SECONDS:
+            index = 0
+        else:
+            index = min(_NUM_BUCKETS - 1, int(math.log(seconds / _MIN_SECONDS) / _LOG_GROWTH) + 1)
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self._buckets[index] += 1
+            if seconds < self.min: self.min = seconds
+            if seconds > self.max: self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """Percentil aproximado (límite superior de la cubeta), en segundos."""
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(self.count * q / 100.0))
+        cumulative = 0
+        for index, bucket_count in enumerate(self._buckets):
+            cumulative += bucket_count
+            if cumulative >= target:
+                upper = _MIN_SECONDS * (_GROWTH ** index)
+                return min(max(upper, self.min), self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        """Resumen en milisegundos."""
+        with self._lock:
+            if not self.count:
+                return {"count": 0, "total_ms": 0.0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+            return {
+                "count": self.count,
+                "total_ms": round(self.total * 1000, 3),
+                "mean_ms": round(self.total / self.count * 1000, 3),
+                "p50_ms": round(self.percentile(50) * 1000, 3),
+                "p95_ms": round(self.percentile(95) * 1000, 3),
+                "p99_ms": round(self.percentile(99) * 1000, 3),
+                "max_ms": round(self.max * 1000, 3),
+            }
+
+
+_histograms: Dict[str, Histogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def get_histogram(name: str) -> Histogram:
+    histogram = _histograms.get(name)
+    if histogram is None:
+        with _histograms_lock:
+            histogram = _histograms.setdefault(name, Histogram())
+    return histogram
+
+
+def record(name: str, seconds: float):
+    """Registra una medición manual (si la instrumentación está activa)."""
+    if _enabled:
+        get_histogram(name).record(seconds)
+
+
+@contextmanager
+def timed_block(name: str):
+    """Context manager que mide el bloque con nombre `name`."""
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        get_histogram(name).record(time.perf_counter() - start)
+
+
+def timed(name: Optional[str] = None):
+    """Decorador que mide cada llamada a la función (nombre por defecto: su __name__)."""
+    def decorator(func):
+        metric_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                get_histogram(metric_name).record(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+_counter_sources: Dict[str, object] = {}
+
+
+def register_counters(name: str, source):
+    """
+    Registra (o sustituye) una fuente de contadores: objeto con counters() -> dict
+    y reset_counters().
+    """
+    with _histograms_lock:
+        _counter_sources[name] = source
+
+
+def counters() -> Dict[str, dict]:
+    """Contadores actuales de cada fuente registrada."""
+    with _histograms_lock:
+        sources = list(_counter_sources.items())
+    return {name: source.counters() for name, source in sources}
+
+
+def snapshot() -> Dict[str, dict]:
+    """Métricas acumuladas por etapa, ordenadas por tiempo total descendente."""
+    with _histograms_lock:
+        items = list(_histograms.items())
+    summary = {name: histogram.to_dict() for name, histogram in items}
+    return dict(sorted(summary.items(), key=lambda kv: kv[1]["total_ms"], reverse=True))
+
+
+def reset():
+    """Elimina todas las métricas acumuladas (y pone a cero los contadores)."""
+    with _histograms_lock:
+        _histograms.clear()
+        sources = list(_counter_sources.values())
+    for source in sources:
+        source.reset_counters()
+
+
+def dump_json(path: Optional[str] = None) -> str:
+    """Devuelve (y opcionalmente escribe en `path`) las métricas en formato JSON."""
+    data = json.dumps({"generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "metrics": snapshot(),
+                       "counters": counters()}, ensure_ascii=False, indent=2)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(data)
+    return data
+
+
+# --- CLI: perfilar el análisis de un archivo de RdAs ---
+def main(argv=None):
+    import argparse
+
+    PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if PROJECT_ROOT not in sys.path:
+        sys.path.append(PROJECT_ROOT)
+
+    parser = argparse.ArgumentParser(description="Perfila el análisis de RdAs y vuelca las métricas en JSON.")
+    parser.add_argument("input", help="Archivo .txt con un RdA por línea.")
+    parser.add_argument("--level", default="6", help="Nivel académico para todos los RdAs.")
+    parser.add_argument("--output", help="Archivo JSON de salida (por defecto, salida estándar).")
+    parser.add_argument("--batch", action="store_true", help="Procesar con nlp.pipe en un solo lote.")
+    args = parser.parse_args(argv)
+
+    # Usar el módulo importado por los analizadores (no __main__) para compartir las métricas
+    from src import instrumentation
+    from src.rda_logging import configure_logging
+    from src.nlp_utils import load_spacy_model_internal
+    from src.rda_pipeline import analyze_rda, analyze_rda_batch
+    configure_logging("WARNING")
+    instrumentation.enable()
+
+    with open(args.input, encoding="utf-8") as f:
+        items = [(line.strip(), args.level) for line in f if line.strip()]
+
+    with instrumentation.timed_block("carga_modelo"):
+        nlp = load_spacy_model_internal()
+    if not nlp:
+        sys.exit("No se pudo cargar el modelo spaCy.")
+
+    with instrumentation.timed_block("analisis_total"):
+        if args.batch:
+            analyze_rda_batch(items, nlp)
+        else:
+            for text, level in items:
+                analyze_rda(text, level, nlp)
+
+    output = instrumentation.dump_json(args.output)
+    if not args.output:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+"""
+Ejecutor de trabajos de análisis en segundo plano.
+
+Permite lanzar el análisis de un lote de RdAs en un hilo de fondo para que la
+página de Streamlit no quede bloqueada: el progreso y los resultados parciales
+se consultan desde la sesión, y el trabajo puede cancelarse y reanudarse desde
+la última fila procesada.
+
+Los trabajos de todas las sesiones pasan por una cola justa (JobScheduler): como
+mucho RDA_JOB_WORKERS trabajos se ejecutan a la vez y cada uno procesa turnos de
+RDA_JOB_SLICE filas, volviendo al final de la cola entre turnos; así un lote
+enorme no retrasa indefinidamente a los que llegan después. La sesión puede
+consultar la posición de su trabajo en la cola (AnalysisJob.queue_position).
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    from src import instrumentation
+except ImportError: # Ejecución directa del módulo (python src/...)
+    import instrumentation
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Estados de un trabajo
+JOB_PENDING = "pendiente"
+JOB_RUNNING = "en_curso"
+JOB_CANCELLED = "cancelado"
+JOB_COMPLETED = "completado"
+JOB_FAILED = "error"
+
+# Trabajos simultáneos por servidor y filas por turno (configurables por variable de entorno)
+DEFAULT_MAX_WORKERS = int(os.environ.get("RDA_JOB_WORKERS", "2"))
+DEFAULT_SLICE_ROWS = int(os.environ.get("RDA_JOB_SLICE", "25"))
+
+
+class JobScheduler:
+    """
+    Cola justa de trabajos con admisión limitada.
+
+    Como mucho `max_workers` trabajos se ejecutan a la vez; el resto espera en
+    orden de llegada. Cada trabajo admitido procesa `slice_rows` filas y, si le
+    quedan, vuelve al final de la cola (turnos rotatorios).
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, slice_rows: int = DEFAULT_SLICE_ROWS):
+        self.max_workers = max(1, max_workers)
+        self.slice_rows = max(1, slice_rows)
+        self._queue: "deque[AnalysisJob]" = deque()
+        self._running: set = set()
+        self._resubmitted: set = set() # En ejecución y ya reenviados (se reencolan al soltar su turno)
+        self._threads: List[threading.Thread] = []
+        self._cond = threading.Condition()
+        self.jobs = self.turns = 0
+        self.admission_wait = 0.0
+
+    def submit(self, job: "AnalysisJob"):
+        """Pone el trabajo al final de la cola."""
+        with self._cond:
+            if job in self._queue or job in self._resubmitted:
+                return
+            job._queued_at = time.perf_counter()
+            self.jobs += 1
+            if job in self._running:
+                # Su hilo aún no ha soltado el turno (p. ej. reanudado justo tras cancelarse):
+                # el hilo lo reencola al terminar
+                self._resubmitted.add(job)
+                return
+            self._queue.append(job)
+            while len(self._threads) < self.max_workers:
+                thread = threading.Thread(target=self._worker, name=f"rda-job-{len(self._threads)}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._cond.notify()
+
+    def remove(self, job: "AnalysisJob") -> bool:
+        """Saca de la cola un trabajo que espera turno (True si estaba en ella)."""
+        with self._cond:
+            try:
+                self._queue.remove(job)
+                return True
+            except ValueError:
+                return False
+
+    def position(self, job: "AnalysisJob") -> Optional[int]:
+        """Posición del trabajo en la cola (1 = el siguiente), o None si no espera turno."""
+        with self._cond:
+            try:
+                return self._queue.index(job) + 1
+            except ValueError:
+                return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                job = self._queue.popleft()
+                self._running.add(job)
+                self.turns += 1
+                if job._queued_at is not None: # Primer turno: espera de admisión
+                    self.admission_wait += time.perf_counter() - job._queued_at
+                    job._queued_at = None
+            more = False
+            try:
+                more = job._run_slice(self.slice_rows)
+            finally:
+                with self._cond:
+                    self._running.discard(job)
+                    if job in self._resubmitted:
+                        self._resubmitted.discard(job)
+                        more = True
+                    if more:
+                        self._queue.append(job)
+                        self._cond.notify()
+
+    def counters(self) -> dict:
+        with self._cond:
+            return {"en_cola": len(self._queue), "en_ejecucion": len(self._running), "trabajos": self.jobs,
+                    "turnos": self.turns, "espera_admision_s": round(self.admission_wait, 4)}
+
+    def reset_counters(self):
+        with self._cond:
+            self.jobs = self.turns = 0
+            self.admission_wait = 0.0
+
+
+_scheduler: Optional[JobScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> JobScheduler:
+    """Devuelve la cola de trabajos compartida del proceso (creada bajo demanda)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = JobScheduler()
+            instrumentation.register_counters("job_scheduler", _scheduler)
+        return _scheduler
+
+
+class AnalysisJob:
+    """
+    Trabajo de análisis de un lote de filas.
+
+    Cada fila es una tupla (clave, texto_ra, nivel_academico). La función de
+    análisis recibe (texto_ra, nivel_academico) y su resultado se guarda por clave.
+    Si la función tiene `prepare(textos)` (ver make_row_analyzer), se llama con los
+    textos de cada turno antes de analizar sus filas, para procesarlos en lote.
+    """
+
+    def __init__(self, rows: List[Tuple[str, str, str]], analyze_fn: Callable[[str, str], Optional[dict]]):
+        self.rows = list(rows)
+        self.analyze_fn = analyze_fn
+        self.results: Dict[str, Optional[dict]] = {}
+        self.status = JOB_PENDING
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._next_index = 0 # Primera fila aún no procesada (punto de reanudación)
+        self._cancel_event = threading.Event()
+        self._stopped = threading.Event() # Fuera de la cola (terminado, cancelado o con error)
+        self._stopped.set()
+        self._lock = threading.Lock()
+        self._scheduler: Optional[JobScheduler] = None
+        self._queued_at: Optional[float] = None
+
+    # --- Control del trabajo ---
+
+    def start(self, scheduler: Optional[JobScheduler] = None) -> "AnalysisJob":
+        """Pone el trabajo en la cola de fondo (o lo reanuda desde la última fila)."""
+        with self._lock:
+            if self.status == JOB_RUNNING:
+                return self
+            self._cancel_event.clear()
+            self._stopped.clear()
+            self.status = JOB_RUNNING
+            self.error = None
+            if self.started_at is None:
+                self.started_at = time.time()
+        self._scheduler = scheduler or get_scheduler()
+        self._scheduler.submit(self)
+        return self
+
+    def resume(self, scheduler: Optional[JobScheduler] = None) -> "AnalysisJob":
+        """Reanuda un trabajo cancelado o fallido desde la primera fila pendiente."""
+        if self.status in (JOB_CANCELLED, JOB_FAILED):
+            return self.start(scheduler)
+        return self
+
+    def cancel(self):
+        """Solicita la cancelación; el hilo se detiene al terminar la fila en curso."""
+        self._cancel_event.set()
+        waiting = self._scheduler is not None and self._scheduler.remove(self)
+        with self._lock:
+            if self.status == JOB_PENDING or (waiting and self.status == JOB_RUNNING):
+                self.status = JOB_CANCELLED
+                self._stopped.set() # Esperaba turno: se cancela sin pasar por un hilo
+
+    def _finish(self, status: str, error: Optional[str] = None):
+        with self._lock:
+            self.status = status
+            self.error = error
+            if status == JOB_COMPLETED:
+                self.finished_at = time.time()
+            self._stopped.set()
+
+    def _run_slice(self, max_rows: int) -> bool:
+        """Procesa un turno de hasta `max_rows` filas; True si quedan filas (vuelve a la cola)."""
+        try:
+            end = min(self._next_index + max_rows, len(self.rows))
+            prepare = getattr(self.analyze_fn, "prepare", None)
+            if prepare is not None and not self._cancel_event.is_set():
+                prepare([text for _, text, _ in self.rows[self._next_index:end]])
+            while self._next_index < end and not self._cancel_event.is_set():
+                key, text, level = self.rows[self._next_index]
+                result = self.analyze_fn(text, level)
+                with self._lock:
+                    self.results[key] = result
+                    self._next_index += 1
+        except Exception as e:
+            logger.error("Error en trabajo de análisis (fila %d): %s", self._next_index, e, exc_info=True)
+            self._finish(JOB_FAILED, str(e))
+            return False
+        if self._cancel_event.is_set():
+            logger.info("Trabajo de análisis cancelado en la fila %d de %d.", self._next_index, len(self.rows))
+            self._finish(JOB_CANCELLED)
+            return False
+        if self._next_index < len(self.rows):
+            return True
+        self._finish(JOB_COMPLETED)
+        return False
+
+    # --- Consulta de estado ---
+
+    @property
+    def total(self) -> int:
+        return len(self.rows)
+
+    @property
+    def done(self) -> int:
+        return self._next_index
+
+    @property
+    def progress(self) -> float:
+        """Fracción completada (0.0 - 1.0)."""
+        return self.done / self.total if self.total else 1.0
+
+    @property
+    def is_running(self) -> bool:
+        return self.status == JOB_RUNNING
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status == JOB_COMPLETED
+
+    @property
+    def queue_position(self) -> Optional[int]:
+        """Posición en la cola de trabajos (1 = el siguiente), o None si se está procesando o no está activo."""
+        if self._scheduler is None or self.status != JOB_RUNNING:
+            return None
+        return self._scheduler.position(self)
+
+    def snapshot_results(self) -> Dict[str, Optional[dict]]:
+        """Copia de los resultados parciales disponibles hasta el momento."""
+        with self._lock:
+            return dict(self.results)
+
+    def wait(self, timeout: Optional[float] = None):
+        """Espera a que el trabajo salga de la cola (útil fuera de Streamlit)."""
+        if not self._stopped.wait(timeout):
+            raise TimeoutError(f"El trabajo de análisis no terminó en {timeout} s.")
@@ -1,165 +1,157 @@
 import spacy
 import logging
-from typing import List, Dict, Set
+from typing import List, Dict, Optional
+
+import numpy as np
+
+try:
+    from src.instrumentation import timed, timed_block
+    from src.rda_logging import trace
+    from src.rule_packs import get_rule_pack
+    from src.features import extract_features
+    from src.notes import make_notes, note
+except ImportError: # Ejecución directa del módulo (python src/...)
+    from instrumentation import timed, timed_block
+    from rda_logging import trace
+    from rule_packs import get_rule_pack
+    from features import extract_features
+    from notes import make_notes, note
 
 # Configurar logger
 logger = logging.getLogger(__name__)
 
 # --- Palabras Clave y Heurísticas por Dimensión del Conocimiento ---
 
-# (Estas listas son iniciales y pueden necesitar refinamiento)
-
-# 1. Conocimiento Factual
-FACTUAL_KEYWORDS: Set[str] = {
-    "hecho", "dato", "término", "detalle", "nombre", "fecha", "definición", "lista",
-    "terminología", "vocabulario", "elemento", "componente", "parte", "ejemplo",
-    "identificar", "nombrar", "listar", "definir", "describir (hechos)" # Verbos clave
-}
-# Heurística adicional: Buscar sustantivos propios (PERSON, ORG, LOC), números.
-
-# 2. Conocimiento Conceptual
-CONCEPTUAL_KEYWORDS: Set[str] = {
-    "concepto", "principio", "teoría", "modelo", "estructura", "clasificación",
-    "categoría", "relación", "idea", "ley", "marco", "tipo", "forma", "función",
-    "propiedad", "característica", "abstracción", "generalización", "patrón",
-    "comparar", "clasificar", "explicar", "interpretar", "resumir", "inferir", # Verbos clave
-    "diferenciar", "relacionar", "categorizar"
-}
-# Heurística adicional: Buscar sustantivos abstractos, conectores lógicos (porque, entonces, si...).
-
-# 3. Conocimiento Procedimental
-PROCEDURAL_KEYWORDS: Set[str] = {
-    "procedimiento", "técnica", "método", "metodología", "habilidad", "paso",
-    "proceso", "aplicación", "uso", "cómo", "algoritmo", "protocolo", "rutina",
-    "estrategia (para hacer algo)", "destreza", "operación",
-    "aplicar", "usar", "implementar", "ejecutar", "construir", "calcular", # Verbos clave
-    "demostrar", "operar", "producir", "resolver (problemas)", "desarrollar (algo)"
-}
-# Heurística adicional: Buscar gerundios (aplicando, usando), verbos de acción sobre objetos.
-
-# 4. Conocimiento Metacognitivo
-METACOGNITIVE_KEYWORDS: Set[str] = {
-    "reflexionar", "autorregular", "monitorear", "evaluar", "planificar",
-    "estrategia (cognitiva/aprendizaje)", "conciencia", "aprendizaje", "pensamiento",
-    "conocimiento (propio)", "comprensión (propia)", "meta", "objetivo (personal)",
-    "autoevaluación", "autocorrección", "metacognición",
-    "propio", "mi", "su (aprendizaje/pensamiento)" # Adjetivos/Pronombres clave
-}
-# Heurística adicional: Buscar preguntas reflexivas implícitas, referencias al estudiante como agente de su aprendizaje.
+# Los léxicos de cada dimensión (Factual, Conceptual, Procedimental, Metacognitivo)
+# y las palabras de autorreferencia se definen en el paquete de reglas activo
+# (data/rule_packs/, ver src/rule_packs.py).
+# Heurísticas adicionales: Factual -> entidades y números; Conceptual -> sustantivos
+# abstractos; Procedimental -> verbos de acción con objeto; Metacognitivo -> autorreferencia.
+# Las características del Doc se extraen en src/features.py.
 
 # Mapeo de puntajes
 SCORE_MAP = {"Bajo": 1, "Medio": 2, "Alto": 3}
 SCORE_MAP_REV = {v: k for k, v in SCORE_MAP.items()} # Para notas
 
+# --- Puntuación sobre la tabla de características ---
+
+def _dimension_scores(hits, high_flag):
+    """Medio (2) con alguna coincidencia; Alto (3) con 2+ o con 1 y el indicador de la dimensión."""
+    return np.where((hits >= 2) | ((hits >= 1) & high_flag), 3, np.where(hits >= 1, 2, 1))
+
+
+def score_knowledge_features(features) -> dict:
+    """
+    Puntuaciones (1-3) de cada dimensión del conocimiento a partir de las
+    características de src/features.py (una fila o las columnas de la tabla de un lote).
+    """
+    n_factual = np.asarray(features["n_factual"])
+    n_conceptual = np.asarray(features["n_conceptual"])
+    n_procedural = np.asarray(features["n_procedural"])
+    n_metacognitive = np.asarray(features["n_metacognitive"])
+    has_specifics = (np.asarray(features["has_proper_nouns"], dtype=bool)
+                     | np.asarray(features["has_number"], dtype=bool))
+    has_abstract_nouns = np.asarray(features["has_abstract_nouns"], dtype=bool)
+    # Verbo de acción con objeto claro (cuenta como procedimental aunque no haya keywords)
+    clear_action = (np.asarray(features["has_action_verbs"], dtype=bool)
+                    & np.asarray(features["has_clear_object"], dtype=bool))
+    has_self_reference = np.asarray(features["has_self_reference"], dtype=bool)
+
+    procedural = np.where((n_procedural >= 2) | ((n_procedural >= 1) & clear_action), 3,
+                          np.where((n_procedural >= 1) | clear_action, 2, 1))
+    return {
+        'factual_score': _dimension_scores(n_factual, has_specifics),
+        'conceptual_score': _dimension_scores(n_conceptual, has_abstract_nouns),
+        'procedural_score': procedural,
+        'metacognitive_score': _dimension_scores(n_metacognitive, has_self_reference),
+    }
+
+
+def build_knowledge_result(features: dict, scores: dict) -> dict:
+    """Diccionario de resultado (puntuaciones de una fila y notas codificadas, ver src/notes.py)."""
+    notes = []
+
+    factual_found = features["factual_found"]
+    if factual_found:
+        if scores['factual_score'] == 3:
+            notes.append(("con.factual_alto", tuple(factual_found)))
+        else:
+            notes.append(("con.factual_medio", tuple(factual_found)))
+
+    conceptual_found = features["conceptual_found"]
+    if conceptual_found:
+        if scores['conceptual_score'] == 3:
+            notes.append(("con.conceptual_alto", tuple(conceptual_found)))
+        else:
+            notes.append(("con.conceptual_medio", tuple(conceptual_found)))
+
+    if scores['procedural_score'] > 1:
+        procedural_found = features["procedural_found"]
+        main_verb = features["main_verb"]
+        found_list = tuple(procedural_found) + ((main_verb,) if features["has_action_verbs"] and features["has_main_verb"]
+                                               and main_verb not in procedural_found else ())
+        if scores['procedural_score'] == 3:
+            notes.append(("con.procedimental_alto", found_list))
+        else:
+            notes.append(("con.procedimental_medio", found_list))
+
+    metacognitive_found = features["metacognitive_found"]
+    if metacognitive_found:
+        if scores['metacognitive_score'] == 3:
+            notes.append(("con.metacognitivo_alto", tuple(metacognitive_found)))
+        else:
+            notes.append(("con.metacognitivo_medio", tuple(metacognitive_found)))
+
+    results = dict(scores)
+    # Unir notas
+    results['knowledge_notes'] = make_notes(notes if notes else [("con.sin_indicadores",)])
+    trace(logger, "conocimiento.resultado", factual=results['factual_score'], conceptual=results['conceptual_score'],
+          procedimental=results['procedural_score'], metacognitivo=results['metacognitive_score'])
+    return results
+
 # --- Función Principal ---
 
-def check_knowledge_dimension(text: str, nlp_model: spacy.language.Language) -> dict:
+@timed("check_knowledge_dimension")
+def check_knowledge_dimension(text: str, nlp_model: spacy.language.Language, doc: Optional[spacy.tokens.Doc] = None,
+                              features: Optional[dict] = None) -> dict:
     """
     Estima la presencia y nivel de cada dimensión del conocimiento en un RA.
 
     Args:
         text: El texto del Resultado de Aprendizaje.
         nlp_model: El modelo de lenguaje spaCy cargado.
+        doc: Doc spaCy ya procesado de text.lower() (opcional, evita volver a procesar).
+        features: Características ya extraídas del Doc (ver src/features.py; opcional).
 
     Returns:
         Un diccionario con puntajes estimados (1-3) para cada dimensión y notas.
     """
-    logger.info(f"--- Iniciando check_knowledge_dimension para: '{text}' ---")
     results = {
         'factual_score': 1, 'conceptual_score': 1,
         'procedural_score': 1, 'metacognitive_score': 1,
-        'knowledge_notes': []
+        'knowledge_notes': note('con.sin_indicadores')
     }
     if not text or not isinstance(text, str):
-        logger.warning("Texto de entrada inválido o vacío.")
-        results['knowledge_notes'].append('Texto inválido.')
+        trace(logger, "conocimiento.texto_invalido", texto=text)
+        results['knowledge_notes'] = note('con.texto_invalido')
         return results
-    if not nlp_model:
+    if not nlp_model and doc is None and features is None:
          logger.error("Modelo NLP no disponible para check_knowledge_dimension.")
-         results['knowledge_notes'].append('Modelo NLP no disponible.')
+         results['knowledge_notes'] = note('modelo_no_disponible')
          return results
 
     try:
-        doc = nlp_model(text.lower())
-        lemmas = {token.lemma_ for token in doc}
-        tokens = [token for token in doc]
-
-        # --- Contadores y Flags para Nivel Alto ---
-        factual_hits = 0
-        conceptual_hits = 0
-        procedural_hits = 0
-        metacognitive_hits = 0
-        has_proper_nouns = any(ent.label_ in ["PER", "ORG", "LOC", "MISC"] for ent in doc.ents)
-        has_numbers = any(token.like_num for token in tokens)
-        has_abstract_nouns = any(token.pos_ == "NOUN" and not token.is_stop and token.lemma_ in CONCEPTUAL_KEYWORDS for token in tokens)
-        has_action_verbs = any(token.pos_ == "VERB" and token.lemma_ in PROCEDURAL_KEYWORDS for token in tokens)
-        has_self_reference = any(token.lemma_ in ["propio", "mi", "su"] for token in tokens)
-
-        # --- Evaluación por Dimensión ---
-
-        # 1. Factual
-        factual_found = lemmas.intersection(FACTUAL_KEYWORDS)
-        if factual_found:
-            results['factual_score'] = 2
-            factual_hits = len(factual_found)
-            results['knowledge_notes'].append(f"Factual(Medio): Keywords={list(factual_found)}.")
-            # Criterios para Alto
-            if factual_hits >= 2 or (factual_hits >= 1 and (has_proper_nouns or has_numbers)):
-                 results['factual_score'] = 3
-                 results['knowledge_notes'][-1] = f"Factual(Alto): Keywords={list(factual_found)}, Especificidad alta."
-
-        # 2. Conceptual
-        conceptual_found = lemmas.intersection(CONCEPTUAL_KEYWORDS)
-        if conceptual_found:
-            results['conceptual_score'] = 2
-            conceptual_hits = len(conceptual_found)
-            results['knowledge_notes'].append(f"Conceptual(Medio): Keywords={list(conceptual_found)}.")
-             # Criterios para Alto
-            if conceptual_hits >= 2 or (conceptual_hits >= 1 and has_abstract_nouns):
-                 results['conceptual_score'] = 3
-                 results['knowledge_notes'][-1] = f"Conceptual(Alto): Keywords={list(conceptual_found)}, Abstracción/Estructura alta."
-
-        # 3. Procedimental
-        procedural_found = lemmas.intersection(PROCEDURAL_KEYWORDS)
-        # También considerar verbos de acción no listados si tienen objeto directo claro
-        main_verb = next((tok for tok in tokens if tok.dep_ == "ROOT" and tok.pos_ == "VERB"), None)
-        if not main_verb: main_verb = next((tok for tok in tokens if tok.pos_ == "VERB"), None)
-
-        has_clear_object = False
-        if main_verb:
-            if any(child.dep_ in ["dobj", "obj", "obl", "xcomp"] for child in main_verb.children):
-                has_clear_object = True
-
-        if procedural_found or (has_action_verbs and has_clear_object):
-            results['procedural_score'] = 2
-            procedural_hits = len(procedural_found)
-            found_list = list(procedural_found) + ([main_verb.lemma_] if has_action_verbs and main_verb and main_verb.lemma_ not in procedural_found else [])
-            results['knowledge_notes'].append(f"Procedural(Medio): Keywords/Verbos={found_list}.")
-             # Criterios para Alto
-            if procedural_hits >= 2 or (procedural_hits >= 1 and has_action_verbs and has_clear_object):
-                 results['procedural_score'] = 3
-                 results['knowledge_notes'][-1] = f"Procedural(Alto): Keywords/Verbos={found_list}, Proceso claro."
-
-        # 4. Metacognitivo
-        metacognitive_found = lemmas.intersection(METACOGNITIVE_KEYWORDS)
-        if metacognitive_found:
-            results['metacognitive_score'] = 2
-            metacognitive_hits = len(metacognitive_found)
-            results['knowledge_notes'].append(f"Metacognitivo(Medio): Keywords={list(metacognitive_found)}.")
-             # Criterios para Alto
-            if metacognitive_hits >= 2 or (metacognitive_hits >= 1 and has_self_reference):
-                 results['metacognitive_score'] = 3
-                 results['knowledge_notes'][-1] = f"Metacognitivo(Alto): Keywords={list(metacognitive_found)}, Auto-referencia/reflexión clara."
-
-        # Unir notas
-        results['knowledge_notes'] = " ".join(results['knowledge_notes']) if results['knowledge_notes'] else "No se encontraron indicadores claros para ninguna dimensión."
-
-        logger.info(f"--- Resultado final check_knowledge_dimension: F={results['factual_score']}, C={results['conceptual_score']}, P={results['procedural_score']}, M={results['metacognitive_score']} ---")
-        return results
+        if features is None:
+            if doc is None:
+                with timed_block("spacy_parse"):
+                    doc = nlp_model(text.lower())
+            features = extract_features(doc, get_rule_pack())
+        scores = score_knowledge_features(features)
+        return build_knowledge_result(features, {key: int(value) for key, value in scores.items()})
 
     except Exception as e:
-        logger.error(f"Error en check_knowledge_dimension para texto '{text[:50]}...': {e}", exc_info=True)
-        results['knowledge_notes'] = f'Error durante el análisis: {e}'
+        logger.error("Error en check_knowledge_dimension para texto '%s...': %s", text[:50], e, exc_info=True)
+        results['knowledge_notes'] = note('error', str(e))
         return results
 
 # --- Ejemplo de uso (opcional, para pruebas) ---
@@ -0,0 +1,152 @@
+"""
+Memo de decisiones por lema, compartido por todos los analizadores del proceso.
+
+Los mismos pocos cientos de verbos y sustantivos se repiten en miles de RdAs.
+En lugar de normalizar el lema y consultar cada léxico en cada fila, la
+primera vez que aparece un lema se calcula un registro con todas sus
+decisiones (LemmaDecision) y las siguientes se leen del memo:
+
+  - nivel de Bloom del verbo (clave normalizada NFKC de la taxonomía),
+  - clase del verbo para Verificabilidad (observable / interno),
+  - clase de acción para Autenticidad (alta / media / baja / otra),
+  - pertenencia a los léxicos por token de Conocimiento (procedimental,
+    conceptual, autorreferencia) y a los adverbios de aplicación.
+
+El memo es un LRU acotado (RDA_LEMMA_MEMO_SIZE, por defecto 4096 lemas) y
+depende del paquete de reglas y de la taxonomía activos: al cambiar cualquiera
+de ellos se crea uno nuevo. Los aciertos/fallos se consultan con
+instrumentation.counters() (fuente "lemma_memo").
+"""
+
+import functools
+import os
+import threading
+import unicodedata
+from typing import NamedTuple, Optional
+
+try:
+    from src.rule_packs import RulePack, get_rule_pack
+    from src import instrumentation
+except ImportError: # Ejecución directa del módulo (python src/...)
+    from rule_packs import RulePack, get_rule_pack
+    import instrumentation
+
+DEFAULT_MEMO_SIZE = 4096
+
+# Clase del verbo principal según los léxicos de Autenticidad (índice de la tabla de puntuación)
+ACTION_TIER_OTHER, ACTION_TIER_LOW, ACTION_TIER_MEDIUM, ACTION_TIER_HIGH = range(4)
+
+
+class LemmaDecision(NamedTuple):
+    bloom_key: str                # Lema normalizado para buscar en la taxonomía
+    bloom_level: Optional[str]    # Nivel de Bloom (minúsculas) o None si no está en la taxonomía
+    verif_verb_class: int         # 1 observable, -1 interno, 0 sin clasificar
+    action_tier: int              # ACTION_TIER_*
+    is_procedural: bool
+    is_conceptual: bool
+    is_self_reference: bool
+    is_application_adverb: bool
+
+
+def decide_lemma(lemma: str, rules: RulePack, verb_map: dict) -> LemmaDecision:
+    """Registro de decisiones de un lema (sin memo)."""
+    bloom_key = unicodedata.normalize('NFKC', lemma).lower().strip()
+    if lemma in rules.observable_verbs:
+        verif_verb_class = 1
+    elif lemma in rules.internal_verbs:
+        verif_verb_class = -1
+    else:
+        verif_verb_class = 0
+    if lemma in rules.action_verbs_high:
+        action_tier = ACTION_TIER_HIGH
+    elif lemma in rules.action_verbs_medium:
+        action_tier = ACTION_TIER_MEDIUM
+    elif lemma in rules.action_verbs_low:
+        action_tier = ACTION_TIER_LOW
+    else:
+        action_tier = ACTION_TIER_OTHER
+    return LemmaDecision(
+        bloom_key=bloom_key,
+        bloom_level=verb_map.get(bloom_key) if verb_map else None,
+        verif_verb_class=verif_verb_class,
+        action_tier=action_tier,
+        is_procedural=lemma in rules.procedural_keywords,
+        is_conceptual=lemma in rules.conceptual_keywords,
+        is_self_reference=lemma in rules.self_reference_words,
+        is_application_adverb=lemma in rules.application_adverbs,
+    )
+
+
+class LemmaMemo:
+    """LRU acotado lema -> LemmaDecision para un paquete de reglas y una taxonomía."""
+
+    def __init__(self, rules: RulePack, verb_map: dict, maxsize: int = DEFAULT_MEMO_SIZE):
+        self.rules = rules
+        self.rules_version = rules.version
+        self.verb_map = verb_map
+        self.maxsize = maxsize
+        self._baseline = (0, 0)
+        # lru_cache: orden LRU y contadores en C, seguro entre hilos
+        self.get = functools.lru_cache(maxsize=maxsize)(self._decide)
+
+    def _decide(self, lemma: str) -> LemmaDecision:
+        return decide_lemma(lemma, self.rules, self.verb_map)
+
+    def counters(self) -> dict:
+        info = self.get.cache_info()
+        hits, misses = info.hits - self._baseline[0], info.misses - self._baseline[1]
+        total = hits + misses
+        return {"aciertos": hits, "fallos": misses, "tasa_acierto": round(hits / total, 4) if total else None,
+                "lemas": info.currsize, "capacidad": info.maxsize}
+
+    def reset_counters(self):
+        info = self.get.cache_info()
+        self._baseline = (info.hits, info.misses)
+
+
+_memo: Optional[LemmaMemo] = None
+_memo_lock = threading.Lock()
+
+
+def _memo_size() -> int:
+    try:
+        return max(1, int(os.environ.get("RDA_LEMMA_MEMO_SIZE", DEFAULT_MEMO_SIZE)))
+    except ValueError:
+        return DEFAULT_MEMO_SIZE
+
+
+def _bloom_verb_map() -> dict:
+    # Importación diferida: bloom_analyzer usa este módulo
+    try:
+        from src.bloom_analyzer import cached_load_bloom_taxonomy
+    except ImportError:
+        from bloom_analyzer import cached_load_bloom_taxonomy
+    verb_map = cached_load_bloom_taxonomy()
+    return verb_map if isinstance(verb_map, dict) else {}
+
+
+def get_lemma_memo(rules: Optional[RulePack] = None, verb_map: Optional[dict] = None) -> LemmaMemo:
+    """
+    Memo de decisiones del paquete de reglas (por defecto el activo) y la
+    taxonomía (por defecto la del memo actual o, si no hay, la de Bloom
+    cargada); uno por proceso.
+    """
+    global _memo
+    rules = rules or get_rule_pack()
+    memo = _memo
+    if verb_map is None:
+        verb_map = memo.verb_map if memo is not None else _bloom_verb_map()
+    if memo is None or memo.rules is not rules or memo.rules_version != rules.version or memo.verb_map is not verb_map:
+        with _memo_lock:
+            memo = _memo
+            if (memo is None or memo.rules is not rules or memo.rules_version != rules.version
+                    or memo.verb_map is not verb_map):
+                memo = LemmaMemo(rules, verb_map, _memo_size())
+                _memo = memo
+                instrumentation.register_counters("lemma_memo", memo)
+    return memo
+
+
+def get_lemma_decision(lemma: str, rules: Optional[RulePack] = None) -> LemmaDecision:
+    """Decisiones de un lema (del memo del paquete de reglas activo)."""
+    return get_lemma_memo(rules).get(lemma)
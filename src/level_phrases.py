@@ -0,0 +1,166 @@
+"""
+Reglas de frases de nivel/condición de Corrección compiladas en matchers spaCy.
+
+Un complemento del verbo principal (obl/advcl) indica nivel, condición o método
+si en su primer token empieza una de las frases del paquete de reglas:
+
+  - "iniciador": un token cuyo lema está en correccion.iniciadores_nivel
+    (la frase reportada es el complemento completo);
+  - los patrones de correccion.patrones_nivel, en orden: patrones del Matcher
+    de spaCy escritos como datos, por ejemplo "de forma/manera ADJ":
+
+        {"nombre": "de_forma_adjetivo", "texto": "coincidencia",
+         "patron": [{"LEMMA": "de"}, {"LEMMA": {"IN": ["forma", "manera"]}}, {"POS": "ADJ"}]}
+
+    "texto" indica qué se reporta: "coincidencia" (los tokens del patrón) o
+    "complemento" (el complemento completo). Los lemas se escriben en
+    minúsculas y coinciden también con su forma Capitalizada o en MAYÚSCULAS
+    (p. ej. "De" al inicio del texto).
+
+Los complementos del verbo se obtienen con un DependencyMatcher (verbo > obl/advcl)
+y las frases con un Matcher; ambos se compilan una vez por paquete de reglas y
+vocabulario (get_level_phrase_matcher), de modo que una nueva condición se
+añade al JSON del paquete sin código por fila.
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from spacy.matcher import DependencyMatcher, Matcher
+from spacy.tokens import Doc, Token
+
+try:
+    from src.rule_packs import RulePack
+    from src.verb_frame import MODIFIER_DEPS
+except ImportError: # Ejecución directa del módulo (python src/...)
+    from rule_packs import RulePack
+    from verb_frame import MODIFIER_DEPS
+
+STARTER_PATTERN = "iniciador"
+TEXT_MODES = ("complemento", "coincidencia")
+_COMPLEMENT_PATTERN = "complemento_nivel"
+
+
+def _case_variants(values):
+    return sorted({variant for value in values for variant in (value, value.capitalize(), value.upper())})
+
+
+def _lemma_case_insensitive(pattern: List[dict]) -> List[dict]:
+    """
+    Copia del patrón en la que los valores de LEMMA incluyen sus variantes de
+    mayúsculas (el atributo LEMMA del Matcher las distingue; un predicado en Python
+    sobre lemma_.lower() sería varias veces más lento).
+    """
+    compiled = []
+    for token_spec in pattern:
+        lemma = token_spec.get("LEMMA")
+        if isinstance(lemma, str):
+            token_spec = {**token_spec, "LEMMA": {"IN": _case_variants([lemma])}}
+        elif isinstance(lemma, dict) and isinstance(lemma.get("IN"), list):
+            token_spec = {**token_spec, "LEMMA": {**lemma, "IN": _case_variants(lemma["IN"])}}
+        compiled.append(token_spec)
+    return compiled
+
+
+class LevelPhraseMatch:
+    """Frase de nivel encontrada: complemento del verbo, patrón y texto reportado."""
+
+    __slots__ = ("complement", "pattern", "text")
+
+    def __init__(self, complement: Token, pattern: str, text: str):
+        self.complement = complement
+        self.pattern = pattern
+        self.text = text
+
+    def __repr__(self):
+        return f"LevelPhraseMatch(pattern={self.pattern!r}, text={self.text!r})"
+
+
+class LevelPhraseMatcher:
+    """Matcher de frases de nivel y DependencyMatcher de complementos para un vocabulario."""
+
+    def __init__(self, vocab, rules: RulePack):
+        self.vocab = vocab
+        self.rules_version = rules.version
+        self.matcher = Matcher(vocab)
+        self._patterns: Dict[int, Tuple[int, str, str]] = {} # match_id -> (prioridad, nombre, modo de texto)
+
+        starters = sorted(rules.level_indicator_starters)
+        self._add(STARTER_PATTERN, "complemento", [[{"LEMMA": {"IN": starters}}]])
+        for spec in rules.level_phrase_patterns:
+            mode = spec.get("texto", "coincidencia")
+            if mode not in TEXT_MODES:
+                raise ValueError(f"Patrón de nivel '{spec.get('nombre')}': 'texto' debe ser uno de {TEXT_MODES}.")
+            pattern = spec["patron"]
+            # Un patrón o una lista de alternativas
+            self._add(spec["nombre"], mode, pattern if pattern and isinstance(pattern[0], list) else [pattern])
+
+        self.dependency_matcher = DependencyMatcher(vocab)
+        self.dependency_matcher.add(_COMPLEMENT_PATTERN, [[
+            {"RIGHT_ID": "verbo", "RIGHT_ATTRS": {"POS": "VERB"}},
+            {"LEFT_ID": "verbo", "REL_OP": ">", "RIGHT_ID": "complemento",
+             "RIGHT_ATTRS": {"DEP": {"IN": list(MODIFIER_DEPS)}}},
+        ]])
+
+    def _add(self, name: str, mode: str, patterns: List[list]):
+        self.matcher.add(name, [_lemma_case_insensitive(pattern) for pattern in patterns])
+        self._patterns[self.vocab.strings[name]] = (len(self._patterns), name, mode)
+
+    def complements(self, doc: Doc, verb: Token) -> List[Token]:
+        """Complementos obl/advcl del verbo, en orden."""
+        return sorted((doc[token_ids[1]] for _, token_ids in self.dependency_matcher(doc)
+                       if token_ids[0] == verb.i), key=lambda token: token.i)
+
+    def phrase_starts(self, doc: Doc) -> Dict[int, Tuple[int, str, str, int]]:
+        """Índice del primer token -> (prioridad, nombre, modo de texto, fin) de la frase más prioritaria."""
+        starts: Dict[int, Tuple[int, str, str, int]] = {}
+        for match_id, start, end in self.matcher(doc):
+            priority, name, mode = self._patterns[match_id]
+            current = starts.get(start)
+            if current is None or (priority, -end) < (current[0], -current[3]):
+                starts[start] = (priority, name, mode, end)
+        return starts
+
+    def find(self, verb: Optional[Token], complements=None) -> Optional[LevelPhraseMatch]:
+        """
+        Primer complemento del verbo que empieza con una frase de nivel, o None.
+
+        Args:
+            verb: Verbo principal.
+            complements: Complementos obl/advcl ya resueltos (VerbFrame.modifiers);
+                         si es None se obtienen con el DependencyMatcher.
+        """
+        if verb is None:
+            return None
+        doc = verb.doc
+        complements = self.complements(doc, verb) if complements is None else complements
+        if not complements:
+            return None
+        starts = self.phrase_starts(doc)
+        for complement in complements:
+            # Primer token de la frase (advcl: el propio verbo de la cláusula)
+            start = complement if complement.dep_ == "advcl" else complement.left_edge
+            found = starts.get(start.i)
+            if found is None:
+                continue
+            _, name, mode, end = found
+            tokens = complement.subtree if mode == "complemento" else doc[start.i:end]
+            return LevelPhraseMatch(complement, name, " ".join(t.text for t in tokens))
+        return None
+
+
+_matchers: Dict[tuple, LevelPhraseMatcher] = {}
+_matchers_lock = threading.Lock()
+
+
+def get_level_phrase_matcher(vocab, rules: RulePack) -> LevelPhraseMatcher:
+    """Matchers compilados del paquete de reglas para el vocabulario (una vez por proceso)."""
+    key = (id(vocab), id(rules), rules.version)
+    matcher = _matchers.get(key)
+    if matcher is None or matcher.vocab is not vocab:
+        with _matchers_lock:
+            matcher = _matchers.get(key)
+            if matcher is None or matcher.vocab is not vocab:
+                matcher = LevelPhraseMatcher(vocab, rules)
+                _matchers[key] = matcher
+    return matcher
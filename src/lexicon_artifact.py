@@ -0,0 +1,377 @@
+"""
+Artefacto de léxicos prelematizados, compartido entre procesos mediante mmap.
+
+Los léxicos del paquete de reglas y las keywords de contexto profesional se
+escriben como formas de superficie ("competencias", "clima_laboral") que no
+coinciden con los lemas de spaCy ("competencia", "clima laboral"). El paso de
+construcción (fuera de línea) lematiza cada entrada una sola vez con el mismo
+modelo spaCy y escribe un archivo binario compacto:
+
+    cabecera   b"RDALEX01" + longitud (uint32) + JSON de metadatos
+    offsets    uint32[n + 1]  inicio de cada término en la tabla de cadenas
+    etiquetas  uint64[n]      máscara de bits de los léxicos que contienen el término
+    ranuras    int32[m]       índice hash (CRC32, sondeo lineal; -1 = vacía)
+    cadenas    UTF-8 de los términos, ordenados
+
+Se guardan tanto la forma normalizada original como la lematizada. Al abrirlo
+con open_lexicon_artifact() el archivo se proyecta en memoria (mmap) de solo
+lectura: los procesos del servicio comparten las páginas a través de la caché
+del sistema operativo en lugar de mantener cada uno sus propios conjuntos.
+
+Construcción:
+    python -m src.lexicon_artifact [--model es_core_news_sm] [--output ruta.lex]
+
+Si existe data/lexicon_artifacts/<paquete>.lex (o la ruta de RDA_LEXICON_ARTIFACT)
+y fue construido para la versión del paquete de reglas activo, load_rule_pack()
+lo utiliza automáticamente (ver RulePack.attach_lexicon_artifact).
+RDA_LEXICON_ARTIFACT=0 desactiva su uso.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import mmap
+import os
+import sys
+import time
+import zlib
+from array import array
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional
+
+try:
+    from src.rule_packs import LEXICONS, RulePack, normalize_lemma, get_rule_pack
+except ImportError: # Ejecución directa del módulo (python src/...)
+    from rule_packs import LEXICONS, RulePack, normalize_lemma, get_rule_pack
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+ARTIFACTS_DIR = os.path.join(os.path.dirname(CURRENT_DIR), 'data', 'lexicon_artifacts')
+
+MAGIC = b"RDALEX01"
+FORMAT_VERSION = 1
+# Etiqueta de las keywords de contexto profesional (el resto son atributos del RulePack)
+KEYWORDS_LABEL = "keywords"
+LEXICON_LABELS = tuple(attribute for lexicons in LEXICONS.values() for attribute in lexicons.values())
+_LOAD_FACTOR = 0.5 # Ocupación máxima del índice hash
+
+
+def keywords_digest(professional_keywords: Optional[Dict[str, List[str]]]) -> Optional[str]:
+    """Hash del diccionario de keywords (identifica con qué keywords se construyó el artefacto)."""
+    if professional_keywords is None:
+        return None
+    canonical = json.dumps({category: sorted(set(terms)) for category, terms in professional_keywords.items()},
+                           ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:12]
+
+
+def default_artifact_path(pack: RulePack) -> str:
+    """Ruta del artefacto de un paquete de reglas (RDA_LEXICON_ARTIFACT o data/lexicon_artifacts/<nombre>.lex)."""
+    configured = os.environ.get("RDA_LEXICON_ARTIFACT")
+    if configured and configured not in ("0", "off"):
+        return configured
+    return os.path.join(ARTIFACTS_DIR, f"{pack.name}.lex")
+
+
+def _hash(data: bytes) -> int:
+    return zlib.crc32(data)
+
+
+def _pad(size: int) -> int:
+    return (-size) % 8
+
+
+# --- Construcción (fuera de línea) ---
+
+def lemmatize_terms(terms: Iterable[str], nlp_model, batch_size=256) -> Dict[str, str]:
+    """
+    Forma lematizada de cada término con el modelo spaCy ("_" se trata como espacio).
+
+    Returns:
+        Diccionario término normalizado -> lemas normalizados unidos por espacios.
+    """
+    surfaces = list(dict.fromkeys(normalize_lemma(term.replace("_", " ")) for term in terms))
+    surfaces = [surface for surface in surfaces if surface]
+    lemmatized = {}
+    for surface, doc in zip(surfaces, nlp_model.pipe(surfaces, batch_size=batch_size)):
+        lemmas = [normalize_lemma(token.lemma_ or token.text) for token in doc if not token.is_space]
+        lemmatized[surface] = " ".join(lemma for lemma in lemmas if lemma) or surface
+    return lemmatized
+
+
+def build_lexicon_artifact(nlp_model, path: Optional[str] = None, rule_pack: Optional[RulePack] = None,
+                           professional_keywords: Optional[Dict[str, List[str]]] = None,
+                           model_name: Optional[str] = None) -> str:
+    """
+    Lematiza los léxicos del paquete de reglas y las keywords y escribe el artefacto.
+
+    Args:
+        nlp_model: Modelo spaCy (el mismo que se usa para analizar los RdAs).
+        path: Archivo de salida (por defecto default_artifact_path(rule_pack)).
+        rule_pack: Paquete de reglas (por defecto el activo, sin artefacto adjunto).
+        professional_keywords: Keywords de contexto profesional (None para no incluirlas).
+        model_name: Nombre del modelo para los metadatos (por defecto nlp.meta).
+
+    Returns:
+        Ruta del archivo escrito.
+    """
+    rule_pack = rule_pack or get_rule_pack()
+    if rule_pack.lexicon_artifact is not None:
+        raise ValueError("El paquete de reglas ya usa un artefacto; construya a partir del paquete original.")
+    path = path or default_artifact_path(rule_pack)
+
+    labeled_terms: Dict[str, Iterable[str]] = {label: getattr(rule_pack, label) for label in LEXICON_LABELS}
+    if professional_keywords is not None:
+        labeled_terms[KEYWORDS_LABEL] = [kw for terms in professional_keywords.values() for kw in terms]
+    lemmatized = lemmatize_terms((term for terms in labeled_terms.values() for term in terms), nlp_model)
+
+    labels = list(labeled_terms)
+    masks: Dict[str, int] = {}
+    for bit, (label, terms) in enumerate(labeled_terms.items()):
+        for term in terms:
+            surface = normalize_lemma(term.replace("_", " "))
+            if not surface:
+                continue
+            for form in (surface, lemmatized.get(surface, surface)):
+                masks[form] = masks.get(form, 0) | (1 << bit)
+
+    # Tabla de cadenas ordenada (por bytes UTF-8) e índice hash sobre ella
+    encoded = sorted(term.encode("utf-8") for term in masks)
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    n_slots = max(8, int(len(encoded) / _LOAD_FACTOR) + 1)
+    slots = [-1] * n_slots
+    for index, data in enumerate(encoded):
+        slot = _hash(data) % n_slots
+        while slots[slot] != -1:
+            slot = (slot + 1) % n_slots
+        slots[slot] = index
+
+    body = b"".join((
+        array("I", offsets).tobytes(), b"\0" * _pad(4 * len(offsets)),
+        array("Q", [masks[data.decode("utf-8")] for data in encoded]).tobytes(),
+        array("i", slots).tobytes(), b"\0" * _pad(4 * n_slots),
+        b"".join(encoded),
+    ))
+    meta = {
+        "formato": FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "etiquetas": labels,
+        "n_terminos": len(encoded),
+        "n_ranuras": n_slots,
+        "max_palabras": max((data.count(b" ") + 1 for data in encoded), default=1),
+        "paquete": {"nombre": rule_pack.name, "version": rule_pack.version},
+        "keywords": keywords_digest(professional_keywords),
+        "modelo": model_name or f"{nlp_model.meta.get('lang', '')}_{nlp_model.meta.get('name', '')}"
+                                f"@{nlp_model.meta.get('version', '')}",
+        "digest": hashlib.sha256(body).hexdigest()[:12],
+        "creado": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    header = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+    header += b" " * _pad(len(MAGIC) + 4 + len(header))
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(4, sys.byteorder))
+        f.write(header)
+        f.write(body)
+    os.replace(tmp_path, path) # Los procesos que ya lo tienen abierto conservan la versión anterior
+    logger.info("Artefacto de léxicos escrito en %s (%d términos, paquete %s@%s)",
+                path, len(encoded), rule_pack.name, rule_pack.version)
+    return path
+
+
+# --- Lectura (mmap) ---
+
+class MappedLexicon:
+    """Vista de solo lectura de un léxico del artefacto (admite `in`, iteración y len)."""
+
+    __slots__ = ("_artifact", "_bit", "label")
+
+    def __init__(self, artifact: "LexiconArtifact", label: str):
+        self._artifact = artifact
+        self._bit = 1 << artifact.labels.index(label)
+        self.label = label
+
+    def __contains__(self, term) -> bool:
+        return bool(self._artifact.mask(term) & self._bit)
+
+    def __iter__(self) -> Iterator[str]:
+        artifact = self._artifact
+        return (artifact.term(i) for i in range(len(artifact)) if artifact.masks[i] & self._bit)
+
+    def __len__(self) -> int:
+        masks = self._artifact.masks
+        return sum(1 for i in range(len(masks)) if masks[i] & self._bit)
+
+    def __bool__(self) -> bool:
+        return True
+
+    def match(self, lemmas) -> set:
+        """Términos del léxico (de una o varias palabras) presentes en la secuencia de lemas."""
+        return self._artifact.match(lemmas, self._bit)
+
+    def __repr__(self):
+        return f"MappedLexicon({self.label!r})"
+
+
+class LexiconArtifact:
+    """Artefacto de léxicos proyectado en memoria (ver build_lexicon_artifact)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = buffer = memoryview(self._mmap)
+        if bytes(buffer[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"'{path}' no es un artefacto de léxicos.")
+        header_start = len(MAGIC) + 4
+        header_len = int.from_bytes(buffer[len(MAGIC):header_start], sys.byteorder)
+        self.meta = json.loads(bytes(buffer[header_start:header_start + header_len]).decode("utf-8"))
+        if self.meta.get("formato") != FORMAT_VERSION or self.meta.get("byteorder") != sys.byteorder:
+            raise ValueError(f"Formato del artefacto '{path}' no compatible.")
+
+        self.labels: List[str] = list(self.meta["etiquetas"])
+        n_terms, n_slots = self.meta["n_terminos"], self.meta["n_ranuras"]
+        self.max_words = self.meta.get("max_palabras", 1)
+        position = header_start + header_len
+        self.offsets = buffer[position:position + 4 * (n_terms + 1)].cast("I")
+        position += 4 * (n_terms + 1) + _pad(4 * (n_terms + 1))
+        self.masks = buffer[position:position + 8 * n_terms].cast("Q")
+        position += 8 * n_terms
+        self.slots = buffer[position:position + 4 * n_slots].cast("i")
+        position += 4 * n_slots + _pad(4 * n_slots)
+        self.strings = buffer[position:]
+        self._n_slots = n_slots
+        self._label_sets: Dict[int, FrozenSet[str]] = {}
+
+    @property
+    def rule_pack_version(self) -> Optional[str]:
+        return self.meta.get("paquete", {}).get("version")
+
+    @property
+    def keywords_digest(self) -> Optional[str]:
+        return self.meta.get("keywords")
+
+    @property
+    def digest(self) -> str:
+        return self.meta.get("digest", "")
+
+    def __len__(self) -> int:
+        return len(self.masks)
+
+    def term(self, index: int) -> str:
+        return bytes(self.strings[self.offsets[index]:self.offsets[index + 1]]).decode("utf-8")
+
+    def find(self, term: str) -> int:
+        """Índice del término en la tabla ordenada, o -1."""
+        data = term.encode("utf-8")
+        slots, offsets, strings = self.slots, self.offsets, self.strings
+        slot = _hash(data) % self._n_slots
+        while True:
+            index = slots[slot]
+            if index < 0:
+                return -1
+            if strings[offsets[index]:offsets[index + 1]] == data:
+                return index
+            slot = (slot + 1) % self._n_slots
+
+    def mask(self, term) -> int:
+        """Máscara de bits de los léxicos que contienen el término (0 si no está)."""
+        if not isinstance(term, str):
+            return 0
+        index = self.find(term)
+        return self.masks[index] if index >= 0 else 0
+
+    def get(self, term, default=None) -> Optional[FrozenSet[str]]:
+        """Léxicos que contienen el término (misma interfaz que RulePack.lemma_index)."""
+        mask = self.mask(term)
+        if not mask:
+            return default
+        labels = self._label_sets.get(mask)
+        if labels is None:
+            labels = frozenset(label for bit, label in enumerate(self.labels) if mask & (1 << bit))
+            self._label_sets[mask] = labels
+        return labels
+
+    def lexicon(self, label: str) -> MappedLexicon:
+        return MappedLexicon(self, label)
+
+    def match(self, lemmas, bit_mask: int = -1) -> set:
+        """Términos (de hasta max_words lemas) presentes en la secuencia y contenidos en los léxicos de bit_mask."""
+        lemmas = lemmas if isinstance(lemmas, (list, tuple)) else list(lemmas)
+        found = set()
+        for start in range(len(lemmas)):
+            for size in range(1, min(self.max_words, len(lemmas) - start) + 1):
+                term = " ".join(lemmas[start:start + size])
+                if self.mask(term) & bit_mask:
+                    found.add(term)
+        return found
+
+    def close(self):
+        """Libera la proyección en memoria (las vistas del artefacto dejan de ser válidas)."""
+        for view in (self.offsets, self.masks, self.slots, self.strings, self._buffer):
+            view.release()
+        self._mmap.close()
+
+    def __repr__(self):
+        return f"LexiconArtifact({self.path!r}, términos={len(self)}, paquete={self.rule_pack_version!r})"
+
+
+def open_lexicon_artifact(path: str) -> LexiconArtifact:
+    return LexiconArtifact(path)
+
+
+def find_lexicon_artifact(pack: RulePack) -> Optional[LexiconArtifact]:
+    """
+    Artefacto construido para el paquete de reglas, si existe y coincide su versión.
+    Un artefacto desactualizado se ignora (con aviso) y se usan los léxicos del JSON.
+    """
+    if os.environ.get("RDA_LEXICON_ARTIFACT") in ("0", "off"):
+        return None
+    path = default_artifact_path(pack)
+    if not os.path.exists(path):
+        return None
+    try:
+        artifact = open_lexicon_artifact(path)
+    except (OSError, ValueError) as e:
+        logger.warning("No se pudo abrir el artefacto de léxicos %s: %s", path, e)
+        return None
+    if artifact.rule_pack_version != pack.version:
+        logger.warning("Artefacto de léxicos %s construido para la versión %s del paquete (activa: %s); "
+                       "se ignora. Reconstrúyalo con python -m src.lexicon_artifact",
+                       path, artifact.rule_pack_version, pack.version)
+        artifact.close()
+        return None
+    return artifact
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Construye el artefacto de léxicos prelematizados.")
+    parser.add_argument("--model", default="es_core_news_sm", help="Modelo spaCy para lematizar.")
+    parser.add_argument("--output", help="Archivo de salida (por defecto data/lexicon_artifacts/<paquete>.lex).")
+    parser.add_argument("--sin-keywords", action="store_true", help="No incluir las keywords de contexto profesional.")
+    args = parser.parse_args(argv)
+
+    from src.rda_logging import configure_logging
+    from src.nlp_utils import load_spacy_model_internal
+    from src.authenticity_analyzer import PROFESSIONAL_KEYWORDS
+    from src.rule_packs import load_rule_pack
+    configure_logging("INFO")
+
+    nlp = load_spacy_model_internal(args.model)
+    if not nlp:
+        sys.exit("No se pudo cargar el modelo spaCy.")
+    pack = load_rule_pack(use_artifact=False)
+    path = build_lexicon_artifact(nlp, args.output, pack, None if args.sin_keywords else PROFESSIONAL_KEYWORDS,
+                                  model_name=args.model)
+    print(open_lexicon_artifact(path))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Cascada de modelos spaCy: modelo pequeño para todas las filas y modelo grande
+solo para las filas inciertas.
+
+El modelo pequeño (es_core_news_sm) analiza el lote completo; las filas que deja
+inciertas se vuelven a analizar con un modelo más preciso ya instalado
+(es_core_news_lg o es_core_news_md, o el de RDA_CASCADE_MODEL). Se considera
+incierta una fila cuando:
+  - el nivel de Bloom es "No identificado" o "No clasificado", o
+  - Corrección no encontró un verbo de desempeño (nota cor.sin_verbo).
+
+El modelo de escalado nunca se descarga: si no hay ninguno instalado, la
+cascada devuelve los resultados del modelo pequeño.
+"""
+
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from src.rda_pipeline import analyze_rda_batch
+    from src.model_snapshot import preflight_model
+    from src.nlp_utils import load_spacy_model_internal
+    from src.notes import Notes
+except ImportError:
+    from rda_pipeline import analyze_rda_batch
+    from model_snapshot import preflight_model
+    from nlp_utils import load_spacy_model_internal
+    from notes import Notes
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Modelos de escalado, en orden de preferencia
+ESCALATION_MODELS = ("es_core_news_lg", "es_core_news_md")
+UNCERTAIN_BLOOM_LEVELS = ("No identificado", "No clasificado")
+NO_VERB_NOTE = "cor.sin_verbo"
+
+_escalation_models: Dict[str, object] = {}
+_escalation_lock = threading.Lock()
+
+
+def is_uncertain_result(result: Optional[dict]) -> bool:
+    """La fila de resultados requiere el modelo grande (ver criterios del módulo)."""
+    if not result:
+        return False
+    if result.get("Nivel Bloom Original") in UNCERTAIN_BLOOM_LEVELS:
+        return True
+    notes = result.get("Notas Corrección")
+    return isinstance(notes, Notes) and NO_VERB_NOTE in notes.codes()
+
+
+def find_escalation_model() -> Optional[str]:
+    """Nombre del modelo de escalado: RDA_CASCADE_MODEL o el primero instalado de ESCALATION_MODELS."""
+    configured = os.environ.get("RDA_CASCADE_MODEL")
+    if configured:
+        return configured
+    return next((name for name in ESCALATION_MODELS if preflight_model(name, check_network=False)["ok"]), None)
+
+
+def get_escalation_model(model_name: Optional[str] = None):
+    """
+    Modelo de escalado cargado (una vez por proceso), o None si no está instalado.
+    """
+    model_name = model_name or find_escalation_model()
+    if not model_name:
+        return None
+    nlp = _escalation_models.get(model_name)
+    if nlp is None:
+        with _escalation_lock:
+            nlp = _escalation_models.get(model_name)
+            if nlp is None:
+                if not preflight_model(model_name, check_network=False)["ok"]:
+                    logger.warning("Modelo de escalado '%s' no instalado; la cascada usa solo el modelo pequeño.",
+                                   model_name)
+                    return None
+                nlp = load_spacy_model_internal(model_name)
+                if nlp is None:
+                    return None
+                _escalation_models[model_name] = nlp
+    return nlp
+
+
+def analyze_rda_cascade(items, nlp_model, escalation_model=None, professional_keywords=None,
+                        batch_size=64) -> Tuple[List[Optional[dict]], dict]:
+    """
+    Analiza el lote con el modelo pequeño y vuelve a analizar con el modelo de
+    escalado solo las filas inciertas.
+
+    Args:
+        items: Lista de tuplas (texto_ra, nivel_academico).
+        nlp_model: Modelo spaCy pequeño (todas las filas).
+        escalation_model: Modelo spaCy grande; si es None se busca uno instalado
+                          (ver get_escalation_model).
+        professional_keywords, batch_size: Ver analyze_rda_batch.
+
+    Returns:
+        (resultados en el orden de items, estadísticas: 'filas', 'inciertas',
+        'resueltas' (inciertas que el modelo grande deja de marcar como tales) y
+        'modelo_escalado').
+    """
+    results = analyze_rda_batch(items, nlp_model, professional_keywords, batch_size)
+    uncertain = [i for i, result in enumerate(results) if is_uncertain_result(result)]
+    stats = {"filas": len(items), "inciertas": len(uncertain), "resueltas": 0, "modelo_escalado": None}
+    if not uncertain:
+        return results, stats
+
+    escalation_model = escalation_model if escalation_model is not None else get_escalation_model()
+    if escalation_model is None or escalation_model is nlp_model:
+        return results, stats
+    stats["modelo_escalado"] = f"{escalation_model.meta.get('lang', '')}_{escalation_model.meta.get('name', '')}"
+
+    escalated = analyze_rda_batch([items[i] for i in uncertain], escalation_model, professional_keywords, batch_size)
+    for i, result in zip(uncertain, escalated):
+        if result is not None:
+            stats["resueltas"] += not is_uncertain_result(result)
+            results[i] = result
+    logger.info("Cascada: %d de %d filas inciertas reanalizadas con %s (%d resueltas)",
+                len(uncertain), len(items), stats["modelo_escalado"], stats["resueltas"])
+    return results, stats
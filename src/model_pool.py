@@ -0,0 +1,144 @@
+"""
+Pool de instancias del modelo spaCy compartido por los trabajos de análisis.
+
+Todas las sesiones de Streamlit reciben el mismo objeto nlp (st.cache_resource);
+los trabajos simultáneos lo piden prestado al pool en lugar de usarlo a la vez:
+
+    with pool.model() as nlp:
+        docs = list(nlp.pipe(textos))
+
+El pool tiene RDA_MODEL_POOL_SIZE instancias (por defecto 1: el modelo ya
+cargado, sin memoria adicional). Las instancias extra se clonan bajo demanda a
+partir del modelo cargado (misma configuración y pesos, vocabulario propio),
+de modo que comparten la firma del modelo y las cachés de resultados.
+Si todas están prestadas, el trabajo espera a que se devuelva una (en orden de
+llegada).
+
+Los préstamos y las esperas se consultan con instrumentation.counters() (fuente "model_pool").
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+from spacy import util
+from spacy.language import Language
+
+try:
+    from src import instrumentation
+except ImportError: # Ejecución directa del módulo (python src/...)
+    import instrumentation
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 1
+
+
+def clone_model(nlp_model: Language) -> Language:
+    """Copia independiente del pipeline (configuración, pesos y metadatos)."""
+    clone = util.load_model_from_config(nlp_model.config, auto_fill=False)
+    return clone.from_bytes(nlp_model.to_bytes())
+
+
+class ModelPool:
+    """Instancias del modelo prestadas de una en una, en orden de llegada."""
+
+    def __init__(self, nlp_model: Language, size: int = DEFAULT_POOL_SIZE,
+                 factory: Optional[Callable[[], Language]] = None):
+        self.primary = nlp_model
+        self.size = max(1, size)
+        self._factory = factory or (lambda: clone_model(nlp_model))
+        self._idle: List[Language] = [nlp_model]
+        self._created = 1
+        self._reserved = 0 # Instancias libres ya asignadas a un trabajo en espera
+        self._waiters: "deque[threading.Event]" = deque()
+        self._lock = threading.Lock()
+        self.borrows = self.waits = 0
+        self.wait_seconds = 0.0
+
+    def acquire(self, timeout: Optional[float] = None) -> Language:
+        """Toma una instancia libre (o crea otra si no se alcanzó el tamaño); si no hay, espera su turno."""
+        with self._lock:
+            self.borrows += 1
+            if len(self._idle) > self._reserved and not self._waiters:
+                return self._idle.pop()
+            create = self._created < self.size
+            if create:
+                self._created += 1
+            else:
+                turn = threading.Event()
+                self._waiters.append(turn)
+                self.waits += 1
+        if create:
+            try:
+                nlp_model = self._factory()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+            logger.info("Pool de modelos: instancia %d de %d creada.", self._created, self.size)
+            return nlp_model
+
+        start = time.perf_counter()
+        got_turn = turn.wait(timeout)
+        with self._lock:
+            self.wait_seconds += time.perf_counter() - start
+            if not got_turn and turn in self._waiters:
+                self._waiters.remove(turn)
+                raise TimeoutError("No hay instancias libres del modelo spaCy.")
+            self._reserved -= 1
+            return self._idle.pop() # release() la dejó reservada para este turno
+
+    def release(self, nlp_model: Language):
+        """Devuelve la instancia; si hay trabajos esperando, pasa al primero de la cola."""
+        with self._lock:
+            self._idle.append(nlp_model)
+            if self._waiters:
+                self._reserved += 1
+                self._waiters.popleft().set()
+
+    @contextmanager
+    def model(self, timeout: Optional[float] = None):
+        nlp_model = self.acquire(timeout)
+        try:
+            yield nlp_model
+        finally:
+            self.release(nlp_model)
+
+    def counters(self) -> dict:
+        with self._lock:
+            return {"instancias": self._created, "tamano": self.size, "libres": len(self._idle) - self._reserved,
+                    "en_espera": len(self._waiters), "prestamos": self.borrows, "esperas": self.waits,
+                    "espera_total_s": round(self.wait_seconds, 4)}
+
+    def reset_counters(self):
+        with self._lock:
+            self.borrows = self.waits = 0
+            self.wait_seconds = 0.0
+
+
+_pool: Optional[ModelPool] = None
+_pool_lock = threading.Lock()
+
+
+def model_pool_size() -> int:
+    try:
+        return max(1, int(os.environ.get("RDA_MODEL_POOL_SIZE", DEFAULT_POOL_SIZE)))
+    except ValueError:
+        return DEFAULT_POOL_SIZE
+
+
+def get_model_pool(nlp_model: Language) -> ModelPool:
+    """Pool del proceso para el modelo cargado (se renueva si cambia el modelo)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.primary is not nlp_model:
+            _pool = ModelPool(nlp_model, model_pool_size())
+            instrumentation.register_counters("model_pool", _pool)
+            logger.info("Pool de modelos spaCy: hasta %d instancias.", _pool.size)
+        return _pool
@@ -0,0 +1,232 @@
+"""
+Arranque en caliente del modelo spaCy.
+
+- preflight_model(): comprueba, sin descargar nada, de dónde se puede cargar el
+  modelo (snapshot local o paquete instalado). Si no hay ninguno y no hay red (o
+  RDA_OFFLINE=1), la carga falla de inmediato en lugar de intentar la descarga.
+- build_model_snapshot(): guarda con nlp.to_disk una copia del modelo sin los
+  componentes que no usan los analizadores (perfil de exclusión), junto con sus
+  metadatos (modelo, versión de spaCy, perfil). Cargar el snapshot evita
+  construir los componentes excluidos y los desactivados del paquete.
+- measure_cold_start(): mide la carga en un intérprete nuevo (tiempo de arranque
+  en frío real, usado por la suite de benchmarks).
+
+Los snapshots se guardan en data/model_snapshots/<modelo>-<perfil>/ (o en la
+ruta de RDA_MODEL_SNAPSHOT) y load_spacy_model_internal() los usa si existen y
+fueron creados con la misma versión de spaCy.
+
+Construcción:
+    python -m src.model_snapshot build [--model es_core_news_sm] [--profile analisis]
+    python -m src.model_snapshot preflight
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from typing import Optional
+
+import spacy
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOTS_DIR = os.path.join(os.path.dirname(CURRENT_DIR), 'data', 'model_snapshots')
+SNAPSHOT_META_FILE = "rda_snapshot.json"
+
+# Perfil -> componentes excluidos del snapshot (además de los desactivados en el modelo, p. ej. senter)
+SNAPSHOT_PROFILES = {
+    "analisis": (),              # Todo lo que usan los analizadores: tok2vec, morfología, parser, lematizador, NER
+    "sin_entidades": ("ner",),   # Sin NER: la especificidad factual deja de detectar nombres propios
+}
+DEFAULT_PROFILE = "analisis"
+
+# Host consultado para saber si hay red antes de intentar una descarga
+DOWNLOAD_HOST = ("raw.githubusercontent.com", 443)
+
+
+def is_offline_mode() -> bool:
+    """True si RDA_OFFLINE=1: nunca se intenta descargar el modelo."""
+    return os.environ.get("RDA_OFFLINE", "0") == "1"
+
+
+def is_online(timeout: float = 2.0) -> bool:
+    """Comprobación rápida de red (conexión TCP al host de descarga de modelos)."""
+    try:
+        with socket.create_connection(DOWNLOAD_HOST, timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def snapshot_path(model_name: str = "es_core_news_sm", profile: str = DEFAULT_PROFILE) -> str:
+    """Directorio del snapshot del modelo (RDA_MODEL_SNAPSHOT o data/model_snapshots/<modelo>-<perfil>)."""
+    configured = os.environ.get("RDA_MODEL_SNAPSHOT")
+    if configured:
+        return configured
+    return os.path.join(SNAPSHOTS_DIR, f"{os.path.basename(model_name.rstrip('/'))}-{profile}")
+
+
+def read_snapshot_meta(path: str) -> Optional[dict]:
+    """Metadatos del snapshot, o None si el directorio no es un snapshot."""
+    try:
+        with open(os.path.join(path, SNAPSHOT_META_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _minor_version(version: str) -> str:
+    return ".".join(version.split(".")[:2])
+
+
+def is_snapshot_compatible(meta: Optional[dict]) -> bool:
+    """El snapshot se creó con la misma versión menor de spaCy que la instalada."""
+    return bool(meta) and _minor_version(meta.get("spacy", "")) == _minor_version(spacy.__version__)
+
+
+def is_snapshot_of(meta: Optional[dict], model_name: str) -> bool:
+    """El snapshot se creó a partir del modelo pedido (RDA_MODEL_SNAPSHOT apunta a un único modelo)."""
+    return bool(meta) and os.path.basename(str(meta.get("modelo", "")).rstrip("/")) == os.path.basename(model_name.rstrip("/"))
+
+
+def is_model_installed(model_name: str) -> bool:
+    """El modelo está instalado como paquete o es un directorio de modelo."""
+    return spacy.util.is_package(model_name) or os.path.isdir(model_name)
+
+
+def preflight_model(model_name: str = "es_core_news_sm", profile: str = DEFAULT_PROFILE,
+                    check_network: bool = True) -> dict:
+    """
+    Comprueba de dónde se puede cargar el modelo, sin descargar nada.
+
+    Returns:
+        Diccionario con 'ok', 'source' ('snapshot', 'paquete' o None), 'path',
+        'online' (None si no hizo falta comprobarlo) y 'message'.
+    """
+    path = snapshot_path(model_name, profile)
+    meta = read_snapshot_meta(path)
+    if meta is not None and not is_snapshot_of(meta, model_name):
+        logger.debug("Snapshot %s es de '%s', no de '%s'; se ignora.", path, meta.get("modelo"), model_name)
+        meta = None
+    if is_snapshot_compatible(meta):
+        return {"ok": True, "source": "snapshot", "path": path, "online": None,
+                "message": f"Snapshot '{path}' ({meta.get('modelo')}, perfil {meta.get('perfil')})."}
+    if meta is not None:
+        logger.warning("Snapshot %s creado con spaCy %s (instalado: %s); se ignora.",
+                       path, meta.get("spacy"), spacy.__version__)
+    if is_model_installed(model_name):
+        return {"ok": True, "source": "paquete", "path": model_name, "online": None,
+                "message": f"Modelo '{model_name}' instalado."}
+    online = False if is_offline_mode() or not check_network else is_online()
+    message = (f"El modelo '{model_name}' no está instalado"
+               + (" y no hay conexión para descargarlo" if not online else "")
+               + f". Instálelo con: python -m spacy download {model_name}")
+    return {"ok": False, "source": None, "path": None, "online": online, "message": message}
+
+
+def load_model_snapshot(path: str):
+    """Carga el modelo desde un snapshot (ver build_model_snapshot)."""
+    return spacy.load(path)
+
+
+def build_model_snapshot(model_name: str = "es_core_news_sm", profile: str = DEFAULT_PROFILE,
+                         path: Optional[str] = None) -> str:
+    """
+    Guarda una copia del modelo sin los componentes desactivados ni los del perfil.
+
+    Args:
+        model_name: Paquete o directorio del modelo spaCy (debe estar instalado).
+        profile: Perfil de exclusión (ver SNAPSHOT_PROFILES).
+        path: Directorio de salida (por defecto snapshot_path(model_name, profile)).
+
+    Returns:
+        Directorio del snapshot.
+    """
+    if profile not in SNAPSHOT_PROFILES:
+        raise ValueError(f"Perfil de snapshot desconocido: '{profile}' (disponibles: {', '.join(SNAPSHOT_PROFILES)}).")
+    path = path or snapshot_path(model_name, profile)
+    full = spacy.load(model_name)
+    exclude = list(full.disabled) + [name for name in SNAPSHOT_PROFILES[profile] if name in full.component_names]
+    nlp = spacy.load(model_name, exclude=exclude) if exclude else full
+
+    # Escribir en un directorio temporal y sustituir el anterior de una vez
+    tmp_path = f"{path.rstrip(os.sep)}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    nlp.to_disk(tmp_path)
+    meta = {
+        "modelo": model_name,
+        "version_modelo": full.meta.get("version"),
+        "spacy": spacy.__version__,
+        "perfil": profile,
+        "excluidos": exclude,
+        "componentes": list(nlp.pipe_names),
+        "creado": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    with open(os.path.join(tmp_path, SNAPSHOT_META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    os.replace(tmp_path, path)
+    logger.info("Snapshot del modelo '%s' (perfil %s, sin %s) guardado en %s", model_name, profile, exclude or "-", path)
+    return path
+
+
+_COLD_START_SCRIPT = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "import spacy\n"
+    "spacy.load(sys.argv[1])\n"
+    "print(time.perf_counter() - start)\n"
+)
+
+
+def measure_cold_start(source: str, timeout: float = 300) -> Optional[float]:
+    """
+    Segundos de importar spaCy y cargar `source` (paquete o snapshot) en un
+    intérprete nuevo, sin cachés del proceso actual. None si la carga falla.
+    """
+    try:
+        completed = subprocess.run([sys.executable, "-c", _COLD_START_SCRIPT, source],
+                                   capture_output=True, text=True, timeout=timeout, check=True)
+        return round(float(completed.stdout.strip().splitlines()[-1]), 4)
+    except subprocess.CalledProcessError as e:
+        error_lines = (e.stderr or "").strip().splitlines()
+        logger.warning("No se pudo medir el arranque en frío de '%s': %s", source,
+                       error_lines[-1] if error_lines else f"código de salida {e.returncode}")
+    except (subprocess.SubprocessError, ValueError, IndexError) as e:
+        logger.warning("No se pudo medir el arranque en frío de '%s': %s", source, e)
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Snapshot del modelo spaCy para arranque en caliente.")
+    parser.add_argument("command", choices=("build", "preflight"))
+    parser.add_argument("--model", default="es_core_news_sm")
+    parser.add_argument("--profile", default=DEFAULT_PROFILE, choices=sorted(SNAPSHOT_PROFILES))
+    parser.add_argument("--output", help="Directorio del snapshot (por defecto data/model_snapshots/<modelo>-<perfil>).")
+    args = parser.parse_args(argv)
+
+    from src.rda_logging import configure_logging
+    configure_logging("INFO")
+
+    if args.command == "preflight":
+        result = preflight_model(args.model, args.profile)
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        sys.exit(0 if result["ok"] else 1)
+
+    if not is_model_installed(args.model):
+        sys.exit(preflight_model(args.model, args.profile)["message"])
+    path = build_model_snapshot(args.model, args.profile, args.output)
+    print(f"Snapshot: {path}")
+    print(f"Arranque en frío: paquete {measure_cold_start(args.model)}s | snapshot {measure_cold_start(path)}s")
+
+
+if __name__ == '__main__':
+    main()
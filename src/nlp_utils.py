@@ -3,8 +3,17 @@ import re
 import logging
 import streamlit as st # Necesario para el decorador @st.cache_resource
 
-# Configuración básica de logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+try:
+    from src.rda_logging import trace
+    from src.verb_frame import get_verb_frame
+    from src.model_snapshot import preflight_model, load_model_snapshot
+except ImportError: # Ejecución directa del módulo (python src/...)
+    from rda_logging import trace
+    from verb_frame import get_verb_frame
+    from model_snapshot import preflight_model, load_model_snapshot
+
+# Configurar logger (la configuración del logging la hace el punto de entrada)
+logger = logging.getLogger(__name__)
 
 # --- Carga del Modelo spaCy (con Caché) ---
 
@@ -12,26 +21,43 @@ def load_spacy_model_internal(model_name="es_core_news_sm"):
     """
     Función interna para cargar el modelo spaCy.
     Llamada por la versión cacheada.
+
+    Usa el snapshot local del modelo si existe (arranque en caliente, ver
+    src/model_snapshot.py). Solo intenta descargar el modelo si no está
+    instalado y hay red; sin conexión (o con RDA_OFFLINE=1) falla de inmediato.
     """
     nlp = None
-    logging.info(f"Intentando cargar modelo spaCy '{model_name}'...")
+    preflight = preflight_model(model_name)
+    if preflight["source"] == "snapshot":
+        try:
+            nlp = load_model_snapshot(preflight["path"])
+            logger.info("Modelo spaCy '%s' cargado desde el snapshot %s.", model_name, preflight["path"])
+            return nlp
+        except Exception as e:
+            logger.warning("No se pudo cargar el snapshot %s (%s); se carga el paquete.", preflight["path"], e)
+    elif not preflight["ok"] and not preflight["online"]:
+        logger.error("Comprobación previa del modelo: %s", preflight["message"])
+        st.error(f"No se encontró el modelo spaCy '{model_name}' y no hay conexión para descargarlo. Instálalo manualmente.")
+        return None
+
+    logger.info("Intentando cargar modelo spaCy '%s'...", model_name)
     try:
         nlp = spacy.load(model_name)
-        logging.info(f"Modelo spaCy '{model_name}' cargado exitosamente.")
+        logger.info("Modelo spaCy '%s' cargado exitosamente.", model_name)
     except OSError:
-        logging.warning(f"Modelo '{model_name}' no encontrado localmente. Intentando descargar...")
+        logger.warning("Modelo '%s' no encontrado localmente. Intentando descargar...", model_name)
         try:
             spacy.cli.download(model_name)
             nlp = spacy.load(model_name) # Intentar cargar de nuevo después de descargar
-            logging.info(f"Modelo spaCy '{model_name}' descargado y cargado exitosamente.")
+            logger.info("Modelo spaCy '%s' descargado y cargado exitosamente.", model_name)
         except Exception as e:
-            logging.error(f"Error CRÍTICO al descargar o cargar el modelo '{model_name}': {e}", exc_info=True)
-            logging.error("Asegúrate de tener conexión a internet y permisos, o ejecuta manualmente:")
-            logging.error(f"python -m spacy download {model_name}")
+            logger.error("Error CRÍTICO al descargar o cargar el modelo '%s': %s", model_name, e, exc_info=True)
+            logger.error("Asegúrate de tener conexión a internet y permisos, o ejecuta manualmente:")
+            logger.error("python -m spacy download %s", model_name)
             st.error(f"No se pudo descargar ni cargar el modelo spaCy '{model_name}'. La aplicación no funcionará correctamente. Intenta instalarlo manualmente.")
             nlp = None # Asegura que sigue siendo None si falla
     except Exception as e:
-         logging.error(f"Error inesperado al cargar el modelo '{model_name}': {e}", exc_info=True)
+         logger.error("Error inesperado al cargar el modelo '%s': %s", model_name, e, exc_info=True)
          st.error(f"Error inesperado al cargar el modelo spaCy '{model_name}'.")
          nlp = None # Asegura que sigue siendo None si falla
     return nlp
@@ -41,7 +67,7 @@ def load_spacy_model(model_name="es_core_news_sm"):
     """
     Carga y cachea el modelo de spaCy especificado usando Streamlit.
     """
-    logging.info("Ejecutando cached_load_spacy_model (debería ocurrir solo si la caché expira o es la primera vez)...")
+    logger.info("Ejecutando cached_load_spacy_model (debería ocurrir solo si la caché expira o es la primera vez)...")
     return load_spacy_model_internal(model_name)
 
 # --- Funciones de Procesamiento de Texto ---
@@ -59,47 +85,17 @@ def clean_text(text):
 def find_main_verb(doc):
     """
     Encuentra el verbo principal (lema en minúsculas) en un documento spaCy procesado.
-    Prioriza el verbo raíz (ROOT), luego busca otros verbos no auxiliares.
+    Prioriza el verbo raíz (ROOT) en infinitivo, luego otros verbos no auxiliares
+    en infinitivo. Usa el marco de verbo compartido (ver src/verb_frame.py).
     """
     if not doc:
         return None
 
-    root_verb = None
-    first_verb = None
-
-    for token in doc:
-        # Buscar el verbo raíz (suele ser el principal)
-        if token.dep_ == "ROOT" and token.pos_ == "VERB":
-            root_verb = token.lemma_.lower()
-            logging.debug(f"Verbo ROOT encontrado: '{token.text}' (Lema: '{root_verb}')")
-            # Si el verbo raíz es infinitivo (termina en ar, er, ir), usarlo directamente
-            if root_verb.endswith(('ar', 'er', 'ir')):
-                 return root_verb
-            # Si no es infinitivo, seguir buscando por si hay un infinitivo antes que sea mejor candidato
-
-        # Guardar el primer verbo encontrado que no sea auxiliar, por si no hay ROOT claro
-        if first_verb is None and token.pos_ == "VERB" and token.dep_ != "aux":
-             # Verificar si es infinitivo
-             lemma = token.lemma_.lower()
-             if lemma.endswith(('ar', 'er', 'ir')):
-                first_verb = lemma
-                logging.debug(f"Primer verbo infinitivo no auxiliar encontrado: '{token.text}' (Lema: '{first_verb}')")
-
-
-    # Decidir qué verbo devolver
-    if root_verb and root_verb.endswith(('ar', 'er', 'ir')):
-        logging.debug(f"Devolviendo verbo ROOT infinitivo: '{root_verb}'")
-        return root_verb
-    elif first_verb: # Si encontramos un infinitivo no auxiliar antes (o en lugar) del ROOT
-        logging.debug(f"Devolviendo primer verbo infinitivo no auxiliar: '{first_verb}'")
-        return first_verb
-    elif root_verb: # Si el ROOT no era infinitivo y no hubo otro infinitivo antes
-        logging.debug(f"Devolviendo verbo ROOT (no infinitivo): '{root_verb}'")
-        return root_verb
-    else:
+    verb = get_verb_frame(doc).infinitive_lemma()
+    if verb is None:
         # Si no se encontró ni ROOT ni otro verbo adecuado
-        logging.warning(f"No se encontró un verbo principal claro en el Doc: '{doc.text}'")
-        return None
+        trace(logger, "verbo.no_encontrado", texto=doc.text)
+    return verb
 
 
 # --- Bloque para Pruebas (Opcional) ---
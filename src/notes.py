@@ -0,0 +1,187 @@
+"""
+Notas codificadas de los analizadores.
+
+Los analizadores no redactan sus notas/justificaciones por fila: emiten un
+objeto Notes, una tupla de notas (código, *argumentos). El texto se genera solo
+al mostrar o exportar los resultados (render_notes / render_note_columns), con
+las plantillas del idioma indicado (por defecto español).
+
+- Las notas idénticas se internan (make_notes), de modo que miles de filas con
+  la misma nota comparten un único objeto.
+- El texto de cada combinación de notas se genera una vez por idioma y se
+  reutiliza (caché acotada), también al renderizar columnas completas.
+- register_templates() añade o sustituye plantillas de otro idioma; los
+  códigos sin traducción usan la plantilla en español.
+"""
+
+import threading
+from typing import Dict, Iterable, Optional
+
+DEFAULT_LANGUAGE = "es"
+
+# Columnas de resultados que contienen notas codificadas
+NOTE_COLUMNS = ("Notas Corrección", "Notas Autenticidad", "Notas Conocimiento")
+
+# Código -> plantilla (argumentos posicionales). Los argumentos de tipo tupla se
+# muestran como lista (p. ej. "Keywords=['dato', 'fecha']").
+NOTE_TEMPLATES: Dict[str, Dict[str, str]] = {
+    "es": {
+        # Comunes
+        "texto_invalido": "Texto de entrada inválido o vacío.",
+        "modelo_no_disponible": "Modelo NLP no disponible.",
+        "error": "Error durante el análisis: {0}",
+        # Verificabilidad
+        "ver.verbo": "Verbo: '{0}'.",
+        "ver.tipo_observable": "Tipo: Observable.",
+        "ver.tipo_interno": "Tipo: Interno/Cognitivo.",
+        "ver.tipo_no_clasificado": "Tipo: No clasificado claramente.",
+        "ver.objeto_concreto": "Objeto ('{0}'): Concreto.",
+        "ver.objeto_abstracto": "Objeto ('{0}'): Abstracto.",
+        "ver.objeto_no_clasificado": "Objeto ('{0}'): No clasificado.",
+        "ver.sin_verbo": "No se identificó verbo principal claro.",
+        "ver.indicadores_medida": "Indicadores de medida: {0}.",
+        "ver.numeros": "Presencia de números.",
+        "ver.subjetivos_sin_definir": "Términos subjetivos sin definir: {0}.",
+        "ver.subjetivos_presentes": "Términos subjetivos presentes: {0}.",
+        "ver.sin_indicadores": "No se encontraron indicadores claros de medida o subjetividad.",
+        # Corrección
+        "cor.texto_invalido": "Texto inválido o demasiado corto para análisis.",
+        "cor.muy_breve": "Formulación muy breve (menos de {0} palabras significativas).",
+        "cor.sin_verbo": "No se identificó un verbo de desempeño claro.",
+        "cor.completa": "Formulación clara con verbo, contenido específico y nivel/condición.",
+        "cor.limitaciones": "Presenta limitaciones: falta {0}.",
+        "cor.limitaciones_generica": "Presenta limitaciones en la formulación.",
+        "cor.incorrecta": "Carece de elementos básicos o formulación incorrecta.",
+        "cor.verbo": "Verbo: '{0}'.",
+        "cor.contenido": "Contenido: '{0}'.",
+        "cor.contenido_vago": "Contenido (vago/general?): '{0}'.",
+        "cor.nivel": "Nivel/Condición: '{0}'.",
+        "cor.error": "Error durante el análisis de corrección: {0}",
+        # Autenticidad
+        "aut.verbo_alto": "Verbo '{0}' sugiere acción clara/aplicable.",
+        "aut.verbo_medio": "Verbo '{0}' sugiere acción, podría ser más concreto.",
+        "aut.verbo_bajo": "Verbo '{0}' sugiere acción menos directa/observable.",
+        "aut.verbo_otro": "Verbo '{0}' encontrado.",
+        "aut.adverbio": "Adverbio sugiere mayor nivel de aplicación.",
+        "aut.sin_verbo": "No se encontró verbo principal claro, baja orientación a la acción.",
+        "aut.keywords": "Vinculación con contexto sugerida por keywords: {0}.",
+        "aut.sin_keywords": "No se encontraron keywords específicas de contexto profesional (según lista actual).",
+        "aut.sentido_manual": "Sentido formativo requiere evaluación manual (default=3).",
+        # Dimensión del Conocimiento
+        "con.texto_invalido": "Texto inválido.",
+        "con.factual_medio": "Factual(Medio): Keywords={0}.",
+        "con.factual_alto": "Factual(Alto): Keywords={0}, Especificidad alta.",
+        "con.conceptual_medio": "Conceptual(Medio): Keywords={0}.",
+        "con.conceptual_alto": "Conceptual(Alto): Keywords={0}, Abstracción/Estructura alta.",
+        "con.procedimental_medio": "Procedural(Medio): Keywords/Verbos={0}.",
+        "con.procedimental_alto": "Procedural(Alto): Keywords/Verbos={0}, Proceso claro.",
+        "con.metacognitivo_medio": "Metacognitivo(Medio): Keywords={0}.",
+        "con.metacognitivo_alto": "Metacognitivo(Alto): Keywords={0}, Auto-referencia/reflexión clara.",
+        "con.sin_indicadores": "No se encontraron indicadores claros para ninguna dimensión.",
+    },
+}
+
+_MAX_INTERNED = 100_000 # Límite de las tablas de internado y de textos generados
+
+
+class Notes(tuple):
+    """
+    Notas de un analizador para un RdA: tupla de notas (código, *argumentos).
+    str() genera el texto en el idioma por defecto.
+    """
+
+    __slots__ = ()
+
+    def render(self, lang: Optional[str] = None) -> str:
+        return render_notes(self, lang)
+
+    def codes(self):
+        """Códigos de las notas, en orden."""
+        return [note[0] for note in self]
+
+    def __str__(self):
+        return render_notes(self)
+
+
+_interned: Dict[tuple, Notes] = {}
+_rendered: Dict[tuple, str] = {}
+_lock = threading.Lock()
+
+
+def make_notes(notes: Iterable[tuple]) -> Notes:
+    """
+    Crea (o reutiliza) el objeto Notes de una secuencia de notas (código, *argumentos).
+    Las notas repetidas exactamente se eliminan, conservando el orden.
+    """
+    key = tuple(dict.fromkeys(notes))
+    interned = _interned.get(key)
+    if interned is None:
+        interned = Notes(key)
+        with _lock:
+            if len(_interned) >= _MAX_INTERNED:
+                _interned.clear()
+            _interned[key] = interned
+    return interned
+
+
+def note(code: str, *args) -> Notes:
+    """Notes con una sola nota."""
+    return make_notes(((code,) + args,))
+
+
+def _format_arg(value):
+    return list(value) if isinstance(value, tuple) else value
+
+
+def render_notes(notes, lang: Optional[str] = None) -> str:
+    """
+    Texto de unas notas (Notes). Las cadenas y valores nulos se devuelven tal cual,
+    de modo que también acepta resultados guardados antes de codificar las notas.
+    """
+    if not isinstance(notes, Notes):
+        return notes if notes is not None else ""
+    lang = lang or DEFAULT_LANGUAGE
+    cache_key = (lang, notes)
+    text = _rendered.get(cache_key)
+    if text is None:
+        templates = NOTE_TEMPLATES.get(lang, {})
+        default_templates = NOTE_TEMPLATES[DEFAULT_LANGUAGE]
+        parts = []
+        for code, *args in notes:
+            template = templates.get(code) or default_templates.get(code, code)
+            parts.append(template.format(*(_format_arg(arg) for arg in args)))
+        text = " ".join(parts)
+        with _lock:
+            if len(_rendered) >= _MAX_INTERNED:
+                _rendered.clear()
+            _rendered[cache_key] = text
+    return text
+
+
+def render_note_columns(df, lang: Optional[str] = None, columns=NOTE_COLUMNS):
+    """
+    Copia del DataFrame con las columnas de notas convertidas a texto. Cada
+    combinación de notas distinta se genera una sola vez (caché de render_notes).
+    """
+    present = [column for column in columns if column in df.columns]
+    if not present:
+        return df
+    df = df.copy()
+    for column in present:
+        df[column] = [render_notes(value, lang) for value in df[column]]
+    return df
+
+
+def render_result(result: Optional[dict], lang: Optional[str] = None) -> Optional[dict]:
+    """Copia de un diccionario de resultados con las notas convertidas a texto (p. ej. para JSON)."""
+    if result is None:
+        return None
+    return {key: render_notes(value, lang) if isinstance(value, Notes) else value for key, value in result.items()}
+
+
+def register_templates(lang: str, templates: Dict[str, str]):
+    """Añade o sustituye plantillas de un idioma (los códigos que falten usan el español)."""
+    with _lock:
+        NOTE_TEMPLATES.setdefault(lang, {}).update(templates)
+        for key in [key for key in _rendered if key[0] == lang]:
+            del _rendered[key]
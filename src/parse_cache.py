@@ -0,0 +1,294 @@
+"""
+Caché persistente de análisis spaCy (Docs serializados con DocBin).
+
+Guarda en SQLite el Doc ya procesado de cada texto, indexado por el texto y la
+identidad del modelo (nombre, versión y componentes del pipeline). Al cambiar
+solo las heurísticas de puntuación (Corrección, Verificabilidad...) y volver a
+analizar un archivo de RdAs, los Docs se recuperan de la caché en lugar de
+volver a ejecutar el parser: el coste queda acotado por la puntuación.
+
+- Los Docs de cada lote se guardan en un mismo DocBin (sin user_data: las
+  extensiones Doc._ como el marco de verbo se recalculan al usarlas).
+- Cambiar de modelo, de versión o de componentes cambia la clave, de modo que
+  nunca se reutilizan análisis de otro pipeline.
+- Tamaño acotado: al guardar se eliminan los DocBin que ya no referencia ningún
+  texto, los más antiguos que la caducidad y, si el archivo supera el tamaño
+  máximo, los más antiguos hasta volver a caber.
+
+Configuración (variables de entorno):
+    RDA_PARSE_CACHE        ruta del archivo .sqlite (sin definir: caché desactivada);
+                           parse_rda_texts() la usa automáticamente (ver get_parse_cache)
+    RDA_PARSE_CACHE_MB     tamaño máximo de los DocBin guardados (por defecto 512 MB)
+    RDA_PARSE_CACHE_TTL    caducidad en segundos (por defecto 30 días)
+
+Mantenimiento:
+    python -m src.parse_cache stats --path cache.sqlite
+    python -m src.parse_cache clear --path cache.sqlite
+    python -m src.parse_cache prune --path cache.sqlite   # solo otros modelos
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from spacy.tokens import DocBin
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Atributos por token que se serializan (los que usan los analizadores; las oraciones salen de HEAD)
+DOC_ATTRS = ("ORTH", "NORM", "TAG", "POS", "MORPH", "LEMMA", "HEAD", "DEP", "ENT_IOB", "ENT_TYPE")
+_SQL_CHUNK = 500 # Parámetros por consulta (límite de variables de SQLite)
+
+_BLOB_MAX_DOCS = 1000 # Docs por DocBin guardado
+_DECODED_BLOBS = 8 # DocBin ya deserializados que se conservan (LRU) para las lecturas de uno en uno
+DEFAULT_MAX_MB = 512
+DEFAULT_TTL = 30 * 24 * 3600 # Segundos
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS doc_blobs (
+    id INTEGER PRIMARY KEY,
+    model TEXT NOT NULL,
+    data BLOB NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS parsed_docs (
+    key TEXT PRIMARY KEY,
+    blob_id INTEGER NOT NULL,
+    position INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS parsed_docs_blob ON parsed_docs (blob_id);
+"""
+
+
+def model_signature(nlp_model) -> str:
+    """Identidad del pipeline: idioma, nombre y versión del modelo, y componentes activos."""
+    meta = nlp_model.meta
+    return f"{meta.get('lang', '')}_{meta.get('name', '')}@{meta.get('version', '')}:{','.join(nlp_model.pipe_names)}"
+
+
+def cache_key(signature: str, text: str) -> str:
+    return hashlib.sha256(f"{signature}\0{text}".encode("utf-8")).hexdigest()
+
+
+class ParseCache:
+    """
+    Caché de Docs serializados de un pipeline spaCy en un archivo SQLite.
+
+    Los Docs de cada escritura se guardan juntos en un DocBin (hasta
+    _BLOB_MAX_DOCS) y cada texto apunta a su DocBin y posición: al releer un
+    archivo con los mismos lotes, cada DocBin se deserializa una sola vez. Los
+    últimos DocBin leídos se conservan deserializados (LRU de _DECODED_BLOBS), de
+    modo que las lecturas fila a fila no vuelven a decodificar el lote entero.
+    """
+
+    def __init__(self, path: str, nlp_model, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024, ttl: float = DEFAULT_TTL):
+        self.path = path
+        self.nlp_model = nlp_model
+        self.signature = model_signature(nlp_model)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._decoded: "OrderedDict[int, list]" = OrderedDict() # id de DocBin -> Docs
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._evict(time.time())
+        self._conn.commit()
+
+    def get_many(self, texts: Iterable[str]) -> Dict[str, object]:
+        """Docs en caché de los textos indicados (texto -> Doc); los que faltan no aparecen."""
+        keys = {cache_key(self.signature, text): text for text in texts}
+        key_list = list(keys)
+        by_blob: Dict[int, list] = {}
+        found = {}
+        with self._lock:
+            for start in range(0, len(key_list), _SQL_CHUNK):
+                chunk = key_list[start:start + _SQL_CHUNK]
+                rows = self._conn.execute(
+                    f"SELECT key, blob_id, position FROM parsed_docs WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for key, blob_id, position in rows:
+                    by_blob.setdefault(blob_id, []).append((position, keys[key]))
+            for blob_id, entries in by_blob.items():
+                docs = self._decoded_blob(blob_id)
+                if docs is None:
+                    continue
+                for position, text in entries:
+                    found[text] = docs[position]
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def _decoded_blob(self, blob_id: int) -> Optional[list]:
+        """Docs del DocBin (con el lock tomado), deserializándolo solo si no está en el LRU."""
+        docs = self._decoded.get(blob_id)
+        if docs is not None:
+            self._decoded.move_to_end(blob_id)
+            return docs
+        row = self._conn.execute("SELECT data FROM doc_blobs WHERE id = ?", (blob_id,)).fetchone()
+        if row is None:
+            return None
+        docs = list(DocBin().from_bytes(row[0]).get_docs(self.nlp_model.vocab))
+        self._decoded[blob_id] = docs
+        if len(self._decoded) > _DECODED_BLOBS:
+            self._decoded.popitem(last=False)
+        return docs
+
+    def put_many(self, docs: Dict[str, object]):
+        """Guarda los Docs (texto -> Doc)."""
+        items = list(docs.items())
+        now = time.time()
+        with self._lock:
+            written, replaced = set(), set()
+            for start in range(0, len(items), _BLOB_MAX_DOCS):
+                chunk = items[start:start + _BLOB_MAX_DOCS]
+                keys = [cache_key(self.signature, text) for text, _ in chunk]
+                replaced.update(blob_id for blob_id, in self._conn.execute(
+                    f"SELECT blob_id FROM parsed_docs WHERE key IN ({','.join('?' * len(keys))})", keys))
+                data = DocBin(attrs=DOC_ATTRS, store_user_data=False, docs=[doc for _, doc in chunk]).to_bytes()
+                blob_id = self._conn.execute("INSERT INTO doc_blobs (model, data, created) VALUES (?, ?, ?)",
+                                             (self.signature, data, now)).lastrowid
+                written.add(blob_id)
+                self._conn.executemany("INSERT OR REPLACE INTO parsed_docs VALUES (?, ?, ?)",
+                                       [(key, blob_id, position) for position, key in enumerate(keys)])
+            # DocBin cuyos textos se acaban de reescribir y que ya no referencia ninguno
+            self._delete_blobs([blob_id for blob_id in replaced - written if self._conn.execute(
+                "SELECT 1 FROM parsed_docs WHERE blob_id = ? LIMIT 1", (blob_id,)).fetchone() is None])
+            self._evict(now, keep=written)
+            self._conn.commit()
+
+    def _delete_blobs(self, blob_ids):
+        """Elimina los DocBin indicados y los textos que apuntan a ellos (con el lock tomado)."""
+        blob_ids = list(blob_ids)
+        for start in range(0, len(blob_ids), _SQL_CHUNK):
+            chunk = blob_ids[start:start + _SQL_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            self._conn.execute(f"DELETE FROM parsed_docs WHERE blob_id IN ({placeholders})", chunk)
+            self._conn.execute(f"DELETE FROM doc_blobs WHERE id IN ({placeholders})", chunk)
+        for blob_id in blob_ids:
+            self._decoded.pop(blob_id, None)
+
+    def _evict(self, now: float, keep=()):
+        """
+        Elimina los DocBin caducados y, si se supera max_bytes, los más antiguos
+        (salvo los de `keep`, recién escritos) hasta volver a caber.
+        """
+        expired = [blob_id for blob_id, in self._conn.execute(
+            "SELECT id FROM doc_blobs WHERE created < ?", (now - self.ttl,))]
+        self._delete_blobs(expired)
+        total = self._conn.execute("SELECT COALESCE(SUM(LENGTH(data)), 0) FROM doc_blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for blob_id, size in self._conn.execute("SELECT id, LENGTH(data) FROM doc_blobs ORDER BY created, id"):
+            if total <= self.max_bytes:
+                break
+            if blob_id not in keep:
+                evicted.append(blob_id)
+                total -= size
+        self._delete_blobs(evicted)
+        logger.info("Caché de análisis: %d DocBin expulsados por tamaño (máximo %d bytes)", len(evicted), self.max_bytes)
+
+    def stats(self) -> dict:
+        with self._lock:
+            n_docs = self._conn.execute("SELECT COUNT(*) FROM parsed_docs").fetchone()[0]
+            n_blobs, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM doc_blobs").fetchone()
+            current = self._conn.execute(
+                "SELECT COUNT(*) FROM parsed_docs JOIN doc_blobs ON doc_blobs.id = parsed_docs.blob_id "
+                "WHERE doc_blobs.model = ?", (self.signature,)).fetchone()[0]
+        return {"ruta": self.path, "modelo": self.signature, "docs": n_docs, "docs_modelo": current,
+                "docbins": n_blobs, "bytes": size, "max_bytes": self.max_bytes, "ttl_s": self.ttl,
+                "aciertos": self.hits, "fallos": self.misses}
+
+    def clear(self, other_models_only: bool = False):
+        """
+        Elimina todas las entradas, o solo las de otros modelos y los DocBin que
+        ya no referencia ningún texto.
+        """
+        with self._lock:
+            if other_models_only:
+                self._conn.execute("DELETE FROM doc_blobs WHERE model != ?", (self.signature,))
+                self._conn.execute("DELETE FROM parsed_docs WHERE blob_id NOT IN (SELECT id FROM doc_blobs)")
+                self._conn.execute("DELETE FROM doc_blobs WHERE id NOT IN (SELECT DISTINCT blob_id FROM parsed_docs)")
+            else:
+                self._conn.execute("DELETE FROM parsed_docs")
+                self._conn.execute("DELETE FROM doc_blobs")
+            self._conn.commit()
+            self._decoded.clear()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_caches: Dict[tuple, ParseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _env_limits() -> dict:
+    """Tamaño máximo y caducidad configurados (RDA_PARSE_CACHE_MB / RDA_PARSE_CACHE_TTL)."""
+    return {"max_bytes": int(_env_number("RDA_PARSE_CACHE_MB", DEFAULT_MAX_MB) * 1024 * 1024),
+            "ttl": _env_number("RDA_PARSE_CACHE_TTL", DEFAULT_TTL)}
+
+
+def get_parse_cache(nlp_model, path: Optional[str] = None) -> Optional[ParseCache]:
+    """
+    Caché de análisis del modelo (una por archivo y pipeline), o None si no está
+    activada (RDA_PARSE_CACHE sin definir y sin `path`).
+    """
+    path = path or os.environ.get("RDA_PARSE_CACHE")
+    if not path:
+        return None
+    key = (os.path.abspath(path), id(nlp_model))
+    cache = _caches.get(key)
+    if cache is None or cache.nlp_model is not nlp_model:
+        with _caches_lock:
+            cache = _caches.get(key)
+            if cache is None or cache.nlp_model is not nlp_model:
+                cache = ParseCache(path, nlp_model, **_env_limits())
+                _caches[key] = cache
+                logger.info("Caché de análisis spaCy en %s (modelo %s)", path, cache.signature)
+    return cache
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mantenimiento de la caché de análisis spaCy.")
+    parser.add_argument("command", choices=("stats", "clear", "prune"),
+                        help="prune elimina las entradas de otros modelos/versiones y los DocBin sin uso.")
+    parser.add_argument("--path", default=os.environ.get("RDA_PARSE_CACHE"), help="Archivo SQLite de la caché.")
+    parser.add_argument("--model", default="es_core_news_sm")
+    args = parser.parse_args(argv)
+    if not args.path:
+        parser.error("Indique --path o RDA_PARSE_CACHE.")
+
+    from src.nlp_utils import load_spacy_model_internal
+    nlp = load_spacy_model_internal(args.model)
+    if not nlp:
+        raise SystemExit("No se pudo cargar el modelo spaCy.")
+    cache = ParseCache(args.path, nlp, **_env_limits())
+    if args.command in ("clear", "prune"):
+        cache.clear(other_models_only=args.command == "prune")
+    print(json.dumps(cache.stats(), ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
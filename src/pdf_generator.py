@@ -24,8 +24,7 @@ from .pdf_styles import (
     get_andru_styles, get_status_color, get_bloom_color, AndruSymbols
 )
 
-# Configurar logging
-logging.basicConfig(level=logging.INFO)
+# Configurar logger (la configuración del logging la hace el punto de entrada)
 logger = logging.getLogger(__name__)
 
 class AndruPDFGenerator:
@@ -260,7 +259,7 @@ class AndruPDFGenerator:
             return buffer.getvalue()
             
         except Exception as e:
-            logger.error(f"Error generando PDF detallado: {e}")
+            logger.error("Error generando PDF detallado: %s", e)
             raise
     
     def generate_executive_pdf(self, df):
@@ -327,7 +326,7 @@ class AndruPDFGenerator:
             return buffer.getvalue()
             
         except Exception as e:
-            logger.error(f"Error generando PDF ejecutivo: {e}")
+            logger.error("Error generando PDF ejecutivo: %s", e)
             raise
     
     def generate_level_pdf(self, df, level):
@@ -399,7 +398,7 @@ class AndruPDFGenerator:
             return buffer.getvalue()
             
         except Exception as e:
-            logger.error(f"Error generando PDF por nivel: {e}")
+            logger.error("Error generando PDF por nivel: %s", e)
             raise
     
     def generate_complete_pdf(self, df):
@@ -493,7 +492,7 @@ class AndruPDFGenerator:
             return buffer.getvalue()
             
         except Exception as e:
-            logger.error(f"Error generando PDF completo: {e}")
+            logger.error("Error generando PDF completo: %s", e)
             raise
 
 # ============================================================================
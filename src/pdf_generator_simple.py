@@ -15,6 +15,11 @@ matplotlib.use('Agg')  # Backend sin GUI
 import numpy as np
 from collections import Counter
 
+try:
+    from src.instrumentation import timed
+except ImportError: # Ejecución directa del módulo (python src/...)
+    from instrumentation import timed
+
 def create_pure_charts_pdf(data, title="📈 Análisis Visual de RdAs"):
     """Crea un PDF con SOLO gráficos y visualizaciones (sin tablas)"""
     buffer = io.BytesIO()
@@ -489,10 +494,12 @@ def create_complete_pdf(data, title="📋 Reporte Completo"):
     return buffer.getvalue()
 
 # FUNCIONES PRINCIPALES (sin cambios en las firmas para compatibilidad)
+@timed("pdf_ejecutivo")
 def generate_executive_pdf(data, academic_level=None, summary_stats=None):
     """Genera PDF ejecutivo con columnas esenciales"""
     return create_executive_pdf(data, "📊 Reporte Ejecutivo - Resumen Gerencial")
 
+@timed("pdf_nivel")
 def generate_level_pdf(data, level, summary_stats=None):
     """Genera PDF por nivel con tabla completa filtrada"""
     if isinstance(data, list) and len(data) > 0:
@@ -528,10 +535,12 @@ def generate_level_pdf(data, level, summary_stats=None):
     
     return create_executive_pdf(data, f"🎯 Análisis Nivel Académico {level}")
 
+@timed("pdf_completo")
 def generate_complete_pdf(data, academic_level=None, summary_stats=None):
     """Genera PDF completo con todas las columnas en orientación horizontal"""
     return create_complete_pdf(data, "📋 Reporte Completo - Análisis Integral")
 
+@timed("pdf_graficos")
 def generate_charts_pdf(data, academic_level=None, summary_stats=None):
     """Genera PDF con SOLO gráficos y análisis visual (sin tablas)"""
     return create_pure_charts_pdf(data, "📈 Análisis Visual Completo - Solo Gráficos")
\ No newline at end of file
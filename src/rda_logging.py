@@ -0,0 +1,114 @@
+"""
+Registro (logging) de la herramienta: configuración única y traza muestreada por RdA.
+
+- configure_logging(): configura el logging raíz una sola vez, desde el punto de
+  entrada (app, servicio, CLI). Los módulos de análisis no llaman a basicConfig.
+  El nivel se toma de RDA_LOG_LEVEL (por defecto INFO).
+- Traza por fila: los analizadores no registran nada por RdA en modo normal.
+  Con RDA_TRACE=1 emiten eventos estructurados (evento + campos) para una
+  muestra determinista de filas: RDA_TRACE_SAMPLE=0.01 traza ~1% de los RdAs
+  (por defecto, todos). El muestreo se decide por hash del texto, de modo que
+  la misma fila se traza siempre.
+
+Con la traza desactivada, cada punto de traza solo paga la llamada a trace(),
+que comprueba is_tracing() antes de emitir; los campos no se formatean.
+"""
+
+import logging
+import os
+import threading
+import zlib
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_TRUE_VALUES = ("1", "true", "si", "sí")
+
+_trace_enabled = os.environ.get("RDA_TRACE", "").lower() in _TRUE_VALUES
+try:
+    _sample_rate = min(1.0, max(0.0, float(os.environ.get("RDA_TRACE_SAMPLE", "1"))))
+except ValueError:
+    _sample_rate = 1.0
+
+_row = threading.local() # Decisión de muestreo de la fila en curso (por hilo)
+
+
+def configure_logging(level=None):
+    """
+    Configura el logging raíz (formato común) si aún no tiene handlers.
+
+    Args:
+        level: Nivel (nombre o número). Por defecto RDA_LOG_LEVEL o INFO.
+    """
+    level = level or os.environ.get("RDA_LOG_LEVEL", "INFO")
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            level = logging.INFO
+    logging.basicConfig(level=level, format=LOG_FORMAT)
+
+
+def enable_trace(sample_rate=1.0):
+    """Activa la traza por fila para una fracción `sample_rate` (0..1) de los RdAs."""
+    global _trace_enabled, _sample_rate
+    _sample_rate = min(1.0, max(0.0, float(sample_rate)))
+    _trace_enabled = True
+
+
+def disable_trace():
+    global _trace_enabled
+    _trace_enabled = False
+
+
+def is_trace_enabled() -> bool:
+    return _trace_enabled
+
+
+def begin_row(key) -> bool:
+    """
+    Marca el inicio del análisis de una fila y decide si se traza.
+    Devuelve True si la fila forma parte de la muestra.
+    """
+    if not _trace_enabled:
+        return False
+    sampled = _sample_rate >= 1.0 or (
+        zlib.crc32(str(key).encode("utf-8")) / 0xFFFFFFFF < _sample_rate
+    )
+    _row.sampled = sampled
+    return sampled
+
+
+def end_row():
+    """Marca el final de la fila en curso."""
+    if _trace_enabled:
+        _row.sampled = None
+
+
+def is_tracing() -> bool:
+    """True si la fila en curso debe trazarse (fuera de una fila: solo con muestreo total)."""
+    if not _trace_enabled:
+        return False
+    sampled = getattr(_row, "sampled", None)
+    return _sample_rate >= 1.0 if sampled is None else sampled
+
+
+class _Fields:
+    """Campos de un evento; se formatean solo si un handler emite el registro."""
+
+    __slots__ = ("fields",)
+
+    def __init__(self, fields):
+        self.fields = fields
+
+    def __str__(self):
+        return " ".join(f"{name}={value!r}" for name, value in self.fields.items())
+
+
+def trace(logger, event, **fields):
+    """
+    Emite un evento de traza estructurado (nivel INFO) si la fila en curso se traza.
+    Los campos quedan también en el registro como `rda_event` / `rda_fields`.
+    """
+    if not is_tracing():
+        return
+    logger.info("[traza] %s %s", event, _Fields(fields),
+                extra={"rda_event": event, "rda_fields": fields})
@@ -0,0 +1,416 @@
+"""
+Pipeline de análisis por RdA.
+
+Ejecuta todos los analizadores sobre un Resultado de Aprendizaje y construye el
+registro de resultados (mismas columnas que muestra la interfaz y que consumen
+las exportaciones Excel/PDF).
+"""
+
+import logging
+import threading
+
+from src.nlp_utils import clean_text
+from src.bloom_analyzer import analyze_bloom_level, check_appropriateness
+from src.verificability_analyzer import (check_verificability, score_verificability_features,
+                                        build_verificability_result)
+from src.correction_analyzer import check_correction
+from src.authenticity_analyzer import (check_authenticity, PROFESSIONAL_KEYWORDS, get_keyword_index,
+                                       score_authenticity_features, build_authenticity_result)
+from src.knowledge_analyzer import check_knowledge_dimension, score_knowledge_features, build_knowledge_result
+from src.features import extract_features, extract_feature_rows, build_feature_table
+from src.instrumentation import timed, timed_block
+from src.rda_logging import begin_row, end_row, trace
+from src.rule_packs import get_rule_pack
+from src.parse_cache import get_parse_cache
+from src.result_cache import analysis_signature, result_key
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Mapeo de Nivel de Bloom a Número
+LEVEL_TO_NUMBER = {
+    'recordar': 1, 'comprender': 2, 'aplicar': 3,
+    'analizar': 4, 'evaluar': 5, 'crear': 6
+}
+
+
+def parse_variants(objective_text):
+    """
+    Variantes de texto que procesan los analizadores: clean_text (Bloom),
+    minúsculas (Verificabilidad, Autenticidad, Conocimiento) y original (Corrección).
+    """
+    return clean_text(objective_text), objective_text.lower(), objective_text
+
+
+def parse_rda_texts(texts, nlp_model, batch_size=64, parse_cache=None):
+    """
+    Procesa en lote con nlp.pipe todas las variantes de texto necesarias para
+    analizar `texts`. Cada cadena distinta se procesa una sola vez.
+
+    Si hay caché de análisis (parse_cache, o la de RDA_PARSE_CACHE; ver
+    src/parse_cache.py), los Docs ya guardados se recuperan de ella y solo se
+    procesan y guardan los que faltan.
+
+    Returns:
+        Diccionario cadena -> Doc spaCy.
+    """
+    unique_strings = list(dict.fromkeys(
+        variant for text in texts if text and isinstance(text, str)
+        for variant in parse_variants(normalize_rda_text(text)) if variant
+    ))
+    parse_cache = parse_cache or get_parse_cache(nlp_model)
+    docs = {}
+    if parse_cache is not None:
+        try:
+            with timed_block("parse_cache_get"):
+                docs = parse_cache.get_many(unique_strings)
+        except Exception as e:
+            logger.error("Error leyendo la caché de análisis: %s", e, exc_info=True)
+    missing = [text for text in unique_strings if text not in docs]
+    with timed_block("spacy_pipe"):
+        parsed = dict(zip(missing, nlp_model.pipe(missing, batch_size=batch_size)))
+    if parse_cache is not None and parsed:
+        try:
+            with timed_block("parse_cache_put"):
+                parse_cache.put_many(parsed)
+        except Exception as e:
+            logger.error("Error guardando en la caché de análisis: %s", e, exc_info=True)
+    docs.update(parsed)
+    return docs
+
+
+def normalize_rda_text(objective_text):
+    """
+    Texto normalizado de un RdA (espacios colapsados y sin espacios en los extremos).
+    Es la clave de deduplicación de los lotes y el texto que procesan los analizadores.
+    """
+    return " ".join(objective_text.split())
+
+
+@timed("analyze_rda_text")
+def analyze_rda_text(objective_text, nlp_model, professional_keywords=None, docs=None,
+                     features=None, feature_scores=None):
+    """
+    Ejecuta los analizadores que no dependen del nivel académico (Bloom,
+    Verificabilidad, Corrección, Autenticidad y Conocimiento) sobre un texto ya
+    normalizado. El resultado se puede reutilizar en todas las filas con el mismo texto.
+
+    Args:
+        objective_text: Texto normalizado del RdA (ver normalize_rda_text).
+        nlp_model: El modelo de lenguaje spaCy cargado.
+        professional_keywords: Keywords de contexto profesional (por defecto PROFESSIONAL_KEYWORDS).
+        docs: Diccionario cadena -> Doc ya procesado (ver parse_rda_texts). Si es None,
+              cada analizador procesa el texto por su cuenta.
+        features: Características del Doc en minúsculas (ver src/features.py). Si es None
+                  y hay Doc, se extraen una vez para Verificabilidad, Autenticidad y Conocimiento.
+        feature_scores: Puntuaciones ya calculadas sobre la tabla del lote (ver
+                        score_feature_table); requiere `features`.
+
+    Returns:
+        Diccionario analizador -> resultado ('bloom', 'verificability', 'correction',
+        'authenticity', 'knowledge').
+    """
+    if professional_keywords is None:
+        professional_keywords = PROFESSIONAL_KEYWORDS
+
+    cleaned_doc = lower_doc = original_doc = None
+    if docs is not None:
+        cleaned_text, lower_text, original_text = parse_variants(objective_text)
+        cleaned_doc, lower_doc, original_doc = docs.get(cleaned_text), docs.get(lower_text), docs.get(original_text)
+
+    # 1. Analizar Nivel de Bloom (Proceso Cognitivo)
+    bloom_result = analyze_bloom_level(objective_text, doc=cleaned_doc)
+
+    # Características compartidas por Verificabilidad, Autenticidad y Conocimiento
+    if features is None and lower_doc is not None:
+        features = extract_features(lower_doc, get_rule_pack(), get_keyword_index(professional_keywords))
+
+    # 3. Evaluar Verificabilidad
+    if feature_scores is not None:
+        verificability_result = build_verificability_result(features, feature_scores['verificability'])
+    else:
+        verificability_result = check_verificability(objective_text, nlp_model, doc=lower_doc, features=features)
+
+    # 4. Evaluar Corrección
+    correction_result = check_correction(objective_text, nlp_model, doc=original_doc)
+
+    # 5. Evaluar Autenticidad
+    if feature_scores is not None:
+        authenticity_result = build_authenticity_result(features, feature_scores['authenticity'])
+    else:
+        authenticity_result = check_authenticity(objective_text, nlp_model, professional_keywords,
+                                                 doc=lower_doc, features=features)
+
+    # 6. Evaluar Dimensión del Conocimiento
+    if feature_scores is not None:
+        knowledge_result = build_knowledge_result(features, feature_scores['knowledge'])
+    else:
+        knowledge_result = check_knowledge_dimension(objective_text, nlp_model, doc=lower_doc, features=features)
+
+    return {
+        'bloom': bloom_result,
+        'verificability': verificability_result,
+        'correction': correction_result,
+        'authenticity': authenticity_result,
+        'knowledge': knowledge_result,
+    }
+
+
+def build_rda_result(objective_text, ra_academic_level, text_analysis):
+    """
+    Construye el registro de resultados de una fila a partir del análisis de su
+    texto (ver analyze_rda_text). Solo la adecuación depende del nivel académico.
+    """
+    bloom_result = text_analysis['bloom']
+    verificability_result = text_analysis['verificability']
+    correction_result = text_analysis['correction']
+    authenticity_result = text_analysis['authenticity']
+    knowledge_result = text_analysis['knowledge']
+
+    original_level = bloom_result.get('level', 'Error')
+    verb = bloom_result.get('verb', 'N/A')
+    error_bloom = bloom_result.get('error')
+    level_number = LEVEL_TO_NUMBER.get(original_level.lower(), '')
+    formatted_level = f"{original_level} ({level_number})" if level_number else original_level
+
+    # 2. Evaluar Adecuación vs Nivel Académico
+    appropriateness = check_appropriateness(original_level, str(ra_academic_level))
+
+    result = {
+        "RA": objective_text,
+        "Nivel Académico Origen": ra_academic_level,
+        "Verbo Principal": verb,
+        "Nivel Bloom Original": original_level,
+        "Nivel Bloom Detectado": formatted_level,
+        "Clasificación vs Nivel Origen": appropriateness,
+        "Puntaje Observable": verificability_result.get('observable_score', 0),
+        "Puntaje Medible": verificability_result.get('measurable_score', 0),
+        "Puntaje Evaluable": verificability_result.get('evaluability_score', 0),
+        "Puntaje Corrección": correction_result.get('correction_score', 0),
+        "Autenticidad Acción": authenticity_result.get('action_score', 1),
+        "Autenticidad Contexto": authenticity_result.get('context_score', 1),
+        "Autenticidad Sentido": authenticity_result.get('meaning_score', 1),
+        "Conocimiento Factual": knowledge_result.get('factual_score', 1),
+        "Conocimiento Conceptual": knowledge_result.get('conceptual_score', 1),
+        "Conocimiento Procedimental": knowledge_result.get('procedural_score', 1),
+        "Conocimiento Metacognitivo": knowledge_result.get('metacognitive_score', 1),
+        "Notas Corrección": correction_result.get('correction_notes', ''),
+        "Notas Autenticidad": authenticity_result.get('authenticity_notes', ''),
+        "Notas Conocimiento": knowledge_result.get('knowledge_notes', ''),
+        "Error Bloom": error_bloom
+    }
+    if bloom_result.get('approximate_verb'):
+        # Solo con búsqueda aproximada de verbos (RDA_FUZZY_VERBS): verbo de la taxonomía usado
+        result["Verbo Aproximado"] = (f"{bloom_result['approximate_verb']} "
+                                      f"(distancia {bloom_result['approximate_distance']})")
+    trace(logger, "rda.resultado", verbo=verb, nivel_bloom=original_level, adecuacion=appropriateness,
+          correccion=result["Puntaje Corrección"])
+    return result
+
+
+@timed("analyze_rda")
+def analyze_rda(objective_text, ra_academic_level, nlp_model, professional_keywords=None, docs=None,
+                features=None, feature_scores=None, text_analysis=None):
+    """
+    Analiza un RdA con todos los criterios y devuelve el diccionario de resultados.
+
+    Args:
+        objective_text: Texto del Resultado de Aprendizaje.
+        ra_academic_level: Nivel académico asociado al RdA (ej: '2', '4', '6', '8').
+        nlp_model: El modelo de lenguaje spaCy cargado.
+        professional_keywords: Keywords de contexto profesional (por defecto PROFESSIONAL_KEYWORDS).
+        docs, features, feature_scores: Ver analyze_rda_text.
+        text_analysis: Análisis ya calculado del mismo texto normalizado (ver
+                       analyze_rda_text); si se indica, solo se evalúa la adecuación.
+
+    Returns:
+        Un diccionario con las columnas de resultados, o None si la entrada es inválida.
+    """
+    if not objective_text or not isinstance(objective_text, str):
+        logger.warning("Saltando entrada inválida: %r", objective_text)
+        return None
+    normalized_text = normalize_rda_text(objective_text)
+    # Traza por fila (solo con RDA_TRACE=1, para la muestra de filas configurada)
+    traced = begin_row(normalized_text)
+    if traced:
+        trace(logger, "rda.inicio", texto=objective_text, nivel=ra_academic_level)
+    try:
+        if text_analysis is None:
+            text_analysis = analyze_rda_text(normalized_text, nlp_model, professional_keywords, docs=docs,
+                                             features=features, feature_scores=feature_scores)
+        return build_rda_result(objective_text, ra_academic_level, text_analysis)
+    finally:
+        end_row()
+
+
+def make_row_analyzer(nlp_model, professional_keywords=None, result_cache=None, model_pool=None):
+    """
+    Función (texto_ra, nivel_academico) -> resultado para analizar filas de una en
+    una (p. ej. en un AnalysisJob) que analiza cada texto normalizado una sola vez:
+    las filas repetidas (mismo RdA en varias secciones o niveles) reutilizan el
+    análisis y solo evalúan su adecuación.
+
+    Con `result_cache` (ver src/result_cache.py) el análisis de cada texto se
+    busca primero en la caché compartida entre sesiones y se guarda en ella.
+    Con `model_pool` (ver src/model_pool.py) los textos nuevos se procesan con
+    una instancia del modelo prestada por el pool en lugar de con `nlp_model`.
+
+    La función tiene además `prepare(textos)`: analiza por adelantado, en un solo
+    lote (un nlp.pipe y una escritura en las cachés), los textos de las próximas
+    filas; AnalysisJob la llama al empezar cada turno.
+    """
+    analyses = {} # Texto normalizado -> análisis (vive lo que viva la función, p. ej. un trabajo)
+    lock = threading.Lock()
+    signature = analysis_signature(nlp_model, professional_keywords) if result_cache is not None else None
+
+    def parse_and_analyze(keys, model):
+        docs = parse_rda_texts(keys, model)
+        return {key: analyze_rda_text(key, model, professional_keywords, docs=docs) for key in keys}
+
+    def analyze_texts(keys):
+        """Análisis de los textos normalizados: memoria del trabajo, caché compartida y, en lote, spaCy."""
+        with lock:
+            missing = [key for key in dict.fromkeys(keys) if key not in analyses]
+        if not missing:
+            return
+        found = {}
+        if result_cache is not None:
+            cache_keys = {key: result_key(signature, key) for key in missing}
+            cached = result_cache.get_many(cache_keys.values())
+            found = {key: cached[cache_key] for key, cache_key in cache_keys.items() if cache_key in cached}
+            missing = [key for key in missing if key not in found]
+        if missing:
+            if model_pool is not None:
+                with model_pool.model() as pooled_model:
+                    parsed = parse_and_analyze(missing, pooled_model)
+            else:
+                parsed = parse_and_analyze(missing, nlp_model)
+            if result_cache is not None:
+                result_cache.put_many({cache_keys[key]: analysis for key, analysis in parsed.items()})
+            found.update(parsed)
+        with lock:
+            analyses.update(found)
+
+    def prepare(texts):
+        analyze_texts([normalize_rda_text(text) for text in texts if text and isinstance(text, str)])
+
+    def analyze_row(objective_text, ra_academic_level):
+        if not objective_text or not isinstance(objective_text, str):
+            return analyze_rda(objective_text, ra_academic_level, nlp_model, professional_keywords)
+        key = normalize_rda_text(objective_text)
+        analyze_texts([key])
+        with lock:
+            text_analysis = analyses[key]
+        return analyze_rda(objective_text, ra_academic_level, nlp_model, professional_keywords,
+                           text_analysis=text_analysis)
+
+    analyze_row.prepare = prepare
+    return analyze_row
+
+
+def analyze_cached_rows(rows, nlp_model, professional_keywords=None, result_cache=None):
+    """
+    Resultados de las filas cuyo texto ya está en la caché compartida (sin
+    procesar nada con spaCy; solo se evalúa la adecuación de cada fila).
+
+    Args:
+        rows: Lista de tuplas (clave, texto_ra, nivel_academico), como en AnalysisJob.
+        result_cache: Caché de resultados (ver src/result_cache.py); sin ella no hay resultados.
+
+    Returns:
+        Diccionario clave -> resultado de las filas encontradas.
+    """
+    if result_cache is None or not rows:
+        return {}
+    signature = analysis_signature(nlp_model, professional_keywords)
+    keys = {row_key: result_key(signature, normalize_rda_text(text))
+            for row_key, text, _ in rows if text and isinstance(text, str)}
+    cached = result_cache.get_many(keys.values())
+    return {row_key: analyze_rda(text, level, nlp_model, professional_keywords,
+                                 text_analysis=cached[keys[row_key]])
+            for row_key, text, level in rows if keys.get(row_key) in cached}
+
+
+def analyze_rda_batch(items, nlp_model, professional_keywords=None, batch_size=64):
+    """
+    Analiza un lote de RdAs procesando todos los textos con una sola llamada a nlp.pipe.
+
+    Las filas se agrupan por texto normalizado: los analizadores independientes del
+    nivel se ejecutan una vez por texto distinto y solo la adecuación se evalúa por fila.
+
+    Args:
+        items: Lista de tuplas (texto_ra, nivel_academico).
+        nlp_model: El modelo de lenguaje spaCy cargado.
+        professional_keywords: Keywords de contexto profesional (por defecto PROFESSIONAL_KEYWORDS).
+        batch_size: Tamaño de lote para nlp.pipe.
+
+    Returns:
+        Lista de resultados en el mismo orden que items (None para entradas inválidas).
+    """
+    if professional_keywords is None:
+        professional_keywords = PROFESSIONAL_KEYWORDS
+    unique_texts = list(dict.fromkeys(
+        normalize_rda_text(text) for text, _ in items if text and isinstance(text, str)
+    ))
+    unique_texts = [text for text in unique_texts if text]
+    if len(unique_texts) < len(items):
+        logger.info("Lote de %d RdAs con %d textos distintos", len(items), len(unique_texts))
+    docs = parse_rda_texts(unique_texts, nlp_model, batch_size=batch_size)
+
+    # Tabla de características del lote (una fila por texto en minúsculas distinto) y puntuaciones vectorizadas
+    lower_texts = list(dict.fromkeys(text.lower() for text in unique_texts))
+    row_features, row_scores = {}, {}
+    try:
+        with timed_block("feature_table"):
+            feature_rows = extract_feature_rows([docs[text] for text in lower_texts], get_rule_pack(),
+                                                get_keyword_index(professional_keywords))
+            table = build_feature_table(feature_rows)
+        with timed_block("feature_scoring"):
+            scores = score_feature_table(table)
+        row_features = dict(zip(lower_texts, feature_rows))
+        row_scores = dict(zip(lower_texts, scores))
+    except Exception as e:
+        # Sin tabla, cada RdA se puntúa por separado (los analizadores informan del error por fila)
+        logger.error("Error construyendo la tabla de características del lote: %s", e, exc_info=True)
+
+    # Análisis independiente del nivel: una vez por texto normalizado distinto
+    text_analyses = {}
+    for text in unique_texts:
+        begin_row(text)
+        try:
+            text_analyses[text] = analyze_rda_text(text, nlp_model, professional_keywords, docs=docs,
+                                                   features=row_features.get(text.lower()),
+                                                   feature_scores=row_scores.get(text.lower()))
+        finally:
+            end_row()
+
+    # Adecuación por fila, en el orden original
+    results = []
+    for text, level in items:
+        text_analysis = text_analyses.get(normalize_rda_text(text)) if text and isinstance(text, str) else None
+        results.append(analyze_rda(text, level, nlp_model, professional_keywords, docs=docs,
+                                   text_analysis=text_analysis))
+    return results
+
+
+def score_feature_table(table):
+    """
+    Puntuaciones de Verificabilidad, Autenticidad y Conocimiento de todas las
+    filas de la tabla de características, con una operación por columna.
+
+    Returns:
+        Lista (una entrada por fila) de diccionarios analizador -> puntuaciones (int).
+    """
+    if table.empty:
+        return []
+    by_analyzer = {
+        'verificability': score_verificability_features(table),
+        'authenticity': score_authenticity_features(table),
+        'knowledge': score_knowledge_features(table),
+    }
+    columns = {analyzer: {name: values.tolist() for name, values in scores.items()}
+               for analyzer, scores in by_analyzer.items()}
+    return [
+        {analyzer: {name: values[i] for name, values in scores.items()} for analyzer, scores in columns.items()}
+        for i in range(len(table))
+    ]
@@ -0,0 +1,277 @@
+"""
+Caché de resultados compartida entre sesiones (todas las sesiones de Streamlit del proceso).
+
+Guarda el análisis de cada texto normalizado (analyze_rda_text: Bloom,
+Verificabilidad, Corrección, Autenticidad y Conocimiento), que no depende del
+nivel académico; la adecuación se sigue evaluando por fila. La clave combina el
+texto con la firma del análisis (analysis_signature): modelo spaCy, versión del
+paquete de reglas, keywords profesionales, taxonomía de Bloom, búsqueda
+aproximada de verbos y código de los analizadores (hash de los módulos de
+ANALYZER_MODULES). Cambiar cualquiera de ellos cambia la clave, de modo que
+nunca se reutilizan resultados calculados con otras reglas u otras heurísticas.
+
+- Memoria: LRU acotado por número de entradas y por tamaño aproximado (bytes
+  del pickle), con caducidad (TTL). Segura entre hilos.
+- Disco (opcional): SQLite con los resultados serializados; sobrevive a los
+  reinicios y la comparten los procesos que usen el mismo archivo. Un acierto
+  en disco se copia a memoria.
+
+Configuración (variables de entorno):
+    RDA_RESULT_CACHE_ENTRIES   entradas en memoria (por defecto 20000; 0 desactiva la caché)
+    RDA_RESULT_CACHE_MB        tamaño máximo en memoria (por defecto 128 MB)
+    RDA_RESULT_CACHE_TTL       caducidad en segundos (por defecto 86400)
+    RDA_RESULT_CACHE_PATH      archivo SQLite del nivel en disco (sin definir: solo memoria)
+
+Los aciertos/fallos se consultan con instrumentation.counters() (fuente "result_cache").
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+try:
+    from src.parse_cache import model_signature
+    from src.rule_packs import get_rule_pack
+    from src.lexicon_artifact import keywords_digest
+    from src.fuzzy_verbs import fuzzy_max_distance
+    from src.bloom_analyzer import cached_load_bloom_taxonomy
+    from src.authenticity_analyzer import PROFESSIONAL_KEYWORDS
+    from src import instrumentation
+except ImportError: # Ejecución directa del módulo (python src/...)
+    from parse_cache import model_signature
+    from rule_packs import get_rule_pack
+    from lexicon_artifact import keywords_digest
+    from fuzzy_verbs import fuzzy_max_distance
+    from bloom_analyzer import cached_load_bloom_taxonomy
+    from authenticity_analyzer import PROFESSIONAL_KEYWORDS
+    import instrumentation
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+RESULT_FORMAT = 1 # Cambiar si cambia la forma de los resultados guardados
+DEFAULT_MAX_ENTRIES = 20000
+DEFAULT_MAX_MB = 128
+DEFAULT_TTL = 86400
+_SQL_CHUNK = 500 # Parámetros por consulta (límite de variables de SQLite)
+
+# Módulos cuyo código determina el análisis guardado (analyze_rda_text y lo que usa)
+ANALYZER_MODULES = (
+    "rda_pipeline", "bloom_analyzer", "verificability_analyzer", "correction_analyzer", "authenticity_analyzer",
+    "knowledge_analyzer", "features", "lemma_decisions", "level_phrases", "verb_frame", "fuzzy_verbs", "notes",
+    "nlp_utils",
+)
+_SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    created REAL NOT NULL
+);
+"""
+
+_taxonomy_digests: Dict[int, tuple] = {}
+
+
+def _taxonomy_digest(verb_map) -> str:
+    cached = _taxonomy_digests.get(id(verb_map))
+    if cached is None or cached[0] is not verb_map:
+        canonical = json.dumps(verb_map if isinstance(verb_map, dict) else {}, ensure_ascii=False, sort_keys=True)
+        cached = (verb_map, hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:12])
+        _taxonomy_digests[id(verb_map)] = cached
+    return cached[1]
+
+
+@functools.lru_cache(maxsize=1)
+def code_digest() -> str:
+    """Hash del código fuente de los analizadores (cambia con cualquier cambio de heurística)."""
+    digest = hashlib.sha256()
+    for name in ANALYZER_MODULES:
+        try:
+            with open(os.path.join(_SRC_DIR, f"{name}.py"), "rb") as f:
+                digest.update(f.read())
+        except OSError: # Instalación sin fuentes: solo cuenta RESULT_FORMAT
+            digest.update(name.encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+def analysis_signature(nlp_model, professional_keywords=None) -> str:
+    """Firma de todo lo que determina el análisis de un texto (ver el docstring del módulo)."""
+    return "|".join((
+        f"v{RESULT_FORMAT}",
+        f"codigo={code_digest()}",
+        model_signature(nlp_model),
+        get_rule_pack().version,
+        keywords_digest(professional_keywords or PROFESSIONAL_KEYWORDS),
+        _taxonomy_digest(cached_load_bloom_taxonomy()),
+        f"fuzzy={fuzzy_max_distance()}",
+    ))
+
+
+def result_key(signature: str, text: str) -> str:
+    return hashlib.sha256(f"{signature}\0{text}".encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Caché de análisis por texto: LRU en memoria (entradas, bytes y TTL) y nivel
+    opcional en disco (SQLite).
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024,
+                 ttl: float = DEFAULT_TTL, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.path = path
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict() # clave -> (caduca, bytes, resultado)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.memory_hits = self.disk_hits = self.misses = self.evictions = 0
+        self._conn = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute("DELETE FROM results WHERE created < ?", (time.time() - ttl,))
+            self._conn.commit()
+
+    def _store(self, key: str, data: bytes, value, created: float):
+        """Añade a memoria (con el lock tomado) y expulsa las entradas menos usadas si se superan los límites."""
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous[1]
+        if len(data) > self.max_bytes:
+            return
+        self._entries[key] = (created + self.ttl, len(data), value)
+        self._bytes += len(data)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, size, _) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, object]:
+        """Resultados vigentes de las claves indicadas (clave -> resultado); las que faltan no aparecen."""
+        now = time.time()
+        found, missing = {}, []
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(key)
+                    found[key] = entry[2]
+                    self.memory_hits += 1
+                else:
+                    if entry is not None: # Caducada
+                        self._entries.pop(key)
+                        self._bytes -= entry[1]
+                    missing.append(key)
+            if self._conn is not None and missing:
+                for start in range(0, len(missing), _SQL_CHUNK):
+                    chunk = missing[start:start + _SQL_CHUNK]
+                    rows = self._conn.execute(
+                        f"SELECT key, data, created FROM results WHERE created >= ? AND key IN ({','.join('?' * len(chunk))})",
+                        [now - self.ttl, *chunk]).fetchall()
+                    for key, data, created in rows:
+                        value = pickle.loads(data)
+                        self._store(key, data, value, created)
+                        found[key] = value
+                        self.disk_hits += 1
+            self.misses += sum(1 for key in missing if key not in found)
+        return found
+
+    def get(self, key: str):
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: Dict[str, object]):
+        """Guarda los resultados (clave -> resultado) en memoria y, si lo hay, en disco."""
+        now = time.time()
+        serialized = {key: pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL) for key, value in items.items()}
+        with self._lock:
+            for key, data in serialized.items():
+                self._store(key, data, items[key], now)
+            if self._conn is not None and serialized:
+                self._conn.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                                       [(key, data, now) for key, data in serialized.items()])
+                self._conn.commit()
+
+    def put(self, key: str, value):
+        self.put_many({key: value})
+
+    def counters(self) -> dict:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            total = hits + self.misses
+            return {"aciertos": hits, "aciertos_disco": self.disk_hits, "fallos": self.misses,
+                    "tasa_acierto": round(hits / total, 4) if total else None, "expulsadas": self.evictions,
+                    "entradas": len(self._entries), "bytes": self._bytes}
+
+    def reset_counters(self):
+        with self._lock:
+            self.memory_hits = self.disk_hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        stats = self.counters()
+        stats.update({"max_entradas": self.max_entries, "max_bytes": self.max_bytes, "ttl_s": self.ttl,
+                      "ruta": self.path})
+        if self._conn is not None:
+            with self._lock:
+                stats["entradas_disco"] = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return stats
+
+    def clear(self):
+        """Vacía la memoria y el disco."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM results")
+                self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_cache: Optional[ResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """
+    Caché de resultados del proceso (configurada con las variables RDA_RESULT_CACHE_*),
+    o None si está desactivada (RDA_RESULT_CACHE_ENTRIES=0).
+    """
+    global _cache
+    if _cache is None:
+        max_entries = int(_env_number("RDA_RESULT_CACHE_ENTRIES", DEFAULT_MAX_ENTRIES))
+        if max_entries <= 0:
+            return None
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResultCache(max_entries, int(_env_number("RDA_RESULT_CACHE_MB", DEFAULT_MAX_MB) * 1024 * 1024),
+                                     _env_number("RDA_RESULT_CACHE_TTL", DEFAULT_TTL),
+                                     os.environ.get("RDA_RESULT_CACHE_PATH") or None)
+                instrumentation.register_counters("result_cache", _cache)
+                logger.info("Caché de resultados compartida: %d entradas, %.0f MB, TTL %.0f s%s", _cache.max_entries,
+                            _cache.max_bytes / 1024 / 1024, _cache.ttl, f", disco {_cache.path}" if _cache.path else "")
+    return _cache
@@ -0,0 +1,263 @@
+"""
+Paquetes de reglas (léxicos) de los analizadores.
+
+Un paquete de reglas es un JSON (data/rule_packs/<nombre>.json) con los léxicos
+de Verificabilidad, Corrección, Conocimiento y Autenticidad. Se carga y compila
+una sola vez: cada léxico queda como frozenset de términos normalizados
+(NFKC, minúsculas, espacios simples) y se construye un índice
+lema -> léxicos que lo contienen, de modo que cambiar de paquete no requiere
+cambios de código ni añade coste por RdA.
+
+Cada paquete lleva un hash de versión (SHA-256 del contenido compilado) que
+identifica qué reglas produjeron un resultado.
+
+Selección del paquete: variable de entorno RDA_RULE_PACK (nombre de un paquete
+en data/rule_packs/ o ruta a un archivo .json); por defecto "default".
+Un paquete puede declarar "extiende": "<nombre>" y redefinir solo algunos léxicos.
+
+Si hay un artefacto de léxicos prelematizados para el paquete (ver
+src/lexicon_artifact.py), los léxicos se consultan en él en lugar de en frozensets.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import unicodedata
+from typing import Dict, FrozenSet, Iterable, Optional
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+RULE_PACKS_DIR = os.path.join(os.path.dirname(CURRENT_DIR), 'data', 'rule_packs')
+DEFAULT_RULE_PACK = "default"
+
+# Sección -> léxico del JSON -> atributo del RulePack compilado
+LEXICONS = {
+    "verificabilidad": {
+        "verbos_observables": "observable_verbs",
+        "verbos_internos": "internal_verbs",
+        "sustantivos_concretos": "concrete_nouns",
+        "sustantivos_abstractos": "abstract_nouns",
+        "indicadores_medida": "measurement_keywords",
+        "terminos_subjetivos": "subjective_keywords",
+    },
+    "correccion": {
+        "palabras_vagas": "vague_words",
+        "iniciadores_nivel": "level_indicator_starters",
+    },
+    "conocimiento": {
+        "factual": "factual_keywords",
+        "conceptual": "conceptual_keywords",
+        "procedimental": "procedural_keywords",
+        "metacognitivo": "metacognitive_keywords",
+        "autorreferencia": "self_reference_words",
+    },
+    "autenticidad": {
+        "verbos_accion_alta": "action_verbs_high",
+        "verbos_accion_media": "action_verbs_medium",
+        "verbos_accion_baja": "action_verbs_low",
+        "adverbios_aplicacion": "application_adverbs",
+    },
+}
+
+
+def normalize_lemma(term: str) -> str:
+    """Forma normalizada de un término del léxico (NFKC, minúsculas, espacios simples)."""
+    return " ".join(unicodedata.normalize("NFKC", term).lower().split())
+
+
+class PhraseIndex:
+    """
+    Índice de términos de una o varias palabras indexados por su primer lema.
+
+    match() recorre una secuencia de lemas una sola vez: en cada posición solo
+    se comparan los términos que empiezan por ese lema, de modo que el coste no
+    depende del tamaño de los léxicos y no hay coincidencias dentro de palabras
+    (p. ej. "plan" no coincide con "planificación").
+    """
+
+    __slots__ = ("_by_first",)
+
+    def __init__(self, labeled_terms: Dict[str, Iterable[str]]):
+        """
+        Args:
+            labeled_terms: etiqueta (p. ej. atributo del léxico) -> términos normalizados.
+        """
+        by_first: Dict[str, Dict[tuple, set]] = {}
+        for label, terms in labeled_terms.items():
+            for term in terms:
+                words = tuple(term.split())
+                if words:
+                    by_first.setdefault(words[0], {}).setdefault(words, set()).add(label)
+        # Por primer lema: tuplas (palabras restantes, etiquetas), las más largas primero
+        self._by_first = {
+            first: tuple((words[1:], frozenset(labels))
+                         for words, labels in sorted(phrases.items(), key=lambda kv: -len(kv[0])))
+            for first, phrases in by_first.items()
+        }
+
+    def match(self, lemmas) -> Dict[str, set]:
+        """Etiqueta -> términos encontrados en la secuencia de lemas."""
+        lemmas = lemmas if isinstance(lemmas, (list, tuple)) else list(lemmas)
+        by_first = self._by_first
+        found: Dict[str, set] = {}
+        for i, lemma in enumerate(lemmas):
+            candidates = by_first.get(lemma)
+            if not candidates:
+                continue
+            for rest, labels in candidates:
+                if rest and tuple(lemmas[i + 1:i + 1 + len(rest)]) != rest:
+                    continue
+                term = " ".join((lemma,) + rest)
+                for label in labels:
+                    found.setdefault(label, set()).add(term)
+        return found
+
+
+class RulePack:
+    """Paquete de reglas compilado (inmutable una vez construido)."""
+
+    def __init__(self, config: dict, source: Optional[str] = None):
+        self.name = config.get("nombre", DEFAULT_RULE_PACK)
+        self.description = config.get("descripcion", "")
+        self.source = source
+
+        compiled = {}
+        for section, lexicons in LEXICONS.items():
+            section_config = config.get(section, {})
+            for key, attribute in lexicons.items():
+                terms = frozenset(normalize_lemma(term) for term in section_config.get(key, []) if term.strip())
+                compiled[attribute] = terms
+                setattr(self, attribute, terms)
+        self.min_reasonable_length = int(config.get("correccion", {}).get("longitud_minima", 5))
+        # Patrones del Matcher de spaCy para frases de nivel/condición (ver src/level_phrases.py)
+        self.level_phrase_patterns = tuple(config.get("correccion", {}).get("patrones_nivel", []))
+        self.lexicon_artifact = None # Artefacto de léxicos prelematizados (ver src/lexicon_artifact.py)
+
+        # Índice lema -> atributos de los léxicos que lo contienen
+        lemma_index: Dict[str, set] = {}
+        for attribute, terms in compiled.items():
+            for term in terms:
+                lemma_index.setdefault(term, set()).add(attribute)
+        self.lemma_index: Dict[str, FrozenSet[str]] = {term: frozenset(attrs) for term, attrs in lemma_index.items()}
+        # Sustantivos concretos/abstractos (con entradas de varias palabras) para clasificar objetos
+        self.object_noun_index = PhraseIndex({
+            "concrete_nouns": self.concrete_nouns, "abstract_nouns": self.abstract_nouns,
+        })
+
+        canonical = json.dumps({attribute: sorted(terms) for attribute, terms in compiled.items()}
+                               | {"min_reasonable_length": self.min_reasonable_length,
+                                  "level_phrase_patterns": self.level_phrase_patterns},
+                               ensure_ascii=False, sort_keys=True)
+        self.version = hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:12]
+
+    def match_lemmas(self, lemmas: Iterable[str]) -> Dict[str, set]:
+        """
+        Agrupa por léxico los lemas que aparecen en el paquete, en una sola pasada.
+
+        Returns:
+            Diccionario atributo del léxico -> conjunto de lemas encontrados.
+        """
+        matches: Dict[str, set] = {}
+        index = self.lemma_index
+        for lemma in lemmas:
+            attributes = index.get(lemma)
+            if attributes:
+                for attribute in attributes:
+                    matches.setdefault(attribute, set()).add(lemma)
+        return matches
+
+    def attach_lexicon_artifact(self, artifact):
+        """
+        Sustituye los léxicos por las vistas del artefacto prelematizado (proyectado
+        en memoria y compartido entre procesos). La versión del paquete pasa a
+        identificar también el artefacto, ya que cambia qué lemas coinciden.
+        """
+        for lexicons in LEXICONS.values():
+            for attribute in lexicons.values():
+                setattr(self, attribute, artifact.lexicon(attribute))
+        self.lemma_index = artifact
+        self.object_noun_index = PhraseIndex({
+            "concrete_nouns": self.concrete_nouns, "abstract_nouns": self.abstract_nouns,
+        })
+        self.lexicon_artifact = artifact
+        self.version = hashlib.sha256(f"{self.version}:{artifact.digest}".encode("utf-8")).hexdigest()[:12]
+
+    def __repr__(self):
+        return f"RulePack(name={self.name!r}, version={self.version!r})"
+
+
+def _resolve_path(name_or_path: str) -> str:
+    if name_or_path.endswith(".json") or os.path.sep in name_or_path:
+        return name_or_path
+    return os.path.join(RULE_PACKS_DIR, f"{name_or_path}.json")
+
+
+def _read_config(name_or_path: str, _seen=None) -> dict:
+    """Lee el JSON del paquete aplicando la herencia "extiende" (por léxico)."""
+    path = _resolve_path(name_or_path)
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    parent = config.get("extiende")
+    if not parent:
+        return config
+    seen = (_seen or set()) | {os.path.abspath(path)}
+    if os.path.abspath(_resolve_path(parent)) in seen:
+        raise ValueError(f"Herencia circular de paquetes de reglas en '{path}'.")
+    merged = _read_config(parent, seen)
+    for key, value in config.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = {**merged[key], **value}
+        else:
+            merged[key] = value
+    return merged
+
+
+def load_rule_pack(name_or_path: Optional[str] = None, use_artifact: bool = True) -> RulePack:
+    """
+    Carga y compila un paquete de reglas.
+
+    Args:
+        name_or_path: Nombre de un paquete de data/rule_packs/ o ruta a un .json.
+                      Por defecto RDA_RULE_PACK o "default".
+        use_artifact: Usar el artefacto de léxicos prelematizados del paquete si
+                      existe y corresponde a su versión (ver src/lexicon_artifact.py).
+    """
+    name_or_path = name_or_path or os.environ.get("RDA_RULE_PACK") or DEFAULT_RULE_PACK
+    path = _resolve_path(name_or_path)
+    pack = RulePack(_read_config(name_or_path), source=path)
+    if use_artifact:
+        try:
+            from src.lexicon_artifact import find_lexicon_artifact
+        except ImportError: # Ejecución directa del módulo (python src/...)
+            from lexicon_artifact import find_lexicon_artifact
+        artifact = find_lexicon_artifact(pack)
+        if artifact is not None:
+            pack.attach_lexicon_artifact(artifact)
+            logger.info("Léxicos prelematizados desde %s", artifact.path)
+    logger.info("Paquete de reglas '%s' cargado (versión %s) desde %s", pack.name, pack.version, path)
+    return pack
+
+
+_rule_pack: Optional[RulePack] = None
+_rule_pack_lock = threading.Lock()
+
+
+def get_rule_pack() -> RulePack:
+    """Paquete de reglas activo (se carga una sola vez por proceso)."""
+    global _rule_pack
+    if _rule_pack is None:
+        with _rule_pack_lock:
+            if _rule_pack is None:
+                _rule_pack = load_rule_pack()
+    return _rule_pack
+
+
+def set_rule_pack(pack: RulePack):
+    """Sustituye el paquete activo (por ejemplo, para analizar con las reglas de otra institución)."""
+    global _rule_pack
+    with _rule_pack_lock:
+        _rule_pack = pack
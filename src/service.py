@@ -0,0 +1,301 @@
+"""
+Servicio HTTP local de análisis de RdAs (API JSON por lotes).
+
+Expone los mismos analizadores que la aplicación Streamlit para otros sistemas
+(LMS, editor de sílabos...). Mantiene un único modelo spaCy cargado y la
+taxonomía/keywords en memoria, agrupa las peticiones concurrentes en lotes para
+nlp.pipe, y limita el trabajo con un pool fijo de hilos y una cola acotada:
+si la cola está llena responde 503 con Retry-After (contrapresión).
+Cada hilo pide prestado el modelo al pool (src/model_pool.py), de modo que nunca
+dos hilos usan la misma instancia a la vez; con RDA_MODEL_POOL_SIZE igual a
+--workers los lotes se procesan en paralelo.
+
+Solo usa la biblioteca estándar; no requiere servicios externos.
+
+Con --cascade, las filas que el modelo pequeño deja inciertas se reanalizan con
+un modelo más preciso ya instalado (ver src/model_cascade.py).
+
+Uso:
+    python -m src.service --host 127.0.0.1 --port 8765 [--cascade]
+
+    POST /analizar
+    {"items": [{"text": "Analizar estados financieros...", "academic_level": "6"}, ...]}
+"""
+
+import argparse
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- Añadir el directorio raíz del proyecto al sys.path ---
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from src.nlp_utils import load_spacy_model_internal
+from src.bloom_analyzer import cached_load_bloom_taxonomy
+from src.authenticity_analyzer import PROFESSIONAL_KEYWORDS, get_keyword_index
+from src.rda_pipeline import analyze_rda_batch
+from src.model_cascade import analyze_rda_cascade, get_escalation_model
+from src.model_pool import ModelPool, get_model_pool, model_pool_size
+from src import instrumentation
+from src.rda_logging import configure_logging
+from src.rule_packs import get_rule_pack
+from src.notes import render_result
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 2           # Hilos que ejecutan los analizadores
+DEFAULT_MAX_QUEUE = 32        # Peticiones en espera antes de responder 503
+DEFAULT_MAX_BATCH_ITEMS = 256 # RdAs agrupados por llamada a nlp.pipe
+DEFAULT_MAX_REQUEST_ITEMS = 1000
+DEFAULT_REQUEST_TIMEOUT = 300 # Segundos
+
+
+class _PendingRequest:
+    """Petición encolada: items de entrada y resultados cuando estén listos."""
+
+    def __init__(self, items):
+        self.items = items
+        self.results = None
+        self.error = None
+        self.abandoned = False # El cliente ya recibió 504: no se procesa
+        self.done = threading.Event()
+
+
+class BatchAnalyzer:
+    """
+    Pool fijo de hilos que agrupa peticiones en lotes y ejecuta los analizadores.
+
+    Cada hilo toma una petición de la cola y, sin esperar, añade las siguientes
+    peticiones disponibles hasta completar `max_batch_items` RdAs; todo el lote
+    se procesa con una sola llamada a nlp.pipe.
+    """
+
+    def __init__(self, nlp_model, workers=DEFAULT_WORKERS, max_queue=DEFAULT_MAX_QUEUE,
+                 max_batch_items=DEFAULT_MAX_BATCH_ITEMS, professional_keywords=None, escalation_model=None):
+        self.nlp_model = nlp_model
+        self.escalation_model = escalation_model # Modelo de la cascada (None: solo nlp_model)
+        self.max_batch_items = max_batch_items
+        self.professional_keywords = professional_keywords or PROFESSIONAL_KEYWORDS
+        self.abandoned = 0 # Peticiones descartadas por tiempo de espera agotado
+        # Instancias del modelo prestadas a los hilos (una por hilo a la vez)
+        self.model_pool = get_model_pool(nlp_model)
+        self.escalation_pool = None
+        if escalation_model is not None:
+            self.escalation_pool = ModelPool(escalation_model, model_pool_size())
+            instrumentation.register_counters("model_pool_escalado", self.escalation_pool)
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"rda-service-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, items) -> _PendingRequest:
+        """Encola una petición. Lanza queue.Full si no hay capacidad (contrapresión)."""
+        request = _PendingRequest(items)
+        self._queue.put_nowait(request)
+        return request
+
+    def abandon(self, request: _PendingRequest):
+        """Marca una petición cuyo cliente ya no espera; si sigue en cola, el hilo la descarta."""
+        request.abandoned = True
+
+    @property
+    def queue_size(self) -> int:
+        return self._queue.qsize()
+
+    def _worker(self):
+        while True:
+            batch, batch_items = [], 0
+            request = self._queue.get()
+            while True:
+                if request.abandoned:
+                    self.abandoned += 1
+                    request.done.set()
+                else:
+                    batch.append(request)
+                    batch_items += len(request.items)
+                if batch_items >= self.max_batch_items:
+                    break
+                try:
+                    request = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._process(batch)
+
+    def _process(self, batch):
+        all_items = [item for request in batch for item in request.items]
+        try:
+            with self.model_pool.model() as nlp_model:
+                if self.escalation_pool is not None:
+                    with self.escalation_pool.model() as escalation_model:
+                        results, _ = analyze_rda_cascade(all_items, nlp_model, escalation_model,
+                                                         self.professional_keywords)
+                else:
+                    results = analyze_rda_batch(all_items, nlp_model, self.professional_keywords)
+        except Exception as e:
+            logger.error("Error procesando lote de %d RdAs: %s", len(all_items), e, exc_info=True)
+            for request in batch:
+                request.error = str(e)
+                request.done.set()
+            return
+        offset = 0
+        for request in batch:
+            request.results = results[offset:offset + len(request.items)]
+            offset += len(request.items)
+            request.done.set()
+
+
+def parse_items(payload, max_items):
+    """
+    Valida el cuerpo JSON y devuelve la lista de tuplas (texto, nivel_academico).
+    Acepta {"items": [...]} o directamente una lista de objetos {text, academic_level}.
+    """
+    raw_items = payload.get("items") if isinstance(payload, dict) else payload
+    if not isinstance(raw_items, list) or not raw_items:
+        raise ValueError("Se esperaba una lista no vacía de objetos {text, academic_level}.")
+    if len(raw_items) > max_items:
+        raise ValueError(f"Demasiados RdAs en una petición ({len(raw_items)} > {max_items}).")
+    items = []
+    for i, raw in enumerate(raw_items):
+        if not isinstance(raw, dict) or "text" not in raw:
+            raise ValueError(f"Elemento {i} inválido: se esperaba un objeto con 'text'.")
+        items.append((raw["text"], str(raw.get("academic_level", "")).strip()))
+    return items
+
+
+def make_handler(analyzer: BatchAnalyzer, model_name: str, max_request_items: int, request_timeout: float):
+    """Crea la clase manejadora HTTP ligada a un BatchAnalyzer."""
+
+    class AnalysisRequestHandler(BaseHTTPRequestHandler):
+        server_version = "RdAAnalysisService/1.0"
+
+        def _send_json(self, status, body, headers=None):
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path in ("/salud", "/health"):
+                rule_pack = get_rule_pack()
+                self._send_json(200, {"estado": "ok", "modelo": model_name, "cola": analyzer.queue_size,
+                                      "descartadas": analyzer.abandoned,
+                                      "reglas": {"nombre": rule_pack.name, "version": rule_pack.version}})
+            elif self.path in ("/metricas", "/metrics"):
+                # Solo contiene datos si la instrumentación está activa (RDA_PROFILING=1)
+                self._send_json(200, {"activa": instrumentation.is_enabled(), "metricas": instrumentation.snapshot(),
+                                      "contadores": instrumentation.counters()})
+            else:
+                self._send_json(404, {"error": "Ruta no encontrada."})
+
+        def do_POST(self):
+            if self.path not in ("/analizar", "/analyze"):
+                self._send_json(404, {"error": "Ruta no encontrada."})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                items = parse_items(json.loads(self.rfile.read(length) or b"null"), max_request_items)
+            except (ValueError, json.JSONDecodeError) as e:
+                self._send_json(400, {"error": str(e)})
+                return
+
+            start = time.perf_counter()
+            try:
+                pending = analyzer.submit(items)
+            except queue.Full:
+                self._send_json(503, {"error": "Servicio saturado, reintente más tarde."}, {"Retry-After": "1"})
+                return
+            if not pending.done.wait(request_timeout):
+                analyzer.abandon(pending)
+                self._send_json(504, {"error": "Tiempo de espera agotado."})
+                return
+            if pending.error:
+                self._send_json(500, {"error": pending.error})
+                return
+
+            results = [render_result(result) if result is not None else {"error": "Entrada inválida o vacía."}
+                       for result in pending.results]
+            self._send_json(200, {
+                "modelo": model_name,
+                "reglas": get_rule_pack().version,
+                "total": len(results),
+                "tiempo_ms": round((time.perf_counter() - start) * 1000, 1),
+                "resultados": results,
+            })
+
+        def log_message(self, format, *args):
+            logger.debug("%s - %s", self.address_string(), format % args)
+
+    return AnalysisRequestHandler
+
+
+def create_server(host="127.0.0.1", port=8765, model_name="es_core_news_sm", workers=DEFAULT_WORKERS,
+                  max_queue=DEFAULT_MAX_QUEUE, max_batch_items=DEFAULT_MAX_BATCH_ITEMS,
+                  max_request_items=DEFAULT_MAX_REQUEST_ITEMS, request_timeout=DEFAULT_REQUEST_TIMEOUT,
+                  cascade=False, nlp_model=None):
+    """
+    Carga los recursos (modelo, taxonomía, keywords) una sola vez y crea el servidor HTTP.
+    Con `nlp_model` se usa ese pipeline ya cargado en lugar de cargar `model_name`.
+    """
+    nlp_model = nlp_model or load_spacy_model_internal(model_name)
+    if not nlp_model:
+        raise RuntimeError(f"No se pudo cargar el modelo spaCy '{model_name}'.")
+    escalation_model = get_escalation_model() if cascade else None
+    if cascade and escalation_model is None:
+        logger.warning("Cascada solicitada sin modelo de escalado instalado; se usa solo '%s'.", model_name)
+    # Precalentar taxonomía e índice de keywords para que la primera petición no pague la carga
+    cached_load_bloom_taxonomy()
+    get_keyword_index(PROFESSIONAL_KEYWORDS)
+    get_rule_pack()
+
+    analyzer = BatchAnalyzer(nlp_model, workers=workers, max_queue=max_queue, max_batch_items=max_batch_items,
+                             escalation_model=escalation_model)
+    handler = make_handler(analyzer, model_name, max_request_items, request_timeout)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio HTTP local de análisis de RdAs.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--model", default="es_core_news_sm", help="Modelo spaCy a cargar.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Hilos de análisis.")
+    parser.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE, help="Peticiones en espera antes de responder 503.")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH_ITEMS, help="RdAs por lote de nlp.pipe.")
+    parser.add_argument("--max-items", type=int, default=DEFAULT_MAX_REQUEST_ITEMS,
+                        help="RdAs por petición (más responde 400).")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_REQUEST_TIMEOUT,
+                        help="Segundos de espera por petición antes de responder 504.")
+    parser.add_argument("--cascade", action="store_true",
+                        help="Reanalizar las filas inciertas con un modelo más preciso instalado (md/lg).")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    server = create_server(args.host, args.port, args.model, args.workers, args.max_queue, args.max_batch,
+                           args.max_items, args.timeout, cascade=args.cascade)
+    logger.info("Servicio de análisis de RdAs escuchando en http://%s:%d", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Servicio detenido.")
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
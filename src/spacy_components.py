@@ -0,0 +1,264 @@
+"""
+Analizadores de RdA como componentes del pipeline spaCy.
+
+add_rda_components(nlp) añade al final del pipeline los componentes de
+puntuación; nlp.pipe(textos, n_process=N, batch_size=B) devuelve entonces Docs
+ya puntuados, con spaCy encargándose de los lotes y de los procesos:
+
+    rda_variantes        procesa (con los componentes anteriores, por lotes) las
+                         variantes del texto que usan los analizadores: clean_text
+                         (Bloom) y minúsculas (Verificabilidad, Autenticidad,
+                         Conocimiento); el Doc original lo usa Corrección.
+    rda_bloom            -> Doc._.rda_bloom
+    rda_verificabilidad  -> Doc._.rda_verificability
+    rda_correccion       -> Doc._.rda_correction
+    rda_autenticidad     -> Doc._.rda_authenticity
+    rda_conocimiento     -> Doc._.rda_knowledge
+    rda_cierre           elimina los datos intermedios (variantes, características,
+                         marco del verbo), que no se pueden serializar entre procesos.
+
+Doc._.rda_analysis reúne los cinco resultados con la misma forma que
+analyze_rda_text(), de modo que build_rda_result() puede construir la fila.
+Los resultados coinciden con los del pipeline por RdA (mismos analizadores y
+mismas variantes de texto).
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+from spacy.language import Language
+from spacy.tokens import Doc
+from spacy.util import minibatch
+
+try:
+    from src.rda_pipeline import parse_variants, normalize_rda_text
+    from src.bloom_analyzer import analyze_bloom_level
+    from src.verificability_analyzer import check_verificability
+    from src.correction_analyzer import check_correction
+    from src.authenticity_analyzer import check_authenticity, PROFESSIONAL_KEYWORDS, get_keyword_index
+    from src.knowledge_analyzer import check_knowledge_dimension
+    from src.features import extract_features
+    from src.rule_packs import get_rule_pack
+    from src.notes import Notes, make_notes
+    from src.verb_frame import FRAME_EXTENSION
+except ImportError:
+    from rda_pipeline import parse_variants, normalize_rda_text
+    from bloom_analyzer import analyze_bloom_level
+    from verificability_analyzer import check_verificability
+    from correction_analyzer import check_correction
+    from authenticity_analyzer import check_authenticity, PROFESSIONAL_KEYWORDS, get_keyword_index
+    from knowledge_analyzer import check_knowledge_dimension
+    from features import extract_features
+    from rule_packs import get_rule_pack
+    from notes import Notes, make_notes
+    from verb_frame import FRAME_EXTENSION
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Analizador (clave de analyze_rda_text) -> extensión Doc._ con su resultado
+RESULT_EXTENSIONS = {
+    'bloom': "rda_bloom",
+    'verificability': "rda_verificability",
+    'correction': "rda_correction",
+    'authenticity': "rda_authenticity",
+    'knowledge': "rda_knowledge",
+}
+# Datos intermedios (solo viven dentro del pipeline)
+VARIANTS_EXTENSION = "rda_variants"
+FEATURES_EXTENSION = "rda_features"
+
+# Componentes en el orden en que se añaden
+RDA_COMPONENTS = ("rda_variantes", "rda_bloom", "rda_verificabilidad", "rda_correccion",
+                  "rda_autenticidad", "rda_conocimiento", "rda_cierre")
+
+
+def _restore_arg(value):
+    return tuple(_restore_arg(item) for item in value) if isinstance(value, list) else value
+
+
+def _restore_notes(result):
+    """
+    Los Docs que vuelven de otro proceso (n_process > 1) traen las notas como
+    listas (msgpack); se vuelven a convertir en Notes.
+    """
+    if not isinstance(result, dict):
+        return result
+    return {key: make_notes(tuple(_restore_arg(item) for item in value))
+            if isinstance(value, list) and not isinstance(value, Notes) else value
+            for key, value in result.items()}
+
+
+def get_doc_analysis(doc: Doc) -> Optional[Dict[str, dict]]:
+    """
+    Resultados de los analizadores de un Doc puntuado por los componentes RdA,
+    con la misma forma que analyze_rda_text(); None si falta alguno.
+    """
+    results = {analyzer: getattr(doc._, extension) for analyzer, extension in RESULT_EXTENSIONS.items()}
+    if any(result is None for result in results.values()):
+        return None
+    return {analyzer: _restore_notes(result) for analyzer, result in results.items()}
+
+
+for _extension in (*RESULT_EXTENSIONS.values(), VARIANTS_EXTENSION, FEATURES_EXTENSION):
+    if not Doc.has_extension(_extension):
+        Doc.set_extension(_extension, default=None)
+if not Doc.has_extension("rda_analysis"):
+    Doc.set_extension("rda_analysis", getter=get_doc_analysis)
+
+
+def _variant_docs(doc: Doc):
+    """Texto normalizado y Docs de sus variantes (clean_text, minúsculas, original)."""
+    text = normalize_rda_text(doc.text)
+    variants = doc._.get(VARIANTS_EXTENSION) or {}
+    return text, tuple(variants.get(variant) for variant in parse_variants(text))
+
+
+class RdaVariants:
+    """
+    Componente rda_variantes: procesa las variantes de texto de cada Doc con los
+    componentes que lo preceden en el pipeline (por lotes, una vez por cadena
+    distinta) y las guarda en Doc._.rda_variants.
+    """
+
+    def __init__(self, nlp: Language, name: str):
+        self.nlp = nlp
+        self.name = name
+
+    def _upstream(self):
+        for name, proc in self.nlp.pipeline:
+            if name == self.name:
+                break
+            yield proc
+
+    def _parse(self, texts: List[str]) -> Dict[str, Doc]:
+        docs = [self.nlp.make_doc(text) for text in texts]
+        for proc in self._upstream():
+            docs = list(proc.pipe(docs)) if hasattr(proc, "pipe") else [proc(doc) for doc in docs]
+        return dict(zip(texts, docs))
+
+    def _set_variants(self, docs: List[Doc]):
+        pending = list(dict.fromkeys(
+            variant for doc in docs for variant in parse_variants(normalize_rda_text(doc.text))
+            if variant != doc.text
+        ))
+        parsed = self._parse(pending) if pending else {}
+        for doc in docs:
+            variants = {variant: parsed.get(variant, doc)
+                        for variant in parse_variants(normalize_rda_text(doc.text))}
+            variants[doc.text] = doc
+            doc._.set(VARIANTS_EXTENSION, variants)
+
+    def __call__(self, doc: Doc) -> Doc:
+        self._set_variants([doc])
+        return doc
+
+    def pipe(self, stream, batch_size: int = 128):
+        for batch in minibatch(stream, size=batch_size):
+            self._set_variants(batch)
+            yield from batch
+
+
+@Language.factory("rda_variantes")
+def make_rda_variants(nlp: Language, name: str):
+    return RdaVariants(nlp, name)
+
+
+@Language.component("rda_bloom")
+def rda_bloom(doc: Doc) -> Doc:
+    text, (cleaned_doc, _, _) = _variant_docs(doc)
+    doc._.rda_bloom = analyze_bloom_level(text, doc=cleaned_doc)
+    return doc
+
+
+def _lower_features(doc: Doc, lower_doc: Optional[Doc], keyword_index):
+    """Características del Doc en minúsculas, extraídas una vez para los tres analizadores que las comparten."""
+    features = doc._.get(FEATURES_EXTENSION)
+    if features is None and lower_doc is not None:
+        features = extract_features(lower_doc, get_rule_pack(), keyword_index)
+        doc._.set(FEATURES_EXTENSION, features)
+    return features
+
+
+class _FeatureAnalyzer:
+    """Componentes que puntúan sobre el Doc en minúsculas y sus características compartidas."""
+
+    def __init__(self, professional_keywords: Optional[Dict[str, List[str]]]):
+        self.professional_keywords = professional_keywords or PROFESSIONAL_KEYWORDS
+
+    def _inputs(self, doc: Doc):
+        text, (_, lower_doc, _) = _variant_docs(doc)
+        features = _lower_features(doc, lower_doc, get_keyword_index(self.professional_keywords))
+        return text, lower_doc, features
+
+
+class RdaVerificability(_FeatureAnalyzer):
+    def __call__(self, doc: Doc) -> Doc:
+        text, lower_doc, features = self._inputs(doc)
+        doc._.rda_verificability = check_verificability(text, None, doc=lower_doc, features=features)
+        return doc
+
+
+class RdaAuthenticity(_FeatureAnalyzer):
+    def __call__(self, doc: Doc) -> Doc:
+        text, lower_doc, features = self._inputs(doc)
+        doc._.rda_authenticity = check_authenticity(text, None, self.professional_keywords,
+                                                    doc=lower_doc, features=features)
+        return doc
+
+
+class RdaKnowledge(_FeatureAnalyzer):
+    def __call__(self, doc: Doc) -> Doc:
+        text, lower_doc, features = self._inputs(doc)
+        doc._.rda_knowledge = check_knowledge_dimension(text, None, doc=lower_doc, features=features)
+        return doc
+
+
+@Language.factory("rda_verificabilidad", default_config={"professional_keywords": None})
+def make_rda_verificability(nlp: Language, name: str, professional_keywords: Optional[dict]):
+    return RdaVerificability(professional_keywords)
+
+
+@Language.factory("rda_autenticidad", default_config={"professional_keywords": None})
+def make_rda_authenticity(nlp: Language, name: str, professional_keywords: Optional[dict]):
+    return RdaAuthenticity(professional_keywords)
+
+
+@Language.factory("rda_conocimiento", default_config={"professional_keywords": None})
+def make_rda_knowledge(nlp: Language, name: str, professional_keywords: Optional[dict]):
+    return RdaKnowledge(professional_keywords)
+
+
+@Language.component("rda_correccion")
+def rda_correction(doc: Doc) -> Doc:
+    text, (_, _, original_doc) = _variant_docs(doc)
+    doc._.rda_correction = check_correction(text, None, doc=original_doc)
+    return doc
+
+
+@Language.component("rda_cierre")
+def rda_close(doc: Doc) -> Doc:
+    """Elimina los datos intermedios de Doc._ (Docs de variantes, características, marco del verbo)."""
+    for extension in (VARIANTS_EXTENSION, FEATURES_EXTENSION, FRAME_EXTENSION):
+        doc.user_data.pop(("._.", extension, None, None), None)
+    return doc
+
+
+def add_rda_components(nlp: Language, professional_keywords: Optional[Dict[str, List[str]]] = None) -> Language:
+    """
+    Añade los componentes RdA al final del pipeline (si no están ya).
+
+    Args:
+        nlp: Pipeline spaCy cargado (tagger/parser/lematizador ya incluidos).
+        professional_keywords: Keywords de contexto profesional (por defecto PROFESSIONAL_KEYWORDS).
+
+    Returns:
+        El mismo pipeline, para encadenar.
+    """
+    keyword_config = {"professional_keywords": professional_keywords}
+    for name in RDA_COMPONENTS:
+        if name in nlp.pipe_names:
+            continue
+        config = keyword_config if name in ("rda_verificabilidad", "rda_autenticidad", "rda_conocimiento") else {}
+        nlp.add_pipe(name, config=config)
+    return nlp
@@ -0,0 +1,121 @@
+"""
+Marco del verbo principal de un RdA, compartido por todos los analizadores.
+
+resolve_verb_frame() recorre el Doc una vez y devuelve el verbo principal con
+su objeto, sus complementos (obl/advcl) y sus auxiliares. get_verb_frame() lo
+guarda en la extensión Doc._.rda_verb_frame, de modo que los analizadores que
+comparten un Doc (Verificabilidad, Autenticidad y Conocimiento sobre el texto en
+minúsculas) no repiten la búsqueda.
+
+Criterio único para el verbo principal:
+  1. el verbo raíz (ROOT con pos VERB);
+  2. si no hay, el verbo del que depende el primer auxiliar ("ser capaz de...");
+  3. si no, el primer verbo del texto.
+"""
+
+from typing import Optional, Tuple
+
+from spacy.tokens import Doc, Token
+
+FRAME_EXTENSION = "rda_verb_frame"
+if not Doc.has_extension(FRAME_EXTENSION):
+    Doc.set_extension(FRAME_EXTENSION, default=None)
+
+# Dependencias del objeto/complemento principal (en orden de preferencia)
+OBJECT_DEPS = ("dobj", "obj")
+COMPLEMENT_CLAUSE_DEPS = ("ccomp", "xcomp")
+# Complementos que pueden indicar nivel, condición o método
+MODIFIER_DEPS = ("obl", "advcl")
+AUX_DEPS = ("aux", "aux:pass", "cop")
+
+INFINITIVE_ENDINGS = ('ar', 'er', 'ir')
+
+
+class VerbFrame:
+    """Verbo principal de un Doc y sus dependientes relevantes (inmutable una vez creado)."""
+
+    __slots__ = ("verb", "lemma", "object", "modifiers", "aux", "root_verb", "verbs")
+
+    def __init__(self, verb: Optional[Token], object: Optional[Token], modifiers: Tuple[Token, ...],
+                 aux: Tuple[Token, ...], root_verb: Optional[Token], verbs: Tuple[Token, ...]):
+        self.verb = verb                # Token del verbo principal (o None)
+        self.lemma = verb.lemma_.lower() if verb is not None else None
+        self.object = object            # Objeto directo o complemento principal del verbo
+        self.modifiers = modifiers      # Hijos obl/advcl del verbo, en orden
+        self.aux = aux                  # Auxiliares/cópula que dependen del verbo
+        self.root_verb = root_verb      # Verbo raíz, si lo hay
+        self.verbs = verbs              # Verbos no auxiliares del texto, en orden
+
+    def infinitive_lemma(self) -> Optional[str]:
+        """
+        Lema preferido para buscar en la taxonomía de Bloom: el verbo raíz si es
+        infinitivo; si no, el primer verbo no auxiliar en infinitivo; si no, el raíz.
+        """
+        root_lemma = self.root_verb.lemma_.lower() if self.root_verb is not None else None
+        if root_lemma and root_lemma.endswith(INFINITIVE_ENDINGS):
+            return root_lemma
+        for token in self.verbs:
+            lemma = token.lemma_.lower()
+            if lemma.endswith(INFINITIVE_ENDINGS):
+                return lemma
+        return root_lemma
+
+    def __repr__(self):
+        return f"VerbFrame(verb={self.lemma!r}, object={self.object.text if self.object is not None else None!r})"
+
+
+def _find_object(verb: Token) -> Optional[Token]:
+    """Objeto directo, objeto dentro de una cláusula complemento, o núcleo nominal de un obl."""
+    for child in verb.children:
+        if child.dep_ in OBJECT_DEPS:
+            return child
+        if child.dep_ in COMPLEMENT_CLAUSE_DEPS:
+            obj_token_in_comp = next((t for t in child.subtree if t.dep_ in OBJECT_DEPS), None)
+            return obj_token_in_comp if obj_token_in_comp else child
+    for child in verb.children:
+        if child.dep_ == "obl":
+            obj_token = next((t for t in child.subtree if t.pos_ == "NOUN"), None)
+            return obj_token if obj_token else child
+        if child.dep_ == "prep":
+            pobj_token = next((t for t in child.children if t.dep_ == "pobj"), None)
+            if pobj_token:
+                return pobj_token
+    return None
+
+
+def resolve_verb_frame(doc: Doc) -> VerbFrame:
+    """Resuelve el marco del verbo principal en una sola pasada por los tokens (sin caché)."""
+    root_verb = aux_head = first_verb = None
+    verbs = []
+    for token in doc:
+        if token.pos_ == "VERB":
+            if first_verb is None:
+                first_verb = token
+            if token.dep_ != "aux":
+                verbs.append(token)
+            if root_verb is None and token.dep_ == "ROOT":
+                root_verb = token
+        if aux_head is None and token.dep_ == "aux" and token.head.pos_ == "VERB":
+            aux_head = token.head
+
+    verb = root_verb if root_verb is not None else aux_head if aux_head is not None else first_verb
+    if verb is None:
+        return VerbFrame(None, None, (), (), None, tuple(verbs))
+    children = list(verb.children)
+    return VerbFrame(
+        verb,
+        _find_object(verb),
+        tuple(child for child in children if child.dep_ in MODIFIER_DEPS),
+        tuple(child for child in children if child.dep_ in AUX_DEPS),
+        root_verb,
+        tuple(verbs),
+    )
+
+
+def get_verb_frame(doc: Doc) -> VerbFrame:
+    """Marco del verbo principal del Doc, calculado una vez y guardado en Doc._.rda_verb_frame."""
+    frame = doc._.get(FRAME_EXTENSION)
+    if frame is None:
+        frame = resolve_verb_frame(doc)
+        doc._.set(FRAME_EXTENSION, frame)
+    return frame
@@ -1,68 +1,120 @@
 import spacy
 import logging
+from typing import Optional
 
-# --- Listas de Palabras Clave (Ejemplos iniciales - ¡Necesitan expansión!) ---
-
-# Verbos que tienden a ser más observables (acción física o producto tangible)
-OBSERVABLE_VERBS = {
-    "identificar", "listar", "nombrar", "describir", "dibujar", "construir",
-    "demostrar", "operar", "ejecutar", "implementar", "calcular", "medir",
-    "clasificar", "categorizar", "organizar", "comparar", "contrastar",
-    "diseñar", "producir", "redactar", "presentar", "exponer", "resolver",
-    "aplicar", "utilizar", "manejar", "elaborar", "preparar", "realizar",
-    "registrar", "documentar"
-}
-
-# Verbos que tienden a ser menos observables (procesos cognitivos internos)
-INTERNAL_VERBS = {
-    "conocer", "saber", "comprender", "entender", "creer", "pensar",
-    "apreciar", "valorar", "sentir", "internalizar", "reconocer", # 'Reconocer' puede ser ambiguo
-    "recordar", "memorizar", "asimilar", "interpretar" # 'Interpretar' puede ser ambiguo
-}
-
-# Sustantivos/Conceptos que tienden a ser concretos/observables
-CONCRETE_NOUNS = {
-    "informe", "reporte", "documento", "plan", "propuesta", "diseño",
-    "modelo", "maqueta", "prototipo", "diagrama", "gráfico", "tabla",
-    "cálculo", "resultado", "presentación", "exposición", "demostración",
-    "producto", "artefacto", "código", "programa", "solución", "respuesta",
-    "lista", "resumen", "mapa conceptual", "ensayo", "artículo"
-}
-
-# Sustantivos/Conceptos que tienden a ser abstractos
-ABSTRACT_NOUNS = {
-    "comprensión", "conocimiento", "entendimiento", "importancia", "rol",
-    "significado", "valor", "apreciación", "conciencia", "principios",
-    "conceptos", "teoría", "estructura", "relación", "impacto", "efecto",
-    "necesidad", "capacidad", "habilidad", "competencia", "actitud", "estrategia"
-}
-
-# Palabras clave que indican cuantificación o estándares
-MEASUREMENT_KEYWORDS = {
-    "%", "porcentaje", "número", "cantidad", "frecuencia", "nivel", "grado",
-    "según", "acuerdo", "norma", "estándar", "criterio", "parámetro",
-    "dentro de", "máximo", "mínimo", "al menos", "exactamente", "precisión",
-    "eficiencia", "eficacia", "rendimiento", "tasa", "ratio", "comparar con",
-    "mejorar", "optimizar", "aumentar", "disminuir"
-    # Añadir números como patrones también sería útil (regex)
-}
-
-# Palabras clave que pueden indicar subjetividad si no están definidas
-SUBJECTIVE_KEYWORDS = {
-    "adecuado", "apropiado", "pertinente", "relevante", "efectivo", "eficiente",
-    "bueno", "óptimo", "satisfactorio", "correcto", "claro", "coherente",
-    "significativo"
-}
+import numpy as np
+
+try:
+    from src.instrumentation import timed, timed_block
+    from src.rule_packs import get_rule_pack
+    from src.features import extract_features
+    from src.notes import make_notes, note
+except ImportError: # Ejecución directa del módulo (python src/...)
+    from instrumentation import timed, timed_block
+    from rule_packs import get_rule_pack
+    from features import extract_features
+    from notes import make_notes, note
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# --- Listas de Palabras Clave ---
+# Los léxicos (verbos observables/internos, sustantivos concretos/abstractos,
+# indicadores de medida y términos subjetivos) se definen en el paquete de
+# reglas activo (data/rule_packs/, ver src/rule_packs.py). Las características
+# del Doc se extraen en src/features.py (compartidas con Autenticidad y Conocimiento).
+
+# --- Puntuación sobre la tabla de características ---
+
+def score_verificability_features(features) -> dict:
+    """
+    Puntuaciones de Verificabilidad a partir de las características de
+    src/features.py. Acepta una fila (escalares) o la tabla de un lote
+    (columnas); en ese caso devuelve un array por puntuación.
+    """
+    has_verb = np.asarray(features["verif_has_verb"], dtype=bool)
+    verb_class = np.asarray(features["verif_verb_class"])
+    object_effect = np.asarray(features["verif_object_effect"])
+    n_measurement = np.asarray(features["n_measurement"])
+    has_number = np.asarray(features["has_number"], dtype=bool)
+    n_subjective = np.asarray(features["n_subjective"])
+
+    # Observabilidad: base 3, +1 verbo observable / -1 interno, +-1 objeto concreto/abstracto; 1 sin verbo
+    observable = np.where(has_verb, 3 + verb_class + object_effect, 1)
+    # Medibilidad: base 2, +1 por indicador de medida distinto, +1 si hay números
+    found_measurement = (n_measurement > 0) | has_number
+    measurable = 2 + n_measurement + has_number
+    # Términos subjetivos sin indicadores de medida: -1 y penalización adicional (mínimo 1)
+    only_subjective = (n_subjective > 0) & ~found_measurement
+    measurable = np.where(only_subjective, np.maximum(1, measurable - 2), measurable)
+
+    observable = np.clip(observable, 1, 5) # Asegurar rango 1-5
+    measurable = np.clip(measurable, 1, 5)
+    return {
+        'observable_score': observable,
+        'measurable_score': measurable,
+        # Evaluabilidad como mínimo de las otras dos
+        'evaluability_score': np.minimum(observable, measurable),
+    }
+
+
+def build_verificability_result(features: dict, scores: dict) -> dict:
+    """Diccionario de resultado (puntuaciones de una fila y justificación codificada, ver src/notes.py)."""
+    justification_parts = []
+    main_verb = features["verif_verb"]
+    if main_verb:
+        justification_parts.append(("ver.verbo", main_verb))
+        if features["verif_verb_class"] > 0:
+            justification_parts.append(("ver.tipo_observable",))
+        elif features["verif_verb_class"] < 0:
+            justification_parts.append(("ver.tipo_interno",))
+        else:
+            justification_parts.append(("ver.tipo_no_clasificado",))
+        direct_object = features["verif_object"]
+        if features["verif_object_effect"] > 0:
+            justification_parts.append(("ver.objeto_concreto", direct_object))
+        elif features["verif_object_effect"] < 0:
+            justification_parts.append(("ver.objeto_abstracto", direct_object))
+        elif direct_object:
+            justification_parts.append(("ver.objeto_no_clasificado", direct_object))
+    else:
+        justification_parts.append(("ver.sin_verbo",))
+
+    measurement_matches = features["measurement_matches"]
+    found_measurement = bool(measurement_matches) or features["has_number"]
+    if measurement_matches:
+        justification_parts.append(("ver.indicadores_medida", ", ".join(measurement_matches)))
+    if features["has_number"]:
+        justification_parts.append(("ver.numeros",))
+    subjective_matches = features["subjective_matches"]
+    if subjective_matches:
+        if not found_measurement:
+            justification_parts.append(("ver.subjetivos_sin_definir", ", ".join(subjective_matches)))
+        else:
+            justification_parts.append(("ver.subjetivos_presentes", ", ".join(subjective_matches)))
+    elif not found_measurement:
+        justification_parts.append(("ver.sin_indicadores",))
+
+    return {
+        'observable_score': scores['observable_score'],
+        'measurable_score': scores['measurable_score'],
+        'evaluability_score': scores['evaluability_score'],
+        'justification': make_notes(justification_parts)
+    }
 
 # --- Función Principal ---
 
-def check_verificability(text: str, nlp_model: spacy.language.Language) -> dict:
+@timed("check_verificability")
+def check_verificability(text: str, nlp_model: spacy.language.Language, doc: Optional[spacy.tokens.Doc] = None,
+                         features: Optional[dict] = None) -> dict:
     """
     Analiza un texto de RA para estimar su verificabilidad según 3 criterios.
 
     Args:
         text: El texto del Resultado de Aprendizaje.
         nlp_model: El modelo de lenguaje spaCy cargado.
+        doc: Doc spaCy ya procesado de text.lower() (opcional, evita volver a procesar).
+        features: Características ya extraídas del Doc (ver src/features.py; opcional).
 
     Returns:
         Un diccionario con las puntuaciones estimadas (1-5) y una justificación.
@@ -72,138 +124,28 @@ def check_verificability(text: str, nlp_model: spacy.language.Language) -> dict:
     if not text or not isinstance(text, str):
         return {
             'observable_score': 1, 'measurable_score': 1, 'evaluability_score': 1,
-            'justification': 'Texto de entrada inválido o vacío.'
+            'justification': note('texto_invalido')
         }
-    if not nlp_model:
+    if not nlp_model and doc is None and features is None:
          return {
             'observable_score': 1, 'measurable_score': 1, 'evaluability_score': 1,
-            'justification': 'Modelo NLP no disponible.'
+            'justification': note('modelo_no_disponible')
         }
 
     try:
-        doc = nlp_model(text.lower()) # Procesar en minúsculas para keywords
-
-        # --- Inicialización de Puntuaciones y Justificación ---
-        observable_score = 3 # Punto de partida neutro
-        measurable_score = 2 # Punto de partida ligeramente bajo (medir suele ser más difícil)
-        evaluability_score = 1 # Se calculará al final
-        justification_parts = []
-
-        # --- Análisis de Observabilidad ---
-        main_verb = None
-        direct_object = None
-        verb_token = None
-
-        # Encontrar el verbo principal (raíz del documento o verbo auxiliar principal)
-        for token in doc:
-            if token.dep_ == "ROOT" and token.pos_ == "VERB":
-                main_verb = token.lemma_
-                verb_token = token
-                break
-            # Considerar auxiliares si el ROOT no es verbo (ej. "ser capaz de...")
-            if token.dep_ == "aux" and token.head.pos_ == "VERB":
-                 main_verb = token.head.lemma_
-                 verb_token = token.head
-                 break
-        # Si no se encontró verbo raíz, buscar el primer verbo
-        if not main_verb:
-             for token in doc:
-                 if token.pos_ == "VERB":
-                     main_verb = token.lemma_
-                     verb_token = token
-                     break
-
-        if main_verb:
-            justification_parts.append(f"Verbo: '{main_verb}'.")
-            if main_verb in OBSERVABLE_VERBS:
-                observable_score += 1
-                justification_parts.append("Tipo: Observable.")
-            elif main_verb in INTERNAL_VERBS:
-                observable_score -= 1
-                justification_parts.append("Tipo: Interno/Cognitivo.")
-            else:
-                 justification_parts.append("Tipo: No clasificado claramente.")
-
-
-            # Encontrar el objeto directo del verbo principal
-            if verb_token:
-                for child in verb_token.children:
-                    if child.dep_ == "dobj" and child.pos_ == "NOUN": # Objeto directo que es sustantivo
-                        direct_object = child.lemma_
-                        # Buscar si el objeto o sus compuestos están en las listas
-                        obj_subtree_text = " ".join([t.lemma_ for t in child.subtree])
-                        if any(cn in obj_subtree_text for cn in CONCRETE_NOUNS):
-                             observable_score += 1
-                             justification_parts.append(f"Objeto ('{direct_object}'): Concreto.")
-                             break # Encontrado concreto
-                        elif any(an in obj_subtree_text for an in ABSTRACT_NOUNS):
-                             observable_score -= 1
-                             justification_parts.append(f"Objeto ('{direct_object}'): Abstracto.")
-                             break # Encontrado abstracto
-                if direct_object and "Objeto" not in " ".join(justification_parts):
-                     justification_parts.append(f"Objeto ('{direct_object}'): No clasificado.")
-
-
-        else:
-            justification_parts.append("No se identificó verbo principal claro.")
-            observable_score = 1 # Penalizar si no hay verbo claro
-
-        # --- Análisis de Medibilidad ---
-        found_measurement = False
-        found_subjective = False
-
-        # Buscar palabras clave de medición/cuantificación
-        text_lemmas = {token.lemma_ for token in doc}
-        measurement_matches = text_lemmas.intersection(MEASUREMENT_KEYWORDS)
-        if measurement_matches:
-            measurable_score += len(measurement_matches) # Sumar puntos por cada tipo encontrado
-            justification_parts.append(f"Indicadores de medida: {', '.join(measurement_matches)}.")
-            found_measurement = True
-
-        # Buscar números explícitos (simplificado)
-        if any(token.like_num for token in doc):
-             measurable_score += 1
-             justification_parts.append("Presencia de números.")
-             found_measurement = True
-
-        # Buscar palabras clave subjetivas
-        subjective_matches = text_lemmas.intersection(SUBJECTIVE_KEYWORDS)
-        if subjective_matches:
-             # Penalizar solo si no hay indicadores claros de medida que los definan
-             if not found_measurement:
-                 measurable_score -= 1
-                 justification_parts.append(f"Términos subjetivos sin definir: {', '.join(subjective_matches)}.")
-             else:
-                 justification_parts.append(f"Términos subjetivos presentes: {', '.join(subjective_matches)}.")
-             found_subjective = True
-
-        if not found_measurement and not found_subjective:
-             justification_parts.append("No se encontraron indicadores claros de medida o subjetividad.")
-        elif not found_measurement and found_subjective:
-             measurable_score = max(1, measurable_score -1) # Penalizar más si solo hay subjetividad
-
-
-        # --- Ajustar y Calcular Puntuaciones Finales ---
-        observable_score = max(1, min(5, observable_score)) # Asegurar rango 1-5
-        measurable_score = max(1, min(5, measurable_score)) # Asegurar rango 1-5
-
-        # Calcular Evaluabilidad (como mínimo de las otras dos)
-        evaluability_score = min(observable_score, measurable_score)
-
-        final_justification = " ".join(justification_parts)
-
-        return {
-            'observable_score': observable_score,
-            'measurable_score': measurable_score,
-            'evaluability_score': evaluability_score,
-            'justification': final_justification
-        }
+        if features is None:
+            if doc is None:
+                with timed_block("spacy_parse"):
+                    doc = nlp_model(text.lower()) # Procesar en minúsculas para keywords
+            features = extract_features(doc, get_rule_pack())
+        scores = score_verificability_features(features)
+        return build_verificability_result(features, {key: int(value) for key, value in scores.items()})
 
     except Exception as e:
-        logging.error(f"Error en check_verificability para texto '{text[:50]}...': {e}", exc_info=True)
+        logger.error("Error en check_verificability para texto '%s...': %s", text[:50], e, exc_info=True)
         return {
             'observable_score': 1, 'measurable_score': 1, 'evaluability_score': 1,
-            'justification': f'Error durante el análisis: {e}'
+            'justification': note('error', str(e))
         }
 
 # --- Ejemplo de uso (opcional, para pruebas) ---
@@ -0,0 +1,87 @@
+"""
+Prueba de la tabla precompilada de adecuación (nivel Bloom × nivel académico)
+"""
+
+import sys
+import os
+import json
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+
+from src.appropriateness import load_appropriateness_table, DEFAULT_APPROPRIATENESS_RULES
+
+
+def _reference(bloom_level, academic_level, rules=DEFAULT_APPROPRIATENESS_RULES):
+    """Implementación original de check_appropriateness (recorrido de listas)."""
+    if not bloom_level or bloom_level in ["N/A", "Error", "No identificado", "No clasificado"]:
+        return "N/A"
+    if academic_level not in rules:
+        return "Nivel Académico Desconocido"
+    level_rules = rules[academic_level]
+    bloom_norm = str(bloom_level).lower()
+    if bloom_norm in level_rules['bajo']: return "Potencialmente Bajo"
+    if bloom_norm in level_rules['apropiado']: return "Apropiado"
+    if bloom_norm in level_rules['alto']: return "Potencialmente Alto"
+    return "No Categorizado en Reglas"
+
+
+BLOOM_VALUES = ["Recordar", "comprender", "Aplicar", "ANALIZAR", "Evaluar", "Crear",
+                "N/A", "Error", "No identificado", "No clasificado", "", "Sintetizar"]
+ACADEMIC_VALUES = ["2", "4", "6", "8", "10"]
+
+
+def test_table_matches_rules():
+    """La tabla compilada da el mismo resultado que las reglas originales"""
+    print("🧪 Probando tabla de adecuación...")
+    table = load_appropriateness_table()
+    for bloom in BLOOM_VALUES:
+        for academic in ACADEMIC_VALUES:
+            assert table.classify(bloom, academic) == _reference(bloom, academic), (bloom, academic)
+    assert table.describe_levels("6") == "3 (Aplicar) a 4 (Analizar)"
+    print("✅ Tabla equivalente a las reglas")
+
+
+def test_classify_column():
+    """La variante vectorizada coincide con la clasificación fila a fila"""
+    print("🧪 Probando clasificación vectorizada...")
+    table = load_appropriateness_table()
+    pairs = [(b, a) for b in BLOOM_VALUES for a in ACADEMIC_VALUES] * 3
+    df = pd.DataFrame(pairs, columns=["Nivel Bloom Original", "Nivel Académico Origen"])
+    df.loc[0, "Nivel Bloom Original"] = None # Celdas vacías (NaN) se tratan como no clasificadas
+    result = table.classify_column(df["Nivel Bloom Original"], df["Nivel Académico Origen"])
+    expected = [_reference(b if b == b else None, a) for b, a in zip(df["Nivel Bloom Original"], df["Nivel Académico Origen"])]
+    assert list(result) == expected and (result.index == df.index).all()
+    print("✅ Clasificación vectorizada correcta")
+
+
+def test_custom_level_scheme():
+    """Una facultad puede definir sus propios niveles académicos"""
+    print("🧪 Probando esquema de niveles personalizado...")
+    config = {"niveles_academicos": {
+        "Técnico": {"bajo": [], "apropiado": ["recordar", "comprender", "aplicar"], "alto": ["crear"]},
+        "Magíster": {"bajo": ["recordar"], "apropiado": ["analizar", "evaluar", "crear"], "alto": []},
+    }}
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as f:
+        json.dump(config, f)
+    try:
+        table = load_appropriateness_table(f.name)
+    finally:
+        os.unlink(f.name)
+    assert table.academic_levels == ["Técnico", "Magíster"]
+    assert table.classify("Crear", "Técnico") == "Potencialmente Alto"
+    assert table.classify("Recordar", "Magíster") == "Potencialmente Bajo"
+    assert table.classify("Aplicar", "Magíster") == "No Categorizado en Reglas"
+    assert table.classify("Aplicar", "2") == "Nivel Académico Desconocido"
+    print("✅ Esquema personalizado correcto")
+
+
+if __name__ == "__main__":
+    print("🎯 PRUEBA TABLA DE ADECUACIÓN")
+    print("=" * 30)
+    test_table_matches_rules()
+    test_classify_column()
+    test_custom_level_scheme()
+    print("\n🎉 ¡Pruebas exitosas!")
@@ -0,0 +1,128 @@
+"""
+Prueba del almacén acotado de archivos generados (PDF/Excel): deduplicación,
+presupuesto por sesión, volcado a disco y expulsión global
+"""
+
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.artifact_store import ArtifactStore, content_key
+
+PDF_A = b"%PDF-A" + b"a" * 994  # 1000 bytes
+PDF_B = b"%PDF-B" + b"b" * 994
+PDF_C = b"%PDF-C" + b"c" * 994
+
+
+def test_dedup_between_sessions():
+    """Dos sesiones con los mismos resultados comparten el grupo y cada archivo se guarda una vez"""
+    print("🧪 Probando deduplicación entre sesiones...")
+    store = ArtifactStore()
+    key = content_key("pdfs", "resultados", "2")
+    assert key == content_key("pdfs", "resultados", "2") and key != content_key("pdfs", "resultados", "3")
+
+    builds = []
+    build = lambda: builds.append(1) or {"executive": PDF_A, "complete": PDF_B, "level_2": PDF_A}
+    assert store.get_or_build("sesion1", key, build)["level_2"] == PDF_A
+    assert store.get_or_build("sesion2", key, build) == {"executive": PDF_A, "complete": PDF_B, "level_2": PDF_A}
+    assert len(builds) == 1 # La segunda sesión no regenera
+
+    counters = store.counters()
+    assert counters["archivos"] == 2 and counters["bytes_memoria"] == 2000, counters
+    assert counters["deduplicados"] == 1 and (counters["aciertos"], counters["fallos"]) == (1, 1)
+
+    store.release_session("sesion1")
+    assert store.get_group("sesion2", key) is not None # Sigue en uso por la otra sesión
+    store.release_session("sesion2")
+    assert store.counters()["grupos"] == 0 and store.counters()["bytes_memoria"] == 0
+    print("✅ Deduplicación correcta")
+
+
+def test_session_budget():
+    """Una sesión que supera su presupuesto suelta sus grupos más antiguos (nunca el actual)"""
+    print("🧪 Probando presupuesto por sesión...")
+    store = ArtifactStore(session_max_bytes=2500)
+    store.put_group("s", "g1", {"pdf": PDF_A})
+    store.put_group("s", "g2", {"pdf": PDF_B})
+    store.put_group("otra", "g1", {"pdf": PDF_A}) # g1 también la usa otra sesión
+    store.put_group("s", "g3", {"pdf": PDF_C})
+    assert store.session_bytes("s") <= 2500
+    assert store.get_group("otra", "g1") == {"pdf": PDF_A} # Conservado por la otra sesión
+
+    store.put_group("s", "grande", {"pdf": PDF_A + PDF_B + PDF_C})
+    assert store.get_group("s", "grande") is not None # El grupo actual nunca se suelta
+    assert list(store._sessions["s"]) == ["grande"]
+    assert store.counters()["expulsados"] >= 1
+    print("✅ Presupuesto por sesión correcto")
+
+
+def test_retain_current_groups():
+    """Al cambiar los resultados la sesión suelta los grupos anteriores (salvo los que use otra)"""
+    print("🧪 Probando liberación de resultados anteriores...")
+    store = ArtifactStore()
+    store.put_group("s", "excel_v1", {"xlsx": PDF_A})
+    store.put_group("s", "pdfs_v1", {"pdf": PDF_B})
+    store.put_group("otra", "pdfs_v1", {"pdf": PDF_B})
+    store.put_group("s", "excel_v2", {"xlsx": PDF_C})
+
+    store.retain_groups("s", {"excel_v2"})
+    assert list(store._sessions["s"]) == ["excel_v2"]
+    assert store.get_group("otra", "excel_v1") is None # Nadie más lo usaba: eliminado
+    assert store.get_group("otra", "pdfs_v1") == {"pdf": PDF_B} # Conservado por la otra sesión
+    assert store.counters()["bytes_memoria"] == 2000
+
+    store.retain_groups("s", set())
+    assert "s" not in store._sessions and store.counters()["sesiones"] == 1
+    print("✅ Liberación de resultados anteriores correcta")
+
+
+def test_spill_and_reload():
+    """Los archivos menos usados se vuelcan a disco y se recuperan intactos"""
+    print("🧪 Probando volcado a disco...")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ArtifactStore(max_memory_bytes=1500, spill_dir=tmp)
+        store.put_group("s1", "g1", {"pdf": PDF_A})
+        store.put_group("s2", "g2", {"pdf": PDF_B})
+        counters = store.counters()
+        assert counters["volcados"] == 1 and counters["bytes_memoria"] == 1000 and counters["bytes_disco"] == 1000
+        assert len(os.listdir(tmp)) == 1
+
+        assert store.get_group("s1", "g1") == {"pdf": PDF_A} # Vuelve a memoria (y se vuelca el otro)
+        assert store.get_group("s2", "g2") == {"pdf": PDF_B}
+        store.release_session("s1")
+        store.release_session("s2")
+        assert os.listdir(tmp) == [] and store.counters()["bytes_disco"] == 0
+    print("✅ Volcado a disco correcto")
+
+
+def test_global_eviction():
+    """Sin disco (o con el disco lleno) se eliminan los grupos menos usados"""
+    print("🧪 Probando expulsión global...")
+    store = ArtifactStore(max_memory_bytes=2000)
+    for i, pdf in enumerate([PDF_A, PDF_B, PDF_C]):
+        store.put_group(f"s{i}", f"g{i}", {"pdf": pdf})
+    assert store.get_group("s0", "g0") is None # El menos usado se expulsó
+    assert store.get_group("s2", "g2") == {"pdf": PDF_C}
+    assert store.counters()["bytes_memoria"] <= 2000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ArtifactStore(max_memory_bytes=1000, spill_dir=tmp, max_disk_bytes=1000)
+        for i, pdf in enumerate([PDF_A, PDF_B, PDF_C]):
+            store.put_group(f"s{i}", f"g{i}", {"pdf": pdf})
+        counters = store.counters()
+        assert counters["bytes_memoria"] <= 1000 and counters["bytes_disco"] <= 1000, counters
+        assert store.get_group("s0", "g0") is None and store.counters()["expulsados"] == 1
+    print("✅ Expulsión global correcta")
+
+
+if __name__ == "__main__":
+    print("🗃️ PRUEBA ALMACÉN DE ARCHIVOS GENERADOS")
+    print("=" * 40)
+    test_dedup_between_sessions()
+    test_session_budget()
+    test_retain_current_groups()
+    test_spill_and_reload()
+    test_global_eviction()
+    print("\n🎉 ¡Pruebas exitosas!")
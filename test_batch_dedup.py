@@ -0,0 +1,78 @@
+"""
+Prueba de la deduplicación de RdAs idénticos en un lote (solo la adecuación se evalúa por fila)
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import spacy
+
+from src import instrumentation
+from src.rda_pipeline import (analyze_rda, analyze_rda_batch, make_row_analyzer, normalize_rda_text,
+                              parse_rda_texts)
+
+ITEMS = [
+    ("Analizar los estados financieros de la empresa", "2"),
+    ("Diseñar un plan de marketing", "4"),
+    ("Analizar los estados financieros de la empresa", "8"),
+    ("  Analizar los estados   financieros de la empresa ", "4"),
+    ("", "4"),
+    ("Diseñar un plan de marketing", "4"),
+]
+
+
+def _text_analysis_count():
+    return instrumentation.snapshot().get("analyze_rda_text", {}).get("count", 0)
+
+
+def test_batch_analyzes_each_text_once():
+    """Cada texto normalizado distinto se analiza una vez; los resultados coinciden con el análisis por fila"""
+    print("🧪 Probando deduplicación del lote...")
+    nlp = spacy.blank("es")
+    assert normalize_rda_text(ITEMS[3][0]) == ITEMS[0][0]
+
+    instrumentation.reset()
+    instrumentation.enable()
+    try:
+        results = analyze_rda_batch(ITEMS, nlp)
+        assert _text_analysis_count() == 2, instrumentation.snapshot()
+    finally:
+        instrumentation.disable()
+        instrumentation.reset()
+
+    assert len(results) == len(ITEMS) and results[4] is None
+    for (text, level), result in zip(ITEMS, results):
+        if result is None:
+            continue
+        # Cada fila conserva su texto y nivel; el resto coincide con el análisis individual
+        assert result["RA"] == text and result["Nivel Académico Origen"] == level
+        assert result == analyze_rda(text, level, nlp, docs=parse_rda_texts([text], nlp)), text
+    assert results[0]["Puntaje Corrección"] == results[2]["Puntaje Corrección"] == results[3]["Puntaje Corrección"]
+    print("✅ Lote deduplicado correctamente")
+
+
+def test_row_analyzer_reuses_text_analysis():
+    """El analizador por filas (trabajos en segundo plano) reutiliza el análisis de los textos repetidos"""
+    print("🧪 Probando analizador por filas...")
+    nlp = spacy.blank("es")
+    analyze_row = make_row_analyzer(nlp)
+    instrumentation.reset()
+    instrumentation.enable()
+    try:
+        results = [analyze_row(text, level) for text, level in ITEMS]
+        assert _text_analysis_count() == 2, instrumentation.snapshot()
+    finally:
+        instrumentation.disable()
+        instrumentation.reset()
+    assert results == analyze_rda_batch(ITEMS, nlp)
+    print("✅ Analizador por filas correcto")
+
+
+if __name__ == "__main__":
+    print("🔁 PRUEBA DEDUPLICACIÓN DE RdAs")
+    print("=" * 30)
+    test_batch_analyzes_each_text_once()
+    test_row_analyzer_reuses_text_analysis()
+    print("\n🎉 ¡Pruebas exitosas!")
@@ -0,0 +1,49 @@
+"""
+Prueba del generador de corpus sintético y la comparación de benchmarks
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks.corpus_generator import generate_rdas, load_verbs
+from benchmarks.compare_results import compare
+
+
+def test_corpus_is_deterministic():
+    """Misma semilla -> mismo corpus; cada RdA usa un verbo de la taxonomía"""
+    print("🧪 Probando generador de corpus...")
+    first = list(generate_rdas(200, seed=7))
+    assert first == list(generate_rdas(200, seed=7))
+    assert first != list(generate_rdas(200, seed=8))
+    assert all(level in ('2', '4', '6', '8') for _, level in first)
+
+    verbs = set(load_verbs())
+    for text, _ in first[:20]:
+        words = text.lower().rstrip(".").replace(",", "").split()
+        assert verbs & set(words), text
+    print(f"   Ejemplo: {first[0][0]}")
+    print("✅ Corpus determinista")
+
+
+def test_compare_flags_regressions():
+    """Solo se marca regresión si supera el umbral relativo y la diferencia mínima"""
+    print("🧪 Probando comparación de resultados...")
+    def report(per_row_s, pdf_s):
+        return {"cold_start_s": 1.0, "environment": {}, "runs": [{
+            "size": 100, "end_to_end": {"per_row_s": per_row_s, "batch_s": 1.0},
+            "export_s": {"pdf_completo": pdf_s}, "stages": {}}]}
+
+    rows = compare(report(1.0, 0.0001), report(1.5, 0.0002), threshold_pct=10)
+    flagged = {name for _, name, *_, regression in rows if regression}
+    assert flagged == {"per_row_s"}, flagged
+    print("✅ Regresiones detectadas")
+
+
+if __name__ == "__main__":
+    print("📏 PRUEBA BENCHMARKS")
+    print("=" * 30)
+    test_corpus_is_deterministic()
+    test_compare_flags_regressions()
+    print("\n🎉 ¡Pruebas exitosas!")
@@ -0,0 +1,81 @@
+"""
+Prueba de la vía rápida de Bloom (infinitivo inicial sin parser) y de su informe de coincidencia
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import spacy
+from spacy.language import Language
+
+from src.bloom_analyzer import fast_bloom_verb, analyze_bloom_level, compare_bloom_fast_path, cached_load_bloom_taxonomy
+from src.nlp_utils import clean_text
+
+
+@Language.component("prueba_verbos_infinitivo")
+def _infinitive_tagger(doc):
+    """Etiquetador mínimo para la prueba: infinitivos como VERB y el primero como ROOT."""
+    root = None
+    for token in doc:
+        token.lemma_ = token.lower_
+        is_verb = token.lower_.endswith(("ar", "er", "ir"))
+        token.pos_ = "VERB" if is_verb else "NOUN"
+        if is_verb and root is None:
+            root = token
+            token.dep_ = "ROOT"
+        else:
+            token.dep_ = "dep"
+    return doc
+
+
+def test_fast_path_patterns():
+    """Infinitivo inicial y "será capaz de / podrá + infinitivo"; el resto es ambiguo"""
+    print("🧪 Probando patrones de la vía rápida...")
+    verb_map = cached_load_bloom_taxonomy()
+    cases = {
+        "Analizar los estados financieros": "analizar",
+        "El estudiante será capaz de recordar los principios de auditoría": "recordar",
+        "Los estudiantes serán capaces de diseñar estrategias": "diseñar",
+        "El estudiante podrá analizar estados financieros": "analizar",
+        "Ser capaz de evaluar proyectos de inversión": "evaluar",
+        "El estudiante diseñará estrategias de reclutamiento": None, # Verbo conjugado
+        "Nadar en la piscina": None, # Fuera de la taxonomía
+        "- Analizar": None,
+    }
+    for text, expected in cases.items():
+        assert fast_bloom_verb(clean_text(text), verb_map) == expected, text
+
+    # Sin Doc, la vía rápida responde sin cargar el modelo spaCy
+    result = analyze_bloom_level("Analizar los estados financieros")
+    assert result == {"verb": "analizar", "level": "Analizar", "error": None}
+    print("✅ Patrones correctos")
+
+
+def test_fast_path_report():
+    """El informe da la tasa de acierto y la coincidencia con el análisis completo"""
+    print("🧪 Probando informe de la vía rápida...")
+    nlp = spacy.blank("es")
+    nlp.add_pipe("prueba_verbos_infinitivo")
+    texts = ["Analizar los estados financieros", "El estudiante será capaz de recordar los principios",
+             "El estudiante diseñará estrategias", "Nadar en la piscina"]
+    report = compare_bloom_fast_path(texts, nlp)
+    print(f"   {report}")
+    assert (report["textos"], report["aciertos"], report["tasa_acierto"]) == (4, 2, 0.5)
+    assert report["coincidencia_verbo"] == report["coincidencia_nivel"] == 1.0
+    assert report["discrepancias"] == []
+
+    # Un generador recorrido por bloques da el mismo informe
+    streamed = compare_bloom_fast_path((text for text in texts), nlp, chunk_size=3)
+    timing = ("rapida_s", "completa_s")
+    assert {k: v for k, v in streamed.items() if k not in timing} == {k: v for k, v in report.items() if k not in timing}
+    print("✅ Informe correcto")
+
+
+if __name__ == "__main__":
+    print("⚡ PRUEBA VÍA RÁPIDA DE BLOOM")
+    print("=" * 28)
+    test_fast_path_patterns()
+    test_fast_path_report()
+    print("\n🎉 ¡Pruebas exitosas!")
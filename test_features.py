@@ -0,0 +1,111 @@
+"""
+Prueba de la tabla de características y las puntuaciones vectorizadas
+(Verificabilidad, Autenticidad, Conocimiento)
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import spacy
+from spacy.tokens import Doc
+
+from src.features import extract_features, extract_feature_rows, build_feature_table, FEATURE_COLUMNS
+from src.verificability_analyzer import check_verificability
+from src import authenticity_analyzer
+from src.authenticity_analyzer import check_authenticity, get_keyword_index
+from src.knowledge_analyzer import check_knowledge_dimension
+from src.rda_pipeline import score_feature_table
+
+KEYWORDS = {"negocios": ["empresa", "mercado"]}
+
+
+def _parsed_docs():
+    """Docs ya analizados construidos a mano (no requiere el modelo es_core_news_sm)."""
+    vocab = spacy.blank("es").vocab
+    return [
+        # "calcular tres indicadores de la empresa" -> verbo observable, número, keyword
+        Doc(vocab, words=["calcular", "tres", "indicadores", "de", "la", "empresa"],
+            lemmas=["calcular", "tres", "indicador", "de", "el", "empresa"],
+            pos=["VERB", "NUM", "NOUN", "ADP", "DET", "NOUN"],
+            deps=["ROOT", "nummod", "dobj", "case", "det", "nmod"],
+            heads=[0, 2, 0, 5, 5, 2]),
+        # "comprender la importancia" -> verbo interno, objeto abstracto
+        Doc(vocab, words=["comprender", "la", "importancia"],
+            lemmas=["comprender", "el", "importancia"],
+            pos=["VERB", "DET", "NOUN"], deps=["ROOT", "det", "dobj"], heads=[0, 2, 0]),
+        # Sin verbo
+        Doc(vocab, words=["buena", "calidad"], lemmas=["bueno", "calidad"],
+            pos=["ADJ", "NOUN"], deps=["amod", "ROOT"], heads=[1, 1]),
+    ]
+
+
+def test_feature_table():
+    """La tabla tiene una fila por Doc y columnas numéricas tipadas"""
+    print("🧪 Probando tabla de características...")
+    docs = _parsed_docs()
+    rows = extract_feature_rows(docs, keyword_index=get_keyword_index(KEYWORDS))
+    table = build_feature_table(rows)
+    assert len(table) == len(docs)
+    assert set(FEATURE_COLUMNS) <= set(table.columns)
+    assert table["verif_has_verb"].tolist() == [True, True, False]
+    assert table["verif_object_effect"].tolist() == [0, -1, 0]
+    assert table["has_number"].tolist() == [True, False, False]
+    assert table["n_keywords"].tolist() == [1, 0, 0]
+    assert build_feature_table([]).empty
+    print("✅ Tabla de características correcta")
+
+
+def test_vectorized_scores_match_per_row():
+    """Las puntuaciones por lote coinciden con las de cada analizador por fila"""
+    print("🧪 Probando puntuaciones vectorizadas...")
+    docs = _parsed_docs()
+    rows = extract_feature_rows(docs, keyword_index=get_keyword_index(KEYWORDS))
+    batch_scores = score_feature_table(build_feature_table(rows))
+    for doc, scores in zip(docs, batch_scores):
+        verificability = check_verificability(doc.text, None, doc=doc)
+        authenticity = check_authenticity(doc.text, None, KEYWORDS, doc=doc)
+        knowledge = check_knowledge_dimension(doc.text, None, doc=doc)
+        for name, value in scores["verificability"].items():
+            assert verificability[name] == value, (doc.text, name)
+        for name, value in scores["authenticity"].items():
+            assert authenticity[name] == value, (doc.text, name)
+        for name, value in scores["knowledge"].items():
+            assert knowledge[name] == value, (doc.text, name)
+
+    calcular, comprender, sin_verbo = docs
+    result = check_verificability(calcular.text, None, doc=calcular)
+    assert (result['observable_score'], result['measurable_score']) == (4, 3)
+    assert "Presencia de números." in str(result['justification'])
+    assert check_verificability(comprender.text, None, doc=comprender)['observable_score'] == 1 # 3 - 1 (interno) - 1 (abstracto)
+    assert check_verificability(sin_verbo.text, None, doc=sin_verbo)['justification'].render().startswith("No se identificó verbo")
+    assert check_authenticity(calcular.text, None, KEYWORDS, doc=calcular)['context_score'] == 4
+    # Las características ya extraídas evitan volver a analizar el Doc
+    features = extract_features(calcular, keyword_index=get_keyword_index(KEYWORDS))
+    assert check_authenticity(calcular.text, None, KEYWORDS, features=features) == \
+        check_authenticity(calcular.text, None, KEYWORDS, doc=calcular)
+    print("✅ Puntuaciones vectorizadas correctas")
+
+
+def test_keyword_index_cache():
+    """El índice de keywords se reutiliza por contenido del diccionario y la caché está acotada"""
+    print("🧪 Probando caché del índice de keywords...")
+    index = get_keyword_index(KEYWORDS)
+    assert index == frozenset({"empresa", "mercado"})
+    assert get_keyword_index({"negocios": ["empresa", "mercado"]}) is index # Otra copia, mismo contenido
+
+    for i in range(3 * authenticity_analyzer._KEYWORD_INDEX_CACHE_SIZE):
+        get_keyword_index({"temporal": [f"termino_{i}"]})
+    assert len(authenticity_analyzer._KEYWORD_INDEX_CACHE) == authenticity_analyzer._KEYWORD_INDEX_CACHE_SIZE
+    assert get_keyword_index(KEYWORDS) == index
+    print("✅ Caché del índice acotada")
+
+
+if __name__ == "__main__":
+    print("📊 PRUEBA TABLA DE CARACTERÍSTICAS")
+    print("=" * 34)
+    test_feature_table()
+    test_vectorized_scores_match_per_row()
+    test_keyword_index_cache()
+    print("\n🎉 ¡Pruebas exitosas!")
@@ -0,0 +1,79 @@
+"""
+Prueba de la búsqueda aproximada de verbos en la taxonomía (errores de tipeo y variantes)
+"""
+
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import spacy
+from spacy.tokens import Doc
+
+from src.fuzzy_verbs import FuzzyVerbIndex, edit_distance, get_fuzzy_verb_index
+from src.bloom_analyzer import analyze_bloom_level, cached_load_bloom_taxonomy
+from src.rda_pipeline import analyze_rda_text, build_rda_result
+
+
+def _doc(words, lemmas):
+    # Primer token: verbo raíz
+    return Doc(spacy.blank("es").vocab, words=words, lemmas=lemmas,
+               pos=["VERB"] + ["NOUN"] * (len(words) - 1), deps=["ROOT"] + ["obj"] * (len(words) - 1),
+               heads=[0] * len(words))
+
+
+def test_index_lookup():
+    """Verbo más cercano con su distancia; empates entre niveles y palabras cortas no se aproximan"""
+    print("🧪 Probando índice aproximado...")
+    assert edit_distance("analisar", "analizar") == 1 and edit_distance("evalaur", "evaluar") == 1
+    index = FuzzyVerbIndex({"analizar": "analizar", "diseñar": "crear", "citar": "recordar",
+                            "cantar": "aplicar", "contar": "recordar"}, max_distance=2)
+    assert index.lookup("analisar") == ("analizar", 1, "analizar")
+    assert index.lookup("disenar") == ("diseñar", 0, "crear") # Solo difieren las tildes
+    assert index.lookup("nadar") is None
+    assert index.lookup("cntar") is None # Empate cantar/contar con niveles distintos
+    assert index.lookup("cit") is None # Demasiado corta
+
+    index = FuzzyVerbIndex(cached_load_bloom_taxonomy(), max_distance=2)
+    start = time.perf_counter()
+    for _ in range(100):
+        index.lookup("organizr")
+    elapsed_ms = (time.perf_counter() - start) * 1000 / 100
+    print(f"   {index.lookup('organizr')} en {elapsed_ms:.3f} ms")
+    assert elapsed_ms < 1
+    print("✅ Índice correcto")
+
+
+def test_opt_in_bloom_result():
+    """Solo con RDA_FUZZY_VERBS se aproxima el verbo, y la fila lo muestra"""
+    print("🧪 Probando búsqueda aproximada en el análisis de Bloom...")
+    doc = _doc(["analisar", "estados"], ["analisar", "estado"])
+    previous = os.environ.pop("RDA_FUZZY_VERBS", None)
+    try:
+        assert get_fuzzy_verb_index(cached_load_bloom_taxonomy()) is None
+        assert analyze_bloom_level("analisar estados", doc=doc)["level"] == "No clasificado"
+
+        os.environ["RDA_FUZZY_VERBS"] = "1"
+        result = analyze_bloom_level("analisar estados", doc=doc)
+        assert result["level"] == "Analizar" and result["verb"] == "analisar" and result["error"] is None
+        assert (result["approximate_verb"], result["approximate_distance"]) == ("analizar", 1)
+
+        text_analysis = analyze_rda_text("analisar estados", None, docs={"analisar estados": doc})
+        row = build_rda_result("analisar estados", "4", text_analysis)
+        assert row["Verbo Aproximado"] == "analizar (distancia 1)"
+        assert row["Nivel Bloom Detectado"] == "Analizar (4)"
+    finally:
+        if previous is None:
+            os.environ.pop("RDA_FUZZY_VERBS", None)
+        else:
+            os.environ["RDA_FUZZY_VERBS"] = previous
+    print("✅ Búsqueda aproximada opcional y visible")
+
+
+if __name__ == "__main__":
+    print("🔤 PRUEBA BÚSQUEDA APROXIMADA DE VERBOS")
+    print("=" * 38)
+    test_index_lookup()
+    test_opt_in_bloom_result()
+    print("\n🎉 ¡Pruebas exitosas!")
@@ -0,0 +1,60 @@
+"""
+Prueba del re-análisis incremental (diff de entradas por fila y hash de contenido)
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.incremental import (
+    diff_input_data, rows_to_analyze, merge_results, rda_content_hash,
+    STATUS_NEW, STATUS_CHANGED, STATUS_UNCHANGED
+)
+
+
+def test_diff_input_data():
+    """Detecta filas nuevas, modificadas, sin cambios y eliminadas"""
+    print("🧪 Probando diff_input_data...")
+    previous = [("Analizar datos.", "6"), ("Crear un plan.", "8"), ("Listar partes.", "2")]
+    current = [("Analizar datos.", "6"), ("Crear un plan de negocios.", "8"), ("Listar partes.", "2"), ("Evaluar casos.", "4")]
+
+    diff = diff_input_data(previous, current)
+    print(f"   Estados: {diff['status']}")
+
+    assert diff['status'] == [STATUS_UNCHANGED, STATUS_CHANGED, STATUS_UNCHANGED, STATUS_NEW]
+    assert diff['changed'] == [1] and diff['new'] == [3] and diff['removed'] == []
+
+    # Cambiar solo el nivel académico también es una modificación
+    diff_level = diff_input_data(previous, [("Analizar datos.", "8")] + previous[1:])
+    assert diff_level['changed'] == [0]
+
+    # Filas eliminadas al final del archivo
+    diff_removed = diff_input_data(previous, previous[:1])
+    assert diff_removed['removed'] == [1, 2]
+    print("✅ diff_input_data correcto")
+
+
+def test_merge_results():
+    """Solo se re-analizan filas pendientes y el resultado respeta el orden actual"""
+    print("🧪 Probando rows_to_analyze y merge_results...")
+    previous = [("Analizar datos.", "6"), ("Crear un plan.", "8")]
+    current = [("Crear un plan.", "8"), ("Analizar datos.", "6"), ("Evaluar casos.", "4")]
+    cache = {rda_content_hash(text, level): {"RA": text} for text, level in previous}
+
+    diff = diff_input_data(previous, current)
+    pending = rows_to_analyze(diff, cache)
+    assert pending == [2], pending
+
+    cache[diff['hashes'][2]] = {"RA": "Evaluar casos."}
+    merged = merge_results(diff, cache)
+    assert [r["RA"] for r in merged] == ["Crear un plan.", "Analizar datos.", "Evaluar casos."]
+    print("✅ Resultados fusionados en el orden de la entrada actual")
+
+
+if __name__ == "__main__":
+    print("🔁 PRUEBA ANÁLISIS INCREMENTAL")
+    print("=" * 30)
+    test_diff_input_data()
+    test_merge_results()
+    print("\n🎉 ¡Pruebas exitosas!")
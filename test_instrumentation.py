@@ -0,0 +1,62 @@
+"""
+Prueba de la instrumentación de tiempos (histogramas y percentiles)
+"""
+
+import sys
+import os
+import json
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src import instrumentation
+
+
+def test_histogram_percentiles():
+    """Los percentiles aproximados quedan dentro de la resolución de las cubetas (~5%)"""
+    print("🧪 Probando percentiles del histograma...")
+    histogram = instrumentation.Histogram()
+    for ms in range(1, 101): # 1 ms .. 100 ms
+        histogram.record(ms / 1000)
+
+    summary = histogram.to_dict()
+    print(f"   {summary}")
+    assert summary["count"] == 100
+    assert abs(summary["total_ms"] - 5050) < 1e-6
+    assert 50 <= summary["p50_ms"] <= 50 * 1.06
+    assert 95 <= summary["p95_ms"] <= 95 * 1.06
+    assert summary["p99_ms"] <= summary["max_ms"] == 100
+    print("✅ Percentiles correctos")
+
+
+def test_timed_disabled_and_enabled():
+    """Sin activar no se registra nada; activada, se cuentan las llamadas y se exporta JSON"""
+    print("🧪 Probando decorador timed...")
+    instrumentation.reset()
+    instrumentation.disable()
+
+    @instrumentation.timed("prueba")
+    def work(x):
+        return x * 2
+
+    assert work(2) == 4 and instrumentation.snapshot() == {}
+
+    instrumentation.enable()
+    try:
+        for i in range(3):
+            work(i)
+        with instrumentation.timed_block("bloque"):
+            pass
+        metrics = json.loads(instrumentation.dump_json())["metrics"]
+        assert metrics["prueba"]["count"] == 3 and metrics["bloque"]["count"] == 1
+    finally:
+        instrumentation.disable()
+        instrumentation.reset()
+    print("✅ Instrumentación opcional correcta")
+
+
+if __name__ == "__main__":
+    print("⏱️ PRUEBA INSTRUMENTACIÓN")
+    print("=" * 30)
+    test_histogram_percentiles()
+    test_timed_disabled_and_enabled()
+    print("\n🎉 ¡Pruebas exitosas!")
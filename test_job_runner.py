@@ -0,0 +1,131 @@
+"""
+Prueba del ejecutor de trabajos de análisis en segundo plano
+"""
+
+import sys
+import os
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.job_runner import AnalysisJob, JobScheduler, JOB_CANCELLED, JOB_COMPLETED
+
+
+def test_job_completes():
+    """El trabajo procesa todas las filas y guarda los resultados por clave"""
+    print("🧪 Probando ejecución completa...")
+    rows = [(f"k{i}", f"RdA {i}", "6") for i in range(5)]
+    job = AnalysisJob(rows, lambda text, level: {"RA": text, "Nivel": level}).start()
+    job.wait(timeout=10)
+
+    assert job.status == JOB_COMPLETED
+    assert job.done == job.total == 5 and job.progress == 1.0
+    assert job.snapshot_results()["k3"] == {"RA": "RdA 3", "Nivel": "6"}
+    print("✅ Trabajo completado")
+
+
+def test_job_cancel_and_resume():
+    """Cancelar detiene el trabajo tras la fila en curso y reanudar continúa desde ahí"""
+    print("🧪 Probando cancelación y reanudación...")
+    gate = threading.Event()
+    blocked = threading.Event()
+    processed = []
+
+    def slow_analyze(text, level):
+        processed.append(text)
+        if text == "RdA 1":
+            blocked.set()
+            gate.wait(timeout=10) # Bloquear en la segunda fila hasta cancelar
+        return {"RA": text}
+
+    rows = [(f"k{i}", f"RdA {i}", "6") for i in range(4)]
+    job = AnalysisJob(rows, slow_analyze).start()
+    assert blocked.wait(timeout=10), "El trabajo no llegó a la segunda fila"
+    job.cancel()
+    gate.set()
+    job.wait(timeout=10)
+
+    assert job.status == JOB_CANCELLED and job.done == 2, (job.status, job.done)
+    print(f"   Cancelado tras {job.done}/{job.total} filas")
+
+    job.resume().wait(timeout=10)
+    assert job.status == JOB_COMPLETED and job.done == 4
+    assert processed == ["RdA 0", "RdA 1", "RdA 2", "RdA 3"] # Ninguna fila se procesa dos veces
+    print("✅ Reanudado sin repetir filas")
+
+
+class _SlowReleaseJob(AnalysisJob):
+    """Tarda en soltar el turno tras publicar su estado (amplía la ventana entre cancelar y reanudar)."""
+
+    def _finish(self, status, error=None):
+        super()._finish(status, error)
+        time.sleep(0.05)
+
+
+def test_resume_before_turn_released():
+    """Reanudar mientras el hilo aún tiene el turno del trabajo cancelado no lo deja colgado"""
+    print("🧪 Probando reanudación inmediata tras cancelar...")
+    scheduler = JobScheduler(max_workers=1, slice_rows=10)
+    blocked = threading.Event()
+
+    def analyze(text, level):
+        if text == "RdA 0":
+            blocked.set()
+            job.cancel() # Se cancela desde la propia fila en curso
+        return {"RA": text}
+
+    job = _SlowReleaseJob([(f"k{i}", f"RdA {i}", "6") for i in range(3)], analyze).start(scheduler)
+    assert blocked.wait(timeout=10)
+    job.wait(timeout=10)
+    assert job.status == JOB_CANCELLED
+    job.resume(scheduler).wait(timeout=10) # El hilo todavía no ha soltado el turno
+    assert job.status == JOB_COMPLETED and job.done == 3, (job.status, job.done)
+    assert scheduler.counters()["en_cola"] == 0
+    print("✅ Reanudado tras soltar el turno")
+
+
+def test_fair_queue():
+    """Un lote enorme no retrasa a los trabajos que llegan después; la cola informa de la posición"""
+    print("🧪 Probando cola justa y posición en la cola...")
+    scheduler = JobScheduler(max_workers=1, slice_rows=2)
+    gate = threading.Event()
+    started = threading.Event()
+    order = []
+
+    def analyze(text, level):
+        if text == "grande 0":
+            started.set()
+            gate.wait(timeout=10) # Retener el primer turno hasta encolar los demás
+        order.append(text)
+        return {"RA": text}
+
+    big = AnalysisJob([(f"g{i}", f"grande {i}", "6") for i in range(20)], analyze).start(scheduler)
+    assert started.wait(timeout=10), "El primer trabajo no empezó"
+    small = AnalysisJob([(f"p{i}", f"pequeño {i}", "6") for i in range(3)], analyze).start(scheduler)
+    waiting = AnalysisJob([("c0", "cancelado 0", "6")], analyze).start(scheduler)
+    assert (big.queue_position, small.queue_position, waiting.queue_position) == (None, 1, 2)
+
+    waiting.cancel() # Esperaba turno: sale de la cola sin procesar nada
+    waiting.wait(timeout=1)
+    assert waiting.status == JOB_CANCELLED and waiting.done == 0
+    gate.set()
+    small.wait(timeout=10)
+    big.wait(timeout=10)
+
+    assert small.status == big.status == JOB_COMPLETED
+    assert order.index("pequeño 2") < order.index("grande 10"), order # Turnos alternos, no al final del lote
+    assert "cancelado 0" not in order
+    counters = scheduler.counters()
+    assert counters["trabajos"] == 3 and counters["en_cola"] == 0 and counters["turnos"] == 12, counters
+    print("✅ Cola justa correcta")
+
+
+if __name__ == "__main__":
+    print("⚙️ PRUEBA EJECUTOR DE TRABAJOS")
+    print("=" * 30)
+    test_job_completes()
+    test_job_cancel_and_resume()
+    test_resume_before_turn_released()
+    test_fair_queue()
+    print("\n🎉 ¡Pruebas exitosas!")
@@ -0,0 +1,83 @@
+"""
+Prueba del memo de decisiones por lema (LRU acotado compartido por los analizadores)
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import spacy
+from spacy.tokens import Doc
+
+from src import instrumentation
+from src.lemma_decisions import (ACTION_TIER_OTHER, LemmaMemo, decide_lemma, get_lemma_decision, get_lemma_memo)
+from src.rule_packs import get_rule_pack, load_rule_pack, set_rule_pack
+from src.features import extract_features
+
+
+def test_decision_record():
+    """Un registro reúne las decisiones de todos los analizadores para el lema"""
+    print("🧪 Probando registro de decisiones...")
+    rules = load_rule_pack("default")
+    decision = decide_lemma("calcular", rules, {"calcular": "aplicar"})
+    assert decision.bloom_key == "calcular" and decision.bloom_level == "aplicar"
+    assert decision.verif_verb_class == 1
+    assert decide_lemma("Calcular ", rules, {"calcular": "aplicar"}).bloom_level == "aplicar" # Clave normalizada
+    unknown = decide_lemma("xyz", rules, {})
+    assert unknown.bloom_level is None and unknown.verif_verb_class == 0 and unknown.action_tier == ACTION_TIER_OTHER
+    assert not (unknown.is_procedural or unknown.is_conceptual or unknown.is_self_reference)
+    print("✅ Registro correcto")
+
+
+def test_lru_bound_and_counters():
+    """El memo está acotado y sus aciertos/fallos se leen desde instrumentation"""
+    print("🧪 Probando límite y contadores del memo...")
+    memo = LemmaMemo(load_rule_pack("default"), {}, maxsize=2)
+    for lemma in ("a", "b", "a", "c", "b"):
+        memo.get(lemma)
+    counters = memo.counters()
+    assert (counters["aciertos"], counters["fallos"], counters["lemas"]) == (1, 4, 2), counters
+    memo.reset_counters()
+    assert memo.counters()["aciertos"] == 0 and memo.counters()["tasa_acierto"] is None
+
+    memo = get_lemma_memo()
+    instrumentation.reset()
+    get_lemma_decision("comparar")
+    get_lemma_decision("comparar")
+    shared = instrumentation.counters()["lemma_memo"]
+    assert shared["aciertos"] >= 1 and shared["fallos"] <= 1, shared
+    print(f"   {shared}")
+    print("✅ Límite y contadores correctos")
+
+
+def test_rule_pack_change_invalidates():
+    """Un paquete de reglas distinto usa un memo nuevo y las características lo reflejan"""
+    print("🧪 Probando invalidación por paquete de reglas...")
+    doc = Doc(spacy.blank("es").vocab, words=["calcular", "áreas"], lemmas=["calcular", "área"],
+              pos=["VERB", "NOUN"], deps=["ROOT", "obj"], heads=[0, 0])
+    original = get_rule_pack()
+    assert extract_features(doc)["verif_verb_class"] == 1
+    first = get_lemma_memo()
+
+    pack = load_rule_pack("default")
+    pack.observable_verbs = frozenset()
+    pack.internal_verbs = frozenset({"calcular"})
+    pack.version = "prueba-memo"
+    set_rule_pack(pack)
+    try:
+        assert extract_features(doc)["verif_verb_class"] == -1
+        assert get_lemma_memo() is not first
+    finally:
+        set_rule_pack(original)
+    assert extract_features(doc)["verif_verb_class"] == 1
+    print("✅ Invalidación correcta")
+
+
+if __name__ == "__main__":
+    print("🧠 PRUEBA MEMO DE DECISIONES POR LEMA")
+    print("=" * 37)
+    test_decision_record()
+    test_lru_bound_and_counters()
+    test_rule_pack_change_invalidates()
+    print("\n🎉 ¡Pruebas exitosas!")
@@ -0,0 +1,82 @@
+"""
+Prueba de las frases de nivel/condición de Corrección como reglas del Matcher de spaCy
+"""
+
+import sys
+import os
+import json
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import spacy
+from spacy.tokens import Doc
+
+from src.correction_analyzer import check_level_phrase_clause
+from src.level_phrases import get_level_phrase_matcher
+from src.rule_packs import load_rule_pack
+from src.verb_frame import get_verb_frame
+
+VOCAB = spacy.blank("es").vocab
+
+
+def _doc(words, pos, deps, heads, lemmas=None):
+    return Doc(VOCAB, words=words, lemmas=lemmas or [word.lower() for word in words], pos=pos, deps=deps, heads=heads)
+
+
+def test_default_rules():
+    """Iniciadores (complemento completo), "de forma ADJ" (solo el patrón) y advmod ignorado"""
+    print("🧪 Probando reglas por defecto...")
+    doc = _doc(["Analizar", "datos", "según", "normas", "contables"],
+               ["VERB", "NOUN", "ADP", "NOUN", "ADJ"], ["ROOT", "obj", "case", "obl", "amod"], [0, 0, 3, 0, 3])
+    frame = get_verb_frame(doc)
+    assert check_level_phrase_clause(frame.verb, frame.modifiers) == {"found": True, "text": "según normas contables"}
+
+    doc = _doc(["Realizar", "tareas", "De", "forma", "eficiente", "y", "clara"],
+               ["VERB", "NOUN", "ADP", "NOUN", "ADJ", "CCONJ", "ADJ"],
+               ["ROOT", "obj", "case", "obl", "amod", "cc", "conj"], [0, 0, 3, 0, 3, 6, 4],
+               lemmas=["realizar", "tarea", "De", "forma", "eficiente", "y", "claro"])
+    frame = get_verb_frame(doc)
+    assert check_level_phrase_clause(frame.verb, frame.modifiers) == {"found": True, "text": "De forma eficiente"}
+    # Sin modificadores resueltos: los complementos salen del DependencyMatcher
+    assert check_level_phrase_clause(frame.verb) == {"found": True, "text": "De forma eficiente"}
+
+    doc = _doc(["Redactar", "informes", "correctamente"], ["VERB", "NOUN", "ADV"],
+               ["ROOT", "obj", "advmod"], [0, 0, 0])
+    assert check_level_phrase_clause(get_verb_frame(doc).verb) == {"found": False, "text": ""}
+    print("✅ Reglas por defecto correctas")
+
+
+def test_pattern_added_as_data():
+    """Un paquete institucional añade una condición solo con datos"""
+    print("🧪 Probando patrón añadido en el paquete de reglas...")
+    base = load_rule_pack("default")
+    config = {"nombre": "facultad", "extiende": "default", "correccion": {"patrones_nivel": [
+        {"nombre": "en_el_marco_de", "texto": "complemento",
+         "patron": [{"LEMMA": "en"}, {"LEMMA": "el"}, {"LEMMA": "marco"}, {"LEMMA": "de"}]},
+    ]}}
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as f:
+        json.dump(config, f)
+    try:
+        pack = load_rule_pack(f.name)
+    finally:
+        os.unlink(f.name)
+    assert pack.version != base.version
+
+    doc = _doc(["Diseñar", "planes", "en", "el", "marco", "de", "la", "norma"],
+               ["VERB", "NOUN", "ADP", "DET", "NOUN", "ADP", "DET", "NOUN"],
+               ["ROOT", "obj", "case", "det", "obl", "case", "det", "nmod"], [0, 0, 4, 4, 0, 7, 7, 4])
+    verb = get_verb_frame(doc).verb
+    assert get_level_phrase_matcher(VOCAB, base).find(verb) is None
+    match = get_level_phrase_matcher(VOCAB, pack).find(verb)
+    assert match.pattern == "en_el_marco_de" and match.text == "en el marco de la norma"
+    assert get_level_phrase_matcher(VOCAB, pack) is get_level_phrase_matcher(VOCAB, pack) # Compilado una vez
+    print("✅ Patrón de datos reconocido")
+
+
+if __name__ == "__main__":
+    print("📐 PRUEBA FRASES DE NIVEL (MATCHER)")
+    print("=" * 35)
+    test_default_rules()
+    test_pattern_added_as_data()
+    print("\n🎉 ¡Pruebas exitosas!")
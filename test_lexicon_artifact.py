@@ -0,0 +1,105 @@
+"""
+Prueba del artefacto de léxicos prelematizados (construcción, lectura con mmap y uso en el paquete de reglas)
+"""
+
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import spacy
+from spacy.language import Language
+from spacy.tokens import Doc
+
+from src.rule_packs import load_rule_pack, get_rule_pack, set_rule_pack
+from src.lexicon_artifact import (build_lexicon_artifact, open_lexicon_artifact, find_lexicon_artifact,
+                                  MappedLexicon, KEYWORDS_LABEL)
+from src.authenticity_analyzer import get_keyword_index
+from src.features import extract_features
+
+KEYWORDS = {"talento_humano": ["competencias", "clima_laboral", "KPI_recursos_humanos"]}
+
+
+@Language.component("prueba_lemas_plural")
+def _plural_lemmas(doc):
+    """Lematizador mínimo para la prueba: quita la "s" final de las palabras largas."""
+    for token in doc:
+        token.lemma_ = token.text[:-1] if len(token.text) > 4 and token.text.endswith("s") else token.text
+    return doc
+
+
+def _nlp():
+    nlp = spacy.blank("es")
+    nlp.add_pipe("prueba_lemas_plural")
+    return nlp
+
+
+def test_build_and_lookup():
+    """El artefacto guarda formas originales y lematizadas, ordenadas, con índice hash"""
+    print("🧪 Probando construcción y consulta del artefacto...")
+    pack = load_rule_pack("default", use_artifact=False)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = build_lexicon_artifact(_nlp(), os.path.join(tmp, "default.lex"), pack, KEYWORDS)
+        artifact = open_lexicon_artifact(path)
+        print(f"   {artifact}")
+        assert artifact.rule_pack_version == pack.version
+        terms = [artifact.term(i) for i in range(len(artifact))]
+        assert [t.encode("utf-8") for t in terms] == sorted(t.encode("utf-8") for t in terms)
+
+        keywords = artifact.lexicon(KEYWORDS_LABEL)
+        # Forma original normalizada y forma lematizada
+        assert "competencias" in keywords and "competencia" in keywords
+        assert "clima laboral" in keywords and "kpi recurso humano" in keywords
+        assert "calcular" in artifact.lexicon("observable_verbs")
+        assert set(artifact.lexicon("vague_words")) >= set(pack.vague_words)
+        assert artifact.get("dato") >= {"factual_keywords"} and artifact.get("xyz") is None
+        assert keywords.match(["mejorar", "el", "clima", "laboral"]) == {"clima laboral"}
+        artifact.close()
+    print("✅ Artefacto correcto")
+
+
+def test_rule_pack_uses_matching_artifact():
+    """El paquete usa el artefacto de su versión; las keywords coinciden por lema"""
+    print("🧪 Probando paquete de reglas con artefacto...")
+    previous_pack = get_rule_pack()
+    previous_env = os.environ.get("RDA_LEXICON_ARTIFACT")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "default.lex")
+        base = load_rule_pack("default", use_artifact=False)
+        build_lexicon_artifact(_nlp(), path, base, KEYWORDS)
+        os.environ["RDA_LEXICON_ARTIFACT"] = path
+        try:
+            pack = load_rule_pack("default")
+            assert pack.lexicon_artifact is not None and pack.version != base.version
+            assert isinstance(pack.observable_verbs, MappedLexicon) and "calcular" in pack.observable_verbs
+            assert pack.match_lemmas({"dato"})["factual_keywords"] == {"dato"}
+
+            set_rule_pack(pack)
+            keyword_index = get_keyword_index(KEYWORDS)
+            assert isinstance(keyword_index, MappedLexicon)
+            doc = Doc(spacy.blank("es").vocab, words=["mejorar", "las", "competencias", "y", "el", "clima", "laboral"],
+                      lemmas=["mejorar", "el", "competencia", "y", "el", "clima", "laboral"])
+            assert extract_features(doc, pack, keyword_index)["keyword_matches"] == {"competencia", "clima laboral"}
+
+            # Un artefacto de otra versión del paquete se ignora
+            other = load_rule_pack("default", use_artifact=False)
+            other.version = "otra"
+            assert find_lexicon_artifact(other) is None
+            pack.lexicon_artifact.close()
+        finally:
+            set_rule_pack(previous_pack)
+            if previous_env is None:
+                os.environ.pop("RDA_LEXICON_ARTIFACT", None)
+            else:
+                os.environ["RDA_LEXICON_ARTIFACT"] = previous_env
+    assert isinstance(get_keyword_index(KEYWORDS), frozenset)
+    print("✅ Paquete con artefacto correcto")
+
+
+if __name__ == "__main__":
+    print("🗂️ PRUEBA ARTEFACTO DE LÉXICOS")
+    print("=" * 30)
+    test_build_and_lookup()
+    test_rule_pack_uses_matching_artifact()
+    print("\n🎉 ¡Pruebas exitosas!")
@@ -0,0 +1,79 @@
+"""
+Prueba de la cascada de modelos (modelo pequeño para todo, grande solo para las filas inciertas)
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import spacy
+from spacy.language import Language
+
+from src.model_cascade import analyze_rda_cascade, is_uncertain_result
+from src.rda_pipeline import analyze_rda_batch
+
+_LARGE_PARSES = {"count": 0}
+
+
+def _tag_verbs(doc, is_verb):
+    root = None
+    for token in doc:
+        token.lemma_ = token.lower_
+        token.pos_ = "VERB" if is_verb(token.lower_) else "NOUN"
+        token.dep_ = "dep"
+        if token.pos_ == "VERB" and root is None:
+            root = token
+            token.dep_ = "ROOT"
+    return doc
+
+
+@Language.component("prueba_cascada_pequeno")
+def _small_model(doc):
+    """Modelo "pequeño" de la prueba: solo reconoce el verbo analizar."""
+    return _tag_verbs(doc, lambda word: word == "analizar")
+
+
+@Language.component("prueba_cascada_grande")
+def _large_model(doc):
+    """Modelo "grande" de la prueba: reconoce cualquier infinitivo y cuenta los Docs procesados."""
+    _LARGE_PARSES["count"] += 1
+    return _tag_verbs(doc, lambda word: word.endswith(("ar", "er", "ir")))
+
+
+def _model(component):
+    nlp = spacy.blank("es")
+    nlp.add_pipe(component)
+    return nlp
+
+
+def test_cascade_escalates_uncertain_rows():
+    """Solo las filas inciertas pasan por el modelo grande y toman su resultado"""
+    print("🧪 Probando cascada de modelos...")
+    small, large = _model("prueba_cascada_pequeno"), _model("prueba_cascada_grande")
+    items = [("Analizar los estados financieros de la empresa", "4"),
+             ("Diseñar un plan de marketing digital", "6"),
+             ("Nadar en la piscina olímpica", "2")]
+    small_results = analyze_rda_batch(items, small)
+    assert [is_uncertain_result(r) for r in small_results] == [False, True, True]
+
+    _LARGE_PARSES["count"] = 0
+    results, stats = analyze_rda_cascade(items, small, large)
+    print(f"   {stats}")
+    assert stats["filas"] == 3 and stats["inciertas"] == 2 and stats["resueltas"] == 1
+    assert 0 < _LARGE_PARSES["count"] <= 4 # Variantes de las dos filas inciertas, no del lote completo
+    assert results[0] == small_results[0]
+    assert results[1]["Nivel Bloom Original"] == "Crear" and results[1]["Verbo Principal"] == "diseñar"
+    assert results[2]["Nivel Bloom Original"] == "No clasificado" # Sigue incierta con el modelo grande
+
+    # Sin modelo de escalado distinto se devuelven los resultados del pequeño
+    same, same_stats = analyze_rda_cascade(items, small, small)
+    assert same == small_results and same_stats["modelo_escalado"] is None
+    print("✅ Cascada correcta")
+
+
+if __name__ == "__main__":
+    print("🪜 PRUEBA CASCADA DE MODELOS")
+    print("=" * 28)
+    test_cascade_escalates_uncertain_rows()
+    print("\n🎉 ¡Pruebas exitosas!")
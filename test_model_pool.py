@@ -0,0 +1,88 @@
+"""
+Prueba del pool de instancias del modelo spaCy (préstamo, espera en orden y clonación)
+"""
+
+import sys
+import os
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import spacy
+
+from src.model_pool import ModelPool, clone_model
+from src.parse_cache import model_signature
+from src.rda_pipeline import analyze_rda_batch, make_row_analyzer
+
+ITEMS = [
+    ("Analizar los estados financieros de la empresa", "2"),
+    ("Diseñar un plan de marketing", "4"),
+]
+
+
+def test_borrow_and_wait_in_order():
+    """Con las instancias prestadas, los trabajos esperan y las reciben en orden de llegada"""
+    print("🧪 Probando préstamo y espera...")
+    nlp = spacy.blank("es")
+    pool = ModelPool(nlp, size=2, factory=lambda: spacy.blank("es"))
+    first, second = pool.acquire(), pool.acquire()
+    assert first is nlp and second is not nlp # La segunda instancia se crea bajo demanda
+
+    served = []
+    def borrow(name):
+        with pool.model(timeout=10):
+            served.append(name)
+
+    waiters = []
+    for name in ("a", "b"):
+        thread = threading.Thread(target=borrow, args=(name,))
+        thread.start()
+        waiters.append(thread)
+        deadline = time.monotonic() + 10
+        while pool.counters()["en_espera"] < len(waiters): # Esperar a que el hilo quede en la cola
+            assert time.monotonic() < deadline, "El hilo no llegó a esperar"
+            time.sleep(0.001)
+    pool.release(first) # "a" la recibe y, al devolverla, pasa a "b"
+    for thread in waiters:
+        thread.join(timeout=10)
+    pool.release(second)
+
+    assert served == ["a", "b"], served
+    counters = pool.counters()
+    assert (counters["instancias"], counters["libres"], counters["esperas"]) == (2, 2, 2), counters
+
+    held = pool.acquire(), pool.acquire()
+    try:
+        pool.acquire(timeout=0.05)
+        assert False, "Debería agotarse la espera"
+    except TimeoutError:
+        pass
+    for instance in held:
+        pool.release(instance)
+    print("✅ Préstamo y espera correctos")
+
+
+def test_clone_and_pooled_analysis():
+    """Las instancias clonadas tienen la misma firma y producen el mismo análisis"""
+    print("🧪 Probando clonación y análisis con el pool...")
+    nlp = spacy.blank("es")
+    clone = clone_model(nlp)
+    assert clone is not nlp and clone.vocab is not nlp.vocab
+    assert model_signature(clone) == model_signature(nlp)
+
+    expected = analyze_rda_batch(ITEMS, nlp)
+    pool = ModelPool(nlp, size=2)
+    analyze_row = make_row_analyzer(nlp, model_pool=pool)
+    with pool.model(): # Ocupa el modelo cargado: el análisis usa un clon
+        assert [analyze_row(text, level) for text, level in ITEMS] == expected
+    assert pool.counters()["instancias"] == 2
+    print("✅ Análisis con el pool correcto")
+
+
+if __name__ == "__main__":
+    print("🧵 PRUEBA POOL DE MODELOS")
+    print("=" * 30)
+    test_borrow_and_wait_in_order()
+    test_clone_and_pooled_analysis()
+    print("\n🎉 ¡Pruebas exitosas!")
@@ -0,0 +1,87 @@
+"""
+Prueba del arranque en caliente del modelo (comprobación previa sin descarga y snapshot recortado)
+"""
+
+import sys
+import os
+import time
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import spacy
+
+from src.model_snapshot import (build_model_snapshot, preflight_model, read_snapshot_meta, measure_cold_start)
+from src.nlp_utils import load_spacy_model_internal
+
+
+def _save_model(path):
+    """Modelo pequeño en disco: un componente desactivado (senter) y un NER basado en reglas."""
+    nlp = spacy.blank("es")
+    nlp.add_pipe("sentencizer", name="senter")
+    ruler = nlp.add_pipe("entity_ruler", name="ner")
+    ruler.add_patterns([{"label": "ORG", "pattern": "Andruia"}])
+    nlp.disable_pipe("senter")
+    nlp.to_disk(path)
+
+
+def _set_env(name, value):
+    previous = os.environ.get(name)
+    if value is None:
+        os.environ.pop(name, None)
+    else:
+        os.environ[name] = value
+    return previous
+
+
+def test_snapshot_excludes_components():
+    """El snapshot omite los componentes desactivados y los del perfil, y se usa al cargar el modelo"""
+    print("🧪 Probando snapshot del modelo...")
+    with tempfile.TemporaryDirectory() as tmp:
+        model_dir = os.path.join(tmp, "modelo")
+        _save_model(model_dir)
+        snapshot_dir = build_model_snapshot(model_dir, "sin_entidades", path=os.path.join(tmp, "snapshot"))
+        meta = read_snapshot_meta(snapshot_dir)
+        print(f"   {meta['excluidos']} -> {meta['componentes']}")
+        assert set(meta["excluidos"]) == {"senter", "ner"} and meta["componentes"] == []
+
+        previous = _set_env("RDA_MODEL_SNAPSHOT", snapshot_dir)
+        try:
+            preflight = preflight_model(model_dir)
+            assert preflight["ok"] and preflight["source"] == "snapshot"
+            nlp = load_spacy_model_internal(model_dir)
+            assert nlp is not None and "ner" not in nlp.pipe_names
+            # El snapshot solo sirve para el modelo del que se creó (p. ej. no para el de escalado)
+            assert preflight_model("es_core_news_lg", check_network=False)["source"] != "snapshot"
+        finally:
+            _set_env("RDA_MODEL_SNAPSHOT", previous)
+
+        # Sin snapshot se carga el modelo completo
+        assert preflight_model(model_dir)["source"] == "paquete"
+        assert "ner" in load_spacy_model_internal(model_dir).pipe_names
+        assert measure_cold_start(snapshot_dir) > 0
+    print("✅ Snapshot correcto")
+
+
+def test_preflight_fails_fast_offline():
+    """Sin modelo ni conexión no se intenta la descarga"""
+    print("🧪 Probando comprobación previa sin conexión...")
+    previous = _set_env("RDA_OFFLINE", "1")
+    try:
+        preflight = preflight_model("modelo_inexistente_rda")
+        assert not preflight["ok"] and preflight["online"] is False
+        assert "python -m spacy download modelo_inexistente_rda" in preflight["message"]
+        start = time.perf_counter()
+        assert load_spacy_model_internal("modelo_inexistente_rda") is None
+        assert time.perf_counter() - start < 5
+    finally:
+        _set_env("RDA_OFFLINE", previous)
+    print("✅ Falla de inmediato sin conexión")
+
+
+if __name__ == "__main__":
+    print("🚀 PRUEBA ARRANQUE EN CALIENTE DEL MODELO")
+    print("=" * 40)
+    test_snapshot_excludes_components()
+    test_preflight_fails_fast_offline()
+    print("\n🎉 ¡Pruebas exitosas!")
@@ -0,0 +1,54 @@
+"""
+Prueba de las notas codificadas (internado, texto diferido e idiomas)
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+
+from src.notes import Notes, make_notes, note, render_notes, render_note_columns, render_result, register_templates
+
+
+def test_notes_render_and_intern():
+    """Las notas idénticas comparten objeto y el texto se genera al mostrarlas"""
+    print("🧪 Probando notas codificadas...")
+    first = make_notes([("aut.verbo_alto", "analizar"), ("aut.sentido_manual",)])
+    second = make_notes([("aut.verbo_alto", "analizar"), ("aut.sentido_manual",)])
+    assert first is second and isinstance(first, Notes)
+    assert first.codes() == ["aut.verbo_alto", "aut.sentido_manual"]
+    assert str(first) == ("Verbo 'analizar' sugiere acción clara/aplicable. "
+                          "Sentido formativo requiere evaluación manual (default=3).")
+    # Duplicados exactos eliminados; tuplas como listas
+    assert make_notes([("cor.verbo", "x"), ("cor.verbo", "x")]) == (("cor.verbo", "x"),)
+    assert render_notes(note("con.factual_medio", ("dato",))) == "Factual(Medio): Keywords=['dato']."
+    # Valores ya en texto (resultados anteriores) se devuelven tal cual
+    assert render_notes("texto libre") == "texto libre" and render_notes(None) == ""
+    print("✅ Notas codificadas correctas")
+
+
+def test_render_columns_and_languages():
+    """Columnas de notas a texto y plantillas de otro idioma con respaldo en español"""
+    print("🧪 Probando render de columnas e idiomas...")
+    notes = note("aut.sin_keywords")
+    df = pd.DataFrame({"RA": ["a", "b"], "Notas Autenticidad": [notes, notes], "Puntaje Corrección": [1, 2]})
+    rendered = render_note_columns(df)
+    assert rendered["Notas Autenticidad"].tolist() == [str(notes)] * 2
+    assert isinstance(df["Notas Autenticidad"].iloc[0], Notes) # El original no se modifica
+
+    register_templates("en", {"aut.sin_keywords": "No professional context keywords found."})
+    assert notes.render("en") == "No professional context keywords found."
+    assert note("aut.adverbio").render("en") == "Adverbio sugiere mayor nivel de aplicación." # Sin traducción
+    assert render_result({"Notas Autenticidad": notes, "x": 1}, "en") == \
+        {"Notas Autenticidad": "No professional context keywords found.", "x": 1}
+    print("✅ Render de columnas e idiomas correcto")
+
+
+if __name__ == "__main__":
+    print("📝 PRUEBA NOTAS CODIFICADAS")
+    print("=" * 27)
+    test_notes_render_and_intern()
+    test_render_columns_and_languages()
+    print("\n🎉 ¡Pruebas exitosas!")
@@ -0,0 +1,191 @@
+"""
+Prueba de la caché persistente de análisis spaCy (DocBin en SQLite)
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import spacy
+from spacy.language import Language
+from spacy.tokens import Doc, Span
+
+from src import parse_cache
+from src.parse_cache import ParseCache
+from src.job_runner import AnalysisJob, JobScheduler
+from src.features import extract_features
+from src.correction_analyzer import check_correction
+from src.rda_pipeline import analyze_rda_batch, make_row_analyzer
+
+_PARSED = {"count": 0}
+
+
+@Language.component("prueba_contador_parseos")
+def _count_parses(doc):
+    """Cuenta los Docs que pasan por el pipeline (para comprobar que la caché evita el parseo)."""
+    _PARSED["count"] += 1
+    return doc
+
+
+def _parsed_doc(vocab):
+    # "Analizar los estados financieros de Andruia"
+    doc = Doc(vocab, words=["Analizar", "los", "estados", "financieros", "de", "Andruia"],
+              lemmas=["analizar", "el", "estado", "financiero", "de", "Andruia"],
+              pos=["VERB", "DET", "NOUN", "ADJ", "ADP", "PROPN"],
+              deps=["ROOT", "det", "obj", "amod", "case", "nmod"],
+              heads=[0, 2, 0, 2, 5, 2])
+    doc.ents = [Span(doc, 5, 6, label="ORG")]
+    return doc
+
+
+def test_doc_round_trip():
+    """Un Doc recuperado de la caché da los mismos resultados que el original"""
+    print("🧪 Probando ida y vuelta de Docs...")
+    nlp = spacy.blank("es")
+    doc = _parsed_doc(nlp.vocab)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ParseCache(os.path.join(tmp, "cache.sqlite"), nlp)
+        cache.put_many({doc.text: doc})
+        cached = cache.get_many([doc.text, "otro texto"])
+        assert list(cached) == [doc.text]
+        restored = cached[doc.text]
+        for attr in ("text", "lemma_", "pos_", "dep_", "ent_type_"):
+            assert [getattr(t, attr) for t in restored] == [getattr(t, attr) for t in doc], attr
+        assert [t.head.i for t in restored] == [t.head.i for t in doc]
+        assert extract_features(restored) == extract_features(doc)
+        assert check_correction(doc.text, None, doc=restored) == check_correction(doc.text, None, doc=doc)
+        stats = cache.stats()
+        assert (stats["docs"], stats["docbins"]) == (1, 1) and (cache.hits, cache.misses) == (1, 1)
+
+        # Otro pipeline (otros componentes) no reutiliza los análisis
+        other = spacy.blank("es")
+        other.add_pipe("sentencizer")
+        other_cache = ParseCache(os.path.join(tmp, "cache.sqlite"), other)
+        assert other_cache.get_many([doc.text]) == {}
+        other_cache.put_many({"otro texto": other("otro texto")})
+        cache.clear(other_models_only=True) # prune: conserva solo los del modelo actual
+        assert cache.get_many([doc.text]).keys() == {doc.text}
+        assert other_cache.get_many(["otro texto"]) == {} and cache.stats()["docbins"] == 1
+        other_cache.close()
+        cache.close()
+    print("✅ Ida y vuelta correcta")
+
+
+def test_batch_reuses_cached_parses():
+    """Un segundo análisis del mismo lote no vuelve a ejecutar el pipeline"""
+    print("🧪 Probando reutilización en el análisis por lotes...")
+    nlp = spacy.blank("es")
+    nlp.add_pipe("prueba_contador_parseos")
+    items = [("Analizar estados financieros", "4"), ("Diseñar un plan de marketing", "6")]
+    previous = os.environ.get("RDA_PARSE_CACHE")
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["RDA_PARSE_CACHE"] = os.path.join(tmp, "cache.sqlite")
+        try:
+            _PARSED["count"] = 0
+            first = analyze_rda_batch(items, nlp)
+            parsed = _PARSED["count"]
+            assert parsed > 0
+            second = analyze_rda_batch(items, nlp)
+            assert _PARSED["count"] == parsed, "Se volvió a parsear con la caché llena"
+            assert first == second
+        finally:
+            if previous is None:
+                os.environ.pop("RDA_PARSE_CACHE", None)
+            else:
+                os.environ["RDA_PARSE_CACHE"] = previous
+    print("✅ Análisis reutilizados")
+
+
+def test_row_lookups_decode_blob_once():
+    """Las lecturas fila a fila reutilizan el DocBin ya deserializado"""
+    print("🧪 Probando lecturas fila a fila...")
+    decoded = []
+
+    class CountingDocBin(parse_cache.DocBin):
+        def from_bytes(self, data):
+            decoded.append(len(data))
+            return super().from_bytes(data)
+
+    nlp = spacy.blank("es")
+    texts = [f"Analizar el caso {i}" for i in range(300)]
+    original = parse_cache.DocBin
+    parse_cache.DocBin = CountingDocBin
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ParseCache(os.path.join(tmp, "cache.sqlite"), nlp)
+            cache.put_many({text: nlp(text) for text in texts})
+            for text in texts[:100]:
+                assert cache.get_many([text])[text].text == text
+            assert len(decoded) == 1, decoded
+            cache.clear()
+            assert cache.get_many(texts[:1]) == {}
+            cache.close()
+    finally:
+        parse_cache.DocBin = original
+    print("✅ DocBin deserializado una vez")
+
+
+def test_bounded_size():
+    """Los DocBin reemplazados se eliminan; la caché respeta la caducidad y el tamaño máximo"""
+    print("🧪 Probando límites de la caché...")
+    nlp = spacy.blank("es")
+    texts = [f"Analizar el caso {i}" for i in range(20)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.sqlite")
+        cache = ParseCache(path, nlp)
+        cache.put_many({text: nlp(text) for text in texts[:10]})
+        cache.put_many({text: nlp(text) for text in texts[:10]}) # Reescritura: el DocBin anterior queda sin uso
+        assert (cache.stats()["docs"], cache.stats()["docbins"]) == (10, 1), cache.stats()
+        cache.put_many({text: nlp(text) for text in texts[5:15]}) # Reemplazo parcial: el anterior sigue en uso
+        assert (cache.stats()["docs"], cache.stats()["docbins"]) == (15, 2), cache.stats()
+
+        blob_size = cache.stats()["bytes"] // 2
+        cache.max_bytes = int(blob_size * 2.5)
+        cache.put_many({text: nlp(text) for text in texts[15:]})
+        stats = cache.stats()
+        assert stats["bytes"] <= cache.max_bytes and stats["docbins"] == 2, stats
+        assert set(cache.get_many(texts)) == set(texts[5:]) # Se expulsó el DocBin más antiguo
+        cache.close()
+
+        cache = ParseCache(path, nlp, ttl=0)
+        time.sleep(0.01)
+        cache.put_many({texts[0]: nlp(texts[0])})
+        assert (cache.stats()["docs"], cache.stats()["docbins"]) == (1, 1), cache.stats()
+        cache.close()
+    print("✅ Caché acotada")
+
+
+def test_job_parses_each_turn_in_one_batch():
+    """Un AnalysisJob procesa y guarda en la caché los textos de cada turno en lote"""
+    print("🧪 Probando análisis por turnos en lote...")
+    nlp = spacy.blank("es")
+    rows = [(f"k{i}", f"Analizar el caso {i} de la empresa", "4") for i in range(10)]
+    previous = os.environ.get("RDA_PARSE_CACHE")
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["RDA_PARSE_CACHE"] = os.path.join(tmp, "cache.sqlite")
+        try:
+            job = AnalysisJob(rows, make_row_analyzer(nlp)).start(JobScheduler(max_workers=1, slice_rows=4))
+            job.wait(timeout=30)
+            expected = analyze_rda_batch([(text, level) for _, text, level in rows], nlp)
+            assert [job.results[key] for key, _, _ in rows] == expected
+            assert parse_cache.get_parse_cache(nlp).stats()["docbins"] == 3 # Un DocBin por turno (4 + 4 + 2)
+        finally:
+            if previous is None:
+                os.environ.pop("RDA_PARSE_CACHE", None)
+            else:
+                os.environ["RDA_PARSE_CACHE"] = previous
+    print("✅ Turnos procesados en lote")
+
+
+if __name__ == "__main__":
+    print("💾 PRUEBA CACHÉ DE ANÁLISIS spaCy")
+    print("=" * 32)
+    test_doc_round_trip()
+    test_batch_reuses_cached_parses()
+    test_row_lookups_decode_blob_once()
+    test_bounded_size()
+    test_job_parses_each_turn_in_one_batch()
+    print("\n🎉 ¡Pruebas exitosas!")
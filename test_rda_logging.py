@@ -0,0 +1,77 @@
+"""
+Prueba del logging con traza muestreada por RdA
+"""
+
+import sys
+import os
+import logging
+from contextlib import contextmanager
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src import rda_logging
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@contextmanager
+def _capture():
+    """Captura los registros del logger de prueba y quita el handler al terminar."""
+    logger = logging.getLogger("prueba_traza")
+    logger.setLevel(logging.INFO)
+    handler = _ListHandler()
+    logger.addHandler(handler)
+    try:
+        yield logger, handler
+    finally:
+        logger.removeHandler(handler)
+
+
+def test_trace_disabled_emits_nothing():
+    """Sin RDA_TRACE no se emite ningún evento por fila"""
+    print("🧪 Probando traza desactivada...")
+    with _capture() as (logger, handler):
+        rda_logging.disable_trace()
+        assert rda_logging.begin_row("Analizar estados financieros") is False
+        rda_logging.trace(logger, "evento", valor=1)
+        rda_logging.end_row()
+        assert handler.records == []
+    print("✅ Sin coste de logging por fila")
+
+
+def test_trace_sampling():
+    """La muestra es determinista por texto y respeta la fracción configurada"""
+    print("🧪 Probando muestreo de la traza...")
+    rda_logging.enable_trace(sample_rate=0.25)
+    try:
+        rows = [f"RdA número {i}" for i in range(2000)]
+        sampled = [row for row in rows if rda_logging.begin_row(row)]
+        assert sampled == [row for row in rows if rda_logging.begin_row(row)]
+        assert 300 < len(sampled) < 700, len(sampled)
+
+        with _capture() as (logger, handler):
+            rda_logging.begin_row(sampled[0])
+            rda_logging.trace(logger, "rda.resultado", puntaje=2)
+            rda_logging.end_row()
+        record = handler.records[-1]
+        assert record.rda_event == "rda.resultado" and record.rda_fields == {"puntaje": 2}
+        assert "puntaje=2" in record.getMessage()
+        print(f"   {len(sampled)}/2000 filas trazadas")
+    finally:
+        rda_logging.disable_trace()
+    print("✅ Muestreo correcto")
+
+
+if __name__ == "__main__":
+    print("📝 PRUEBA LOGGING")
+    print("=" * 30)
+    test_trace_disabled_emits_nothing()
+    test_trace_sampling()
+    print("\n🎉 ¡Pruebas exitosas!")
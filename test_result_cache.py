@@ -0,0 +1,125 @@
+"""
+Prueba de la caché de resultados compartida entre sesiones (memoria acotada, TTL y disco)
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import spacy
+
+from src import instrumentation
+from src.rda_pipeline import analyze_cached_rows, analyze_rda_batch, make_row_analyzer
+from src import result_cache
+from src.result_cache import ResultCache, analysis_signature
+from src.rule_packs import get_rule_pack, load_rule_pack, set_rule_pack
+
+ITEMS = [
+    ("Analizar los estados financieros de la empresa", "2"),
+    ("Diseñar un plan de marketing", "4"),
+    ("Analizar los estados financieros de la empresa", "8"),
+]
+
+
+def _text_analysis_count():
+    return instrumentation.snapshot().get("analyze_rda_text", {}).get("count", 0)
+
+
+def test_memory_bounds_and_ttl():
+    """El LRU respeta el número de entradas y los bytes; las entradas caducan"""
+    print("🧪 Probando límites y caducidad...")
+    cache = ResultCache(max_entries=2)
+    cache.put_many({"a": 1, "b": 2})
+    cache.get("a")
+    cache.put("c", 3) # Expulsa "b" (la menos usada)
+    assert cache.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+    assert cache.counters()["expulsadas"] == 1
+
+    cache = ResultCache(max_entries=100, max_bytes=300)
+    cache.put_many({key: "x" * 100 for key in "abcd"})
+    assert cache.counters()["bytes"] <= 300 and len(cache.get_many("abcd")) < 4
+
+    cache = ResultCache(ttl=0.05)
+    cache.put("a", {"puntaje": 1})
+    assert cache.get("a") == {"puntaje": 1}
+    time.sleep(0.1)
+    assert cache.get("a") is None and cache.counters()["entradas"] == 0
+    print("✅ Límites y caducidad correctos")
+
+
+def test_disk_tier():
+    """Un proceso nuevo con el mismo archivo recupera los resultados del disco"""
+    print("🧪 Probando nivel en disco...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "resultados.sqlite")
+        first = ResultCache(path=path)
+        first.put("clave", {"bloom": {"level": "Analizar"}})
+        first.close()
+
+        second = ResultCache(path=path)
+        assert second.get("clave") == {"bloom": {"level": "Analizar"}}
+        assert second.get("clave") is not None # Ya en memoria
+        counters = second.counters()
+        assert (counters["aciertos"], counters["aciertos_disco"]) == (2, 1), counters
+        second.close()
+    print("✅ Nivel en disco correcto")
+
+
+def test_shared_between_sessions():
+    """Una segunda sesión obtiene los resultados sin analizar; otras reglas no los reutilizan"""
+    print("🧪 Probando caché compartida entre sesiones...")
+    nlp = spacy.blank("es")
+    cache = ResultCache()
+    expected = analyze_rda_batch(ITEMS, nlp)
+
+    instrumentation.reset()
+    instrumentation.enable()
+    try:
+        first_session = make_row_analyzer(nlp, result_cache=cache)
+        assert [first_session(text, level) for text, level in ITEMS] == expected
+        assert _text_analysis_count() == 2
+
+        rows = [(str(i), text, level) for i, (text, level) in enumerate(ITEMS)]
+        shared = analyze_cached_rows(rows, nlp, result_cache=cache)
+        assert [shared[str(i)] for i in range(len(ITEMS))] == expected
+        second_session = make_row_analyzer(nlp, result_cache=cache)
+        assert [second_session(text, level) for text, level in ITEMS] == expected
+        assert _text_analysis_count() == 2, instrumentation.snapshot() # Nada se volvió a analizar
+    finally:
+        instrumentation.disable()
+        instrumentation.reset()
+
+    signature = analysis_signature(nlp)
+    # Otro código de los analizadores (cambio de heurística) tampoco los reutiliza
+    result_cache.code_digest.cache_clear()
+    original_modules = result_cache.ANALYZER_MODULES
+    result_cache.ANALYZER_MODULES = original_modules[:-1]
+    try:
+        assert analysis_signature(nlp) != signature
+    finally:
+        result_cache.ANALYZER_MODULES = original_modules
+        result_cache.code_digest.cache_clear()
+    assert analysis_signature(nlp) == signature
+
+    original = get_rule_pack()
+    pack = load_rule_pack("default")
+    pack.version = "prueba-cache"
+    set_rule_pack(pack)
+    try:
+        assert analysis_signature(nlp) != signature
+        assert analyze_cached_rows(rows, nlp, result_cache=cache) == {}
+    finally:
+        set_rule_pack(original)
+    print("✅ Caché compartida correcta")
+
+
+if __name__ == "__main__":
+    print("🗄️ PRUEBA CACHÉ DE RESULTADOS COMPARTIDA")
+    print("=" * 40)
+    test_memory_bounds_and_ttl()
+    test_disk_tier()
+    test_shared_between_sessions()
+    print("\n🎉 ¡Pruebas exitosas!")
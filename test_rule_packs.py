@@ -0,0 +1,69 @@
+"""
+Prueba de los paquetes de reglas (carga, versión, herencia e índice por lema)
+"""
+
+import sys
+import os
+import json
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.rule_packs import load_rule_pack, normalize_lemma
+
+
+def test_default_pack():
+    """El paquete por defecto compila los léxicos como frozensets y tiene versión estable"""
+    print("🧪 Probando paquete por defecto...")
+    pack = load_rule_pack("default")
+    assert isinstance(pack.observable_verbs, frozenset) and "calcular" in pack.observable_verbs
+    assert "mapa conceptual" in pack.concrete_nouns
+    assert pack.min_reasonable_length == 5
+    assert pack.version == load_rule_pack("default").version
+    print(f"   {pack}")
+
+    matches = pack.match_lemmas({"comparar", "dato", "xyz"})
+    assert matches["factual_keywords"] == {"dato"}
+    assert {"observable_verbs", "conceptual_keywords"} <= set(k for k, v in matches.items() if "comparar" in v)
+    print("✅ Paquete por defecto correcto")
+
+
+def test_institution_pack_extends_default():
+    """Un paquete institucional redefine solo algunos léxicos y cambia la versión"""
+    print("🧪 Probando paquete institucional...")
+    base = load_rule_pack("default")
+    config = {"nombre": "facultad", "extiende": "default",
+              "correccion": {"palabras_vagas": ["Cosa", "  Asunto  "]}}
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as f:
+        json.dump(config, f)
+    try:
+        pack = load_rule_pack(f.name)
+    finally:
+        os.unlink(f.name)
+    assert pack.name == "facultad"
+    assert pack.vague_words == frozenset({"cosa", "asunto"})
+    assert pack.level_indicator_starters == base.level_indicator_starters # Heredado
+    assert pack.version != base.version
+    assert normalize_lemma(" Mapa   Conceptual ") == "mapa conceptual"
+    print("✅ Herencia de paquetes correcta")
+
+
+def test_object_noun_index():
+    """El índice por lema encuentra términos de una y varias palabras sin coincidencias parciales"""
+    print("🧪 Probando índice de sustantivos concretos/abstractos...")
+    pack = load_rule_pack("default")
+    index = pack.object_noun_index
+    assert index.match(["elaborar", "un", "mapa", "conceptual"]) == {"concrete_nouns": {"mapa conceptual"}}
+    assert index.match(["el", "planificación", "estratégico"]) == {} # "plan" no coincide dentro de "planificación"
+    matches = index.match(["informe", "sobre", "el", "impacto"])
+    assert matches["concrete_nouns"] == {"informe"} and matches["abstract_nouns"] == {"impacto"}
+    print("✅ Índice de sustantivos correcto")
+
+
+if __name__ == "__main__":
+    print("📦 PRUEBA PAQUETES DE REGLAS")
+    print("=" * 30)
+    test_default_pack()
+    test_institution_pack_extends_default()
+    test_object_noun_index()
+    print("\n🎉 ¡Pruebas exitosas!")
@@ -0,0 +1,159 @@
+"""
+Prueba del servicio HTTP de análisis (resultados, contrapresión 503, límite de items y 504)
+"""
+
+import sys
+import os
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import spacy
+from spacy.language import Language
+
+from src.service import create_server
+from src.model_pool import get_model_pool
+
+_GATE = threading.Event()     # Libera los textos "bloquear"
+_BLOCKED = threading.Event()  # Un hilo de análisis está retenido
+_SEEN = []
+
+
+@Language.component("prueba_servicio_bloqueo")
+def _block_component(doc):
+    """Registra los textos procesados y retiene los que contienen "bloquear" hasta abrir _GATE."""
+    _SEEN.append(doc.text.lower())
+    if "bloquear" in doc.text.lower():
+        _BLOCKED.set()
+        _GATE.wait(timeout=10)
+    return doc
+
+
+def _post(port, payload, timeout=10):
+    request = urllib.request.Request(f"http://127.0.0.1:{port}/analizar", data=json.dumps(payload).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"}, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, dict(response.headers), json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), json.loads(e.read())
+
+
+def _get(port, path):
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=10) as response:
+        return json.loads(response.read())
+
+
+def _serve(nlp=None, **kwargs):
+    if nlp is None:
+        nlp = spacy.blank("es")
+        nlp.add_pipe("prueba_servicio_bloqueo")
+    server = create_server(port=0, model_name="prueba", nlp_model=nlp, **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.server_address[1]
+
+
+def _items(*texts):
+    return {"items": [{"text": text, "academic_level": "6"} for text in texts]}
+
+
+def test_results_and_item_limit():
+    """POST devuelve un resultado por RdA; más items que el límite responde 400"""
+    print("🧪 Probando resultados y límite de items...")
+    server, port = _serve(max_request_items=2)
+    try:
+        status, _, body = _post(port, _items("Analizar los estados financieros", "Diseñar un plan"))
+        assert status == 200 and body["total"] == 2 and body["modelo"] == "prueba"
+        assert body["resultados"][0]["RA"] == "Analizar los estados financieros"
+
+        status, _, body = _post(port, _items("a", "b", "c"))
+        assert status == 400 and "Demasiados" in body["error"]
+        assert _post(port, {"items": []})[0] == 400
+        assert _get(port, "/salud")["estado"] == "ok"
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("✅ Resultados y límite correctos")
+
+
+def test_backpressure_and_timeout():
+    """Cola llena -> 503 con Retry-After; una petición que agota la espera no se procesa después"""
+    print("🧪 Probando contrapresión y tiempo de espera...")
+    _GATE.clear()
+    _BLOCKED.clear()
+    server, port = _serve(workers=1, max_queue=1, request_timeout=0.5)
+    try:
+        first = threading.Thread(target=_post, args=(port, _items("Bloquear el único hilo de análisis")))
+        first.start()
+        assert _BLOCKED.wait(timeout=10) # El hilo está ocupado y la cola vacía
+
+        queued = {}
+        second = threading.Thread(target=lambda: queued.update(response=_post(port, _items("Texto abandonado"))))
+        second.start()
+        for _ in range(100): # Esperar a que la segunda petición ocupe la cola
+            if _get(port, "/salud")["cola"] == 1:
+                break
+            time.sleep(0.02)
+        status, headers, _ = _post(port, _items("Texto rechazado"))
+        assert status == 503 and headers.get("Retry-After") == "1", (status, headers)
+
+        second.join(timeout=10)
+        assert queued["response"][0] == 504
+        _GATE.set()
+        first.join(timeout=10)
+        for _ in range(100):
+            if _get(port, "/salud")["descartadas"] == 1:
+                break
+            time.sleep(0.02)
+        assert _get(port, "/salud")["descartadas"] == 1
+        assert not any("abandonado" in text or "rechazado" in text for text in _SEEN), _SEEN
+    finally:
+        _GATE.set()
+        server.shutdown()
+        server.server_close()
+    print("✅ Contrapresión y tiempo de espera correctos")
+
+
+def test_workers_borrow_the_model():
+    """Dos hilos de análisis no usan a la vez la misma instancia del modelo: el segundo espera en el pool"""
+    print("🧪 Probando préstamo del modelo entre hilos...")
+    _GATE.clear()
+    _BLOCKED.clear()
+    nlp = spacy.blank("es")
+    nlp.add_pipe("prueba_servicio_bloqueo")
+    server, port = _serve(nlp, workers=2)
+    pool = get_model_pool(nlp)
+    try:
+        responses = []
+        threads = [threading.Thread(target=lambda text=text: responses.append(_post(port, _items(text))))
+                   for text in ("Bloquear el primer hilo", "Analizar un segundo lote")]
+        threads[0].start()
+        assert _BLOCKED.wait(timeout=10)
+        threads[1].start()
+        for _ in range(100): # El segundo hilo espera su turno en el pool
+            if pool.counters()["en_espera"] == 1:
+                break
+            time.sleep(0.02)
+        assert pool.counters()["en_espera"] == 1, pool.counters()
+        _GATE.set()
+        for thread in threads:
+            thread.join(timeout=10)
+        assert [status for status, _, _ in responses] == [200, 200]
+    finally:
+        _GATE.set()
+        server.shutdown()
+        server.server_close()
+    print("✅ Modelo prestado a un hilo cada vez")
+
+
+if __name__ == "__main__":
+    print("🌐 PRUEBA SERVICIO HTTP DE ANÁLISIS")
+    print("=" * 35)
+    test_results_and_item_limit()
+    test_backpressure_and_timeout()
+    test_workers_borrow_the_model()
+    print("\n🎉 ¡Pruebas exitosas!")
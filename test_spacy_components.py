@@ -0,0 +1,66 @@
+"""
+Prueba de los analizadores como componentes del pipeline spaCy (resultados en Doc._)
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import spacy
+
+from src.spacy_components import add_rda_components, RDA_COMPONENTS
+from src.rda_pipeline import analyze_rda_text, parse_rda_texts, normalize_rda_text, build_rda_result
+from src.notes import Notes
+
+TEXTS = [
+    "Analizar los  estados financieros de la Empresa con precisión",
+    "DISEÑAR un plan de marketing digital",
+    "Ser capaz de evaluar críticamente proyectos de inversión según criterios de rentabilidad",
+    "Aplicar técnicas de KPI recursos humanos en el clima laboral",
+]
+
+
+def _reference(nlp, text):
+    return analyze_rda_text(normalize_rda_text(text), nlp, docs=parse_rda_texts([text], nlp))
+
+
+def test_components_match_pipeline():
+    """nlp.pipe con los componentes RdA da los mismos resultados que el pipeline por RdA"""
+    print("🧪 Probando componentes RdA en nlp.pipe...")
+    nlp = spacy.blank("es")
+    nlp.add_pipe("sentencizer")
+    expected = [_reference(nlp, text) for text in TEXTS]
+    add_rda_components(nlp)
+    add_rda_components(nlp) # Idempotente
+    assert nlp.pipe_names == ["sentencizer", *RDA_COMPONENTS]
+
+    docs = list(nlp.pipe(TEXTS, batch_size=2))
+    assert [doc._.rda_analysis for doc in docs] == expected
+    # Solo quedan los resultados (sin Docs de variantes ni marcos de verbo)
+    assert all(key[1].startswith("rda_") and key[1] not in ("rda_variants", "rda_features", "rda_verb_frame")
+               for key in docs[0].user_data)
+    row = build_rda_result(TEXTS[1], "4", docs[1]._.rda_analysis)
+    assert row["Puntaje Corrección"] == expected[1]["correction"]["correction_score"]
+    print("✅ Resultados idénticos")
+
+
+def test_components_multiprocess():
+    """Con n_process > 1 los resultados vuelven completos y con las notas codificadas"""
+    print("🧪 Probando componentes RdA con varios procesos...")
+    nlp = spacy.blank("es")
+    expected = [_reference(nlp, text) for text in TEXTS]
+    add_rda_components(nlp)
+    docs = list(nlp.pipe(TEXTS, n_process=2, batch_size=2))
+    analyses = [doc._.rda_analysis for doc in docs]
+    assert analyses == expected
+    assert isinstance(analyses[0]["correction"]["correction_notes"], Notes)
+    print("✅ Resultados correctos entre procesos")
+
+
+if __name__ == "__main__":
+    print("🧩 PRUEBA COMPONENTES spaCy")
+    print("=" * 27)
+    test_components_match_pipeline()
+    test_components_multiprocess()
+    print("\n🎉 ¡Pruebas exitosas!")
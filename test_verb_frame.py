@@ -0,0 +1,67 @@
+"""
+Prueba del marco de verbo principal compartido (verbo, objeto, complementos, auxiliares)
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import spacy
+from spacy.tokens import Doc
+
+from src.verb_frame import get_verb_frame, resolve_verb_frame, FRAME_EXTENSION
+from src.nlp_utils import find_main_verb
+from src.correction_analyzer import find_main_verb_and_object
+from src.features import extract_features
+
+
+def _doc(words, lemmas, pos, deps, heads):
+    return Doc(spacy.blank("es").vocab, words=words, lemmas=lemmas, pos=pos, deps=deps, heads=heads)
+
+
+def test_frame_root_verb():
+    """Verbo raíz con objeto y complemento obl; el marco se guarda en la extensión del Doc"""
+    print("🧪 Probando marco del verbo raíz...")
+    # "Analizar los estados financieros según las normas"
+    doc = _doc(["Analizar", "los", "estados", "financieros", "según", "las", "normas"],
+               ["analizar", "el", "estado", "financiero", "según", "el", "norma"],
+               ["VERB", "DET", "NOUN", "ADJ", "ADP", "DET", "NOUN"],
+               ["ROOT", "det", "obj", "amod", "case", "det", "obl"],
+               [0, 2, 0, 2, 6, 6, 0])
+    frame = get_verb_frame(doc)
+    assert frame.verb.text == "Analizar" and frame.lemma == "analizar"
+    assert frame.object.text == "estados"
+    assert [t.text for t in frame.modifiers] == ["normas"]
+    assert doc._.get(FRAME_EXTENSION) is frame
+    assert get_verb_frame(doc) is frame # Calculado una sola vez por Doc
+    # Todos los analizadores usan el mismo verbo
+    assert find_main_verb(doc) == "analizar"
+    assert find_main_verb_and_object(doc)["verb"] is frame.verb
+    assert extract_features(doc)["main_verb"] == "analizar"
+    print(f"   {frame}")
+    print("✅ Marco del verbo raíz correcto")
+
+
+def test_frame_aux_and_fallbacks():
+    """Sin verbo raíz se usa el verbo del auxiliar; sin verbos el marco está vacío"""
+    print("🧪 Probando marco sin verbo raíz...")
+    # "capaz de poder explicar": ROOT adjetivo, auxiliar que depende de "explicar"
+    doc = _doc(["capaz", "de", "poder", "explicar"], ["capaz", "de", "poder", "explicar"],
+               ["ADJ", "ADP", "AUX", "VERB"], ["ROOT", "mark", "aux", "advcl"], [0, 3, 3, 0])
+    frame = resolve_verb_frame(doc)
+    assert frame.lemma == "explicar" and frame.root_verb is None
+    assert [t.text for t in frame.aux] == ["poder"]
+    assert find_main_verb(doc) == "explicar"
+
+    empty = resolve_verb_frame(_doc(["Marketing"], ["marketing"], ["NOUN"], ["ROOT"], [0]))
+    assert empty.verb is None and empty.lemma is None and empty.object is None
+    print("✅ Marco sin verbo raíz correcto")
+
+
+if __name__ == "__main__":
+    print("🔎 PRUEBA MARCO DE VERBO PRINCIPAL")
+    print("=" * 33)
+    test_frame_root_verb()
+    test_frame_aux_and_fallbacks()
+    print("\n🎉 ¡Pruebas exitosas!")